@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+ヘッドレス一括処理 CLI v5.5
+GUIなしでフォルダ内のPDF・CSVを 分類 → リネーム し、処理速度を報告する
+命名・空白ページ除外・重複時の連番はGUIのフォルダ一括処理と共通（core.output_naming.apply_pdf_analysis）。
+命名にスナップショットは使わないため作成しない。
+
+使用例:
+    python -m core.batch 入力フォルダ 出力フォルダ --yymm 2508 --municipality-sets sets.json
+    python -m core.batch 入力フォルダ 出力フォルダ --yymm 2508 --log-level INFO,split=DEBUG --log-json run.jsonl
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .file_identity import FILE_IDENTITY_DB_NAME, configure_shared_file_identity_cache
+from .log_config import configure_logging
+from .output_naming import apply_pdf_analysis, unique_output_path
+from .parallel_batch import create_parallel_batch_engine
+from .pdf_processor import PDFProcessor
+from .run_manifest import create_run_manifest
+
+STAGE_ORDER = ["bundle_detect", "extract", "classify", "ocr", "write", "csv"]
+
+
+@dataclass
+class BatchStats:
+    """一括処理の集計結果"""
+    files: int = 0
+    pages: int = 0
+    outputs: int = 0
+    errors: int = 0
+    reused: int = 0                      # 増分処理で前回の出力を再利用したファイル数
+    elapsed: float = 0.0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    stage_counts: Dict[str, int] = field(default_factory=dict)
+
+    def add_timings(self, timings: Dict[str, float]):
+        """ファイル1件分の段階別所要時間を加算"""
+        for stage, seconds in timings.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_counts[stage] = self.stage_counts.get(stage, 0) + 1
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        """JSON出力用"""
+        return {
+            'files': self.files,
+            'pages': self.pages,
+            'outputs': self.outputs,
+            'errors': self.errors,
+            'reused': self.reused,
+            'elapsed_sec': round(self.elapsed, 4),
+            'files_per_sec': round(self.files_per_sec, 3),
+            'pages_per_sec': round(self.pages_per_sec, 3),
+            'stages': {
+                stage: {
+                    'total_sec': round(self.stage_seconds[stage], 4),
+                    'count': self.stage_counts[stage],
+                    'mean_ms': round(self.stage_seconds[stage] / self.stage_counts[stage] * 1000, 3),
+                }
+                for stage in self._ordered_stages()
+            },
+        }
+
+    def format_report(self) -> str:
+        """人が読むための集計レポート"""
+        lines = [
+            f"files={self.files} pages={self.pages} outputs={self.outputs} errors={self.errors} reused={self.reused}",
+            f"elapsed={self.elapsed:.2f}s files/sec={self.files_per_sec:.2f} pages/sec={self.pages_per_sec:.2f}",
+            "stage            total(s)   count   mean(ms)",
+        ]
+        for stage in self._ordered_stages():
+            total = self.stage_seconds[stage]
+            count = self.stage_counts[stage]
+            lines.append(f"{stage:<15} {total:>9.3f} {count:>7d} {total / count * 1000:>10.2f}")
+        lines.append("(bundle_detect/extract/classify/ocr はワーカー内の累積時間)")
+        return "\n".join(lines)
+
+    def _ordered_stages(self) -> List[str]:
+        known = [s for s in STAGE_ORDER if s in self.stage_seconds]
+        return known + sorted(s for s in self.stage_seconds if s not in STAGE_ORDER)
+
+
+def load_municipality_sets(path: Optional[str]) -> Dict[int, Dict[str, str]]:
+    """自治体セットJSONを読み込む
+
+    次のいずれかの形式に対応:
+        {"1": {"prefecture": "東京都", "city": ""}, "2": {...}}
+        [{"set_number": 1, "prefecture": "東京都", "city": ""}, ...]
+        {"municipality_sets": [...]}  （GUI設定ファイル形式）
+    """
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict) and 'municipality_sets' in data:
+        data = data['municipality_sets']
+
+    municipality_sets = {}
+    if isinstance(data, list):
+        for muni_set in data:
+            municipality_sets[int(muni_set['set_number'])] = {
+                'prefecture': muni_set.get('prefecture', ''),
+                'city': muni_set.get('city', ''),
+            }
+    else:
+        for set_number, muni_set in data.items():
+            municipality_sets[int(set_number)] = {
+                'prefecture': muni_set.get('prefecture', ''),
+                'city': muni_set.get('city', ''),
+            }
+    return municipality_sets
+
+
+def collect_target_files(input_folder: str) -> List[str]:
+    """処理対象ファイル（直下のPDF・CSV）を名前順で収集"""
+    target_files = []
+    for name in sorted(os.listdir(input_folder)):
+        file_path = os.path.join(input_folder, name)
+        if not os.path.isfile(file_path):
+            continue
+        lower = name.lower()
+        if lower.endswith('.pdf') and not name.startswith('__split_'):
+            target_files.append(file_path)
+        elif lower.endswith('.csv'):
+            target_files.append(file_path)
+    return target_files
+
+
+def process_csv_file(file_path: str, output_folder: str, yymm: str,
+                     csv_processor) -> Optional[Tuple[str, str]]:
+    """CSVを分類結果のコードで命名・出力し、(出力パス, 分類) を返す（失敗時はNone）"""
+    import shutil
+
+    # 年月は指定値を使うため、分類はヘッダーのみで行う（本体は読まない）
+    result = csv_processor.process_csv(file_path, year_month=yymm)
+    if not result.success:
+        return None
+    output_path = unique_output_path(output_folder, csv_processor.generate_csv_filename(result))
+    shutil.copy2(file_path, output_path)
+    return output_path, result.document_type
+
+
+def run_batch(input_folder: str, output_folder: str, yymm: str,
+              municipality_sets: Optional[Dict[int, Dict[str, str]]] = None,
+              max_workers: Optional[int] = None,
+              snapshot_dir: Optional[str] = None,
+              incremental: bool = False,
+              logger: Optional[logging.Logger] = None) -> BatchStats:
+    """フォルダ一括処理を実行して集計結果を返す
+
+    incremental=True では入力フォルダのマニフェストを参照し、前回から追加・変更された
+    ファイルだけを処理する（未変更ファイルは前回の出力を再利用）。
+    """
+    logger = logger or logging.getLogger(__name__)
+    os.makedirs(output_folder, exist_ok=True)
+    target_files = collect_target_files(input_folder)
+
+    stats = BatchStats()
+    started = time.perf_counter()
+
+    # 未変更ファイルは stat だけでMD5を再利用（GUIと同じくスナップショット保存先に永続化）
+    file_identity_db = Path(snapshot_dir or "./snapshots") / FILE_IDENTITY_DB_NAME
+    configure_shared_file_identity_cache(file_identity_db)
+
+    manifest = create_run_manifest(input_folder, logger=logger) if incremental else None
+    if manifest is not None:
+        target_files, reused_files = manifest.plan(target_files, output_folder, yymm)
+        stats.reused = len(reused_files)
+        for file_path in reused_files:
+            logger.debug("[batch] Unchanged, reusing previous outputs: %s", os.path.basename(file_path))
+
+    engine = create_parallel_batch_engine(
+        municipality_sets=municipality_sets,
+        max_workers=max_workers,
+        logger=logger,
+        file_identity_db=file_identity_db,
+    )
+    pdf_processor = PDFProcessor(logger=logger)
+    csv_processor = None
+
+    def count_output(*args):
+        stats.outputs += 1
+
+    try:
+        for analysis in engine.iter_analyses(target_files):
+            stats.files += 1
+            filename = os.path.basename(analysis.file_path)
+            if manifest is not None:
+                # 変更されたファイルの前回出力は新しい出力で置き換える
+                for stale in manifest.discard_outputs(analysis.file_path, output_folder):
+                    logger.debug("[batch] Removed stale output: %s", os.path.basename(stale))
+            try:
+                if analysis.kind == 'pdf':
+                    stats.pages += analysis.page_count
+                    success = apply_pdf_analysis(
+                        analysis, output_folder, yymm, pdf_processor, logger.debug, count_output
+                    )
+                elif analysis.kind == 'csv':
+                    csv_started = time.perf_counter()
+                    if csv_processor is None:
+                        from .csv_processor import CSVProcessor
+                        csv_processor = CSVProcessor()
+                    csv_output = process_csv_file(analysis.file_path, output_folder, yymm, csv_processor)
+                    analysis.timings['csv'] = time.perf_counter() - csv_started
+                    success = csv_output is not None
+                    if success:
+                        output_path, document_type = csv_output
+                        stats.outputs += 1
+                        analysis.outputs.append(os.path.basename(output_path))
+                        analysis.document_types.append(document_type)
+                else:
+                    continue
+            except Exception as e:
+                logger.error("[batch] File error: %s - %s", filename, e)
+                success = False
+
+            stats.add_timings(analysis.timings)
+            if manifest is not None:
+                if success:
+                    manifest.record(analysis.file_path, output_folder, yymm,
+                                    analysis.outputs, analysis.document_types)
+                else:
+                    manifest.forget(analysis.file_path)
+            if not success:
+                stats.errors += 1
+                logger.warning("[batch] Failed: %s", filename)
+    finally:
+        pdf_processor.close()
+        if manifest is not None:
+            manifest.save()
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLIエントリポイント"""
+    parser = argparse.ArgumentParser(
+        prog="python -m core.batch",
+        description="税務書類の一括リネーム（ヘッドレス実行・処理速度レポート付き）",
+    )
+    parser.add_argument("input_folder", help="処理対象フォルダ（直下のPDF・CSVのみ）")
+    parser.add_argument("output_folder", help="出力先フォルダ")
+    parser.add_argument("--yymm", required=True, help="年月（YYMM形式、例: 2508）")
+    parser.add_argument("--municipality-sets", help="自治体セット設定JSONファイル")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定: 論理CPU数、1で逐次処理）")
+    parser.add_argument("--snapshot-dir", default=None, help="ファイルMD5キャッシュの保存先（既定: ./snapshots、GUIと共有）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="前回から追加・変更されたファイルのみ処理（入力フォルダのマニフェストを使用）")
+    parser.add_argument("--report-json", default=None, help="集計結果をJSONで保存するパス")
+    parser.add_argument("-v", "--verbose", action="store_true", help="詳細ログを出力")
+    parser.add_argument("--log-level", default=None,
+                        help="ログレベル（例: INFO,classify=DEBUG、既定: 環境変数 TAX_RENAMER_LOG）")
+    parser.add_argument("--log-json", default=None, help="ログをJSON Lines形式で追記するパス")
+    args = parser.parse_args(argv)
+
+    try:
+        configure_logging(args.log_level, json_path=args.log_json,
+                          default_level=logging.DEBUG if args.verbose else logging.WARNING)
+    except ValueError as e:
+        parser.error(f"--log-level の指定が不正です: {e}")
+
+    if not (len(args.yymm) == 4 and args.yymm.isdigit()):
+        parser.error(f"--yymm はYYMM形式の4桁数字で指定してください: {args.yymm}")
+    if not os.path.isdir(args.input_folder):
+        parser.error(f"入力フォルダが存在しません: {args.input_folder}")
+
+    stats = run_batch(
+        args.input_folder,
+        args.output_folder,
+        args.yymm,
+        municipality_sets=load_municipality_sets(args.municipality_sets),
+        max_workers=args.workers,
+        snapshot_dir=args.snapshot_dir,
+        incremental=args.incremental,
+    )
+
+    print(stats.format_report())
+    if args.report_json:
+        with open(args.report_json, 'w', encoding='utf-8') as f:
+            json.dump(stats.to_dict(), f, ensure_ascii=False, indent=2)
+
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,21 +8,27 @@ import re
 import logging
 import json
 import os
-from typing import Dict, List, Optional, Tuple, Callable, Union, Any
+import threading
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple, Callable, Union, Any, Mapping, AbstractSet, Deque
 from dataclasses import dataclass, field
 import datetime
 from pathlib import Path
 
+from .gazetteer import KIND_OFFICE, get_shared_gazetteer
+from .keyword_matcher import AhoCorasickMatcher, KeywordHits
+
 # Import generic receipt numbering functions
 from helpers.seq_policy import (
     analyze_prefecture_sets,
     generate_receipt_number_generic
 )
 
-@dataclass
+@dataclass(frozen=True)
 class AndCondition:
-    """AND条件を表すデータクラス"""
-    keywords: List[str]
+    """AND条件を表すデータクラス（共有ルールセットで使うため不変）"""
+    keywords: Tuple[str, ...]
     match_type: str = "all"  # "all" (すべて必要) or "any" (いずれか必要)
     
     def check_match(self, text: str) -> Tuple[bool, List[str]]:
@@ -36,6 +42,15 @@ class AndCondition:
             return len(matched) == len(self.keywords), matched
         else:  # "any"
             return len(matched) > 0, matched
+    
+    def check_hits(self, hits: AbstractSet[str]) -> Tuple[bool, List[str]]:
+        """検出済みキーワード集合によるマッチングチェック（check_match と同一結果）"""
+        matched = [keyword for keyword in self.keywords if keyword in hits]
+        
+        if self.match_type == "all":
+            return len(matched) == len(self.keywords), matched
+        else:  # "any"
+            return len(matched) > 0, matched
 
 @dataclass
 class ClassificationStep:
@@ -61,23 +76,144 @@ class ClassificationResult:
     prefecture_code: Optional[int] = None  # 都道府県連番コード（1001/1011/1021等）
     city_code: Optional[int] = None  # 市区町村連番コード（2001/2011/2021等）
 
+def _freeze_rule_value(value):
+    """ルール値を読み取り専用に変換"""
+    if isinstance(value, AndCondition):
+        return AndCondition(tuple(value.keywords), value.match_type)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_rule_value(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze_rule_value(v) for k, v in value.items()})
+    return value
+
+
+# 1文書あたりの処理ログ保持件数（一括処理の結果一覧に保持するため上限を設ける）
+DEFAULT_MAX_LOG_ENTRIES = 100
+
+_SHARED_RULES_V5: Optional[Mapping[str, Mapping[str, Any]]] = None
+_SHARED_RULES_LOCK = threading.Lock()
+
+
+def get_shared_classification_rules_v5() -> Mapping[str, Mapping[str, Any]]:
+    """プロセス共有の分類ルールセットを取得
+    
+    初回呼び出し時に1回だけ構築し、以降はすべての DocumentClassifierV5
+    インスタンスが同じ読み取り専用ルールセットを参照する。
+    """
+    global _SHARED_RULES_V5
+    if _SHARED_RULES_V5 is None:
+        with _SHARED_RULES_LOCK:
+            if _SHARED_RULES_V5 is None:
+                _SHARED_RULES_V5 = _freeze_rule_value(
+                    DocumentClassifierV5._initialize_classification_rules_v5()
+                )
+    return _SHARED_RULES_V5
+
+
+_SHARED_KEYWORD_MATCHER: Optional[AhoCorasickMatcher] = None
+
+
+def get_shared_keyword_matcher() -> AhoCorasickMatcher:
+    """共有ルールセットの全キーワードをまとめたオートマトンを取得（プロセス内1回だけ構築）"""
+    global _SHARED_KEYWORD_MATCHER
+    if _SHARED_KEYWORD_MATCHER is None:
+        with _SHARED_RULES_LOCK:
+            if _SHARED_KEYWORD_MATCHER is None:
+                keywords = set()
+                for rules in get_shared_classification_rules_v5().values():
+                    for key in ("exact_keywords", "partial_keywords", "exclude_keywords", "filename_keywords"):
+                        keywords.update(rules.get(key, ()))
+                    for condition in rules.get("highest_priority_conditions", ()):
+                        keywords.update(condition.keywords)
+                _SHARED_KEYWORD_MATCHER = AhoCorasickMatcher(keywords)
+    return _SHARED_KEYWORD_MATCHER
+
+
+# 自治体セット番号（UI設定のセット順）→ 所在地（都道府県, 市区町村）
+# 都の市区町村書類はないため、セット1の区は提出先の税務署の絞り込みにだけ使う
+SUBMISSION_SET_LOCALITIES: Mapping[int, Tuple[str, str]] = MappingProxyType({
+    1: ("東京都", "港区"),    # セット1
+    2: ("愛知県", "蒲郡市"),  # セット2
+    3: ("福岡県", "福岡市"),  # セット3
+    4: ("北海道", "札幌市"),  # セット4（拡張用）
+    5: ("大阪府", "大阪市"),  # セット5（拡張用）
+})
+
+_SUBMISSION_OFFICE_SETS: Optional[Mapping[int, Tuple[str, ...]]] = None
+_SHARED_OFFICE_MATCHER: Optional[AhoCorasickMatcher] = None
+
+
+def _build_submission_office_names(prefecture: str, city: str) -> Tuple[str, ...]:
+    """所在地の提出先キーワード（都道府県・都道府県税の事務所・所在市区の税務署・市区町村）を地名辞書から作成"""
+    gazetteer = get_shared_gazetteer()
+    names = [prefecture]
+    for office in gazetteer.entries_in(prefecture, KIND_OFFICE):
+        if not office.is_national_tax_office:
+            names.extend((office.name, prefecture + office.name))
+        elif office.city == city:
+            names.append(office.name)
+    if prefecture != "東京都":
+        names.extend((city, city + "役所"))
+    return tuple(dict.fromkeys(names))
+
+
+def get_submission_office_sets() -> Mapping[int, Tuple[str, ...]]:
+    """提出先（税事務所・自治体名）→ 自治体セット番号の対応を取得（プロセス内1回だけ構築）"""
+    global _SUBMISSION_OFFICE_SETS
+    if _SUBMISSION_OFFICE_SETS is None:
+        with _SHARED_RULES_LOCK:
+            if _SUBMISSION_OFFICE_SETS is None:
+                _SUBMISSION_OFFICE_SETS = MappingProxyType({
+                    set_num: _build_submission_office_names(prefecture, city)
+                    for set_num, (prefecture, city) in SUBMISSION_SET_LOCALITIES.items()
+                })
+    return _SUBMISSION_OFFICE_SETS
+
+
+def get_shared_office_matcher() -> AhoCorasickMatcher:
+    """提出先キーワードのオートマトンを取得（プロセス内1回だけ構築）"""
+    global _SHARED_OFFICE_MATCHER
+    if _SHARED_OFFICE_MATCHER is None:
+        office_sets = get_submission_office_sets()
+        with _SHARED_RULES_LOCK:
+            if _SHARED_OFFICE_MATCHER is None:
+                _SHARED_OFFICE_MATCHER = AhoCorasickMatcher(
+                    name for names in office_sets.values() for name in names)
+    return _SHARED_OFFICE_MATCHER
+
+
+def _find_submission_set(text: str) -> Tuple[Optional[int], Optional[str]]:
+    """text に含まれる提出先のうち最小のセット番号と、その根拠のキーワード"""
+    hits = get_shared_office_matcher().find(text)
+    for set_num, office_names in get_submission_office_sets().items():
+        for office_name in office_names:
+            if office_name in hits:
+                return set_num, office_name
+    return None, None
+
+
 class DocumentClassifierV5:
     """書類分類エンジン v5.0 - AND条件対応版"""
     
-    def __init__(self, debug_mode: bool = False, log_callback: Optional[Callable[[str], None]] = None):
+    def __init__(self, debug_mode: bool = False, log_callback: Optional[Callable[[str], None]] = None,
+                 max_log_entries: int = DEFAULT_MAX_LOG_ENTRIES):
         """初期化
         
         Args:
-            debug_mode: デバッグモードの有効化
+            debug_mode: デバッグモードの有効化（ルールごとの評価過程 debug_steps を記録）
             log_callback: ログ出力のコールバック関数
+            max_log_entries: 1文書あたりの処理ログの保持件数（超えた分は古いものから破棄）
         """
         self.debug_mode = debug_mode
         self.log_callback = log_callback
+        self.logger = logging.getLogger(__name__)
         self.current_filename = ""
-        self.processing_log = []
+        self.processing_log: Deque[str] = deque(maxlen=max_log_entries)
         
-        # v5.0 新分類ルール（AND条件対応）
-        self.classification_rules_v5 = self._initialize_classification_rules_v5()
+        # v5.0 新分類ルール（AND条件対応・プロセス共有の読み取り専用ルールセット）
+        self.classification_rules_v5 = get_shared_classification_rules_v5()
+        self.keyword_matcher = get_shared_keyword_matcher()
+        self._last_keyword_scan: Optional[Tuple[Tuple[str, str], KeywordHits]] = None
         
         # v5.3.4 prefecture code mapping for local tax
         self.prefecture_code_map = {
@@ -138,8 +274,12 @@ class DocumentClassifierV5:
         # その他の地方税コード
         return base_class
 
-    def _initialize_classification_rules_v5(self) -> Dict:
-        """v5.0 分類ルール初期化（AND条件対応）"""
+    @staticmethod
+    def _initialize_classification_rules_v5() -> Dict:
+        """v5.0 分類ルール初期化（AND条件対応）
+        
+        通常は get_shared_classification_rules_v5() 経由でプロセス内1回だけ呼ばれる。
+        """
         return {
             # ===== 0000番台 - 国税申告書類 =====
             "0000_納付税額一覧表": {
@@ -555,7 +695,7 @@ class DocumentClassifierV5:
         }
 
     def _log(self, message: str, level: str = "INFO"):
-        """ログ出力"""
+        """ログ出力（INFO の経過ログは logger には DEBUG で流し、WARNING 以上のみ既定で表示）"""
         timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
         log_entry = f"[{timestamp}] [{level}] {message}"
         
@@ -566,18 +706,35 @@ class DocumentClassifierV5:
         if self.log_callback:
             self.log_callback(log_entry)
         
-        # デバッグモードの場合はコンソール出力
-        if self.debug_mode:
-            print(log_entry)
+        log_level = logging.getLevelName(level)
+        if not isinstance(log_level, int) or log_level <= logging.INFO:
+            log_level = logging.DEBUG
+        self.logger.log(log_level, "%s", message)
+
+    def _log_debug(self, message: str, *args):
+        """デバッグレベルのログ（%-形式の引数は出力するときだけ展開）
 
-    def _log_debug(self, message: str):
-        """デバッグレベルのログ"""
+        processing_log・コールバックへの記録は debug_mode 時のみ。debug_mode でなくても
+        logger が DEBUG 有効なら logger にだけ出力する。
+        """
         if self.debug_mode:
-            self._log(message, "DEBUG")
+            self._log(message % args if args else message, "DEBUG")
+        elif self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(message, *args)
+
+    def _scan_keywords(self, text: str, filename: str) -> KeywordHits:
+        """全ルールのキーワードを1パスで検出（同一入力の直前結果は再利用）"""
+        key = (text, filename)
+        last_scan = self._last_keyword_scan
+        if last_scan is not None and last_scan[0] == key:
+            return last_scan[1]
+        hits = self.keyword_matcher.scan(text, filename)
+        self._last_keyword_scan = (key, hits)
+        return hits
 
     def _check_highest_priority_conditions(self, text: str, filename: str) -> Optional[ClassificationResult]:
         """最優先条件（AND条件）をチェック"""
-        combined_text = f"{text} {filename}"
+        hits = self._scan_keywords(text, filename)
         
         self._log("最優先AND条件判定開始")
         
@@ -592,12 +749,12 @@ class DocumentClassifierV5:
                 continue
             
             for i, condition in enumerate(highest_priority_conditions):
-                is_match, matched_keywords = condition.check_match(combined_text)
+                is_match, matched_keywords = condition.check_hits(hits.combined)
                 
                 if is_match:
-                    self._log(f"最優先AND条件一致: {doc_type} (条件{i+1})")
-                    self._log_debug(f"マッチしたキーワード: {matched_keywords}")
-                    self._log_debug(f"マッチタイプ: {condition.match_type}")
+                    self._log_debug("最優先AND条件一致: %s (条件%s)", doc_type, i + 1)
+                    self._log_debug("マッチしたキーワード: %s", matched_keywords)
+                    self._log_debug("マッチタイプ: %s", condition.match_type)
                     
                     # メタデータの取得
                     meta_data = rules.get("meta", {})
@@ -608,13 +765,13 @@ class DocumentClassifierV5:
                         matched_keywords=matched_keywords,
                         classification_method="highest_priority_and_condition",
                         debug_steps=[],
-                        processing_log=self.processing_log.copy(),
-                        meta=meta_data
+                        processing_log=list(self.processing_log),
+                        meta=dict(meta_data)
                     )
                     
                     # 6002/6003の場合、層C四重ロック警告
                     if doc_type.startswith(('6002_', '6003_')):
-                        self._log(f"[6002/6003 Lock C] Asset document detected: {doc_type}")
+                        self._log_debug("[6002/6003 Lock C] Asset document detected: %s", doc_type)
                     
                     return result
         
@@ -623,31 +780,31 @@ class DocumentClassifierV5:
 
     def classify_document_v5(self, text: str, filename: str = "", job_context=None) -> ClassificationResult:
         """v5.0 書類分類（AND条件対応版）+ 受信通知連番処理強制実行"""
-        self.processing_log = []  # ログをリセット
+        self.processing_log.clear()  # ログをリセット
         self.current_filename = filename
         
         # 🔥 Bundle分割ファイルの特別ログ（段階1）
         if filename.startswith("__split_"):
-            print(f"[BUNDLE_SPLIT_DEBUG] Bundle分割ファイル処理開始: {filename}")
-            print(f"[BUNDLE_SPLIT_DEBUG] JobContext存在: {job_context is not None}")
+            self.logger.debug("[BUNDLE_SPLIT_DEBUG] Bundle分割ファイル処理開始: %s", filename)
+            self.logger.debug("[BUNDLE_SPLIT_DEBUG] JobContext存在: %s", job_context is not None)
             if job_context:
-                print(f"[BUNDLE_SPLIT_DEBUG] JobContext内容: {type(job_context)}")
+                self.logger.debug("[BUNDLE_SPLIT_DEBUG] JobContext内容: %s", type(job_context))
                 municipality_sets = getattr(job_context, 'current_municipality_sets', None)
-                print(f"[BUNDLE_SPLIT_DEBUG] municipality_sets: {municipality_sets}")
+                self.logger.debug("[BUNDLE_SPLIT_DEBUG] municipality_sets: %s", municipality_sets)
         
-        self._log(f"書類分類開始 (v5.0): {filename}")
+        self._log_debug("書類分類開始 (v5.0): %s", filename)
         
         # テキストの前処理
         text_cleaned = self._preprocess_text(text)
         filename_cleaned = self._preprocess_text(filename)
         
-        self._log_debug(f"入力テキスト長: {len(text)} → 前処理後: {len(text_cleaned)}")
-        self._log_debug(f"ファイル名: {filename} → 前処理後: {filename_cleaned}")
+        self._log_debug("入力テキスト長: %s → 前処理後: %s", len(text), len(text_cleaned))
+        self._log_debug("ファイル名: %s → 前処理後: %s", filename, filename_cleaned)
         
         # 抽出テキストの一部を表示（デバッグ用）
         if text_cleaned:
             preview = text_cleaned[:200] + "..." if len(text_cleaned) > 200 else text_cleaned
-            self._log_debug(f"テキスト内容: {preview}")
+            self._log_debug("テキスト内容: %s", preview)
         
         # バグ修正依頼書: D-2 地方税受信通知専用判定（新規追加）
         municipality_info = self._extract_municipality_info_from_text(text_cleaned, filename_cleaned)
@@ -659,14 +816,14 @@ class DocumentClassifierV5:
             if (filename.startswith("__split_") and 
                 hasattr(local_tax_result, 'classification_method') and
                 local_tax_result.classification_method == "local_tax_receipt_detection_ocr"):
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: {local_tax_result.document_type}")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: {local_tax_result.classification_method}")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: {job_context is not None}")
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: %s", local_tax_result.document_type)
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: %s", local_tax_result.classification_method)
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: %s", job_context is not None)
             
             # 🔥 修正指示書対応: 受信通知の場合、即座に連番処理を実行
             if job_context is not None:
-                print(f"[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
+                self.logger.debug("[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
             final_result = self._apply_receipt_numbering_if_needed(local_tax_result, text_cleaned, job_context)
             return final_result
         
@@ -677,14 +834,14 @@ class DocumentClassifierV5:
             if (filename.startswith("__split_") and 
                 hasattr(enhanced_result, 'classification_method') and
                 enhanced_result.classification_method == "local_tax_receipt_detection_ocr"):
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: {enhanced_result.document_type}")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: {enhanced_result.classification_method}")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: {job_context is not None}")
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: %s", enhanced_result.document_type)
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: %s", enhanced_result.classification_method)
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: %s", job_context is not None)
             
             # 🔥 修正指示書対応: 受信通知の場合、即座に連番処理を実行
             if job_context is not None:
-                print(f"[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
+                self.logger.debug("[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
             final_result = self._apply_receipt_numbering_if_needed(enhanced_result, text_cleaned, job_context)
             return final_result
         
@@ -695,14 +852,14 @@ class DocumentClassifierV5:
             if (filename.startswith("__split_") and 
                 hasattr(priority_result, 'classification_method') and
                 priority_result.classification_method == "local_tax_receipt_detection_ocr"):
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: {priority_result.document_type}")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: {priority_result.classification_method}")
-                print(f"[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: {job_context is not None}")
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: %s", priority_result.document_type)
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: %s", priority_result.classification_method)
+                self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: %s", job_context is not None)
             
             # 🔥 修正指示書対応: 受信通知の場合、即座に連番処理を実行
             if job_context is not None:
-                print(f"[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
+                self.logger.debug("[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
             final_result = self._apply_receipt_numbering_if_needed(priority_result, text_cleaned, job_context)
             return final_result
         
@@ -713,14 +870,14 @@ class DocumentClassifierV5:
         if (filename.startswith("__split_") and 
             hasattr(standard_result, 'classification_method') and
             standard_result.classification_method == "local_tax_receipt_detection_ocr"):
-            print(f"[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
-            print(f"[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: {standard_result.document_type}")
-            print(f"[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: {standard_result.classification_method}")
-            print(f"[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: {job_context is not None}")
+            self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 地方税受信通知検出！")
+            self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 分類結果: %s", standard_result.document_type)
+            self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] 判定方法: %s", standard_result.classification_method)
+            self.logger.debug("[LOCAL_TAX_RECEIPT_DEBUG] JobContext for numbering: %s", job_context is not None)
         
         # 🔥 修正指示書対応: 受信通知の場合、即座に連番処理を実行
         if job_context is not None:
-            print(f"[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
+            self.logger.debug("[RECEIPT_NUMBERING_DEBUG] 連番処理開始")
         final_result = self._apply_receipt_numbering_if_needed(standard_result, text_cleaned, job_context)
         return final_result
 
@@ -743,21 +900,21 @@ class DocumentClassifierV5:
         
         # 受信通知判定
         if not is_receipt_notice(base_code):
-            self._log_debug(f"[RECEIPT_SEQ] 受信通知ではないためスキップ: {base_code}")
+            self._log_debug("[RECEIPT_SEQ] 受信通知ではないためスキップ: %s", base_code)
             return classification_result
             
         # JobContext確認
         if not job_context:
-            self._log_debug(f"[RECEIPT_SEQ] JobContext未設定のためスキップ: {base_code}")
+            self._log_debug("[RECEIPT_SEQ] JobContext未設定のためスキップ: %s", base_code)
             return classification_result
         
         # municipality_sets確認
         municipality_sets = getattr(job_context, 'current_municipality_sets', None)
         if not municipality_sets:
-            self._log_debug(f"[RECEIPT_SEQ] municipality_sets未設定のためスキップ: {base_code}")
+            self._log_debug("[RECEIPT_SEQ] municipality_sets未設定のためスキップ: %s", base_code)
             return classification_result
             
-        self._log(f"[RECEIPT_SEQ] 受信通知連番処理開始: {base_code}")
+        self._log_debug("[RECEIPT_SEQ] 受信通知連番処理開始: %s", base_code)
         
         try:
             # ReceiptSequencer統合による動的連番計算
@@ -771,18 +928,18 @@ class DocumentClassifierV5:
                 prefecture = self._extract_prefecture_from_ocr_simple(ocr_text)
                 if prefecture:
                     final_code = sequencer.assign_pref_seq(base_code, prefecture)
-                    self._log(f"[RECEIPT_SEQ] 都道府県連番計算成功: {prefecture} → {final_code}")
+                    self._log_debug("[RECEIPT_SEQ] 都道府県連番計算成功: %s → %s", prefecture, final_code)
                 else:
-                    self._log_debug(f"[RECEIPT_SEQ] 都道府県抽出失敗: {base_code}")
+                    self._log_debug("[RECEIPT_SEQ] 都道府県抽出失敗: %s", base_code)
                     
             elif is_city_receipt(base_code):
                 # 市町村受信通知
                 prefecture, city = self._extract_prefecture_city_from_ocr_simple(ocr_text)
                 if prefecture and city:
                     final_code = sequencer.assign_city_seq(base_code, prefecture, city)
-                    self._log(f"[RECEIPT_SEQ] 市町村連番計算成功: {prefecture} {city} → {final_code}")
+                    self._log_debug("[RECEIPT_SEQ] 市町村連番計算成功: %s %s → %s", prefecture, city, final_code)
                 else:
-                    self._log_debug(f"[RECEIPT_SEQ] 市町村抽出失敗: pref={prefecture}, city={city}")
+                    self._log_debug("[RECEIPT_SEQ] 市町村抽出失敗: pref=%s, city=%s", prefecture, city)
             
             if final_code and final_code != base_code.split('_')[0]:
                 # 連番処理成功：新しい分類結果を作成
@@ -797,23 +954,23 @@ class DocumentClassifierV5:
                     original_doc_type_code=base_code  # 元のコードを保存
                 )
                 
-                self._log(f"[RECEIPT_SEQ] 連番処理成功: {base_code} -> {new_document_type}")
+                self._log_debug("[RECEIPT_SEQ] 連番処理成功: %s -> %s", base_code, new_document_type)
                 return new_result
             else:
-                self._log(f"[RECEIPT_SEQ] 連番処理失敗またはスキップ: {base_code}")
+                self._log_debug("[RECEIPT_SEQ] 連番処理失敗またはスキップ: %s", base_code)
                 return classification_result
                 
         except Exception as e:
-            self._log(f"[RECEIPT_SEQ] 連番処理エラー: {e}")
+            self._log(f"[RECEIPT_SEQ] 連番処理エラー: {e}", "ERROR")
             import traceback
-            self._log_debug(f"[RECEIPT_SEQ] Traceback: {traceback.format_exc()}")
+            self._log_debug("[RECEIPT_SEQ] Traceback: %s", traceback.format_exc())
             return classification_result
 
 
     def _extract_prefecture_from_ocr_simple(self, ocr_text: str) -> Optional[str]:
         """簡素化された都道府県抽出（段階3精度向上版）"""
-        print(f"[RECEIPT_CALC] OCR解析開始")
-        print(f"[RECEIPT_CALC] 検索対象テキスト: {ocr_text[:200]}...")
+        self.logger.debug("[RECEIPT_CALC] OCR解析開始")
+        self.logger.debug("[RECEIPT_CALC] 検索対象テキスト: %s...", ocr_text[:200])
         
         # 発行元パターンを詳細化（段階3強化）
         prefecture_patterns = {
@@ -826,23 +983,23 @@ class DocumentClassifierV5:
         for prefecture, patterns in prefecture_patterns.items():
             for pattern in patterns:
                 if pattern in ocr_text:
-                    print(f"[RECEIPT_CALC] 都道府県マッチ: {pattern} → {prefecture}")
+                    self.logger.debug("[RECEIPT_CALC] 都道府県マッチ: %s → %s", pattern, prefecture)
                     return prefecture
         
         # フォールバック: 基本的な都道府県名検索
         prefectures = ["東京都", "愛知県", "福岡県", "大阪府", "神奈川県"]
         for pref in prefectures:
             if pref in ocr_text:
-                print(f"[RECEIPT_CALC] 都道府県フォールバックマッチ: {pref}")
+                self.logger.debug("[RECEIPT_CALC] 都道府県フォールバックマッチ: %s", pref)
                 return pref
         
-        print(f"[RECEIPT_CALC] 都道府県マッチなし")
+        self.logger.debug("[RECEIPT_CALC] 都道府県マッチなし")
         return None
 
     def _extract_prefecture_city_from_ocr_simple(self, ocr_text: str) -> Tuple[Optional[str], Optional[str]]:
         """簡素化された都道府県・市町村抽出（段階3精度向上版）"""
-        print(f"[RECEIPT_CALC] 市町村OCR解析開始")
-        print(f"[RECEIPT_CALC] 検索対象テキスト: {ocr_text[:200]}...")
+        self.logger.debug("[RECEIPT_CALC] 市町村OCR解析開始")
+        self.logger.debug("[RECEIPT_CALC] 検索対象テキスト: %s...", ocr_text[:200])
         
         # 段階3：市町村パターンを詳細化
         city_patterns = {
@@ -868,14 +1025,14 @@ class DocumentClassifierV5:
                     if city in city_patterns:
                         for pattern in city_patterns[city]:
                             if pattern in ocr_text:
-                                print(f"[RECEIPT_CALC] 市町村マッチ: {pattern} → {pref}({city})")
+                                self.logger.debug("[RECEIPT_CALC] 市町村マッチ: %s → %s(%s)", pattern, pref, city)
                                 return pref, city
                     elif city in ocr_text:
-                        print(f"[RECEIPT_CALC] 市町村基本マッチ: {city} → {pref}({city})")
+                        self.logger.debug("[RECEIPT_CALC] 市町村基本マッチ: %s → %s(%s)", city, pref, city)
                         return pref, city
                 
                 # 都道府県は見つかったが市町村が見つからない場合
-                print(f"[RECEIPT_CALC] 都道府県マッチ、市町村検索中: {pref}")
+                self.logger.debug("[RECEIPT_CALC] 都道府県マッチ、市町村検索中: %s", pref)
                 # 役所パターンで市名を抽出を試行
                 import re
                 city_match = re.search(r'([^県都府道市区町村]+(?:市|区|町|村))役所', ocr_text)
@@ -895,13 +1052,16 @@ class DocumentClassifierV5:
         
         self._log("標準分類ルール評価開始")
         
+        # 全ルールのキーワードを1パスで検出し、各ルールはその結果からスコア計算
+        hits = self._scan_keywords(text, filename)
+        
         # 各分類ルールに対してスコア計算
         for doc_type, rules in self.classification_rules_v5.items():
-            self._log_debug(f"評価中: {doc_type} (優先度: {rules.get('priority', 5)})")
+            self._log_debug("評価中: %s (優先度: %s)", doc_type, rules.get('priority', 5))
             
             # テキストとファイル名を分けてスコア計算
-            text_score, text_keywords = self._calculate_score(text, rules, "テキスト")
-            filename_score, filename_keywords = self._calculate_filename_score(filename, rules)
+            text_score, text_keywords = self._calculate_score(text, rules, "テキスト", hits=hits.text)
+            filename_score, filename_keywords = self._calculate_filename_score(filename, rules, hits=hits.filename)
             
             # 総合スコア（ファイル名を重視）
             total_score = text_score + (filename_score * 1.5)
@@ -913,57 +1073,57 @@ class DocumentClassifierV5:
             
             # 最優先条件が一致している場合は除外キーワードを無視
             has_highest_priority = any(
-                condition.check_match(f"{text} {filename}")[0] 
+                condition.check_hits(hits.combined)[0] 
                 for condition in rules.get("highest_priority_conditions", [])
             )
             
             if not has_highest_priority:
                 # 除外キーワードチェック
                 for exclude_keyword in rules.get("exclude_keywords", []):
-                    if exclude_keyword in text or exclude_keyword in filename:
+                    if exclude_keyword in hits.text or exclude_keyword in hits.filename:
                         excluded = True
                         exclude_reason = f"除外キーワード '{exclude_keyword}' を検出"
                         break
             
-            # デバッグステップ記録
-            step = ClassificationStep(
-                document_type=doc_type,
-                score=total_score,
-                matched_keywords=combined_keywords,
-                excluded=excluded,
-                exclude_reason=exclude_reason,
-                method="standard"
-            )
-            debug_steps.append(step)
+            # デバッグステップ記録（デバッグモード時のみ）
+            if self.debug_mode:
+                debug_steps.append(ClassificationStep(
+                    document_type=doc_type,
+                    score=total_score,
+                    matched_keywords=combined_keywords,
+                    excluded=excluded,
+                    exclude_reason=exclude_reason,
+                    method="standard"
+                ))
             
             # ログ出力
             if excluded:
-                self._log_debug(f"  → {doc_type}: 除外, キーワード:[なし] ({exclude_reason})")
+                self._log_debug("  → %s: 除外, キーワード:[なし] (%s)", doc_type, exclude_reason)
             else:
-                self._log_debug(f"  → {doc_type}: スコア:{total_score:.1f}, キーワード:{combined_keywords}")
+                self._log_debug("  → %s: スコア:%.1f, キーワード:%s", doc_type, total_score, combined_keywords)
                 if text_score > 0:
-                    self._log_debug(f"    - テキストスコア: {text_score:.1f}")
+                    self._log_debug("    - テキストスコア: %.1f", text_score)
                 if filename_score > 0:
-                    self._log_debug(f"    - ファイル名スコア: {filename_score:.1f} × 1.5 = {filename_score * 1.5:.1f}")
+                    self._log_debug("    - ファイル名スコア: %.1f × 1.5 = %.1f", filename_score, filename_score * 1.5)
             
             # 最高スコア更新
             if not excluded and total_score > best_score:
                 best_score = total_score
                 best_match = doc_type
                 best_keywords = combined_keywords
-                self._log_debug(f"    新たな最高スコア! → {doc_type}")
+                self._log_debug("    新たな最高スコア! → %s", doc_type)
         
         # 信頼度を計算（0.0-1.0）会計書類用に調整
         confidence = min(best_score / 10.0, 1.0)  # 会計書類用に閾値を下げる
         
-        self._log(f"最終結果: {best_match}, スコア: {best_score:.1f}, 信頼度: {confidence:.2f}")
+        self._log_debug("最終結果: %s, スコア: %.1f, 信頼度: %.2f", best_match, best_score, confidence)
         
         # 分類できない場合のデフォルト（会計書類用に閾値を下げる）
         if not best_match or confidence < 0.2:  # 0.3 → 0.2 に変更
             best_match = "9999_未分類"
             confidence = 0.0
             best_method = "default_fallback"
-            self._log(f"信頼度不足により未分類に変更")
+            self._log_debug("信頼度不足により未分類に変更")
         
         result = ClassificationResult(
             document_type=best_match,
@@ -971,7 +1131,7 @@ class DocumentClassifierV5:
             matched_keywords=best_keywords,
             classification_method=best_method,
             debug_steps=debug_steps,
-            processing_log=self.processing_log.copy(),
+            processing_log=list(self.processing_log),
             original_doc_type_code=best_match  # 元の分類コードを保存
         )
         
@@ -995,70 +1155,80 @@ class DocumentClassifierV5:
         
         return cleaned.strip()
 
-    def _calculate_score(self, text: str, rules: Dict, source: str = "") -> Tuple[float, List[str]]:
-        """分類ルールに基づいてスコアを計算"""
+    def _calculate_score(self, text: str, rules: Dict, source: str = "",
+                         hits: Optional[AbstractSet[str]] = None) -> Tuple[float, List[str]]:
+        """分類ルールに基づいてスコアを計算
+        
+        hits を渡した場合は部分文字列走査の代わりに検出済みキーワード集合で判定する。
+        """
         score = 0
         matched_keywords = []
         priority = rules.get("priority", 5)
+        contains = hits.__contains__ if hits is not None else text.__contains__
         
         # 除外キーワードチェック（優先）
         for exclude_keyword in rules.get("exclude_keywords", []):
-            if exclude_keyword in text:
-                self._log_debug(f"    除外: {source}除外キーワード検出: '{exclude_keyword}'")
+            if contains(exclude_keyword):
+                self._log_debug("    除外: %s除外キーワード検出: '%s'", source, exclude_keyword)
                 return 0, []
         
         # 完全一致キーワード（高スコア）
         for exact_keyword in rules.get("exact_keywords", []):
-            if exact_keyword in text:
+            if contains(exact_keyword):
                 points = priority * 2
                 score += points
                 matched_keywords.append(exact_keyword)
-                self._log_debug(f"    完全一致: {source}'{exact_keyword}' (+{points})")
+                self._log_debug("    完全一致: %s'%s' (+%s)", source, exact_keyword, points)
         
         # 部分一致キーワード（中スコア）
         for partial_keyword in rules.get("partial_keywords", []):
-            if partial_keyword in text:
+            if contains(partial_keyword):
                 points = priority * 1
                 score += points
                 matched_keywords.append(partial_keyword)
-                self._log_debug(f"    部分一致: {source}'{partial_keyword}' (+{points})")
+                self._log_debug("    部分一致: %s'%s' (+%s)", source, partial_keyword, points)
         
         return score, matched_keywords
 
-    def _calculate_filename_score(self, filename: str, rules: Dict) -> Tuple[float, List[str]]:
-        """ファイル名に基づいてスコアを計算"""
+    def _calculate_filename_score(self, filename: str, rules: Dict,
+                                  hits: Optional[AbstractSet[str]] = None) -> Tuple[float, List[str]]:
+        """ファイル名に基づいてスコアを計算
+        
+        hits を渡した場合は部分文字列走査の代わりに検出済みキーワード集合で判定する。
+        """
         score = 0
         matched_keywords = []
         priority = rules.get("priority", 5)
+        contains = hits.__contains__ if hits is not None else filename.__contains__
         
         # 除外キーワードチェック（ファイル名でも重要）
         for exclude_keyword in rules.get("exclude_keywords", []):
-            if exclude_keyword in filename:
-                self._log_debug(f"    除外: ファイル名除外キーワード検出: '{exclude_keyword}'")
+            if contains(exclude_keyword):
+                self._log_debug("    除外: ファイル名除外キーワード検出: '%s'", exclude_keyword)
                 return 0, []
         
         # ファイル名専用キーワードがある場合
         filename_keywords = rules.get("filename_keywords", [])
         for keyword in filename_keywords:
-            if keyword in filename:
+            if contains(keyword):
                 # バグ修正依頼書: C-2 市役所ファイル名パターンの重み付け強化
                 multiplier = 3.0  # デフォルトの重み付け
                 if keyword == "市役所" and "市町村申告書" in str(rules.get("partial_keywords", [])):
                     multiplier = 9.0  # 市役所 → ファイル名スコア × 3.0 の重み付け適用
-                    self._log_debug(f"    市役所パターン重み付け強化: 市民税関連で×{multiplier}")
+                    self._log_debug("    市役所パターン重み付け強化: 市民税関連で×%s", multiplier)
                 
                 points = priority * multiplier
                 score += points
                 matched_keywords.append(f"[ファイル名]{keyword}")
-                self._log_debug(f"    ファイル名専用一致: '{keyword}' (+{points})")
+                self._log_debug("    ファイル名専用一致: '%s' (+%s)", keyword, points)
         
         # 通常のキーワードもファイル名でチェック
         for exact_keyword in rules.get("exact_keywords", []):
-            if exact_keyword in filename:
+            if contains(exact_keyword):
                 points = priority * 2
                 score += points
                 matched_keywords.append(f"[ファイル名]{exact_keyword}")
-                self._log_debug(f"    ファイル名完全一致: '{exact_keyword}' (+{points})")
+                self._log_debug("    ファイル名完全一致: '%s' (+%s)", exact_keyword, points)
         
         return score, matched_keywords
 
@@ -1076,7 +1246,7 @@ class DocumentClassifierV5:
         
         # 正規化処理でラベル解決（必ず実行）
         if municipality_sets:
-            print(f"[DEBUG] 正規化処理開始: municipality_sets={municipality_sets}")
+            self.logger.debug("正規化処理開始: municipality_sets=%s", municipality_sets)
             # 元の分類コードを保存（自治体適用前）
             if base_result.original_doc_type_code is None:
                 base_result.original_doc_type_code = base_result.document_type
@@ -1084,7 +1254,7 @@ class DocumentClassifierV5:
             # ドメインチェック：LOCAL_TAX以外では自治体変更版をスキップ
             domain = self.code_domain(base_result.document_type)
             if domain != "LOCAL_TAX":
-                self._log(f"overlay=SKIPPED(domain={domain})")
+                self._log_debug("overlay=SKIPPED(domain=%s)", domain)
                 # LOCAL_TAX以外では何もしない
             else:
                 code, final_label, resolved_set_id = self.normalize_classification(
@@ -1092,10 +1262,10 @@ class DocumentClassifierV5:
                 )
                 
                 if final_label != base_result.document_type:
-                    self._log(f"自治体名付きコード生成: {base_result.document_type} → {final_label}")
+                    self._log_debug("自治体名付きコード生成: %s → %s", base_result.document_type, final_label)
                     base_result.document_type = final_label
         else:
-            print(f"[DEBUG] 従来処理実行: municipality_sets={municipality_sets}")
+            self.logger.debug("従来処理実行: municipality_sets=%s", municipality_sets)
             # セット設定がない場合は従来処理
             self.current_municipality_sets = municipality_sets or {}
             # 元の分類コードを保存（自治体適用前）
@@ -1105,7 +1275,7 @@ class DocumentClassifierV5:
             # ドメインチェック：LOCAL_TAX以外では自治体変更版をスキップ
             domain = self.code_domain(base_result.document_type)
             if domain != "LOCAL_TAX":
-                self._log(f"overlay=SKIPPED(domain={domain})")
+                self._log_debug("overlay=SKIPPED(domain=%s)", domain)
                 # LOCAL_TAX以外では何もしない
             else:
                 final_code = self._apply_municipality_numbering(
@@ -1117,7 +1287,7 @@ class DocumentClassifierV5:
                 )
                 
                 if final_code != base_result.document_type:
-                    self._log(f"自治体名付きコード生成: {base_result.document_type} → {final_code}")
+                    self._log_debug("自治体名付きコード生成: %s → %s", base_result.document_type, final_code)
                     base_result.document_type = final_code
         
         return base_result
@@ -1128,7 +1298,7 @@ class DocumentClassifierV5:
                                     text_content: str = "",
                                     filename: str = "") -> str:
         """自治体連番の適用（修正版：固定番号を厳格に管理）"""
-        self._log_debug(f"自治体連番適用チェック: {document_type}, 都道府県={prefecture_code}, 市町村={municipality_code}")
+        self._log_debug("自治体連番適用チェック: %s, 都道府県=%s, 市町村=%s", document_type, prefecture_code, municipality_code)
         
         # 修正1: 固定番号は連番適用除外（重要な修正）  
         # 修正指示書: 納付情報は固定、受信通知は連番対応
@@ -1143,7 +1313,7 @@ class DocumentClassifierV5:
         }
         
         if document_type in FIXED_NUMBERS:
-            self._log_debug(f"固定番号のため連番適用除外: {document_type}")
+            self._log_debug("固定番号のため連番適用除外: %s", document_type)
             return document_type
         
         # 連番適用: 申告書系統への自治体連番の適用
@@ -1161,7 +1331,7 @@ class DocumentClassifierV5:
                     code_part = resolved_code.split("_")[0]
                     final_code = f"{code_part}_{prefecture_name}_都道府県申告書"
                 
-                self._log_debug(f"都道府県申告書連番適用: {document_type} → {final_code}")
+                self._log_debug("都道府県申告書連番適用: %s → %s", document_type, final_code)
                 return final_code
         
         # 市町村申告書（2001系統）
@@ -1169,56 +1339,55 @@ class DocumentClassifierV5:
             if municipality_code:
                 # セット設定情報のデバッグ出力
                 if hasattr(self, 'current_municipality_sets'):
-                    self._log_debug(f"セット設定情報利用可能: {self.current_municipality_sets}")
+                    self._log_debug("セット設定情報利用可能: %s", self.current_municipality_sets)
                 else:
-                    self._log_debug(f"セット設定情報なし: current_municipality_setsが未設定")
+                    self._log_debug("セット設定情報なし: current_municipality_setsが未設定")
                 
                 municipality_name = self._get_municipality_name(municipality_code)
                 final_code = f"{municipality_code}_{municipality_name}_市町村申告書"
-                print(f"[DEBUG] 市町村申告書連番適用: {document_type} → {final_code}")
-                self._log_debug(f"市町村申告書連番適用: {document_type} → {final_code}")
+                self._log_debug("市町村申告書連番適用: %s → %s", document_type, final_code)
                 return final_code
         
         # 修正指示書: 修正5 - 都道府県受信通知の連番対応（OCRテキストから直接読み取り）
         elif document_type == "1003_受信通知":
-            self._log_debug(f"[OCR DEBUG] 都道府県受信通知処理開始: {document_type}")
-            self._log_debug(f"[OCR DEBUG] text_content length: {len(text_content) if text_content else 0}")
-            self._log_debug(f"[OCR DEBUG] has current_municipality_sets: {hasattr(self, 'current_municipality_sets')}")
+            self._log_debug("[OCR DEBUG] 都道府県受信通知処理開始: %s", document_type)
+            self._log_debug("[OCR DEBUG] text_content length: %s", len(text_content) if text_content else 0)
+            self._log_debug("[OCR DEBUG] has current_municipality_sets: %s", hasattr(self, 'current_municipality_sets'))
             
             # OCRテキストから実際の都道府県を読み取り、セット設定と照合
             if hasattr(self, 'current_municipality_sets') and text_content:
-                self._log_debug(f"[OCR DEBUG] セット設定: {self.current_municipality_sets}")
+                self._log_debug("[OCR DEBUG] セット設定: %s", self.current_municipality_sets)
                 detected_prefecture = self._extract_prefecture_from_receipt_text(text_content, filename)
-                self._log_debug(f"[OCR DEBUG] 検出された都道府県: {detected_prefecture}")
+                self._log_debug("[OCR DEBUG] 検出された都道府県: %s", detected_prefecture)
                 
                 if detected_prefecture:
                     # セット設定から該当するセットIDを特定
                     for set_id, info in self.current_municipality_sets.items():
-                        self._log_debug(f"[OCR DEBUG] セット{set_id}チェック: {info.get('prefecture')} == {detected_prefecture}")
+                        self._log_debug("[OCR DEBUG] セット%sチェック: %s == %s", set_id, info.get('prefecture'), detected_prefecture)
                         if info.get("prefecture") == detected_prefecture:
                             receipt_code = 1003 + (set_id - 1) * 10
-                            self._log_debug(f"都道府県受信通知OCR検出: {detected_prefecture} → セット{set_id} → {receipt_code}_受信通知")
+                            self._log_debug("都道府県受信通知OCR検出: %s → セット%s → %s_受信通知", detected_prefecture, set_id, receipt_code)
                             return f"{receipt_code}_受信通知"
                     
-                    self._log_debug(f"都道府県受信通知: OCRで検出した'{detected_prefecture}'がセット設定にありません")
+                    self._log_debug("都道府県受信通知: OCRで検出した'%s'がセット設定にありません", detected_prefecture)
             else:
-                self._log_debug(f"[OCR DEBUG] OCR処理スキップ - セット設定またはテキストなし")
+                self._log_debug("[OCR DEBUG] OCR処理スキップ - セット設定またはテキストなし")
             
             # フォールバック：従来の方式
             if prefecture_code:
-                self._log_debug(f"[OCR DEBUG] フォールバック処理: prefecture_code={prefecture_code}")
+                self._log_debug("[OCR DEBUG] フォールバック処理: prefecture_code=%s", prefecture_code)
                 receipt_code = 1003 + ((prefecture_code - 1001) // 10) * 10
                 return f"{receipt_code}_受信通知"
         
         # 市町村受信通知（2003系統）の連番対応（OCRテキストから直接読み取り）
         elif document_type == "2003_受信通知":
-            self._log_debug(f"[OCR DEBUG] 市町村受信通知処理開始: {document_type}")
-            self._log_debug(f"[OCR DEBUG] text_content length: {len(text_content) if text_content else 0}")
+            self._log_debug("[OCR DEBUG] 市町村受信通知処理開始: %s", document_type)
+            self._log_debug("[OCR DEBUG] text_content length: %s", len(text_content) if text_content else 0)
             
             # OCRテキストから実際の市町村を読み取り、セット設定と照合
             if hasattr(self, 'current_municipality_sets') and text_content:
                 detected_prefecture, detected_city = self._extract_municipality_from_receipt_text(text_content, filename)
-                self._log_debug(f"[OCR DEBUG] 検出された市町村: {detected_prefecture} {detected_city}")
+                self._log_debug("[OCR DEBUG] 検出された市町村: %s %s", detected_prefecture, detected_city)
                 
                 if detected_prefecture and detected_city:
                     # 汎用Tokyo skip連番生成機能を使用
@@ -1232,23 +1401,23 @@ class DocumentClassifierV5:
                             target_info,
                             self.current_municipality_sets
                         )
-                        self._log_debug(f"[GENERIC_RECEIPT] 市町村受信通知Tokyo skip適用: {detected_prefecture}{detected_city} → {receipt_code}_受信通知")
+                        self._log_debug("[GENERIC_RECEIPT] 市町村受信通知Tokyo skip適用: %s%s → %s_受信通知", detected_prefecture, detected_city, receipt_code)
                         return f"{receipt_code}_受信通知"
                     except ValueError as e:
-                        self._log_debug(f"[GENERIC_RECEIPT] 汎用連番生成失敗: {e}")
+                        self._log_debug("[GENERIC_RECEIPT] 汎用連番生成失敗: %s", e)
                         # フォールバック処理に進む
                     
-                    self._log_debug(f"市町村受信通知: OCRで検出した'{detected_prefecture}{detected_city}'がセット設定にありません")
+                    self._log_debug("市町村受信通知: OCRで検出した'%s%s'がセット設定にありません", detected_prefecture, detected_city)
             else:
-                self._log_debug(f"[OCR DEBUG] OCR処理スキップ - セット設定またはテキストなし")
+                self._log_debug("[OCR DEBUG] OCR処理スキップ - セット設定またはテキストなし")
             
             # フォールバック：従来の方式
             if municipality_code:
-                self._log_debug(f"[OCR DEBUG] フォールバック処理: municipality_code={municipality_code}")
+                self._log_debug("[OCR DEBUG] フォールバック処理: municipality_code=%s", municipality_code)
                 receipt_code = 2003 + ((municipality_code - 2001) // 10) * 10
                 return f"{receipt_code}_受信通知"
         
-        self._log_debug(f"自治体連番適用なし: {document_type}")
+        self._log_debug("自治体連番適用なし: %s", document_type)
         return document_type
 
     def _extract_prefecture_from_receipt_text(self, text_content: str, filename: str) -> Optional[str]:
@@ -1269,10 +1438,10 @@ class DocumentClassifierV5:
             match = re.search(pattern, text_content)
             if match:
                 prefecture = match.group(1)
-                self._log_debug(f"受信通知から都道府県検出: {prefecture}")
+                self._log_debug("受信通知から都道府県検出: %s", prefecture)
                 return prefecture
         
-        self._log_debug(f"受信通知から都道府県検出なし: {filename}")
+        self._log_debug("受信通知から都道府県検出なし: %s", filename)
         return None
 
     def _extract_municipality_from_receipt_text(self, text_content: str, filename: str) -> Tuple[Optional[str], Optional[str]]:
@@ -1291,10 +1460,10 @@ class DocumentClassifierV5:
             if match:
                 prefecture = match.group(1)
                 city = match.group(2)
-                self._log_debug(f"受信通知から市町村検出: {prefecture}{city}")
+                self._log_debug("受信通知から市町村検出: %s%s", prefecture, city)
                 return prefecture, city
         
-        self._log_debug(f"受信通知から市町村検出なし: {filename}")
+        self._log_debug("受信通知から市町村検出なし: %s", filename)
         return None, None
 
     def build_order_maps(self, set_settings: Dict[int, Dict[str, str]]) -> Tuple[Dict[int, int], Dict[int, int]]:
@@ -1539,40 +1708,23 @@ class DocumentClassifierV5:
             return document_type
             
         except Exception as e:
-            self._log_debug(f"ラベル解決エラー: {e}")
+            self._log_debug("ラベル解決エラー: %s", e)
             return document_type
     
     def _extract_pref_city_from_text(self, text: str, filename: str) -> Tuple[Optional[str], Optional[str]]:
-        """テキストから都道府県・市町村名を抽出（検証用）"""
-        combined_text = f"{text} {filename}"
-        
-        # 都道府県パターン
-        pref_patterns = [
-            (r'東京都', '東京都'),
-            (r'愛知県', '愛知県'),
-            (r'福岡県', '福岡県')
-        ]
-        
-        # 市町村パターン  
-        city_patterns = [
-            (r'蒲郡市', '蒲郡市'),
-            (r'福岡市', '福岡市')
-        ]
-        
-        extracted_pref = None
-        extracted_city = None
-        
-        for pattern, name in pref_patterns:
-            if re.search(pattern, combined_text):
-                extracted_pref = name
-                break
-                
-        for pattern, name in city_patterns:
-            if re.search(pattern, combined_text):
-                extracted_city = name
-                break
-        
-        return extracted_pref, extracted_city
+        """
+        テキストから都道府県・市町村名を抽出（検証用）
+
+        ファイル名の地名を優先し、ファイル名で決まらない項目だけ本文から補う。
+        本文の会社住所などがファイル名の市町村を上書きしないようにするため。
+        """
+        gazetteer = get_shared_gazetteer()
+        from_name = gazetteer.resolve(filename)
+        if from_name.prefecture and from_name.city:
+            return from_name.prefecture, from_name.city
+        # ファイル名の都道府県を先頭に置き、本文の市町村はその都道府県に属するものに限る
+        from_text = gazetteer.resolve(f"{from_name.prefecture or ''} {text}")
+        return from_name.prefecture or from_text.prefecture, from_name.city or from_text.city
     
     def _detect_municipality_set_from_text(self, text: str, filename: str, 
                                            set_settings: Dict[int, Dict[str, str]]) -> Optional[int]:
@@ -1692,13 +1844,13 @@ class DocumentClassifierV5:
             writer.writerow(log_entry)
         
         # WARNログも出力
-        self._log_debug(f"[WARN] 自治体名不整合: {filename} - {reason}")
-        print(f"[WARN] 自治体名不整合: {filename} - {reason}")
+        self._log_debug("[WARN] 自治体名不整合: %s - %s", filename, reason)
+        self.logger.warning("自治体名不整合: %s - %s", filename, reason)
     
     def normalize_classification(self, text: str, filename: str, template_id: str, 
                                 set_settings: Dict[int, Dict[str, str]]) -> Tuple[int, str, int]:
         """v5.1テンプレートIDを正規化して最終ラベルを生成"""
-        print(f"[INFO] 正規化処理開始: template_id={template_id}")
+        self.logger.debug("正規化処理開始: template_id=%s", template_id)
         
         # 修正: FIXED_NUMBERS確認 - 納付情報は固定、受信通知は連番適用後は固定扱い
         FIXED_NUMBERS = {
@@ -1714,7 +1866,7 @@ class DocumentClassifierV5:
         }
         
         if template_id in FIXED_NUMBERS:
-            print(f"[INFO] FIXED_NUMBER検出: {template_id} -> 正規化スキップ")
+            self.logger.debug("FIXED_NUMBER検出: %s -> 正規化スキップ", template_id)
             return 0, template_id, 0
         try:
             # 1. 連番マップを構築
@@ -1727,12 +1879,12 @@ class DocumentClassifierV5:
 
             # 2. 文書種別を判定（都道府県税 vs 市民税）
             doc_kind = "pref" if self._is_prefecture_tax_document(template_id) else "city"
-            print(f"[INFO] 文書種別判定: {doc_kind}")
+            self.logger.debug("文書種別判定: %s", doc_kind)
             
             # 3. テキストから自治体セットIDを解決
             set_id = self.resolve_set_id_from_text(text, filename, set_settings, doc_kind)
             if not set_id:
-                print(f"[WARN] 自治体セット解決失敗, フォールバックを使用")
+                self.logger.warning("自治体セット解決失敗, フォールバックを使用")
                 # フォールバック：最初の該当セットを使用
                 for sid, info in set_settings.items():
                     if doc_kind == "pref":
@@ -1743,7 +1895,7 @@ class DocumentClassifierV5:
                         break
                         
             if not set_id:
-                print(f"[ERROR] セットID解決失敗")
+                self.logger.error("セットID解決失敗")
                 return 0, template_id, 0
             
             # 4. 連番コードを決定
@@ -1758,8 +1910,8 @@ class DocumentClassifierV5:
                 city = set_settings[set_id]["city"]
                 final_label = f"{code}_{pref}{city}_市町村申告書"
             
-            print(f"[INFO] 正規化結果: set_id={set_id}, code={code}, pref={pref}, city={city}")
-            print(f"[INFO] 最終ラベル: {final_label}")
+            self.logger.debug("正規化結果: set_id=%s, code=%s, pref=%s, city=%s", set_id, code, pref, city)
+            self.logger.debug("最終ラベル: %s", final_label)
             
             # 5. テンプレートIDが最終出力に残らないことを確認
             # "市町村申告書" は正当な文書種別名なのでチェックしない
@@ -1768,30 +1920,20 @@ class DocumentClassifierV5:
             # 6. 不整合検証（簡易版）
             extracted_pref, extracted_city = self._extract_pref_city_from_text(text, filename)
             if extracted_pref and extracted_pref != pref:
-                print(f"[WARN] Locality mismatch text=(pref={extracted_pref}, city={extracted_city}) vs set=(pref={pref}, city={city}), file={filename}")
+                self.logger.warning("Locality mismatch text=(pref=%s, city=%s) vs set=(pref=%s, city=%s), file=%s", extracted_pref, extracted_city, pref, city, filename)
             
             return code, final_label, set_id
             
         except Exception as e:
-            print(f"[ERROR] 正規化処理エラー: {e}")
-            import traceback
-            traceback.print_exc()
+            self.logger.exception("正規化処理エラー: %s", e)
             return 0, template_id, 0
 
     def _extract_municipality_info_from_text(self, text: str, filename: str) -> Tuple[Optional[int], Optional[int]]:
         """テキストから自治体コードを抽出（UI設定ベース解析）"""
         combined_text = f"{text} {filename}".lower()
         
-        # UI設定ベースの自治体判定（より柔軟なパターンマッチング）
+        # UI設定ベースの自治体判定（提出先キーワードは地名辞書由来のセット対応を1回の走査で照合）
         # Step 1: ファイル名と内容から自治体を特定
-        submission_office_patterns = {
-            1: ["東京都", "港都税事務所", "芝税務署", "都税事務所", "東京都港都税事務所"],  # セット1
-            2: ["愛知県", "東三河県税事務所", "蒲郡市", "蒲郡市役所", "愛知県東三河県税事務所"],  # セット2  
-            3: ["福岡県", "西福岡県税事務所", "福岡市", "福岡市役所", "福岡県西福岡県税事務所"],  # セット3
-            4: ["北海道", "札幌市", "道税事務所"],  # セット4（拡張用）
-            5: ["大阪府", "大阪市", "府税事務所"]   # セット5（拡張用）
-        }
-        
         # Step 2: 会社住所を除外してからテキスト判定
         # 会社住所パターン（修正指示書に基づく）
         company_address_patterns = [
@@ -1806,26 +1948,15 @@ class DocumentClassifierV5:
             filtered_text = re.sub(pattern, '', filtered_text, flags=re.IGNORECASE)
         
         # ファイル名から提出先セットを判定
-        detected_set = None
-        for set_num, office_names in submission_office_patterns.items():
-            for office_name in office_names:
-                if office_name in filename.lower():
-                    detected_set = set_num
-                    self._log_debug(f"ファイル名提出先検出: {office_name} → セット{set_num}")
-                    break
-            if detected_set:
-                break
+        detected_set, office_name = _find_submission_set(filename.lower())
+        if detected_set:
+            self._log_debug("ファイル名提出先検出: %s → セット%s", office_name, detected_set)
         
         # テキストからも提出先を確認（会社住所除外済み）
         if not detected_set:
-            for set_num, office_names in submission_office_patterns.items():
-                for office_name in office_names:
-                    if office_name in filtered_text:
-                        detected_set = set_num
-                        self._log_debug(f"テキスト提出先検出: {office_name} → セット{set_num}")
-                        break
-                if detected_set:
-                    break
+            detected_set, office_name = _find_submission_set(filtered_text)
+            if detected_set:
+                self._log_debug("テキスト提出先検出: %s → セット%s", office_name, detected_set)
         
         # セット番号を正確な連番コード番号に変換（連番ルール適用）
         prefecture_code = None
@@ -1834,7 +1965,7 @@ class DocumentClassifierV5:
         if detected_set:
             # 都道府県申告書の連番: 1001 + (セット番号-1) × 10
             prefecture_code = 1001 + (detected_set - 1) * 10
-            self._log_debug(f"都道府県連番計算: セット{detected_set} → 1001 + ({detected_set}-1)×10 = {prefecture_code}")
+            self._log_debug("都道府県連番計算: セット%s → 1001 + (%s-1)×10 = %s", detected_set, detected_set, prefecture_code)
             
             # 市町村申告書の連番: Tokyo skip logic applied
             # Base 2001 for municipal applications (申告書)
@@ -1842,11 +1973,11 @@ class DocumentClassifierV5:
                 # Tokyo skip: adjust set index down by 1 since Tokyo (set 1) has no municipalities
                 adjusted_set = detected_set - 1
                 municipality_code = 2001 + (adjusted_set - 1) * 10
-                self._log_debug(f"市町村連番計算(Tokyo skip): セット{detected_set} → adjusted={adjusted_set} → 2001 + ({adjusted_set}-1)×10 = {municipality_code}")
+                self._log_debug("市町村連番計算(Tokyo skip): セット%s → adjusted=%s → 2001 + (%s-1)×10 = %s", detected_set, adjusted_set, adjusted_set, municipality_code)
             else:
-                self._log_debug(f"東京都（セット1）は市町村書類なし")
+                self._log_debug("東京都（セット1）は市町村書類なし")
         
-        self._log_debug(f"テキスト自治体認識結果: 都道府県={prefecture_code}, 市町村={municipality_code}")
+        self._log_debug("テキスト自治体認識結果: 都道府県=%s, 市町村=%s", prefecture_code, municipality_code)
         return prefecture_code, municipality_code
     
     def _is_payment_info(self, text_content: str, filename: str) -> bool:
@@ -1864,7 +1995,7 @@ class DocumentClassifierV5:
         # これらのキーワードが含まれる場合は必ず納付情報として分類
         for indicator in payment_indicators:
             if indicator in text_content:
-                self._log_debug(f"納付情報強制判定: {indicator}")
+                self._log_debug("納付情報強制判定: %s", indicator)
                 return True
         
         return False
@@ -1888,7 +2019,7 @@ class DocumentClassifierV5:
         
         result = has_receipt and not has_payment
         if result:
-            self._log_debug(f"受信通知強制判定: 受信={has_receipt}, 納付除外={has_payment}")
+            self._log_debug("受信通知強制判定: 受信=%s, 納付除外=%s", has_receipt, has_payment)
         
         return result
     
@@ -1926,14 +2057,14 @@ class DocumentClassifierV5:
             if not set_number:
                 set_number = 1  # フォールバック
             code = self._generate_receipt_number("prefecture", set_number)
-            self._log_debug(f"地方税受信通知（都道府県）: OCRセット検出={set_number} → {code}_受信通知")
+            self._log_debug("地方税受信通知（都道府県）: OCRセット検出=%s → %s_受信通知", set_number, code)
             return ClassificationResult(
                 document_type=f"{code}_受信通知",
                 confidence=1.0,
                 matched_keywords=["地方税受信通知（都道府県）"],
                 classification_method="local_tax_receipt_detection_ocr",
                 debug_steps=[],
-                processing_log=self.processing_log.copy()
+                processing_log=list(self.processing_log)
             )
         
         # 市町村向け判定  
@@ -1944,14 +2075,14 @@ class DocumentClassifierV5:
             if not set_number:
                 set_number = 2  # 市町村のフォールバック（東京がある場合は2から開始）
             code = self._generate_receipt_number("municipality", set_number)
-            self._log_debug(f"地方税受信通知（市町村）: OCRセット検出={set_number} → {code}_受信通知")
+            self._log_debug("地方税受信通知（市町村）: OCRセット検出=%s → %s_受信通知", set_number, code)
             return ClassificationResult(
                 document_type=f"{code}_受信通知",
                 confidence=1.0,
                 matched_keywords=["地方税受信通知（市町村）"],
                 classification_method="local_tax_receipt_detection_ocr",
                 debug_steps=[],
-                processing_log=self.processing_log.copy()
+                processing_log=list(self.processing_log)
             )
             
         return None
@@ -1967,7 +2098,7 @@ class DocumentClassifierV5:
             return str(1003 + (set_number - 1) * 10)
         elif jurisdiction_type == "municipality":
             # 市町村: 汎用Tokyo skip連番生成を使用
-            self._log_debug(f"[COMPAT] レガシー _generate_receipt_number: municipality set {set_number}")
+            self._log_debug("[COMPAT] レガシー _generate_receipt_number: municipality set %s", set_number)
             try:
                 # セット番号から市町村情報を逆引き
                 if hasattr(self, 'current_municipality_sets') and self.current_municipality_sets:
@@ -1983,19 +2114,19 @@ class DocumentClassifierV5:
                             target_info,
                             self.current_municipality_sets
                         )
-                        self._log_debug(f"[COMPAT] 汎用Tokyo skip適用: セット{set_number} → {receipt_code}")
+                        self._log_debug("[COMPAT] 汎用Tokyo skip適用: セット%s → %s", set_number, receipt_code)
                         return str(receipt_code)
                     else:
-                        self._log_debug(f"[COMPAT] セット{set_number}が見つかりません")
+                        self._log_debug("[COMPAT] セット%sが見つかりません", set_number)
                 else:
-                    self._log_debug(f"[COMPAT] current_municipality_setsが未設定")
+                    self._log_debug("[COMPAT] current_municipality_setsが未設定")
 
                 # フォールバック計算（Tokyo skipなし）
-                self._log_debug(f"[COMPAT] フォールバック計算使用: 2003 + ({set_number}-1)×10")
+                self._log_debug("[COMPAT] フォールバック計算使用: 2003 + (%s-1)×10", set_number)
                 return str(2003 + (set_number - 1) * 10)
             except Exception as e:
                 # エラー時のフォールバック
-                self._log_debug(f"[COMPAT] エラーによるフォールバック: {e}")
+                self._log_debug("[COMPAT] エラーによるフォールバック: %s", e)
                 return str(2003 + (set_number - 1) * 10)
         else:
             # フォールバック
@@ -2018,7 +2149,7 @@ class DocumentClassifierV5:
         
         # 自治体セット設定を取得
         if not hasattr(self, 'current_municipality_sets') or not self.current_municipality_sets:
-            self._log_debug(f"OCR自治体セット検出: セット設定なし")
+            self._log_debug("OCR自治体セット検出: セット設定なし")
             return None
             
         # 各セットに対してテキストマッチング
@@ -2029,22 +2160,22 @@ class DocumentClassifierV5:
             # 都道府県受信通知の場合は都道府県名でマッチング
             if target_type == "prefecture":
                 if prefecture and prefecture in combined_text:
-                    self._log_debug(f"OCR自治体セット検出: {prefecture}がテキストで検出 → セット{set_id}")
+                    self._log_debug("OCR自治体セット検出: %sがテキストで検出 → セット%s", prefecture, set_id)
                     return set_id
                     
             # 市町村受信通知の場合は市町村名でマッチング
             elif target_type == "municipality":
                 if city and city in combined_text:
-                    self._log_debug(f"OCR自治体セット検出: {city}がテキストで検出 → セット{set_id}")
+                    self._log_debug("OCR自治体セット検出: %sがテキストで検出 → セット%s", city, set_id)
                     return set_id
                 # 市町村名がない場合（東京都等）は都道府県名でマッチング
                 elif not city and prefecture and prefecture in combined_text:
                     # 東京都の場合、市町村受信通知でも東京都マッチで該当セットを返す
                     # ただし、東京都は基本的に市町村税がないため、稀なケース
-                    self._log_debug(f"OCR自治体セット検出: {prefecture}（市町村なし）がテキストで検出 → セット{set_id}")
+                    self._log_debug("OCR自治体セット検出: %s（市町村なし）がテキストで検出 → セット%s", prefecture, set_id)
                     return set_id
                     
-        self._log_debug(f"OCR自治体セット検出: テキストマッチング失敗")
+        self._log_debug("OCR自治体セット検出: テキストマッチング失敗")
         return None
     
     def _get_jurisdiction_set_number(self, code: Optional[int], jurisdiction_type: str) -> int:
@@ -2098,7 +2229,7 @@ class DocumentClassifierV5:
                     matched_keywords=["納付情報強制判定"],
                     classification_method="enhanced_payment_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
             elif "消費税" in combined_text:
                 return ClassificationResult(
@@ -2107,7 +2238,7 @@ class DocumentClassifierV5:
                     matched_keywords=["納付情報強制判定"],
                     classification_method="enhanced_payment_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
             elif "都道府県" in combined_text or "県税事務所" in combined_text or "都税事務所" in combined_text:
                 return ClassificationResult(
@@ -2116,7 +2247,7 @@ class DocumentClassifierV5:
                     matched_keywords=["納付情報強制判定"],
                     classification_method="enhanced_payment_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
             elif "市町村" in combined_text or "市役所" in combined_text or "市民税" in combined_text:
                 return ClassificationResult(
@@ -2125,7 +2256,7 @@ class DocumentClassifierV5:
                     matched_keywords=["納付情報強制判定"],
                     classification_method="enhanced_payment_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
         
         # 受信通知の強制判定（納付関連キーワードがない場合のみ）
@@ -2138,7 +2269,7 @@ class DocumentClassifierV5:
                     matched_keywords=["受信通知強制判定"],
                     classification_method="enhanced_receipt_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
             elif "消費税" in combined_text:
                 return ClassificationResult(
@@ -2147,7 +2278,7 @@ class DocumentClassifierV5:
                     matched_keywords=["受信通知強制判定"],
                     classification_method="enhanced_receipt_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
             elif "都道府県" in combined_text or "県税事務所" in combined_text or "都税事務所" in combined_text:
                 return ClassificationResult(
@@ -2156,7 +2287,7 @@ class DocumentClassifierV5:
                     matched_keywords=["受信通知強制判定"],
                     classification_method="enhanced_receipt_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
             elif "市町村" in combined_text or "市役所" in combined_text or "市民税" in combined_text:
                 return ClassificationResult(
@@ -2165,7 +2296,7 @@ class DocumentClassifierV5:
                     matched_keywords=["受信通知強制判定"],
                     classification_method="enhanced_receipt_detection",
                     debug_steps=[],
-                    processing_log=self.processing_log.copy()
+                    processing_log=list(self.processing_log)
                 )
         
         return None
@@ -2192,7 +2323,7 @@ class DocumentClassifierV5:
         strong_match = strong_pattern.search(text)
         if strong_match:
             code = strong_match.group(1)
-            self._log_debug(f"Strong code pattern detected: {code}")
+            self._log_debug("Strong code pattern detected: %s", code)
             return code
         
         # 補助パターン: キーワード組み合わせ判定
@@ -2241,22 +2372,22 @@ class DocumentClassifierV5:
         # prefer_bundleに基づくヒューリスティック判定
         if prefer_bundle == "national":
             if is_receipt:
-                self._log_debug(f"National bundle heuristic: receipt -> 0003 (prefer)")
+                self._log_debug("National bundle heuristic: receipt -> 0003 (prefer)")
                 return "0003"  # 法人税を優先
             elif is_payment:
-                self._log_debug(f"National bundle heuristic: payment -> 0004 (prefer)")
+                self._log_debug("National bundle heuristic: payment -> 0004 (prefer)")
                 return "0004"  # 法人税を優先
         elif prefer_bundle == "local":
             if is_receipt:
-                self._log_debug(f"Local bundle heuristic: receipt -> 1003 (prefer)")
+                self._log_debug("Local bundle heuristic: receipt -> 1003 (prefer)")
                 return "1003"  # 都道府県を優先
             elif is_payment:
                 # 地方税の納付情報は都道府県・市町村で分かれるため、より慎重に判定
                 if has_prefecture or not has_municipality:
-                    self._log_debug(f"Local bundle heuristic: payment -> 1004 (prefer prefecture)")
+                    self._log_debug("Local bundle heuristic: payment -> 1004 (prefer prefecture)")
                     return "1004"
                 else:
-                    self._log_debug(f"Local bundle heuristic: payment -> 2004 (prefer municipality)")
+                    self._log_debug("Local bundle heuristic: payment -> 2004 (prefer municipality)")
                     return "2004"
         
         # 判定できない場合
@@ -2502,7 +2633,7 @@ class DocumentClassifierV5:
         
         if document_code in no_split_codes:
             result.meta["no_split"] = True
-            self._log(f"[meta] no_split=True set for document_type: {result.document_type}")
+            self._log_debug("[meta] no_split=True set for document_type: %s", result.document_type)
         else:
             result.meta["no_split"] = False
     
@@ -2516,7 +2647,7 @@ class DocumentClassifierV5:
             matched_keywords=matched_keywords,
             classification_method=classification_method,
             debug_steps=debug_steps or [],
-            processing_log=processing_log or self.processing_log.copy(),
+            processing_log=processing_log or list(self.processing_log),
             original_doc_type_code=original_doc_type_code or document_type
         )
         self._set_no_split_metadata(result)
@@ -2553,7 +2684,7 @@ if __name__ == "__main__":
         Bundle分割ファイル用の代替連番処理
         JobContextが未設定の場合でも基本的な連番付与を行う
         """
-        self._log(f"[BUNDLE_ALTERNATIVE] Bundle分割ファイル代替連番処理開始: {base_code}")
+        self._log_debug("[BUNDLE_ALTERNATIVE] Bundle分割ファイル代替連番処理開始: %s", base_code)
         
         try:
             # 基本的な受信通知の連番処理
@@ -2562,7 +2693,7 @@ if __name__ == "__main__":
                 if base_code == "1003_受信通知":
                     # 都道府県税の受信通知: 1003
                     numbered_code = "1003_受信通知"
-                    self._log(f"[BUNDLE_ALTERNATIVE] 都道府県税受信通知として処理: {numbered_code}")
+                    self._log_debug("[BUNDLE_ALTERNATIVE] 都道府県税受信通知として処理: %s", numbered_code)
                 elif base_code == "2003_受信通知":
                     # 市町村税の受信通知: 動的番号生成
                     try:
@@ -2572,11 +2703,11 @@ if __name__ == "__main__":
                         set_config = None  # Bundle分割時はset_configを省略
                         receipt_number = generate_receipt_number_generic("municipality_receipt", target_info, set_config)
                         numbered_code = f"{receipt_number}_受信通知"
-                        self._log(f"[BUNDLE_ALTERNATIVE] 市町村税受信通知として動的処理: {numbered_code}")
+                        self._log_debug("[BUNDLE_ALTERNATIVE] 市町村税受信通知として動的処理: %s", numbered_code)
                     except Exception as e:
                         # フォールバック: 2003固定
                         numbered_code = "2003_受信通知"
-                        self._log(f"[BUNDLE_ALTERNATIVE] 市町村税受信通知フォールバック: {numbered_code} (エラー: {e})")
+                        self._log(f"[BUNDLE_ALTERNATIVE] 市町村税受信通知フォールバック: {numbered_code} (エラー: {e})", "WARNING")
                 
                 # 新しいClassificationResultを作成
                 return ClassificationResult(
@@ -2585,16 +2716,16 @@ if __name__ == "__main__":
                     matched_keywords=classification_result.matched_keywords + ["Bundle代替連番処理"],
                     classification_method="bundle_alternative_numbering",
                     debug_steps=classification_result.debug_steps + [f"Bundle代替連番: {base_code} → {numbered_code}"],
-                    processing_log=self.processing_log.copy(),
+                    processing_log=list(self.processing_log),
                     original_filename=getattr(classification_result, 'original_filename', '')
                 )
             
             # その他のBundle分割ファイルはそのまま返す
-            self._log(f"[BUNDLE_ALTERNATIVE] 非対象書類のためそのまま返却: {base_code}")
+            self._log_debug("[BUNDLE_ALTERNATIVE] 非対象書類のためそのまま返却: %s", base_code)
             return classification_result
             
         except Exception as e:
-            self._log(f"[BUNDLE_ALTERNATIVE] エラー発生: {str(e)}")
+            self._log(f"[BUNDLE_ALTERNATIVE] エラー発生: {str(e)}", "ERROR")
             return classification_result    
     
     def _generate_receipt_number(self, classification_type: str, jurisdiction_set_number: int) -> str:
@@ -2616,7 +2747,7 @@ if __name__ == "__main__":
         if classification_type in base_numbers:
             base = base_numbers[classification_type]
             result = str(base + (jurisdiction_set_number - 1) * 10)
-            self._log_debug(f"連番生成: {classification_type} セット{jurisdiction_set_number} → {result}")
+            self._log_debug("連番生成: %s セット%s → %s", classification_type, jurisdiction_set_number, result)
             return result
         
         return "0003"  # フォールバック
@@ -4,15 +4,41 @@ CSV処理エンジン v4.0
 仕訳帳・会計帳簿CSVファイルの完全対応
 """
 
-import pandas as pd
+import codecs
 import csv
-import chardet
+import io
 import os
-import re
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from .lazy_import import lazy_module
+from .regex_registry import CSV_FILENAME_DATES, compile_pattern
+
+# pandas・chardet は初回のCSV処理時に読み込む（起動時間短縮、型注釈は文字列で記述）
+pd = lazy_module("pandas")
+chardet = lazy_module("chardet")
+
+# ヘッダー・先頭行の判定に読み込むバイト数と行数（分類は先頭10行の内容で足りる）
+CSV_SAMPLE_BYTES = 64 * 1024
+CSV_SNIFF_BYTES = 16 * 1024
+# ストリーミング読み込みの1チャンクの行数（メモリ使用量はファイルサイズに依存しない）
+CSV_CHUNK_ROWS = 100_000
+CSV_SAMPLE_ROWS = 10
+ENCODING_DETECT_BYTES = 10000
+CSV_DELIMITERS = ",\t;|"
+FALLBACK_ENCODINGS = ['cp932', 'utf-8', 'shift_jis']
+DATE_COLUMN_KEYWORDS = ['日付', 'date', '年月']
+JOURNAL_FILENAME_KEYWORDS = ['仕訳', 'journal']
+JOURNAL_HEADER_KEYWORDS = ['借方', '貸方', 'debit', 'credit', '勘定科目', '仕訳']
+
+# 年月抽出パターン（先に一致したものを優先）
+DATE_PATTERNS = CSV_FILENAME_DATES  # YYYYMMDD・YYYY-MM-DD・YYYY/MM/DD・YYMMDD（コンパイル済み）
+# 最小・最大日付の集計用（YYYYMMDD・YYYY-M-D・YYYY/M/D・YYYY年M月D日）
+DATE_VALUE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%Y%m%d']
+DATE_VALUE_PATTERN = r'(\d{4})[-/年]?(\d{1,2})[-/月]?(\d{1,2})'
+
 @dataclass
 class CSVProcessResult:
     """CSV処理結果を表すデータクラス"""
@@ -23,6 +49,41 @@ class CSVProcessResult:
     row_count: int = 0
     columns: List[str] = None
     error_message: Optional[str] = None
+    missing_columns: Optional[List[str]] = None   # 書類分類の想定列のうちヘッダーにない列
+
+@dataclass
+class CSVSniffResult:
+    """先頭数KBだけで判定したCSVの形式・分類"""
+    filename: str
+    encoding: str
+    delimiter: str
+    columns: List[str]
+    document_type: str                   # ファイル名・列名・先頭行から判定した書類分類
+    is_journal: bool                     # 仕訳帳（ファイル名または列名に仕訳帳の特徴語）
+    date_columns: List[str]              # 年月抽出に使う列
+    year_month: Optional[str] = None     # ファイル名から取れた年月（行データ不要）
+
+    @property
+    def date_column(self) -> Optional[str]:
+        return self.date_columns[0] if self.date_columns else None
+
+@dataclass
+class CSVStreamStats:
+    """チャンク単位の1パス読み込みで集計した行数・日付範囲・列検証結果"""
+    row_count: int = 0
+    date_column: Optional[str] = None
+    min_date: Optional['pd.Timestamp'] = None
+    max_date: Optional['pd.Timestamp'] = None
+    first_year_month: Optional[str] = None           # 日付列の先頭10件の有効値から（従来の判定方法）
+    invalid_date_rows: int = 0                       # 日付として解釈できなかった行数
+    missing_columns: List[str] = field(default_factory=list)
+
+    @property
+    def year_month(self) -> Optional[str]:
+        """年月判定（先頭の有効値、なければ最大日付）"""
+        if self.first_year_month:
+            return self.first_year_month
+        return self.max_date.strftime('%y%m') if self.max_date is not None else None
 
 class CSVProcessor:
     """CSV処理の完全対応クラス"""
@@ -73,24 +134,210 @@ class CSVProcessor:
         """ファイルエンコーディングを自動検出"""
         try:
             with open(file_path, 'rb') as file:
-                raw_data = file.read(10000)  # 最初の10KBを読み取り
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                
-                # 日本語ファイルの一般的なエンコーディングに補正
-                if encoding in ['Shift_JIS', 'cp932']:
-                    return 'cp932'
-                elif encoding in ['UTF-8', 'utf-8']:
-                    return 'utf-8'
-                elif encoding in ['EUC-JP', 'euc-jp']:
-                    return 'euc-jp'
-                else:
-                    return 'cp932'  # デフォルトはcp932
-                    
+                raw_data = file.read(ENCODING_DETECT_BYTES)  # 最初の10KBを読み取り
+            return self._detect_encoding_from_bytes(raw_data)
         except Exception:
             return 'cp932'  # 検出失敗時のデフォルト
 
-    def read_csv_safely(self, file_path: str) -> Tuple[Optional[pd.DataFrame], str]:
+    def _detect_encoding_from_bytes(self, raw_data: bytes) -> str:
+        """先頭バイト列からエンコーディングを推定"""
+        try:
+            encoding = chardet.detect(raw_data[:ENCODING_DETECT_BYTES])['encoding']
+        except Exception:
+            return 'cp932'
+        
+        # 日本語ファイルの一般的なエンコーディングに補正
+        if encoding in ['Shift_JIS', 'cp932']:
+            return 'cp932'
+        elif encoding in ['UTF-8', 'utf-8']:
+            return 'utf-8'
+        elif encoding in ['EUC-JP', 'euc-jp']:
+            return 'euc-jp'
+        else:
+            return 'cp932'  # デフォルトはcp932
+
+    def _sniff_format(self, file_path: str, sample_bytes: int = CSV_SAMPLE_BYTES) -> Tuple[str, str, str]:
+        """先頭サンプルを1回だけ読み、(エンコーディング, 区切り文字, サンプル文字列) を返す"""
+        with open(file_path, 'rb') as file:
+            raw_data = file.read(sample_bytes)
+        
+        # 途中で切れた最終行は捨てる（多バイト文字の途中で切れないように）
+        if len(raw_data) == sample_bytes and b'\n' in raw_data:
+            raw_data = raw_data[:raw_data.rfind(b'\n') + 1]
+        
+        if raw_data.startswith(codecs.BOM_UTF8):
+            candidates = ['utf-8-sig']
+        else:
+            detected = self._detect_encoding_from_bytes(raw_data)
+            candidates = [detected] + [e for e in FALLBACK_ENCODINGS if e != detected]
+        
+        for encoding in candidates:
+            try:
+                sample = raw_data.decode(encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError("エンコーディングを判定できません")
+        
+        try:
+            sniff_lines = "\n".join(sample.splitlines()[:CSV_SAMPLE_ROWS + 1])
+            delimiter = csv.Sniffer().sniff(sniff_lines, delimiters=CSV_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ','
+        return encoding, delimiter, sample
+
+    def _find_date_columns(self, columns) -> List[str]:
+        """年月抽出に使う列（日付・date・年月を含む列名）"""
+        return [col for col in columns
+                if any(keyword in str(col).lower() for keyword in DATE_COLUMN_KEYWORDS)]
+
+    def sniff_csv(self, file_path: str, sample_bytes: int = CSV_SNIFF_BYTES) -> Optional[CSVSniffResult]:
+        """
+        先頭 sample_bytes だけを読み、書類分類・区切り文字・日付列を判定する（本体は読まない）
+
+        Returns:
+            CSVSniffResult: 判定結果（ヘッダーが読めない場合は None）
+        """
+        filename = os.path.basename(file_path)
+        try:
+            encoding, delimiter, sample = self._sniff_format(file_path, sample_bytes)
+            header_df = pd.read_csv(io.StringIO(sample), sep=delimiter, nrows=CSV_SAMPLE_ROWS,
+                                    on_bad_lines='skip')
+        except Exception:
+            return None
+        columns = list(header_df.columns)
+        if not columns:
+            return None
+        
+        document_type = self.classify_csv_by_filename(filename) or self.classify_csv_by_content(header_df)
+        header_text = ''.join(str(col) for col in columns).lower()
+        is_journal = (any(keyword in filename.lower() for keyword in JOURNAL_FILENAME_KEYWORDS)
+                      or any(keyword in header_text for keyword in JOURNAL_HEADER_KEYWORDS))
+        
+        return CSVSniffResult(
+            filename=filename,
+            encoding=encoding,
+            delimiter=delimiter,
+            columns=columns,
+            document_type=document_type or "5006_仕訳データ",  # デフォルト
+            is_journal=is_journal,
+            date_columns=self._find_date_columns(columns),
+            year_month=self._extract_year_month_from_filename(filename),
+        )
+
+    def validate_columns(self, sniff: CSVSniffResult) -> List[str]:
+        """書類分類の想定列（最も一致する列パターン）のうち、ヘッダーにない列を返す"""
+        patterns = self.csv_patterns.get(sniff.document_type, {}).get('column_patterns', [])
+        columns = [str(col).lower() for col in sniff.columns]
+        
+        def present(pattern_col: str) -> bool:
+            return any(pattern_col.lower() in col for col in columns)
+        
+        best = max(patterns, key=lambda pattern: sum(present(col) for col in pattern), default=[])
+        return [col for col in best if not present(col)]
+
+    def stream_csv_stats(self, file_path: str, sniff: Optional[CSVSniffResult] = None,
+                         chunksize: int = CSV_CHUNK_ROWS) -> Optional[CSVStreamStats]:
+        """
+        ファイル全体を1パスで読み、行数・最小/最大日付・列検証を集計する
+
+        日付列（なければ先頭列）のみを chunksize 行ずつ読むため、数GBの元帳でも
+        メモリ使用量は一定。pandas で読めない場合は csv.reader で同じ集計を行う。
+
+        Returns:
+            CSVStreamStats: 集計結果（ヘッダーが読めない場合は None）
+        """
+        sniff = sniff or self.sniff_csv(file_path)
+        if sniff is None:
+            return None
+        
+        usecols = sniff.date_columns or [sniff.columns[0]]
+        try:
+            stats = self._new_stream_stats(sniff)
+            with pd.read_csv(file_path, encoding=sniff.encoding, sep=sniff.delimiter, usecols=usecols,
+                             dtype=str, on_bad_lines='skip', chunksize=chunksize) as reader:
+                for chunk in reader:
+                    self._accumulate_chunk(stats, chunk, sniff.date_columns)
+        except Exception:
+            stats = self._new_stream_stats(sniff)
+            self._stream_with_csv_reader(file_path, sniff, usecols, stats, chunksize)
+        return stats
+
+    def _new_stream_stats(self, sniff: CSVSniffResult) -> CSVStreamStats:
+        return CSVStreamStats(date_column=sniff.date_column, missing_columns=self.validate_columns(sniff))
+
+    def _stream_with_csv_reader(self, file_path: str, sniff: CSVSniffResult, usecols: List[str],
+                                stats: CSVStreamStats, chunksize: int):
+        """csv.reader による行単位の読み込み（pandas で読めない不正な行を含むファイル用）"""
+        indexes = [sniff.columns.index(col) for col in usecols]
+        rows = []
+        with open(file_path, 'r', encoding=sniff.encoding, errors='replace', newline='') as file:
+            reader = csv.reader(file, delimiter=sniff.delimiter)
+            next(reader, None)  # ヘッダー
+            for row in reader:
+                if not row:
+                    continue
+                rows.append([row[i] if i < len(row) and row[i] != '' else None for i in indexes])
+                if len(rows) >= chunksize:
+                    self._accumulate_chunk(stats, pd.DataFrame(rows, columns=usecols), sniff.date_columns)
+                    rows = []
+        if rows:
+            self._accumulate_chunk(stats, pd.DataFrame(rows, columns=usecols), sniff.date_columns)
+
+    def _accumulate_chunk(self, stats: CSVStreamStats, chunk: 'pd.DataFrame', date_columns: List[str]):
+        """1チャンク分を集計に加算"""
+        stats.row_count += len(chunk)
+        if not date_columns:
+            return
+        
+        if stats.first_year_month is None:
+            for col in date_columns:
+                stats.first_year_month = self._extract_year_month_from_values(chunk[col].dropna().head(CSV_SAMPLE_ROWS))
+                if stats.first_year_month:
+                    break
+        
+        values = chunk[date_columns[0]].dropna()
+        dates = self._parse_dates(values)
+        stats.invalid_date_rows += len(values) - len(dates)
+        if dates.empty:
+            return
+        chunk_min, chunk_max = dates.min(), dates.max()
+        stats.min_date = chunk_min if stats.min_date is None else min(stats.min_date, chunk_min)
+        stats.max_date = chunk_max if stats.max_date is None else max(stats.max_date, chunk_max)
+
+    def _parse_dates(self, values: 'pd.Series') -> 'pd.Series':
+        """日付列の値を日付に変換（解釈できない値は除外、行ループなし）
+
+        先頭の値に合う書式で一括変換し、変換できなかった値だけを正規表現で年・月・日に分解する。
+        """
+        values = values.astype(str).str.strip()
+        if values.empty:
+            return pd.Series([], dtype='datetime64[ns]')
+        
+        dates = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        date_format = self._guess_date_format(values.iloc[0])
+        if date_format:
+            dates = pd.to_datetime(values, format=date_format, errors='coerce')
+        
+        remaining = values[dates.isna()]
+        if not remaining.empty:
+            parts = remaining.str.extract(DATE_VALUE_PATTERN).astype(float)
+            parts.columns = ['year', 'month', 'day']
+            dates = dates.fillna(pd.to_datetime(parts, errors='coerce'))
+        return dates.dropna()
+
+    @staticmethod
+    def _guess_date_format(value: str) -> Optional[str]:
+        for date_format in DATE_VALUE_FORMATS:
+            try:
+                datetime.strptime(value, date_format)
+                return date_format
+            except ValueError:
+                continue
+        return None
+
+    def read_csv_safely(self, file_path: str) -> Tuple[Optional['pd.DataFrame'], str]:
         """CSVファイルを安全に読み込み"""
         encoding = self.detect_encoding(file_path)
         
@@ -125,7 +372,7 @@ class CSVProcessor:
         
         return None, "全ての読み込み方法が失敗しました"
 
-    def _read_csv_manual(self, file_path: str, encoding: str) -> pd.DataFrame:
+    def _read_csv_manual(self, file_path: str, encoding: str) -> 'pd.DataFrame':
         """手動CSVリーダー（最後の手段）"""
         try:
             with open(file_path, 'r', encoding=encoding) as file:
@@ -159,12 +406,12 @@ class CSVProcessor:
         
         for doc_type, patterns in self.csv_patterns.items():
             for pattern in patterns['filename_patterns']:
-                if re.search(pattern, filename_lower):
+                if compile_pattern(pattern).search(filename_lower):
                     return doc_type
         
         return None
 
-    def classify_csv_by_content(self, df: pd.DataFrame) -> Optional[str]:
+    def classify_csv_by_content(self, df: 'pd.DataFrame') -> Optional[str]:
         """CSV内容による分類"""
         if df.empty:
             return None
@@ -202,21 +449,11 @@ class CSVProcessor:
         
         return best_match if best_score > 2 else None
 
-    def extract_year_month_from_csv(self, file_path: str, df: pd.DataFrame) -> str:
-        """CSVから年月を抽出"""
-        # 1. ファイル名から抽出
-        filename = os.path.basename(file_path)
-        
+    def _extract_year_month_from_filename(self, filename: str) -> Optional[str]:
+        """ファイル名から年月を抽出"""
         # YYYYMMDD形式を探す
-        date_patterns = [
-            r'(\d{4})(\d{2})\d{2}',  # YYYYMMDD
-            r'(\d{4})-(\d{2})-\d{2}',  # YYYY-MM-DD
-            r'(\d{4})/(\d{2})/\d{2}',  # YYYY/MM/DD
-            r'(\d{2})(\d{2})\d{2}',    # YYMMDD
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, filename)
+        for pattern in DATE_PATTERNS:
+            match = pattern.search(filename)
             if match:
                 year = match.group(1)
                 month = match.group(2)
@@ -226,78 +463,125 @@ class CSVProcessor:
                     year = year[2:]
                 
                 return f"{year}{month}"
+        return None
+
+    def extract_year_month_from_csv(self, file_path: str, df: 'pd.DataFrame') -> str:
+        """CSVから年月を抽出"""
+        # 1. ファイル名から抽出
+        year_month = self._extract_year_month_from_filename(os.path.basename(file_path))
+        if year_month:
+            return year_month
         
-        # 2. CSV内容から抽出
+        # 2. CSV内容から抽出（日付列の先頭10件の有効値）
         if not df.empty:
-            date_columns = []
-            for col in df.columns:
-                if any(keyword in str(col).lower() for keyword in ['日付', 'date', '年月']):
-                    date_columns.append(col)
-            
-            for col in date_columns:
+            for col in self._find_date_columns(df.columns):
                 try:
-                    # 最初の有効な日付を取得
-                    for value in df[col].dropna().head(10):
-                        value_str = str(value)
-                        for pattern in date_patterns:
-                            match = re.search(pattern, value_str)
-                            if match:
-                                year = match.group(1)
-                                month = match.group(2)
-                                if len(year) == 4:
-                                    year = year[2:]
-                                return f"{year}{month}"
+                    year_month = self._extract_year_month_from_values(df[col].dropna().head(CSV_SAMPLE_ROWS))
+                    if year_month:
+                        return year_month
                 except Exception:
                     continue
         
         return "YYMM"  # デフォルト値
 
-    def process_csv(self, file_path: str) -> CSVProcessResult:
-        """CSV処理のメイン処理"""
+    def _extract_year_month_from_values(self, values: 'pd.Series') -> Optional[str]:
+        """日付列の値からYYMMを抽出（先頭の値・先のパターンを優先、行ループなし）"""
+        if values.empty:
+            return None
+        values = values.astype(str)
+        
+        found = pd.Series(pd.NA, index=values.index, dtype=object)
+        for pattern in DATE_PATTERNS:
+            parts = values.str.extract(pattern)
+            found = found.combine_first(parts[0].str[-2:] + parts[1])
+        found = found.dropna()
+        if not found.empty:
+            return found.iloc[0]
+        
+        # 0埋めなし（2025/8/1 等）は日付として解釈
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed').dropna()
+        if not parsed.empty:
+            return parsed.iloc[0].strftime('%y%m')
+        return None
+
+    def process_csv(self, file_path: str, year_month: Optional[str] = None) -> CSVProcessResult:
+        """CSV処理のメイン処理
+
+        分類は先頭数KBのみで行い、行データ（日付列）は年月を行から取る必要がある場合だけ読む。
+        year_month を指定した場合・ファイル名から年月が取れた場合は本体を読まず、row_count は0。
+        """
         filename = os.path.basename(file_path)
         
         try:
-            # CSV読み込み
-            df, read_status = self.read_csv_safely(file_path)
-            
-            if df is None:
-                return CSVProcessResult(
-                    filename=filename,
-                    document_type="unknown",
-                    year_month="YYMM",
-                    success=False,
-                    error_message=f"CSV読み込み失敗: {read_status}"
-                )
-            
-            # 書類分類
-            doc_type = self.classify_csv_by_filename(filename)
-            if not doc_type:
-                doc_type = self.classify_csv_by_content(df)
-            
-            if not doc_type:
-                doc_type = "5006_仕訳データ"  # デフォルト
+            sniff = self.sniff_csv(file_path)
+            if sniff is not None:
+                year_month = year_month or sniff.year_month
+                if year_month:
+                    return CSVProcessResult(
+                        filename=filename,
+                        document_type=sniff.document_type,
+                        year_month=year_month,
+                        success=True,
+                        columns=sniff.columns,
+                        missing_columns=self.validate_columns(sniff),
+                    )
+                
+                # 年月を行データから取る（日付列のみをチャンク単位で1パス集計）
+                stats = self.stream_csv_stats(file_path, sniff)
+                if stats is not None and stats.row_count > 0:
+                    return CSVProcessResult(
+                        filename=filename,
+                        document_type=sniff.document_type,
+                        year_month=stats.year_month or "YYMM",
+                        success=True,
+                        row_count=stats.row_count,
+                        columns=sniff.columns,
+                        missing_columns=stats.missing_columns,
+                    )
             
-            # 年月抽出
-            year_month = self.extract_year_month_from_csv(file_path, df)
+            # 判定できない形式・データ行なしは従来の全読み込み
+            return self._process_csv_full(file_path, year_month)
             
+        except Exception as e:
             return CSVProcessResult(
                 filename=filename,
-                document_type=doc_type,
-                year_month=year_month,
-                success=True,
-                row_count=len(df),
-                columns=list(df.columns),
-                error_message=None
+                document_type="unknown",
+                year_month="YYMM",
+                success=False,
+                error_message=f"CSV処理エラー: {str(e)}"
             )
-            
-        except Exception as e:
+
+    def _process_csv_full(self, file_path: str, year_month: Optional[str] = None) -> CSVProcessResult:
+        """ファイル全体を読み込んで処理（形式判定できないCSV用）"""
+        filename = os.path.basename(file_path)
+        df, read_status = self.read_csv_safely(file_path)
+        
+        if df is None:
             return CSVProcessResult(
                 filename=filename,
                 document_type="unknown",
                 year_month="YYMM",
                 success=False,
-                error_message=f"CSV処理エラー: {str(e)}"
+                error_message=f"CSV読み込み失敗: {read_status}"
             )
+        
+        # 書類分類
+        doc_type = self.classify_csv_by_filename(filename)
+        if not doc_type:
+            doc_type = self.classify_csv_by_content(df)
+        
+        if not doc_type:
+            doc_type = "5006_仕訳データ"  # デフォルト
+        
+        return CSVProcessResult(
+            filename=filename,
+            document_type=doc_type,
+            year_month=year_month or self.extract_year_month_from_csv(file_path, df),
+            success=True,
+            row_count=len(df),
+            columns=list(df.columns),
+            error_message=None
+        )
 
     def generate_csv_filename(self, result: CSVProcessResult) -> str:
         """CSVファイルの新しいファイル名を生成"""
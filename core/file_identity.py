@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+ファイル同一性キャッシュ v5.5
+(パス, サイズ, 更新時刻ns, inode) が変わっていないファイルは前回計算したMD5を再利用し、
+未変更フォルダの再処理では stat 1回だけで済ませる
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .models import compute_file_md5
+
+FileIdentity = Tuple[int, int, int]   # (size, mtime_ns, inode)
+FILE_IDENTITY_DB_NAME = "file_identity.sqlite3"
+
+
+def stat_identity(file_path: str) -> FileIdentity:
+    """ファイルの同一性判定に使う stat 情報"""
+    st = os.stat(file_path)
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+class FileIdentityCache:
+    """
+    ファイルMD5の同一性キャッシュ
+
+    db_path を指定すると SQLite に永続化し、次回実行でも再利用する。
+    stat 情報が1つでも変わったファイルはMD5を計算し直す。
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, logger: Optional[logging.Logger] = None):
+        self.db_path = Path(db_path) if db_path else None
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._memory: Dict[str, Tuple[FileIdentity, str]] = {}
+        self.stats = {'hits': 0, 'computed': 0}
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.db_path is None:
+            return None
+        if self._conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS file_md5 ("
+                    " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                    " inode INTEGER NOT NULL, md5 TEXT NOT NULL)"
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                self.logger.warning("[file_identity] Persistent cache disabled: %s", e)
+                self.db_path = None
+                return None
+        return self._conn
+
+    def md5(self, file_path: str) -> str:
+        """ファイルMD5を取得（stat が前回と同じなら再計算しない）"""
+        path = os.path.abspath(file_path)
+        identity = stat_identity(path)
+
+        with self._lock:
+            cached = self._memory.get(path)
+            if cached is None:
+                cached = self._load(path)
+            if cached is not None and cached[0] == identity:
+                self._memory[path] = cached
+                self.stats['hits'] += 1
+                return cached[1]
+
+        md5 = compute_file_md5(path)
+        with self._lock:
+            self._memory[path] = (identity, md5)
+            self.stats['computed'] += 1
+            self._store(path, identity, md5)
+        return md5
+
+    def _load(self, path: str) -> Optional[Tuple[FileIdentity, str]]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT size, mtime_ns, inode, md5 FROM file_md5 WHERE path = ?", (path,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning("[file_identity] Read failed: %s", e)
+            return None
+        return ((row[0], row[1], row[2]), row[3]) if row else None
+
+    def _store(self, path: str, identity: FileIdentity, md5: str):
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO file_md5 (path, size, mtime_ns, inode, md5) VALUES (?, ?, ?, ?, ?)",
+                (path, identity[0], identity[1], identity[2], md5)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning("[file_identity] Write failed: %s", e)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_SHARED_CACHE: Optional[FileIdentityCache] = None
+_SHARED_CACHE_LOCK = threading.Lock()
+
+
+def get_shared_file_identity_cache() -> FileIdentityCache:
+    """プロセス内で共有する同一性キャッシュ（未設定ならメモリのみ）"""
+    global _SHARED_CACHE
+    if _SHARED_CACHE is None:
+        with _SHARED_CACHE_LOCK:
+            if _SHARED_CACHE is None:
+                _SHARED_CACHE = FileIdentityCache()
+    return _SHARED_CACHE
+
+
+def configure_shared_file_identity_cache(db_path: Optional[Path]) -> FileIdentityCache:
+    """共有キャッシュの永続化先を設定（同じ保存先なら既存のキャッシュをそのまま使う）"""
+    global _SHARED_CACHE
+    with _SHARED_CACHE_LOCK:
+        current = _SHARED_CACHE
+        new_path = Path(db_path) if db_path else None
+        if current is None or current.db_path != new_path:
+            if current is not None:
+                current.close()
+            _SHARED_CACHE = FileIdentityCache(new_path)
+        return _SHARED_CACHE
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+自治体地名辞書（ガゼッティア） v5.5
+都道府県・市区町村・税事務所（県税事務所/都税事務所/税務署）の名称をトライ木にまとめ、
+ページテキストを1回走査するだけで最長一致の地名を取り出す。
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .runtime_paths import get_resource_path
+
+GAZETTEER_RESOURCE = "resources/gazetteer_ja.tsv"
+
+KIND_PREFECTURE = "prefecture"
+KIND_MUNICIPALITY = "municipality"
+KIND_OFFICE = "office"
+# 国税の税務署（それ以外の税事務所は都道府県税の事務所）
+NATIONAL_TAX_OFFICE_SUFFIX = "税務署"
+
+# 表記ゆれ（小書きのヶ・ヵ）を同一視する。1文字→1文字の置換なので位置はずれない
+_FOLD = str.maketrans("ヶヵ", "ケカ")
+_TERMINAL = ""  # トライ節点で「ここで終わる名称の値」を保持するキー（1文字のキーと衝突しない）
+
+
+@dataclass(frozen=True)
+class TrieMatch:
+    """テキスト中の一致箇所"""
+    start: int
+    end: int
+    name: str
+    values: Tuple[Any, ...]
+
+
+class NameTrie:
+    """
+    文字単位のトライ木
+
+    find_all は先頭から走査し、各位置で最長一致した名称を採用して一致の末尾へ進む（左優先・最長一致・重複なし）。
+    走査コストはテキスト長 × 最長名称長で、登録語数に依存しない。
+    """
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def add(self, name: str, value: Any):
+        """名称と値を登録（同じ名称に複数の値を持てる）"""
+        if not name:
+            return
+        node = self._root
+        for ch in name.translate(_FOLD):
+            node = node.setdefault(ch, {})
+        node.setdefault(_TERMINAL, []).append(value)
+
+    def find_all(self, text: str) -> List[TrieMatch]:
+        """左から順に重複しない最長一致をすべて返す"""
+        matches: List[TrieMatch] = []
+        if not text:
+            return matches
+        folded = text.translate(_FOLD)
+        root, n, i = self._root, len(folded), 0
+        while i < n:
+            node, j, found = root, i, None
+            while j < n:
+                node = node.get(folded[j])
+                if node is None:
+                    break
+                j += 1
+                if _TERMINAL in node:
+                    found = (j, node[_TERMINAL])
+            if found is None:
+                i += 1
+                continue
+            end, values = found
+            matches.append(TrieMatch(i, end, text[i:end], tuple(values)))
+            i = end
+        return matches
+
+
+@dataclass(frozen=True)
+class GazetteerEntry:
+    """地名辞書の1項目"""
+    kind: str           # prefecture / municipality / office
+    name: str           # 正式表記（愛知県、蒲郡市、幸田町、東三河県税事務所）
+    prefecture: str     # 所属する都道府県
+    city: str = ""      # 税事務所の所在市区（わかる場合のみ）
+
+    @property
+    def is_national_tax_office(self) -> bool:
+        """国税の税務署か"""
+        return self.kind == KIND_OFFICE and self.name.endswith(NATIONAL_TAX_OFFICE_SUFFIX)
+
+
+@dataclass
+class PlaceResolution:
+    """テキストから解決した所在地"""
+    prefecture: Optional[str] = None
+    city: Optional[str] = None
+    office: Optional[str] = None
+    matches: List[TrieMatch] = field(default_factory=list)
+
+    @property
+    def display_name(self) -> Optional[str]:
+        """都道府県＋市区町村（例: 愛知県蒲郡市、東京都）"""
+        name = (self.prefecture or "") + (self.city or "")
+        return name or None
+
+
+def short_prefecture_name(prefecture: str) -> str:
+    """都道府県名から「都・府・県」を除く（北海道はそのまま）"""
+    if prefecture == "北海道" or len(prefecture) < 3:
+        return prefecture
+    return prefecture[:-1]
+
+
+class Gazetteer:
+    """
+    都道府県・市区町村・税事務所の地名辞書
+
+    同名の市町村（府中市、美里町など）や税務署（中野、池田など）は複数の項目を持ち、
+    都道府県が確定している場合だけその都道府県の項目として解決する。
+    """
+
+    def __init__(self, entries: Iterable[GazetteerEntry], logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries: List[GazetteerEntry] = list(entries)
+        self.trie = NameTrie()
+        for entry in self.entries:
+            self.trie.add(entry.name, entry)
+
+    @classmethod
+    def from_tsv(cls, path: str, logger: Optional[logging.Logger] = None) -> 'Gazetteer':
+        """kind, name, prefecture, city のタブ区切りファイルから読み込み（# 行は注釈）
+
+        Raises:
+            ValueError: 不正な行、未収録の都道府県を参照する行、都道府県が1件もない場合
+        """
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.rstrip("\n")
+                if not line.strip() or line.startswith("#"):
+                    continue
+                cols = line.split("\t")
+                if (len(cols) < 3 or cols[0] not in (KIND_PREFECTURE, KIND_MUNICIPALITY, KIND_OFFICE)
+                        or not cols[1] or not cols[2]):
+                    raise ValueError(f"{path}:{line_no}: invalid gazetteer row: {line!r}")
+                entries.append(GazetteerEntry(kind=cols[0], name=cols[1], prefecture=cols[2],
+                                              city=cols[3] if len(cols) > 3 else ""))
+        prefectures = {e.name for e in entries if e.kind == KIND_PREFECTURE}
+        if not prefectures:
+            raise ValueError(f"{path}: no prefecture rows")
+        for entry in entries:
+            if entry.prefecture not in prefectures:
+                raise ValueError(f"{path}: unknown prefecture {entry.prefecture!r} for {entry.name!r}")
+        return cls(entries, logger=logger)
+
+    def entries_in(self, prefecture: str, kind: Optional[str] = None) -> List[GazetteerEntry]:
+        """都道府県に属する項目（kind 指定時はその種別のみ、収録順）"""
+        return [e for e in self.entries
+                if e.prefecture == prefecture and (kind is None or e.kind == kind)]
+
+    def find_all(self, text: str) -> List[TrieMatch]:
+        """テキスト中の地名を1回の走査で取り出す（左優先・最長一致）"""
+        return self.trie.find_all(text)
+
+    def resolve(self, text: str) -> PlaceResolution:
+        """
+        テキストから都道府県・市区町村・税事務所を解決
+
+        都道府県は 税事務所の所属 → 最初の都道府県名 → 同名のない市区の所属 の順に決める。
+        税事務所はテキスト中の都道府県名と食い違うものを採用しない。
+        町村名は住所の町名（栄町、錦町など）と重なりやすいため、都道府県の推定には使わない。
+        市区町村は解決した都道府県に属する最初の市区町村（都道府県が決まらない場合は最初の市区町村）。
+        """
+        compact = "".join(text.split()) if text else ""
+        result = PlaceResolution(matches=self.find_all(compact))
+
+        def by_kind(kind: str) -> List[Tuple[TrieMatch, List[GazetteerEntry]]]:
+            return [(m, [e for e in m.values if e.kind == kind]) for m in result.matches
+                    if any(e.kind == kind for e in m.values)]
+
+        offices, prefectures = by_kind(KIND_OFFICE), by_kind(KIND_PREFECTURE)
+        cities = by_kind(KIND_MUNICIPALITY)
+        named_prefectures = {e.prefecture for _, entries in prefectures for e in entries}
+        for _, entries in offices:
+            if named_prefectures:
+                entries = [e for e in entries if e.prefecture in named_prefectures]
+            if len({e.prefecture for e in entries}) == 1:
+                result.office, result.prefecture = entries[0].name, entries[0].prefecture
+                break
+        if result.prefecture is None and prefectures:
+            result.prefecture = prefectures[0][1][0].prefecture
+        if result.prefecture is None:
+            for _, entries in cities:
+                if entries[0].name[-1] in "市区" and len({e.prefecture for e in entries}) == 1:
+                    result.prefecture = entries[0].prefecture
+                    break
+
+        for _, entries in cities:
+            if result.prefecture is None or any(e.prefecture == result.prefecture for e in entries):
+                result.city = entries[0].name
+                break
+        return result
+
+
+_SHARED_GAZETTEER: Optional[Gazetteer] = None
+_SHARED_GAZETTEER_LOCK = threading.Lock()
+
+
+def get_shared_gazetteer() -> Gazetteer:
+    """同梱の地名辞書（初回のみ読み込み、プロセス内で共有）"""
+    global _SHARED_GAZETTEER
+    if _SHARED_GAZETTEER is None:
+        with _SHARED_GAZETTEER_LOCK:
+            if _SHARED_GAZETTEER is None:
+                _SHARED_GAZETTEER = create_gazetteer()
+    return _SHARED_GAZETTEER
+
+
+def create_gazetteer(path: Optional[str] = None, logger: Optional[logging.Logger] = None) -> Gazetteer:
+    """地名辞書のファクトリー関数
+
+    自治体・提出先の判定は辞書だけに依存するため、辞書ファイルがない・壊れている場合は例外にする。
+
+    Raises:
+        FileNotFoundError: 辞書ファイルがない場合
+        ValueError: 辞書ファイルが壊れている場合
+    """
+    path = path or get_resource_path(GAZETTEER_RESOURCE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"[gazetteer] Resource not found: {path}")
+    return Gazetteer.from_tsv(path, logger=logger)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+キーワード一括照合エンジン v5.5
+Aho–Corasick オートマトンで全分類ルールのキーワードを1パスで検出する
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+@dataclass(frozen=True)
+class KeywordHits:
+    """1回の走査で得られたキーワード検出結果
+
+    text / filename はそれぞれの文字列内に完全に含まれるキーワード、
+    combined は f"{text} {filename}" 内に含まれるキーワード（境界をまたぐ一致を含む）。
+    """
+    text: FrozenSet[str]
+    filename: FrozenSet[str]
+    combined: FrozenSet[str]
+
+
+class AhoCorasickMatcher:
+    """
+    複数キーワードの部分文字列照合（Aho–Corasick）
+
+    構築後は読み取り専用のため、スレッド間・分類器インスタンス間で共有できる。
+    結果は各キーワードについて `keyword in text` と同一になる。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """初期化
+
+        Args:
+            keywords: 照合対象キーワード（重複・空文字は無視）
+        """
+        self.keywords: Tuple[str, ...] = tuple(sorted({k for k in keywords if k}))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        self._build()
+
+    def _build(self):
+        """トライとfailureリンクを構築"""
+        outputs: List[List[str]] = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(keyword)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+
+        self._output = [tuple(out) for out in outputs]
+
+    def iter_matches(self, text: str):
+        """(終了位置, キーワード) を出現順に列挙"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword in output[state]:
+                yield pos + 1, keyword
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """text に含まれるキーワードの集合を返す"""
+        if not text:
+            return frozenset()
+        return frozenset(keyword for _, keyword in self.iter_matches(text))
+
+    def scan(self, text: str, filename: str) -> KeywordHits:
+        """f"{text} {filename}" を1回だけ走査し、テキスト・ファイル名・結合文字列の検出結果を返す"""
+        combined_text = f"{text} {filename}"
+        filename_start = len(text) + 1
+        text_hits = set()
+        filename_hits = set()
+        combined_hits = set()
+        for end, keyword in self.iter_matches(combined_text):
+            combined_hits.add(keyword)
+            start = end - len(keyword)
+            if end <= len(text):
+                text_hits.add(keyword)
+            elif start >= filename_start:
+                filename_hits.add(keyword)
+        return KeywordHits(frozenset(text_hits), frozenset(filename_hits), frozenset(combined_hits))
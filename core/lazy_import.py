@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+遅延インポート v5.5
+読み込みに時間のかかるライブラリ（pandas・chardet・pytesseract・PIL など）を、
+モジュール読み込み時ではなく最初に属性を参照した時点で import する。
+
+    pd = lazy_module("pandas")     # この時点では import しない
+    pd.read_csv(...)               # 初回の属性参照で import
+
+型注釈で参照する場合は文字列にすること（def f(df: 'pd.DataFrame')）。
+"""
+
+import importlib
+import importlib.util
+import threading
+import types
+from typing import Dict
+
+
+class LazyModule(types.ModuleType):
+    """初回の属性参照で実モジュールを import する代理モジュール"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def _load(self) -> types.ModuleType:
+        module = self._module
+        if module is None:
+            # import 自体のスレッド安全性は import システムのロックで保証される
+            module = self._module = importlib.import_module(self.__name__)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self.__name__!r} ({state})>"
+
+
+def module_available(name: str) -> bool:
+    """モジュールを import せずに導入済みか判定"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+_LAZY_MODULES: Dict[str, LazyModule] = {}
+_LAZY_MODULES_LOCK = threading.Lock()
+
+
+def lazy_module(name: str) -> LazyModule:
+    """モジュール名ごとに共有の代理モジュールを返す（属性の差し替えも全利用箇所で共有される）"""
+    module = _LAZY_MODULES.get(name)
+    if module is None:
+        with _LAZY_MODULES_LOCK:
+            module = _LAZY_MODULES.setdefault(name, LazyModule(name))
+    return module
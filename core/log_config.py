@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+ログ設定 v5.5
+サブシステムごとのログレベルと JSON Lines 出力を一元設定する。
+呼び出し側はメッセージを %-形式の引数で渡す（logger.debug("[split] page %d", n)）。
+無効なレベルのログは logging が引数のまま破棄するため、文字列の組み立ては発生しない。
+
+レベル指定（環境変数 TAX_RENAMER_LOG、batch の --log-level）:
+    "WARNING"                          全体を WARNING
+    "INFO,classify=DEBUG,split=DEBUG"  全体は INFO、分類と分割だけ DEBUG
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+LOG_LEVEL_ENV = "TAX_RENAMER_LOG"
+LOG_JSON_ENV = "TAX_RENAMER_LOG_JSON"
+CONSOLE_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+# サブシステム名 → ロガー名（各モジュールの logging.getLogger(__name__)）
+SUBSYSTEM_LOGGERS: Dict[str, str] = {
+    "app": "tax_renamer.app",
+    "batch": "core.batch",
+    "classify": "core.classification_v5",
+    "csv": "core.csv_processor",
+    "ocr": "core.ocr_engine",
+    "page_store": "core.page_text_store",
+    "parallel": "core.parallel_batch",
+    "pipeline": "core.page_pipeline",
+    "pre_extract": "core.pre_extract",
+    "rename": "core.rename_engine",
+    "split": "core.pdf_processor",
+    "yymm": "core.yymm_resolver",
+}
+
+_HANDLER_MARK = "_tax_renamer_handler"
+_CONFIG_LOCK = threading.Lock()
+_configured_loggers = set()
+
+
+def get_subsystem_logger(subsystem: str) -> logging.Logger:
+    """サブシステム名（classify, split など）またはロガー名からロガーを取得"""
+    return logging.getLogger(SUBSYSTEM_LOGGERS.get(subsystem, subsystem))
+
+
+def _to_level(name: str) -> int:
+    level = logging.getLevelName(name.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {name!r}")
+    return level
+
+
+def parse_level_spec(spec: Optional[str]) -> Tuple[Optional[int], Dict[str, int]]:
+    """"INFO,classify=DEBUG" → (全体のレベル, {ロガー名: レベル})"""
+    default, levels = None, {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, level = part.rpartition("=")
+        if sep:
+            levels[SUBSYSTEM_LOGGERS.get(name.strip(), name.strip())] = _to_level(level)
+        else:
+            default = _to_level(level)
+    return default, levels
+
+
+class _Fields:
+    """構造化項目を key=value で表示（ログが出力されるときだけ文字列化）"""
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return " ".join(f"{key}={value}" for key, value in self.fields.items())
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields: Any):
+    """構造化ログ。コンソールには "event key=value ..."、JSON Lines には項目ごとに出力"""
+    if logger.isEnabledFor(level):
+        logger.log(level, "%s %s", event, _Fields(fields), extra={"fields": fields})
+
+
+class JsonLinesHandler(logging.Handler):
+    """1レコード1行のJSON（ts, level, logger, message と log_event の項目）で追記するハンドラ"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._stream = open(path, "a", encoding="utf-8")
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            entry = {
+                "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+            }
+            fields = getattr(record, "fields", None)
+            if fields is not None:
+                # log_event のレコード: message はイベント名、項目は個別のキー
+                entry["message"] = record.args[0]
+                entry.update(fields)
+            else:
+                entry["message"] = record.getMessage()
+            if record.exc_info:
+                entry["exc"] = logging.Formatter().formatException(record.exc_info)
+            # Handler.handle がロックを取得済み
+            self._stream.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            if not self._stream.closed:
+                self._stream.close()
+        finally:
+            self.release()
+        super().close()
+
+
+def configure_logging(spec: Optional[str] = None, json_path: Optional[str] = None,
+                      default_level: int = logging.WARNING, console: bool = True) -> logging.Logger:
+    """
+    ログ出力を設定（再呼び出しで前回の設定を置き換える）
+
+    Args:
+        spec: レベル指定（未指定なら環境変数 TAX_RENAMER_LOG）
+        json_path: JSON Lines の出力先（未指定なら環境変数 TAX_RENAMER_LOG_JSON、どちらもなければ出力しない）
+        default_level: spec で全体のレベルを指定しない場合のレベル
+        console: 標準エラーへ出力するか
+    """
+    spec = spec if spec is not None else os.environ.get(LOG_LEVEL_ENV)
+    json_path = json_path or os.environ.get(LOG_JSON_ENV)
+    default, levels = parse_level_spec(spec)
+
+    with _CONFIG_LOCK:
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if getattr(h, _HANDLER_MARK, False)]:
+            root.removeHandler(handler)
+            handler.close()
+        for name in _configured_loggers - set(levels):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        _configured_loggers.clear()
+
+        root.setLevel(default if default is not None else default_level)
+        for name, level in levels.items():
+            logging.getLogger(name).setLevel(level)
+            _configured_loggers.add(name)
+
+        handlers = []
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            handlers.append(console_handler)
+        if json_path:
+            handlers.append(JsonLinesHandler(json_path))
+        for handler in handlers:
+            setattr(handler, _HANDLER_MARK, True)
+            root.addHandler(handler)
+    return root
@@ -8,6 +8,8 @@ from dataclasses import dataclass, field
 from typing import Optional, Dict, List, Any
 import hashlib
 import json
+import mmap
+import re
 from pathlib import Path
 
 
@@ -161,12 +163,27 @@ class SerialAllocation:
         return None
 
 
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
 def compute_file_md5(file_path: str) -> str:
-    """ファイルのMD5ハッシュを計算"""
+    """ファイルのMD5ハッシュを計算（mmapで一括、使えない場合は1MB単位で読み込み）"""
     hash_md5 = hashlib.md5()
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hash_md5.update(mapped)
+            return hash_md5.hexdigest()
+        except (ValueError, OSError):
+            # 空ファイルやmmap非対応のファイルシステム
+            f.seek(0)
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hash_md5.update(view[:size])
     return hash_md5.hexdigest()
 
 
@@ -180,6 +197,87 @@ def compute_page_md5(page_bytes: bytes) -> str:
     return hashlib.md5(page_bytes).hexdigest()
 
 
+FALLBACK_RASTER_DPI = 18
+_PDF_OBJECT_REF = re.compile(r"\b(\d+) \d+ R\b")
+
+
+def _page_resources(doc, page_xref: int):
+    """ページのリソース辞書を (種別, 値) で返す（ページツリーから継承されたものを含む）"""
+    xref = page_xref
+    kind, value = doc.xref_get_key(xref, "Resources")
+    while kind == "null":
+        parent_kind, parent = doc.xref_get_key(xref, "Parent")
+        if parent_kind != "xref":
+            break
+        xref = int(parent.split()[0])
+        kind, value = doc.xref_get_key(xref, "Resources")
+    if kind == "xref":
+        value = doc.xref_object(int(value.split()[0]), compressed=True)
+    return kind, value
+
+
+def _update_with_resource_objects(hash_md5, doc, resources: str, page_xref: int):
+    """リソース辞書から参照されるオブジェクト（画像・フォーム・フォント等）を辿ってハッシュに加える
+    
+    ストリームは展開せず生バイトのまま（xref_stream_raw）。同じxref配置でも
+    画像やフォントの中身が違えば異なる値になる。
+    """
+    pending = [int(ref) for ref in _PDF_OBJECT_REF.findall(resources)]
+    visited = {page_xref}
+    while pending:
+        xref = pending.pop()
+        if xref in visited:
+            continue
+        visited.add(xref)
+        definition = doc.xref_object(xref, compressed=True)
+        hash_md5.update(definition.encode("utf-8"))
+        if doc.xref_is_stream(xref):
+            hash_md5.update(doc.xref_stream_raw(xref) or b"")
+        hash_md5.update(b"\x00")
+        pending.extend(int(ref) for ref in _PDF_OBJECT_REF.findall(definition))
+
+
+def compute_page_content_md5(page, raster_fallback: bool = True) -> Optional[str]:
+    """ページのコンテンツストリームと参照リソースからMD5を計算
+    
+    コンテンツストリームは展開せず生バイトのまま、リソース辞書は参照先の
+    画像・フォーム・フォントのストリーム生バイトまで含めてハッシュする。
+    画像のみのページ（スキャン等）は raster_fallback=True なら低解像度ラスタの
+    ピクセル値も加える。コンテンツストリームが取得できない場合は
+    raster_fallback=True なら低解像度ラスタのピクセル値、False なら None を返す。
+    
+    Args:
+        page: PyMuPDF のページオブジェクト
+        raster_fallback: コンテンツストリームがない・画像のみのページで低解像度ラスタを使うか
+    """
+    hash_md5 = hashlib.md5()
+    image_only = False
+    try:
+        doc = page.parent
+        content_xrefs = page.get_contents()
+        for xref in content_xrefs:
+            hash_md5.update(doc.xref_stream_raw(xref) or b"")
+            hash_md5.update(b"\x00")
+        
+        kind, value = _page_resources(doc, page.xref)
+        hash_md5.update(f"|{kind}|{value}|{page.rotation}|{tuple(page.mediabox)}".encode("utf-8"))
+        _update_with_resource_objects(hash_md5, doc, value, page.xref)
+        image_only = bool(page.get_images()) and not page.get_fonts()
+    except Exception:
+        content_xrefs = []
+    
+    if content_xrefs and not (image_only and raster_fallback):
+        return hash_md5.hexdigest()
+    if not raster_fallback:
+        return None
+    
+    pix = page.get_pixmap(dpi=FALLBACK_RASTER_DPI)
+    if content_xrefs:
+        hash_md5.update(pix.samples)
+        return hash_md5.hexdigest()
+    return compute_page_md5(bytes(pix.samples))
+
+
 def make_bucket_key(source_md5: str, muni_name: str, period: str) -> str:
     """連番バケット用のキーを生成"""
     bucket_input = f"{source_md5}|{muni_name or 'NO_MUNI'}|{period or 'NO_PERIOD'}"
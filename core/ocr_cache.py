@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+OCR結果キャッシュ v5.5
+ページ内容のフィンガープリント・切り出し領域・倍率・PSM・言語をキーに結果を永続化し、
+同じ書類の再処理では描画もtesseractも実行しない
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+# 画像前処理やキー構成を変えたら上げる（古いエントリは参照されなくなり、LRUで追い出される）
+OCR_CACHE_VERSION = 3
+
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MEMORY_ENTRIES = 256
+# 他プロセスの書き込みを反映するため、件数・バイト数の累計をDBから数え直す間隔（put回数）
+TOTALS_RESYNC_INTERVAL = 256
+
+
+def compute_ocr_region_md5(page_md5: str, clip: Tuple[float, float, float, float], zoom: float) -> str:
+    """OCR対象領域のハッシュを計算（描画前に求められる）
+
+    ページのフィンガープリント（models.compute_page_content_md5）は画像のみのページでは
+    低解像度ラスタの画素を含むため、同じxref配置の別スキャンと混同しない。
+
+    Args:
+        page_md5: ページ内容のフィンガープリント
+        clip: 切り出し領域 (x0, y0, x1, y1)
+        zoom: 描画倍率
+    """
+    clip_source = ",".join(f"{value:.2f}" for value in clip)
+    return hashlib.md5(f"{page_md5}|{clip_source}|{zoom:.2f}".encode("ascii")).hexdigest()
+
+
+def make_ocr_cache_key(region_md5: str, config: str, lang: str) -> str:
+    """OCRキャッシュキーを生成
+
+    Args:
+        region_md5: OCR対象領域のハッシュ（compute_ocr_region_md5）
+        config: tesseract設定（--psm など）
+        lang: OCR言語
+    """
+    key_source = f"v{OCR_CACHE_VERSION}|{region_md5}|{config}|{lang}"
+    return hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+
+
+class OCRResultCache:
+    """
+    永続OCR結果キャッシュ（SQLite + プロセス内LRU）
+
+    エントリ数・テキスト総バイト数の上限を超えると、最終参照が古いものから削除する。
+    件数・バイト数は put ごとに累計を更新し、全件の集計は一定回数ごとと追い出し前にだけ行う。
+    ワーカープロセス間で同じファイルを共有できる。DBは初回アクセス時に作成する。
+    DBを作成できない場合（読み取り専用の作業フォルダ等）は永続キャッシュを無効にし、
+    プロセス内LRUのみで動作する。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 logger: Optional[logging.Logger] = None):
+        """初期化
+
+        Args:
+            cache_dir: キャッシュ保存先（既定: ./ocr_cache）
+            max_entries: 永続キャッシュの最大エントリ数
+            max_bytes: 永続キャッシュのテキスト総バイト数上限
+            memory_entries: プロセス内LRUの最大エントリ数
+            logger: ロガー
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir) if cache_dir else Path("./ocr_cache")
+        self.db_path = self.cache_dir / "ocr_results.sqlite3"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.persistent_disabled = False
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._totals: Optional[Tuple[int, int]] = None      # (エントリ数, テキスト総バイト数)
+        self._puts_since_resync = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """DB接続（作成できない場合は永続キャッシュを無効にしてNone）"""
+        if self._conn is None and not self.persistent_disabled:
+            conn = None
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS ocr_results ("
+                    " key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_last_used ON ocr_results(last_used)")
+                conn.commit()
+            except (OSError, sqlite3.Error) as e:
+                if conn is not None:
+                    conn.close()
+                self.persistent_disabled = True
+                self.logger.warning("[ocr_cache] Persistent cache disabled (%s): %s", self.db_path, e)
+                return None
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, text: str):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """キャッシュ済みOCR結果を取得（なければNone）"""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                return text
+
+            row = None
+            try:
+                conn = self._connection()
+                if conn is not None:
+                    row = conn.execute("SELECT text FROM ocr_results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE ocr_results SET last_used = ? WHERE key = ?", (time.time(), key))
+                    conn.commit()
+            except sqlite3.Error as e:
+                self.logger.warning("[ocr_cache] Read failed: %s", e)
+                row = None
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key: str, text: str):
+        """OCR結果を保存し、上限を超えた分を古い順に削除"""
+        with self._lock:
+            self._remember(key, text)
+            try:
+                conn = self._connection()
+                if conn is None:
+                    return
+                size = len(text.encode('utf-8'))
+                replaced = conn.execute("SELECT size FROM ocr_results WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr_results (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, text, size, time.time())
+                )
+                self.stats['stores'] += 1
+                self._update_totals(conn, 0 if replaced else 1, size - (replaced[0] if replaced else 0))
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                self._totals = None
+                self.logger.warning("[ocr_cache] Write failed: %s", e)
+
+    def _count_totals(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results").fetchone()
+        self._puts_since_resync = 0
+        return count, total_bytes
+
+    def _update_totals(self, conn: sqlite3.Connection, added_entries: int, added_bytes: int):
+        """累計を更新（初回・一定回数ごとはDBから数え直す）"""
+        self._puts_since_resync += 1
+        if self._totals is None or self._puts_since_resync >= TOTALS_RESYNC_INTERVAL:
+            self._totals = self._count_totals(conn)
+        else:
+            count, total_bytes = self._totals
+            self._totals = (count + added_entries, total_bytes + added_bytes)
+
+    def _over_limit(self, count: int, total_bytes: int) -> bool:
+        return count > self.max_entries or (total_bytes > self.max_bytes and count > 1)
+
+    def _evict(self, conn: sqlite3.Connection):
+        if not self._over_limit(*self._totals):
+            return
+        # 追い出す前に数え直す（他プロセスの追い出しで既に上限内のこともある）
+        count, total_bytes = self._count_totals(conn)
+        while self._over_limit(count, total_bytes):
+            excess = max(count - self.max_entries, 1)
+            rows = conn.execute(
+                "SELECT key, size FROM ocr_results ORDER BY last_used ASC LIMIT ?", (excess,)
+            ).fetchall()
+            conn.executemany("DELETE FROM ocr_results WHERE key = ?", [(k,) for k, _ in rows])
+            for key, size in rows:
+                self._memory.pop(key, None)
+                total_bytes -= size
+            count -= len(rows)
+            self.stats['evictions'] += len(rows)
+        self._totals = (count, total_bytes)
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            self._memory.clear()
+            try:
+                conn = self._connection()
+                if conn is not None:
+                    conn.execute("DELETE FROM ocr_results")
+                    conn.commit()
+                    self._totals = (0, 0)
+            except sqlite3.Error as e:
+                self.logger.warning("[ocr_cache] Clear failed: %s", e)
+
+    def close(self):
+        """DB接続を閉じる"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def create_ocr_cache(cache_dir: Optional[Path] = None, logger: Optional[logging.Logger] = None,
+                     **kwargs) -> OCRResultCache:
+    """OCR結果キャッシュのファクトリー関数"""
+    return OCRResultCache(cache_dir=cache_dir, logger=logger, **kwargs)
@@ -5,13 +5,45 @@ OCR・自治体認識エンジン v4.0
 """
 
 import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
 import re
 import io
-from typing import List, Optional, Dict, Tuple
+import os
+import contextlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Dict, Sequence, Tuple, Union
 from dataclasses import dataclass
 
+from .gazetteer import get_shared_gazetteer, short_prefecture_name
+from .lazy_import import lazy_module
+from .models import compute_page_content_md5
+from .ocr_cache import OCRResultCache, compute_ocr_region_md5, make_ocr_cache_key
+from .tesseract_pool import TesseractWorkerPool, get_shared_tesseract_pool
+
+# OCRスタック（pytesseract・PIL）は初回のOCR実行時に読み込む
+pytesseract = lazy_module("pytesseract")
+Image = lazy_module("PIL.Image")
+
+OCR_LANG = 'jpn'
+OCR_ZOOM = 3.0
+
+# exhaustive: 全PSMを実行し最長の結果を採用（従来方式）
+EXHAUSTIVE_PSM_CONFIGS = [
+    '--psm 6 --oem 3',
+    '--psm 7 --oem 3',
+    '--psm 8 --oem 3',
+    '--psm 13 --oem 3'
+]
+# adaptive: 処理の軽いPSMから順に実行し、市区町村名まで解析できた時点で打ち切る
+ADAPTIVE_PSM_CONFIGS = [
+    '--psm 8 --oem 3',   # 単語
+    '--psm 7 --oem 3',   # 単一行
+    '--psm 13 --oem 3',  # 単一行（raw）
+    '--psm 6 --oem 3'    # ブロック
+]
+PSM_STRATEGIES = ("adaptive", "exhaustive")
+
 @dataclass
 class MunicipalityInfo:
     """自治体情報を表すデータクラス"""
@@ -20,6 +52,7 @@ class MunicipalityInfo:
     raw_text: str = ""
     confidence: float = 0.0
     position: Tuple[int, int, int, int] = (0, 0, 0, 0)
+    source: str = "ocr"                  # "text_layer"（埋め込みテキスト）または "ocr"
 
 @dataclass
 class MunicipalitySet:
@@ -31,34 +64,32 @@ class MunicipalitySet:
 class OCREngine:
     """OCR処理と自治体認識のメインクラス"""
     
-    def __init__(self):
-        """初期化"""
-        # 自治体名認識パターン
-        self.prefecture_patterns = [
-            r'([^都道府県\s]{1,6}?)県[^税]*県税事務所',  # 愛知県東三河県税事務所
-            r'([^都道府県\s]{1,6}?)都[^税]*都税事務所',  # 東京都港都税事務所
-            r'([^都道府県\s]{1,6}?)県知事',
-            r'([^都道府県\s]{1,6}?)都知事',
-            r'([^都道府県\s]{1,6}?)府知事',
-            r'([^都道府県\s]{1,6}?)道知事',
-            r'([^都道府県\s]{1,6}?)県税事務所',
-            r'([^都道府県\s]{1,6}?)都税事務所',
-            r'([^都道府県\s]{1,6}?)県',
-            r'([^都道府県\s]{1,6}?)都',
-            r'([^都道府県\s]{1,6}?)府',
-            r'([^都道府県\s]{1,6}?)道'
-        ]
-        
-        self.municipality_patterns = [
-            r'([^市町村区\s]{1,10}?)市長',
-            r'([^市町村区\s]{1,10}?)町長',
-            r'([^市町村区\s]{1,10}?)村長',
-            r'([^市町村区\s]{1,10}?)区長',
-            r'([^市町村区\s]{1,10}?)市',
-            r'([^市町村区\s]{1,10}?)町',
-            r'([^市町村区\s]{1,10}?)村',
-            r'([^市町村区\s]{1,10}?)区'
-        ]
+    def __init__(self, ocr_cache: Optional[OCRResultCache] = None, use_cache: bool = True,
+                 psm_strategy: str = "adaptive", tesseract_pool: Optional[TesseractWorkerPool] = None,
+                 use_text_layer: bool = True):
+        """初期化
+        
+        Args:
+            ocr_cache: OCR結果キャッシュ（Noneかつuse_cache=Trueで既定の ./ocr_cache を使用）
+            use_cache: OCR結果キャッシュを使うか
+            psm_strategy: "adaptive"（軽いPSMから順に実行し解析成功で打ち切り）
+                          または "exhaustive"（全PSMを実行し最長結果を採用）
+            tesseract_pool: tesseractワーカープール（Noneでプロセス共有プールを使用）
+            use_text_layer: 切り出し領域の埋め込みテキストで解析できればOCRを省略するか
+        """
+        if psm_strategy not in PSM_STRATEGIES:
+            raise ValueError(f"Unknown psm_strategy: {psm_strategy}")
+        self.psm_strategy = psm_strategy
+        self.logger = logging.getLogger(__name__)
+        self.tesseract_pool = tesseract_pool or get_shared_tesseract_pool()
+        self.use_text_layer = use_text_layer
+        
+        # 解析元の集計（text_layer: 埋め込みテキストで解決、ocr: ラスタ化＋tesseract）
+        # エンジン生成または reset_stats() 以降の累計（実行単位の集計は呼び出し側で reset_stats() する）
+        self._stats_lock = threading.Lock()
+        self.stats = {'text_layer': 0, 'ocr': 0}
+        self.ocr_cache = ocr_cache if ocr_cache is not None else (OCRResultCache() if use_cache else None)
+        self.gazetteer = get_shared_gazetteer()
         
         # OCR設定
         self.ocr_config = '--psm 6 --oem 3 -c preserve_interword_spaces=1'
@@ -67,17 +98,82 @@ class OCREngine:
         """PDFから自治体情報を抽出（強化版）"""
         try:
             doc = fitz.open(pdf_path)
-            
+        except Exception as e:
+            self.logger.warning("OCR処理エラー - %s", str(e))
+            return MunicipalityInfo(raw_text=f"OCR処理エラー: {e}")
+        
+        try:
             if page_num >= doc.page_count:
-                doc.close()
                 return MunicipalityInfo(raw_text="ページが存在しません")
             
-            page = doc[page_num]
+            return self._extract_from_page(doc[page_num])
+            
+        except Exception as e:
+            self.logger.warning("OCR処理エラー - %s", str(e))
+            return MunicipalityInfo(raw_text=f"OCR処理エラー: {e}")
+        finally:
+            doc.close()
+
+    def extract_municipalities_batch(self, pdf_path: str, page_indices: Sequence[int],
+                                     max_workers: Optional[int] = None) -> List[MunicipalityInfo]:
+        """複数ページの自治体情報をまとめて抽出
+        
+        ドキュメントは1回だけ開き、各ページの切り出し画像の描画は直列（PyMuPDFはスレッド非安全）、
+        OCRはスレッドで並列にバックエンドへ送る。
+        
+        Args:
+            pdf_path: 対象PDFファイルパス
+            page_indices: 対象ページ番号（0始まり）
+            max_workers: 並列数（Noneでページ数と論理CPU数の小さい方、1以下で逐次）
             
+        Returns:
+            List[MunicipalityInfo]: page_indices と同じ順序の抽出結果
+        """
+        page_indices = list(page_indices)
+        if not page_indices:
+            return []
+        
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            self.logger.warning("OCR処理エラー - %s", str(e))
+            return [MunicipalityInfo(raw_text=f"OCR処理エラー: {e}") for _ in page_indices]
+        
+        render_lock = threading.Lock()
+        
+        def extract(page_num: int) -> MunicipalityInfo:
+            if page_num >= doc.page_count:
+                return MunicipalityInfo(raw_text="ページが存在しません")
+            try:
+                with render_lock:
+                    page = doc[page_num]
+                return self._extract_from_page(page, render_lock=render_lock)
+            except Exception as e:
+                self.logger.warning("OCR処理エラー (p.%s) - %s", page_num + 1, str(e))
+                return MunicipalityInfo(raw_text=f"OCR処理エラー: {e}")
+        
+        try:
+            workers = max_workers if max_workers is not None else min(len(page_indices), os.cpu_count() or 1)
+            self.logger.debug("一括OCR開始 - %sページ, 並列数: %s", len(page_indices), max(workers, 1))
+            if workers <= 1:
+                return [extract(page_num) for page_num in page_indices]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(extract, page_indices))
+        finally:
+            doc.close()
+
+    def _extract_from_page(self, page, render_lock: Optional[threading.Lock] = None) -> MunicipalityInfo:
+        """ページ上部の切り出し画像をOCRして自治体情報を解析
+        
+        render_lock 指定時はページへのアクセス（テキスト取得・描画）をロック内で行う。
+        """
+        page_lock = render_lock or contextlib.nullcontext()
+        
+        with page_lock:
             # ページサイズを取得
             page_rect = page.rect
             
-            print(f"DEBUG: OCR処理開始 - ページサイズ: {page_rect.width}x{page_rect.height}")
+            self.logger.debug("OCR処理開始 - ページサイズ: %sx%s", page_rect.width, page_rect.height)
             
             # 中央上部エリアを定義（ページの上部1/3、左右中央2/3）
             crop_rect = fitz.Rect(
@@ -87,38 +183,60 @@ class OCREngine:
                 page_rect.height * 0.33   # 上部33%
             )
             
-            print(f"DEBUG: OCR対象領域: ({crop_rect.x0}, {crop_rect.y0}, {crop_rect.x1}, {crop_rect.y1})")
+            self.logger.debug("OCR対象領域: (%s, %s, %s, %s)", crop_rect.x0, crop_rect.y0, crop_rect.x1, crop_rect.y1)
             
+            # 埋め込みテキスト（e-Tax/eLTAXの通知はほぼテキストレイヤーを持つ）
+            layer_text = page.get_text(clip=crop_rect) if self.use_text_layer else ""
+        
+        position = (crop_rect.x0, crop_rect.y0, crop_rect.x1, crop_rect.y1)
+        
+        # 都道府県名だけの見出しではOCRを省略しない（PSMの打ち切り判定と同じ基準）
+        if self._has_parsed_municipality(layer_text):
+            municipality_info = self._parse_municipality_text(layer_text)
+            municipality_info.raw_text = layer_text
+            municipality_info.position = position
+            municipality_info.source = "text_layer"
+            self._count_source("text_layer")
+            self.logger.debug("テキストレイヤーで自治体認識（OCR省略） - 都道府県: %s, 市町村: %s [text_layer=%s, ocr=%s]",
+                              municipality_info.prefecture, municipality_info.municipality,
+                              self.stats['text_layer'], self.stats['ocr'])
+            return municipality_info
+        
+        self._count_source("ocr")
+        self.logger.debug("テキストレイヤーで解析不可、OCR実行 [text_layer=%s, ocr=%s]", self.stats['text_layer'], self.stats['ocr'])
+        
+        # キャッシュキーはページ内容のフィンガープリント＋切り出し領域・倍率（描画前に決まる）
+        region_md5 = None
+        if self.ocr_cache is not None:
+            with page_lock:
+                page_md5 = compute_page_content_md5(page)
+            region_md5 = compute_ocr_region_md5(page_md5, position, OCR_ZOOM)
+        
+        def render_image() -> 'Image.Image':
             # 高解像度で画像として描画
-            mat = fitz.Matrix(3.0, 3.0)  # 3倍に拡大（OCR精度向上）
-            pix = page.get_pixmap(matrix=mat, clip=crop_rect)
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
+            mat = fitz.Matrix(OCR_ZOOM, OCR_ZOOM)  # 3倍に拡大（OCR精度向上）
+            with page_lock:
+                pix = page.get_pixmap(matrix=mat, clip=crop_rect)
+            img = Image.open(io.BytesIO(pix.tobytes("png")))
             
             # 画像前処理
-            img = self._preprocess_image_for_ocr(img)
-            
-            doc.close()
-            
-            # OCR実行（複数の設定で試行）
-            extracted_text = self._perform_enhanced_ocr(img)
-            
-            print(f"DEBUG: OCR抽出結果: '{extracted_text}'")
-            
-            # 自治体情報を解析
-            municipality_info = self._parse_municipality_text(extracted_text)
-            municipality_info.raw_text = extracted_text
-            municipality_info.position = (crop_rect.x0, crop_rect.y0, crop_rect.x1, crop_rect.y1)
-            
-            print(f"DEBUG: 自治体認識結果 - 都道府県: {municipality_info.prefecture}, 市町村: {municipality_info.municipality}")
-            
-            return municipality_info
-            
-        except Exception as e:
-            print(f"DEBUG: OCR処理エラー - {str(e)}")
-            return MunicipalityInfo(raw_text=f"OCR処理エラー: {e}")
+            return self._preprocess_image_for_ocr(img)
+        
+        # OCR実行（複数の設定で試行、全設定がキャッシュ済みなら描画・前処理・tesseractを行わない）
+        extracted_text = self._perform_enhanced_ocr(render_image, region_md5=region_md5)
+        
+        self.logger.debug("OCR抽出結果: '%s'", extracted_text)
+        
+        # 自治体情報を解析
+        municipality_info = self._parse_municipality_text(extracted_text)
+        municipality_info.raw_text = extracted_text
+        municipality_info.position = position
+        
+        self.logger.debug("自治体認識結果 - 都道府県: %s, 市町村: %s", municipality_info.prefecture, municipality_info.municipality)
+        
+        return municipality_info
 
-    def _preprocess_image_for_ocr(self, img: Image) -> Image:
+    def _preprocess_image_for_ocr(self, img: 'Image.Image') -> 'Image.Image':
         """OCR精度向上のための画像前処理"""
         try:
             # グレースケール変換
@@ -135,33 +253,79 @@ class OCREngine:
             
             return img
         except Exception as e:
-            print(f"DEBUG: 画像前処理エラー - {str(e)}")
+            self.logger.warning("画像前処理エラー - %s", str(e))
             return img
 
-    def _perform_enhanced_ocr(self, img: Image) -> str:
-        """強化されたOCR処理"""
-        ocr_configs = [
-            '--psm 6 --oem 3',
-            '--psm 7 --oem 3', 
-            '--psm 8 --oem 3',
-            '--psm 13 --oem 3'
-        ]
+    def _perform_enhanced_ocr(self, img: Union['Image.Image', Callable[[], 'Image.Image']],
+                              region_md5: Optional[str] = None) -> str:
+        """強化されたOCR処理
+        
+        adaptive では軽いPSMから順に実行し、市区町村名まで解析できた結果を即座に返す。
+        都道府県名のみの結果では打ち切らず、どのPSMでも市区町村名が得られなかった場合
+        （および exhaustive）は最長の結果を返す。
+        
+        Args:
+            img: OCR対象画像、または画像を返す関数（キャッシュヒット時は呼ばれない）
+            region_md5: OCR対象領域のハッシュ（compute_ocr_region_md5）。指定時はPSMごとに結果をキャッシュ
+        """
+        image_holder = []
+        
+        def get_image() -> 'Image.Image':
+            if not image_holder:
+                image_holder.append(img() if callable(img) else img)
+            return image_holder[0]
+        
+        adaptive = self.psm_strategy == "adaptive"
+        ocr_configs = ADAPTIVE_PSM_CONFIGS if adaptive else EXHAUSTIVE_PSM_CONFIGS
         
         best_result = ""
         best_length = 0
         
         for config in ocr_configs:
             try:
-                result = pytesseract.image_to_string(img, lang='jpn', config=config)
+                result = self._image_to_string_cached(get_image, config, region_md5)
+                if adaptive and self._has_parsed_municipality(result):
+                    self.logger.debug("OCR設定 %s で市区町村名を解析、残りのPSMを省略", config)
+                    return result
                 if len(result.strip()) > best_length:
                     best_result = result
                     best_length = len(result.strip())
             except Exception as e:
-                print(f"DEBUG: OCR設定 {config} でエラー - {str(e)}")
+                self.logger.warning("OCR設定 %s でエラー - %s", config, str(e))
                 continue
         
         return best_result
 
+    def reset_stats(self):
+        """解析元の集計をリセット"""
+        with self._stats_lock:
+            self.stats = {'text_layer': 0, 'ocr': 0}
+
+    def _count_source(self, source: str):
+        with self._stats_lock:
+            self.stats[source] += 1
+
+    def _has_parsed_municipality(self, text: str) -> bool:
+        """OCR結果から市区町村名（都道府県とあわせて）が解析できるか（PSM打ち切り判定）"""
+        if not text or not text.strip():
+            return False
+        return bool(self._parse_municipality_text(text).municipality)
+
+    def _image_to_string_cached(self, get_image: Callable[[], 'Image.Image'], config: str,
+                                region_md5: Optional[str]) -> str:
+        """tesseract実行（キャッシュがあれば結果を再利用）"""
+        if self.ocr_cache is None or region_md5 is None:
+            return self.tesseract_pool.image_to_string(get_image(), lang=OCR_LANG, config=config)
+        
+        key = make_ocr_cache_key(region_md5, config, OCR_LANG)
+        cached = self.ocr_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = self.tesseract_pool.image_to_string(get_image(), lang=OCR_LANG, config=config)
+        self.ocr_cache.put(key, result)
+        return result
+
     def _parse_municipality_text(self, text: str) -> MunicipalityInfo:
         """抽出されたテキストから自治体情報を解析"""
         info = MunicipalityInfo()
@@ -170,68 +334,21 @@ class OCREngine:
         cleaned_text = re.sub(r'\s+', '', text)  # 空白を除去
         cleaned_text = re.sub(r'[^\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF\u3400-\u4DBF]', '', cleaned_text)  # 日本語文字のみ
         
-        # 都道府県名を抽出
-        for pattern in self.prefecture_patterns:
-            match = re.search(pattern, cleaned_text)
-            if match:
-                candidate = match.group(1)
-                if self._is_valid_prefecture_name(candidate):
-                    info.prefecture = candidate
-                    info.confidence += 0.3
-                    break
-        
-        # 市町村名を抽出
-        for pattern in self.municipality_patterns:
-            match = re.search(pattern, cleaned_text)
-            if match:
-                candidate = match.group(1)
-                if self._is_valid_municipality_name(candidate):
-                    info.municipality = candidate
-                    info.confidence += 0.3
-                    break
-        
+        # 地名辞書の1回走査で都道府県・市区町村を解決（「都道府県」「市区町村」の接尾辞は除いた形で返す）
+        place = self.gazetteer.resolve(cleaned_text)
+        if place.prefecture:
+            info.prefecture = short_prefecture_name(place.prefecture)
+            info.confidence += 0.3
+        if place.city:
+            info.municipality = place.city[:-1]
+            info.confidence += 0.3
+
         # 信頼度調整
         if info.prefecture and info.municipality:
             info.confidence += 0.4
         
         return info
 
-    def _is_valid_prefecture_name(self, name: str) -> bool:
-        """都道府県名の妥当性をチェック"""
-        if not name or len(name) < 2 or len(name) > 6:
-            return False
-            
-        # 一般的な都道府県名パターン
-        valid_prefectures = [
-            '北海道', '青森', '岩手', '宮城', '秋田', '山形', '福島',
-            '茨城', '栃木', '群馬', '埼玉', '千葉', '東京', '神奈川',
-            '新潟', '富山', '石川', '福井', '山梨', '長野', '岐阜',
-            '静岡', '愛知', '三重', '滋賀', '京都', '大阪', '兵庫',
-            '奈良', '和歌山', '鳥取', '島根', '岡山', '広島', '山口',
-            '徳島', '香川', '愛媛', '高知', '福岡', '佐賀', '長崎',
-            '熊本', '大分', '宮崎', '鹿児島', '沖縄'
-        ]
-        
-        return name in valid_prefectures
-
-    def _is_valid_municipality_name(self, name: str) -> bool:
-        """市町村名の妥当性をチェック"""
-        if not name or len(name) < 1 or len(name) > 10:
-            return False
-            
-        # 無効な文字パターンをチェック
-        invalid_patterns = [
-            r'^[0-9]+$',  # 数字のみ
-            r'^[あいうえお]+$',  # ひらがな単体
-            r'^[アイウエオ]+$',  # カタカナ単体
-        ]
-        
-        for pattern in invalid_patterns:
-            if re.match(pattern, name):
-                return False
-        
-        return True
-
     def extract_text(self, pdf_path: str) -> str:
         """
         v5.3互換: PDFからテキストを抽出
@@ -248,7 +365,7 @@ class OCREngine:
             
             return text or ""
         except Exception as e:
-            print(f"[OCR] extract_text error: {e}")
+            self.logger.warning("[OCR] extract_text error: %s", e)
             return ""
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+出力ファイル命名 v5.5
+分析結果（core.parallel_batch.FileAnalysis）を「{分類コード}_{YYMM}.pdf」で命名・出力する。
+GUI・ヘッドレスCLI・ui.file_processor で共通の 命名・空白ページ除外・重複時の連番（_001）規則。
+"""
+
+import os
+import shutil
+import time
+from typing import Callable, Optional, Set, Tuple
+
+from .classification_v5 import ClassificationResult
+from .page_pipeline import create_page_pipeline
+from .parallel_batch import AnalyzedUnit, FileAnalysis
+from .pdf_processor import PDFProcessor
+
+
+def output_filename(document_type: str, yymm: str, ext: str = "pdf") -> str:
+    """出力ファイル名「{分類コード}_{YYMM}.{拡張子}」を返す"""
+    return f"{document_type}_{yymm}.{ext}"
+
+
+def unique_output_path(output_folder: str, new_filename: str, reserved: Optional[Set[str]] = None) -> str:
+    """出力先の重複を回避したパスを返す（reserved は命名済みで未書き込みのパス）"""
+    reserved = reserved if reserved is not None else set()
+    output_path = os.path.join(output_folder, new_filename)
+    counter = 1
+    while os.path.exists(output_path) or output_path in reserved:
+        name, ext = os.path.splitext(new_filename)
+        output_path = os.path.join(output_folder, f"{name}_{counter:03d}{ext}")
+        counter += 1
+    return output_path
+
+
+# 空白ページ判定（GUI・ヘッドレスで共通の除外規則）
+_MEANINGFUL_KEYWORDS = (
+    "申告書", "受信通知", "納付", "税務", "法人", "消費税", "地方税",
+    "都道府県", "市町村", "税務署", "都税事務所", "一括償却", "固定資産"
+)
+_BLANK_PAGE_KEYWORDS = ("Page", "of", "メッセージ", "file:///", "Temp", "TzTemp", "AppData")
+_LOW_CONFIDENCE_FILENAME_PATTERNS = ("__split_", "temp", "blank")
+
+
+def should_exclude_blank_page(text: str, filename: str) -> bool:
+    """空白ページ（ヘッダー・フッターのみ等）として出力しないか（分類前の判定）"""
+    text = text.strip()
+    # 有意味な税務コンテンツがあれば除外しない（優先）
+    if any(keyword in text for keyword in _MEANINGFUL_KEYWORDS):
+        return False
+    if any(keyword in text for keyword in _BLANK_PAGE_KEYWORDS):
+        return True
+    if len(text) < 30:
+        return True
+    # 分割ページ等の信頼度の低いファイル名は基準を緩める
+    if any(pattern in filename.lower() for pattern in _LOW_CONFIDENCE_FILENAME_PATTERNS):
+        return len(text) < 80
+    return False
+
+
+def is_blank_unclassified(classification_result: Optional[ClassificationResult], text: str) -> bool:
+    """信頼度0.00かつ未分類の短いテキストか（分類後の空白ページ判定）"""
+    return bool(
+        classification_result
+        and classification_result.confidence == 0.0
+        and classification_result.document_type == "9999_未分類"
+        and len(text.strip()) < 100
+    )
+
+
+def apply_pdf_analysis(analysis: FileAnalysis, output_folder: str, yymm: str, pdf_processor: PDFProcessor,
+                       log: Callable[[str], None], success_callback: Optional[Callable] = None,
+                       unit_callback: Optional[Callable[[AnalyzedUnit, str], None]] = None,
+                       yymm_resolver: Optional[Callable[[str], str]] = None) -> bool:
+    """分析結果からPDFを「{分類コード}_{YYMM}.pdf」で命名・出力（入力順に呼び出すこと）
+    
+    命名・空白ページ除外・重複時の連番（_001）はGUIのフォルダ一括処理と同じ規則。
+    命名 → 書き込み を段階パイプラインで重ね、ログ・コールバックは呼び出しスレッドでページ順に行う。
+    命名済みで未書き込みのパスは予約し、同種ページが続いても同じパスを返さない。
+    所要時間は analysis.timings['write']、出力ファイル名・分類は analysis.outputs / document_types に記録する。
+    unit_callback は出力ごとに (分析単位, 出力パス) で呼ぶ（GUIの詳細ログ用）。
+    yymm_resolver は出力ごとに分類結果を受け取ってYYMMを返す（分類コード別のYYMMポリシー用、Noneで yymm を使用）。
+    非分割PDFが空白ページとして除外された場合は False を返す。
+    """
+    file_path = analysis.file_path
+    filename = os.path.basename(file_path)
+    
+    if analysis.error:
+        log(f"PDF処理エラー {filename}: {analysis.error}")
+        return False
+    
+    if analysis.is_bundle:
+        log(f"Bundle分割完了: {filename}")
+    
+    reserved: Set[str] = set()
+    
+    def name(unit: AnalyzedUnit) -> Tuple[AnalyzedUnit, Optional[str], str]:
+        if (should_exclude_blank_page(unit.text, unit.classify_filename)
+                or is_blank_unclassified(unit.classification, unit.text)):
+            return unit, None, ""
+        document_type = unit.classification.document_type if unit.classification else "9999_未分類"
+        unit_yymm = yymm_resolver(document_type) if yymm_resolver else yymm
+        output_path = unique_output_path(output_folder, output_filename(document_type, unit_yymm), reserved)
+        reserved.add(output_path)
+        return unit, output_path, document_type
+    
+    def write(named: Tuple[AnalyzedUnit, Optional[str], str]) -> Tuple[AnalyzedUnit, Optional[str], str]:
+        unit, output_path, _ = named
+        if output_path is None:
+            return named
+        if analysis.is_bundle:
+            # 元PDFのページを最終ファイル名へ直接書き込む
+            pdf_processor.write_pdf_page(file_path, unit.page_number, output_path)
+        else:
+            os.makedirs(output_folder, exist_ok=True)
+            shutil.copy2(file_path, output_path)
+        return named
+    
+    started = time.perf_counter()
+    pipeline = create_page_pipeline([("name", name), ("write", write)], logger=pdf_processor.logger)
+    try:
+        for item in pipeline.run(analysis.units):
+            if item.error is not None:
+                raise item.error
+            unit, output_path, document_type = item.value
+            if output_path is None:
+                log(f"[exclude] 空白ページとして除外: {unit.classify_filename}")
+                continue
+            source_label = f"{filename} (p.{unit.page_number})" if analysis.is_bundle else filename
+            analysis.outputs.append(os.path.basename(output_path))
+            analysis.document_types.append(document_type)
+            
+            classification_result = unit.classification
+            if classification_result:
+                confidence = f"{classification_result.confidence:.2f}"
+                method = classification_result.classification_method
+                matched_keywords = classification_result.matched_keywords or []
+            else:
+                confidence = "0.00"
+                method = "未分類"
+                matched_keywords = []
+            
+            log(f"✅ 処理完了: {source_label} → {os.path.basename(output_path)}")
+            log(f"  - 分類: {document_type}")
+            log(f"  - 信頼度: {confidence}")
+            log(f"  - 判定方法: {method}")
+            if matched_keywords:
+                log(f"  - キーワード: {matched_keywords}")
+            
+            if success_callback:
+                success_callback(file_path, os.path.basename(output_path), document_type, method, confidence, matched_keywords)
+            if unit_callback:
+                unit_callback(unit, output_path)
+    finally:
+        pdf_processor.page_text_store.release(file_path)
+        analysis.timings['write'] = time.perf_counter() - started
+    
+    return analysis.is_bundle or bool(analysis.outputs)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+ページ段階パイプライン v5.5
+抽出 → 分類 → 書き込み → 命名 の各段階を専用スレッドで動かし、段階間を有界キューでつなぐ。
+各段階は1スレッド・FIFOのため、結果は常に入力順（連番の決定性を維持）。
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_QUEUE_SIZE = 4
+_END = object()
+_POLL_SEC = 0.1
+
+
+@dataclass
+class PipelineItem:
+    """パイプラインを流れる1件（失敗した段階以降はそのまま素通りする）"""
+    index: int
+    value: Any
+    error: Optional[Exception] = None
+    failed_stage: Optional[str] = None
+
+
+class PagePipeline:
+    """
+    有界キューでつないだ段階パイプライン
+
+    stages は (段階名, 関数) の列。関数は前段階の値を受け取り次段階の値を返す。
+    キュー長で先行できるページ数を制限するため、メモリ使用量はページ数に依存しない。
+    所要時間は最も遅い段階の合計時間に近づく。
+    """
+
+    def __init__(self, stages: Sequence[Tuple[str, Callable[[Any], Any]]],
+                 queue_size: int = DEFAULT_QUEUE_SIZE, logger: Optional[logging.Logger] = None):
+        if not stages:
+            raise ValueError("PagePipeline requires at least one stage")
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.logger = logger or logging.getLogger(__name__)
+        self.stage_seconds: Dict[str, float] = {name: 0.0 for name, _ in self.stages}
+
+    def run(self, items: Iterable[Any]) -> Iterator[PipelineItem]:
+        """items を流し、最終段階の結果を入力順に返す（途中で打ち切った場合も全スレッドを停止）"""
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        def put(q: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=_POLL_SEC)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=_POLL_SEC)
+                except queue.Empty:
+                    continue
+            return _END
+
+        def feed():
+            try:
+                for index, value in enumerate(items):
+                    if not put(queues[0], PipelineItem(index=index, value=value)):
+                        return
+            except Exception as e:
+                self.logger.error("[pipeline] Input iteration failed: %s", e)
+            put(queues[0], _END)
+
+        def work(stage_index: int):
+            name, func = self.stages[stage_index]
+            source, sink = queues[stage_index], queues[stage_index + 1]
+            while True:
+                item = get(source)
+                if item is _END:
+                    put(sink, _END)
+                    return
+                if item.error is None:
+                    started = time.perf_counter()
+                    try:
+                        item.value = func(item.value)
+                    except Exception as e:
+                        item.error, item.failed_stage = e, name
+                    self.stage_seconds[name] += time.perf_counter() - started
+                if not put(sink, item):
+                    return
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        threads += [threading.Thread(target=work, args=(i,), name=f"pipeline-{name}", daemon=True)
+                    for i, (name, _) in enumerate(self.stages)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = get(queues[-1])
+                if item is _END:
+                    return
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def run_all(self, items: Iterable[Any]) -> List[PipelineItem]:
+        """全件を処理して入力順のリストで返す"""
+        return list(self.run(items))
+
+
+def create_page_pipeline(stages: Sequence[Tuple[str, Callable[[Any], Any]]],
+                         queue_size: int = DEFAULT_QUEUE_SIZE,
+                         logger: Optional[logging.Logger] = None) -> PagePipeline:
+    """ページ段階パイプラインのファクトリー関数"""
+    return PagePipeline(stages, queue_size=queue_size, logger=logger)
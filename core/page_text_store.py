@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+ページテキストストア v5.5
+1ジョブ内でPDFを1回だけ開き、各ページのテキストを1回だけ抽出して共有する
+"""
+
+import fitz  # PyMuPDF
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .file_identity import FileIdentityCache, get_shared_file_identity_cache
+
+
+class PageTextStore:
+    """
+    ジョブ単位のページテキストキャッシュ
+
+    キーは (ファイルMD5, ページ番号)。Bundle判定・資産ロック・分割・
+    スナップショット・分類の各段階は、このストア経由でテキストを取得する。
+    ジョブ終了時に close() で開いているドキュメントを解放する。
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None,
+                 identity_cache: Optional[FileIdentityCache] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        # ファイルMD5は stat が変わっていなければジョブをまたいで再利用（Noneでプロセス共有キャッシュ）
+        self.identity_cache = identity_cache
+        self._lock = threading.RLock()
+        self._md5_by_path: Dict[str, str] = {}
+        self._docs: Dict[str, "fitz.Document"] = {}
+        self._texts: Dict[Tuple[str, int], str] = {}
+        self.stats = {'documents_opened': 0, 'pages_extracted': 0, 'cache_hits': 0}
+
+    @property
+    def lock(self) -> threading.RLock:
+        """ドキュメントを複数スレッドから操作する間に保持するロック（fitzはスレッドセーフではない）"""
+        return self._lock
+
+    def file_md5(self, pdf_path: str) -> str:
+        """ファイルMD5を取得（ジョブ内で1回だけ参照、未変更ファイルは前回の値を再利用）"""
+        with self._lock:
+            md5 = self._md5_by_path.get(pdf_path)
+            if md5 is None:
+                md5 = (self.identity_cache or get_shared_file_identity_cache()).md5(pdf_path)
+                self._md5_by_path[pdf_path] = md5
+            return md5
+
+    def document(self, pdf_path: str) -> "fitz.Document":
+        """ドキュメントを取得（同一内容のファイルは1回だけ開く）"""
+        with self._lock:
+            md5 = self.file_md5(pdf_path)
+            doc = self._docs.get(md5)
+            if doc is None:
+                doc = fitz.open(pdf_path)
+                self._docs[md5] = doc
+                self.stats['documents_opened'] += 1
+                self.logger.debug("[page_store] Opened: %s (%s pages)", pdf_path, doc.page_count)
+            return doc
+
+    def page_count(self, pdf_path: str) -> int:
+        """ページ数を取得"""
+        return self.document(pdf_path).page_count
+
+    def page_text(self, pdf_path: str, page_index: int) -> str:
+        """指定ページのテキストを取得（未抽出の場合のみ get_text() を実行）"""
+        with self._lock:
+            key = (self.file_md5(pdf_path), page_index)
+            text = self._texts.get(key)
+            if text is not None:
+                self.stats['cache_hits'] += 1
+                return text
+
+            doc = self.document(pdf_path)
+            text = doc[page_index].get_text()
+            self._texts[key] = text
+            self.stats['pages_extracted'] += 1
+            return text
+
+    def page_texts(self, pdf_path: str, max_pages: Optional[int] = None) -> List[str]:
+        """先頭から max_pages ページ分のテキストを取得（Noneで全ページ）"""
+        with self._lock:
+            page_count = self.page_count(pdf_path)
+            scan_pages = min(page_count, max_pages) if max_pages is not None else page_count
+            return [self.page_text(pdf_path, i) for i in range(scan_pages)]
+
+    def document_text(self, pdf_path: str) -> str:
+        """全ページのテキストを連結して取得"""
+        return "".join(self.page_texts(pdf_path))
+
+    def release(self, pdf_path: str):
+        """ドキュメントのハンドルだけを閉じる（抽出済みテキストは保持）
+
+        一時ファイルの削除前に呼び出し、Windowsでのファイルロックを避ける。
+        """
+        with self._lock:
+            md5 = self._md5_by_path.get(pdf_path)
+            doc = self._docs.pop(md5, None) if md5 else None
+            if doc is not None:
+                doc.close()
+
+    def close(self):
+        """開いているドキュメントを閉じ、キャッシュを破棄"""
+        with self._lock:
+            for doc in self._docs.values():
+                try:
+                    doc.close()
+                except Exception as e:
+                    self.logger.debug("[page_store] Close warning: %s", e)
+            self._docs.clear()
+            self._texts.clear()
+            self._md5_by_path.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+並列フォルダ一括処理エンジン v5.5
+抽出・Bundle判定・分類をワーカープロセスで並列実行し、結果は入力順で返す。
+Bundleはワーカー内で ページ抽出 → 分類 を段階パイプラインで重ねる。
+テキストレイヤーのないBundleページはまとめて1回の一括OCRに回し、結果のテキストで分類し直す。
+命名・出力は core.output_naming.apply_pdf_analysis で入力順に行う。
+"""
+
+import os
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .classification_v5 import ClassificationResult, DocumentClassifierV5
+from .file_identity import configure_shared_file_identity_cache
+from .page_pipeline import create_page_pipeline
+from .page_text_store import PageTextStore
+from .pdf_processor import PDFProcessor
+
+
+@dataclass
+class AnalyzedUnit:
+    """出力1件分の分析結果（非分割PDFは1件、Bundleはページごと）"""
+    page_number: Optional[int]           # Bundleのページ番号（1始まり）、非分割はNone
+    classify_filename: str               # 分類時に使用したファイル名
+    text: str
+    classification: Optional[ClassificationResult]
+
+
+@dataclass
+class FileAnalysis:
+    """ファイル1件分の分析結果（書き込み・命名は呼び出し側で入力順に実施）"""
+    index: int
+    file_path: str
+    kind: str                            # "pdf", "csv", "other"
+    is_bundle: bool = False
+    bundle_type: Optional[str] = None
+    page_count: int = 0
+    units: List[AnalyzedUnit] = field(default_factory=list)
+    error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    outputs: List[str] = field(default_factory=list)             # 書き込んだ出力ファイル名（適用時に記録）
+    document_types: List[str] = field(default_factory=list)      # 出力ごとの分類結果（適用時に記録）
+
+
+class _BatchWorker:
+    """ワーカープロセス内で再利用する処理エンジン一式"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        if config.get('file_identity_db'):
+            configure_shared_file_identity_cache(Path(config['file_identity_db']))
+        self.pdf_processor = PDFProcessor(logger=self.logger)
+        self.classifier = DocumentClassifierV5(debug_mode=False)
+        self._ocr_engine = None
+
+    def _get_ocr_engine(self):
+        """OCRエンジンを取得（テキストレイヤーのないページが現れたときに初めて生成）"""
+        if self._ocr_engine is None:
+            from .ocr_engine import OCREngine
+            self._ocr_engine = OCREngine()
+        return self._ocr_engine
+
+    def analyze(self, index: int, file_path: str) -> FileAnalysis:
+        """ファイル1件を分析（例外はFileAnalysis.errorに格納）"""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext != '.pdf':
+            return FileAnalysis(index=index, file_path=file_path, kind='csv' if ext == '.csv' else 'other')
+
+        analysis = FileAnalysis(index=index, file_path=file_path, kind='pdf')
+        store = self.pdf_processor.page_text_store
+        try:
+            started = time.perf_counter()
+            detection = self.pdf_processor._detect_bundle_type(file_path)
+            analysis.timings['bundle_detect'] = time.perf_counter() - started
+            analysis.is_bundle = detection.is_bundle
+            analysis.bundle_type = detection.bundle_type
+
+            municipality_sets = self.config.get('municipality_sets') or {}
+            if detection.is_bundle:
+                self._analyze_bundle_pages(analysis, store, municipality_sets)
+            else:
+                started = time.perf_counter()
+                page_texts = store.page_texts(file_path)
+                analysis.page_count = len(page_texts)
+                analysis.timings['extract'] = time.perf_counter() - started
+
+                started = time.perf_counter()
+                text = "".join(page_texts)
+                classification = self.classifier.classify_with_municipality_info_v5(
+                    text, os.path.basename(file_path), municipality_sets=municipality_sets
+                )
+                analysis.units.append(AnalyzedUnit(None, os.path.basename(file_path), text, classification))
+                analysis.timings['classify'] = time.perf_counter() - started
+
+        except Exception as e:
+            analysis.error = str(e)
+            self.logger.error("[batch] Analyze error: %s - %s", file_path, e)
+        finally:
+            # ファイルごとに解放（専用ストアは close 後も再利用できる）
+            self.pdf_processor.close()
+        return analysis
+
+    def _analyze_bundle_pages(self, analysis: FileAnalysis, store: PageTextStore,
+                              municipality_sets: Dict[int, Dict[str, str]]):
+        """Bundleの各ページを ページ抽出 → 分類 の段階パイプラインで処理（分類は抽出済みページから順に開始）"""
+        file_path = analysis.file_path
+        analysis.page_count = store.page_count(file_path)
+
+        def extract(page_number: int) -> AnalyzedUnit:
+            return AnalyzedUnit(page_number, f"__split_{page_number:03d}.pdf",
+                                store.page_text(file_path, page_number - 1), None)
+
+        def classify(unit: AnalyzedUnit) -> AnalyzedUnit:
+            unit.classification = self.classifier.classify_with_municipality_info_v5(
+                unit.text, unit.classify_filename, municipality_sets=municipality_sets
+            )
+            return unit
+
+        pipeline = create_page_pipeline([("extract", extract), ("classify", classify)], logger=self.logger)
+        for item in pipeline.run(range(1, analysis.page_count + 1)):
+            if item.error is not None:
+                raise item.error
+            analysis.units.append(item.value)
+        analysis.timings.update(pipeline.stage_seconds)
+
+        if self.config.get('ocr_textless_pages', True):
+            self._ocr_textless_pages(analysis, classify)
+
+    def _ocr_textless_pages(self, analysis: FileAnalysis, classify: Callable[[AnalyzedUnit], AnalyzedUnit]):
+        """テキストレイヤーのないページの上部領域をまとめてOCRし、自治体名が読めたページを分類し直す"""
+        textless = [unit for unit in analysis.units if not unit.text.strip()]
+        if not textless:
+            return
+
+        started = time.perf_counter()
+        engine = self._get_ocr_engine()
+        engine.reset_stats()
+        infos = engine.extract_municipalities_batch(
+            analysis.file_path, [unit.page_number - 1 for unit in textless]
+        )
+        for unit, info in zip(textless, infos):
+            if info.prefecture or info.municipality:
+                unit.text = info.raw_text
+                classify(unit)
+        analysis.timings['ocr'] = time.perf_counter() - started
+        self.logger.debug("[batch] OCR for textless pages: %s - %s pages (text_layer=%s, ocr=%s)",
+                          analysis.file_path, len(textless), engine.stats['text_layer'], engine.stats['ocr'])
+
+
+_WORKER: Optional[_BatchWorker] = None
+
+
+def _init_worker(config: Dict[str, Any]):
+    """ワーカープロセス初期化（プロセスごとに1回）"""
+    global _WORKER
+    _WORKER = _BatchWorker(config)
+
+
+def _analyze_in_worker(index: int, file_path: str) -> FileAnalysis:
+    """ワーカープロセスでの分析エントリポイント"""
+    return _WORKER.analyze(index, file_path)
+
+
+class ParallelBatchEngine:
+    """
+    フォルダ一括処理用ワーカープールエンジン
+
+    抽出・Bundle判定・分類をN個のワーカープロセスで実行し、結果を入力順に返す。
+    書き込み・命名（受信通知連番・重複回避）は呼び出し側が入力順に行うため、
+    出力ファイル名はワーカー数に関係なく決定論的になる。
+    未完了タスクは max_workers × 2 件までに制限し、大量ファイルでもメモリを抑える。
+    """
+
+    def __init__(self, municipality_sets: Optional[Dict[int, Dict[str, str]]] = None,
+                 max_workers: Optional[int] = None,
+                 logger: Optional[logging.Logger] = None,
+                 file_identity_db: Optional[Path] = None,
+                 ocr_textless_pages: bool = True):
+        """初期化
+
+        Args:
+            municipality_sets: 自治体セット設定
+            max_workers: ワーカープロセス数（Noneで論理CPU数、1以下で同一プロセス内の逐次処理）
+            logger: ロガー
+            file_identity_db: ファイルMD5同一性キャッシュの保存先（Noneでプロセス内のみ）
+            ocr_textless_pages: テキストレイヤーのないBundleページを一括OCRするか
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.config = {
+            'municipality_sets': municipality_sets or {},
+            'file_identity_db': str(file_identity_db) if file_identity_db else None,
+            'ocr_textless_pages': ocr_textless_pages,
+        }
+
+    def iter_analyses(self, file_paths: Iterable[str]) -> Iterator[FileAnalysis]:
+        """各ファイルの分析結果を入力順に返す"""
+        file_paths = list(file_paths)
+        if self.max_workers <= 1 or len(file_paths) <= 1:
+            yield from self._iter_serial(file_paths)
+            return
+
+        # multiprocessing 一式の読み込みは並列処理を始めるときまで遅らせる
+        from concurrent.futures import ProcessPoolExecutor
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker, initargs=(self.config,)
+            )
+        except Exception as e:
+            self.logger.warning("[batch] Process pool unavailable, falling back to serial: %s", e)
+            yield from self._iter_serial(file_paths)
+            return
+
+        self.logger.info("[batch] Parallel analysis: %s files, workers=%s", len(file_paths), self.max_workers)
+        max_pending = self.max_workers * 2
+        pending = deque()
+        next_index = 0
+        try:
+            while next_index < len(file_paths) or pending:
+                while next_index < len(file_paths) and len(pending) < max_pending:
+                    pending.append((next_index, executor.submit(
+                        _analyze_in_worker, next_index, file_paths[next_index]
+                    )))
+                    next_index += 1
+
+                index, future = pending.popleft()
+                try:
+                    yield future.result()
+                except Exception as e:
+                    self.logger.error("[batch] Worker error: %s - %s", file_paths[index], e)
+                    yield FileAnalysis(index=index, file_path=file_paths[index], kind='pdf', error=str(e))
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _iter_serial(self, file_paths: List[str]) -> Iterator[FileAnalysis]:
+        """同一プロセス内で逐次分析"""
+        worker = _BatchWorker(self.config)
+        for index, file_path in enumerate(file_paths):
+            yield worker.analyze(index, file_path)
+
+
+def create_parallel_batch_engine(municipality_sets: Optional[Dict[int, Dict[str, str]]] = None,
+                                 max_workers: Optional[int] = None,
+                                 **kwargs) -> ParallelBatchEngine:
+    """並列一括処理エンジンのファクトリー関数"""
+    return ParallelBatchEngine(municipality_sets=municipality_sets, max_workers=max_workers, **kwargs)
@@ -12,8 +12,11 @@ import logging
 from typing import List, Optional, Dict, Tuple, Union, Callable
 from dataclasses import dataclass
 from pathlib import Path
-from pypdf import PdfReader, PdfWriter
 from .models import DocItemID, PageFingerprint, compute_file_md5, compute_text_sha1, compute_page_md5
+from .page_text_store import PageTextStore
+from .regex_registry import (
+    ASSET_FILENAME, ASSET_TEXT, OCR_NOISE_CHARS, OCR_NOISE_CHARS_WITH_NEWLINE, WHITESPACE_RUN, compile_pattern,
+)
 
 @dataclass
 class SplitResult:
@@ -51,9 +54,20 @@ NATIONAL_PAYMENT = {"0004", "3004"}
 class PDFProcessor:
     """PDF分割・処理のメインクラス v5.2"""
     
-    def __init__(self, logger: Optional[logging.Logger] = None):
-        """初期化"""
+    def __init__(self, logger: Optional[logging.Logger] = None,
+                 page_text_store: Optional[PageTextStore] = None):
+        """初期化
+
+        Args:
+            logger: ロガー
+            page_text_store: ジョブ共有のページテキストストア（未指定時は専用ストアを作成し、close() で解放）
+        """
         self.logger = logger or logging.getLogger(__name__)
+        self._owns_store = page_text_store is None
+        self.page_text_store = page_text_store or PageTextStore(logger=self.logger)
+        
+        # ページ単位のコード推定用分類器（ルールセットはプロセス共有、初回使用時に生成）
+        self._page_classifier = None
         
         # Load configuration
         self.config = self._load_split_config()
@@ -76,6 +90,25 @@ class PDFProcessor:
             "市町村_納付情報": ["市町村", "納付情報", "納付書"]
         }
 
+    def close(self):
+        """専用ストアで開いているドキュメントを解放（共有ストアは所有者が閉じる）"""
+        if self._owns_store:
+            self.page_text_store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def _get_page_classifier(self):
+        """ページ単位のコード推定用分類器を取得（PDFProcessor内で1インスタンスを再利用）"""
+        if self._page_classifier is None:
+            from .classification_v5 import DocumentClassifierV5
+            self._page_classifier = DocumentClassifierV5(debug_mode=False)
+        return self._page_classifier
+
     def _load_split_config(self) -> Dict:
         """分割設定ファイルを読み込み"""
         try:
@@ -103,10 +136,10 @@ class PDFProcessor:
         ))
         
         # 連続空白の縮約
-        normalized = re.sub(r'\s+', ' ', normalized)
+        normalized = WHITESPACE_RUN.sub(' ', normalized)
         
         # 特殊文字除去
-        normalized = re.sub(r'[・\r\t]', '', normalized)
+        normalized = OCR_NOISE_CHARS.sub('', normalized)
         
         return normalized.strip()
     
@@ -122,10 +155,10 @@ class PDFProcessor:
         ))
         
         # 連続空白の縮約・字間空白の除去
-        normalized = re.sub(r'\s+', '', normalized)
+        normalized = WHITESPACE_RUN.sub('', normalized)
         
         # 改行・中点・特殊文字の除去
-        normalized = re.sub(r'[・\n\r\t]', '', normalized)
+        normalized = OCR_NOISE_CHARS_WITH_NEWLINE.sub('', normalized)
         
         return normalized
     
@@ -145,8 +178,8 @@ class PDFProcessor:
             # title_regex patterns check
             title_patterns = never_bundle_config.get("title_regex", [])
             for pattern in title_patterns:
-                if re.search(pattern, normalized_text, re.IGNORECASE):
-                    self.logger.info(f"[6002/6003 Lock B] never_bundle title_regex matched: {pattern}")
+                if compile_pattern(pattern, re.IGNORECASE).search(normalized_text):
+                    self.logger.info("[6002/6003 Lock B] never_bundle title_regex matched: %s", pattern)
                     return True
             
             # ocr_head_regex patterns check (first few pages)
@@ -155,20 +188,20 @@ class PDFProcessor:
             normalized_head = self._normalize_ocr_text(head_text)
             
             for pattern in ocr_head_patterns:
-                if re.search(pattern, normalized_head, re.IGNORECASE):
-                    self.logger.info(f"[6002/6003 Lock B] never_bundle ocr_head_regex matched: {pattern}")
+                if compile_pattern(pattern, re.IGNORECASE).search(normalized_head):
+                    self.logger.info("[6002/6003 Lock B] never_bundle ocr_head_regex matched: %s", pattern)
                     return True
             
             # v5.3: 表ヘッダ系キーワード組み合わせチェック
             table_header_config = never_bundle_config.get("table_header_patterns", {})
             if table_header_config and self._check_table_header_combination(combined_text, table_header_config):
-                self.logger.info(f"[6002/6003 Lock B] never_bundle table header combination matched")
+                self.logger.info("[6002/6003 Lock B] never_bundle table header combination matched")
                 return True
             
             return False
             
         except Exception as e:
-            self.logger.error(f"[6002/6003 Lock B] never_bundle check error: {e}")
+            self.logger.error("[6002/6003 Lock B] never_bundle check error: %s", e)
             return False
     
     def _check_table_header_combination(self, text: str, config: Dict) -> bool:
@@ -211,7 +244,7 @@ class PDFProcessor:
         
         for keyword in title_keywords:
             if keyword in normalized_text:
-                self.logger.info(f"[exclude] Global exclusion by title: {keyword}")
+                self.logger.info("[exclude] Global exclusion by title: %s", keyword)
                 return True
         
         # コードパターンチェック（資産・帳票系）
@@ -221,15 +254,15 @@ class PDFProcessor:
         ])
         for pattern in code_patterns:
             if pattern in normalized_text:
-                self.logger.info(f"[exclude] Global exclusion by code: {pattern}")
+                self.logger.info("[exclude] Global exclusion by code: %s", pattern)
                 return True
         
         return False
 
     def _create_doc_item_id(self, source_pdf_path: str, page_index: int, page_text: str) -> DocItemID:
         """分割ページ用のDocItemIDを生成"""
-        # 元PDF全体のMD5
-        source_doc_md5 = compute_file_md5(source_pdf_path)
+        # 元PDF全体のMD5（ストアで計算済みの値を再利用）
+        source_doc_md5 = self.page_text_store.file_md5(source_pdf_path)
         
         # 正規化テキストのSHA1
         normalized_text = self._normalize_text_for_exclude_check(page_text)
@@ -288,13 +321,9 @@ class PDFProcessor:
     def analyze_pdf_content(self, pdf_path: str) -> List[PageContent]:
         """PDFの全ページを解析"""
         try:
-            doc = fitz.open(pdf_path)
             pages_content = []
             
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                text = page.get_text()
-                
+            for page_num, text in enumerate(self.page_text_store.page_texts(pdf_path)):
                 # 空白ページ判定
                 is_blank = len(text.strip()) < 50
                 
@@ -308,11 +337,10 @@ class PDFProcessor:
                     keywords=keywords
                 ))
             
-            doc.close()
             return pages_content
             
         except Exception as e:
-            print(f"PDF解析エラー: {e}")
+            self.logger.warning("PDF解析エラー: %s", e)
             return []
 
     def _extract_keywords(self, text: str) -> List[str]:
@@ -383,7 +411,7 @@ class PDFProcessor:
             doc = fitz.open(pdf_path)
             total_pages = doc.page_count
             
-            print(f"DEBUG: 国税受信通知分割開始 - 総ページ数: {total_pages}")
+            self.logger.debug("国税受信通知分割開始 - 総ページ数: %s", total_pages)
             
             # 空白ページを除外して有効ページを特定
             valid_pages = []
@@ -393,7 +421,7 @@ class PDFProcessor:
                 if len(text) > 50:  # 50文字以上を有効ページとみなす
                     valid_pages.append(page_num)
             
-            print(f"DEBUG: 有効ページ: {valid_pages}")
+            self.logger.debug("有効ページ: %s", valid_pages)
             
             # 固定の4分割を実行（最初の4ページ）
             if len(valid_pages) >= 4:
@@ -417,7 +445,7 @@ class PDFProcessor:
                     
                     # 保存前に空白ページチェック
                     if self._is_blank_page_content(new_doc[0]):
-                        print(f"DEBUG: 空白ページのためスキップ - {output_filename} (ページ{page_num})")
+                        self.logger.debug("空白ページのためスキップ - %s (ページ%s)", output_filename, page_num)
                         new_doc.close()
                         continue
                     
@@ -427,14 +455,14 @@ class PDFProcessor:
                     
                     # 保存後に追加で空白チェック（確実な削除のため）
                     if self._is_blank_saved_file(output_path):
-                        print(f"DEBUG: 保存後空白ファイル削除 - {output_filename}")
+                        self.logger.debug("保存後空白ファイル削除 - %s", output_filename)
                         try:
                             os.remove(output_path)
                             continue
                         except Exception as e:
-                            print(f"DEBUG: ファイル削除エラー - {e}")
+                            self.logger.warning("ファイル削除エラー - %s", e)
                     
-                    print(f"DEBUG: 分割完了 - {output_filename} (ページ{page_num})")
+                    self.logger.debug("分割完了 - %s (ページ%s)", output_filename, page_num)
                     
                     split_results.append(SplitResult(
                         filename=output_filename,
@@ -449,12 +477,12 @@ class PDFProcessor:
             
             # 空白ページを削除した結果をフィルタリング
             valid_results = [result for result in split_results if result.success]
-            print(f"DEBUG: 最終結果 - 有効ファイル数: {len(valid_results)}")
+            self.logger.debug("最終結果 - 有効ファイル数: %s", len(valid_results))
             
             return valid_results
             
         except Exception as e:
-            print(f"DEBUG: 国税分割エラー - {str(e)}")
+            self.logger.warning("国税分割エラー - %s", str(e))
             return [SplitResult("", [], "error", False, f"分割処理エラー: {e}")]
 
     def _identify_national_tax_splits(self, pages_content: List[PageContent]) -> List[Dict]:
@@ -538,7 +566,7 @@ class PDFProcessor:
             doc = fitz.open(pdf_path)
             total_pages = doc.page_count
             
-            print(f"DEBUG: 地方税受信通知分割開始 - 総ページ数: {total_pages}")
+            self.logger.debug("地方税受信通知分割開始 - 総ページ数: %s", total_pages)
             
             # 全ページを1ページずつ分割
             prefecture_notification_count = 0
@@ -550,7 +578,7 @@ class PDFProcessor:
                 
                 # 空白ページをスキップ
                 if len(text) < 50:
-                    print(f"DEBUG: ページ{page_num}をスキップ（空白ページ）")
+                    self.logger.debug("ページ%sをスキップ（空白ページ）", page_num)
                     continue
                 
                 # ページ内容による分類
@@ -593,7 +621,7 @@ class PDFProcessor:
                 
                 # 保存前に空白ページチェック
                 if self._is_blank_page_content(new_doc[0]):
-                    print(f"DEBUG: 空白ページのためスキップ - {output_filename} (ページ{page_num})")
+                    self.logger.debug("空白ページのためスキップ - %s (ページ%s)", output_filename, page_num)
                     new_doc.close()
                     continue
                 
@@ -603,14 +631,14 @@ class PDFProcessor:
                 
                 # 保存後に追加で空白チェック（確実な削除のため）
                 if self._is_blank_saved_file(output_path):
-                    print(f"DEBUG: 保存後空白ファイル削除 - {output_filename}")
+                    self.logger.debug("保存後空白ファイル削除 - %s", output_filename)
                     try:
                         os.remove(output_path)
                         continue
                     except Exception as e:
-                        print(f"DEBUG: ファイル削除エラー - {e}")
+                        self.logger.warning("ファイル削除エラー - %s", e)
                 
-                print(f"DEBUG: 分割完了 - {output_filename} (ページ{page_num}, 種別: {page_type})")
+                self.logger.debug("分割完了 - %s (ページ%s, 種別: %s)", output_filename, page_num, page_type)
                 
                 split_results.append(SplitResult(
                     filename=output_filename,
@@ -623,12 +651,12 @@ class PDFProcessor:
             
             # 空白ページを削除した結果をフィルタリング
             valid_results = [result for result in split_results if result.success]
-            print(f"DEBUG: 最終結果 - 有効ファイル数: {len(valid_results)}")
+            self.logger.debug("最終結果 - 有効ファイル数: %s", len(valid_results))
             
             return valid_results
             
         except Exception as e:
-            print(f"DEBUG: 地方税分割エラー - {str(e)}")
+            self.logger.warning("地方税分割エラー - %s", str(e))
             return [SplitResult("", [], "error", False, f"地方税分割処理エラー: {e}")]
 
     def _classify_local_tax_page(self, text: str) -> str:
@@ -707,12 +735,12 @@ class PDFProcessor:
             # テキスト抽出
             text = page.get_text().strip()
             
-            print(f"DEBUG: ページチェック - テキスト長: {len(text)} 文字")
-            print(f"DEBUG: テキスト内容サンプル: {text[:100]}..." if len(text) > 100 else f"DEBUG: テキスト全体: {text}")
+            self.logger.debug("ページチェック - テキスト長: %s 文字", len(text))
+            self.logger.debug("テキスト内容サンプル: %s%s", text[:100], "..." if len(text) > 100 else "")
             
             # 文字数チェック（非常に厳しい基準）
             if len(text) < 50:
-                print("DEBUG: 文字数不足で空白判定")
+                self.logger.debug("文字数不足で空白判定")
                 return True
             
             # 税務書類特化の重要キーワードチェック
@@ -768,39 +796,39 @@ class PDFProcessor:
                 if keyword in text:
                     matched_keywords.append(keyword)
             
-            print(f"DEBUG: マッチしたキーワード: {matched_keywords}")
+            self.logger.debug("マッチしたキーワード: %s", matched_keywords)
             
             # 重要キーワードが一つもない場合は空白と判定
             if not matched_keywords:
-                print("DEBUG: 重要キーワードがないため空白判定")
+                self.logger.debug("重要キーワードがないため空白判定")
                 return True
             
-            print(f"DEBUG: 有効なコンテンツと判定 - マッチ数: {len(matched_keywords)}")
+            self.logger.debug("有効なコンテンツと判定 - マッチ数: %s", len(matched_keywords))
             return False
             
         except Exception as e:
-            print(f"DEBUG: ページ空白チェックエラー - {e}")
+            self.logger.warning("ページ空白チェックエラー - %s", e)
             return False
     
     def _is_blank_saved_file(self, file_path: str) -> bool:
         """保存済みファイルが空白か判定する（税務書類特化）"""
         try:
             if not os.path.exists(file_path):
-                print(f"DEBUG: ファイルが存在しない: {file_path}")
+                self.logger.debug("ファイルが存在しない: %s", file_path)
                 return True
                 
             # ファイルサイズチェック（税務書類の最低サイズを考慮）
             file_size = os.path.getsize(file_path)
-            print(f"DEBUG: ファイルサイズチェック: {file_size} bytes - {file_path}")
+            self.logger.debug("ファイルサイズチェック: %s bytes - %s", file_size, file_path)
             
             # 10KB未満は空白の可能性が高い（より緩い基準）
             if file_size < 10000:  # 10KB未満
-                print(f"DEBUG: ファイルサイズが小さいため詳細チェック実行: {file_size} bytes")
+                self.logger.debug("ファイルサイズが小さいため詳細チェック実行: %s bytes", file_size)
                 
                 # PDFを開いて中身を再チェック
                 doc = fitz.open(file_path)
                 if doc.page_count == 0:
-                    print("DEBUG: ページ数が0のため空白判定")
+                    self.logger.debug("ページ数が0のため空白判定")
                     doc.close()
                     return True
                     
@@ -809,17 +837,17 @@ class PDFProcessor:
                 doc.close()
                 
                 if is_blank:
-                    print(f"DEBUG: 中身チェックで空白判定: {file_path}")
+                    self.logger.debug("中身チェックで空白判定: %s", file_path)
                 else:
-                    print(f"DEBUG: 中身チェックで有効判定: {file_path}")
+                    self.logger.debug("中身チェックで有効判定: %s", file_path)
                 
                 return is_blank
             else:
-                print(f"DEBUG: ファイルサイズが十分なため有効判定: {file_size} bytes")
+                self.logger.debug("ファイルサイズが十分なため有効判定: %s bytes", file_size)
                 return False
             
         except Exception as e:
-            print(f"DEBUG: 保存ファイル空白チェックエラー - {e}")
+            self.logger.warning("保存ファイル空白チェックエラー - %s", e)
             # エラーの場合は安全のため削除しない
             return False
 
@@ -840,33 +868,33 @@ class PDFProcessor:
         Returns:
             dict: {'success': bool, 'split_files': list} 分割成功時はsplit_filesに分割後のファイルパスのリスト
         """
-        self.logger.info(f"[split] Bundle detection started: {os.path.basename(input_pdf_path)}")
+        self.logger.info("[split] Bundle detection started: %s", os.path.basename(input_pdf_path))
         
         try:
             # Step 1: Bundle detection
             detection_result = self._detect_bundle_type(input_pdf_path)
             
             if not detection_result.is_bundle and not force:
-                self.logger.info(f"[split] Skip (non-bundle): {os.path.basename(input_pdf_path)}")
-                self.logger.debug(f"[split] Detection details: {detection_result.debug_info}")
+                self.logger.info("[split] Skip (non-bundle): %s", os.path.basename(input_pdf_path))
+                self.logger.debug("[split] Detection details: %s", detection_result.debug_info)
                 
                 # Check if this was blocked by global exclusion
                 if any("Global exclusion triggered" in info for info in detection_result.debug_info):
-                    self.logger.info(f"[split] EXCLUDED by global rules - single document treatment")
+                    self.logger.info("[split] EXCLUDED by global rules - single document treatment")
                     
                 return {'success': False, 'split_files': []}
             
             bundle_type = detection_result.bundle_type or "unknown"
-            self.logger.info(f"[split] Bundle detected: type={bundle_type}, confidence={detection_result.confidence:.2f}")
+            self.logger.info("[split] Bundle detected: type=%s, confidence=%.2f", bundle_type, detection_result.confidence)
             
             if force and not detection_result.is_bundle:
-                self.logger.info(f"[split] Force split enabled - proceeding despite non-bundle detection")
+                self.logger.info("[split] Force split enabled - proceeding despite non-bundle detection")
                 
             # Step 2: Full page splitting
             return self._execute_bundle_split(input_pdf_path, out_dir, bundle_type, processing_callback)
             
         except Exception as e:
-            self.logger.error(f"[split] Bundle split error: {input_pdf_path} - {e}")
+            self.logger.error("[split] Bundle split error: %s - %s", input_pdf_path, e)
             return {'success': False, 'split_files': []}
     
     def filename_or_heads_match_assets(self, pdf_path: str, head_pages: int = 3) -> bool:
@@ -885,77 +913,30 @@ class PDFProcessor:
             # ファイル名チェック
             filename = os.path.basename(pdf_path)
             # v5.3: ファイル名パターン拡充（少額語彙強化）
-            filename_asset_patterns = [
-                r'6002.*明細',
-                r'6003.*明細',
-                r'一括償却資産.*明細',
-                r'少額減価償却資産.*明細',
-                r'少額.*償却|償却.*少額',
-                r'少額資産|少額.*明細',
-                r'償却資産.*明細',
-                r'減価償却.*明細',
-                # シンプルパターン
-                r'少額\.pdf$',
-                r'資産明細.*\.pdf$'
-            ]
+            found = ASSET_FILENAME.first(filename)
+            if found:
+                self.logger.info("[6002/6003 Lock A] Asset document detected by filename: %s in %s", found[0], filename)
+                return True
             
-            for pattern in filename_asset_patterns:
-                if re.search(pattern, filename, re.IGNORECASE):
-                    self.logger.info(f"[6002/6003 Lock A] Asset document detected by filename: {pattern} in {filename}")
-                    return True
+            # 冒頭ページのOCRチェック（ストア経由で抽出済みテキストを共有）
+            head_texts = self.page_text_store.page_texts(pdf_path, max_pages=head_pages)
             
-            # 冒頭ページのOCRチェック
-            doc = fitz.open(pdf_path)
-            scan_pages = min(doc.page_count, head_pages)
-            
-            for i in range(scan_pages):
-                page = doc[i]
-                text = page.get_text()
+            for i, text in enumerate(head_texts):
                 normalized_text = self._normalize_ocr_text(text)
                 
                 # v5.3: 資産文書キーワードパターン拡充（少額語彙強化）
-                asset_patterns = [
-                    # 基本パターン
-                    r'一括償却資産明細表?',
-                    r'少額減価償却資産明細表?',
-                    r'償却資産明細表?',
-                    r'減価償却資産明細表?',
-                    # 略形パターン
-                    r'少額.*償却|償却.*少額',
-                    r'少額資産|少額.*明細',
-                    # 表フィールド
-                    r'資産コード',
-                    r'取得価額',
-                    r'損金算入限度額',
-                    r'償却方法',
-                    r'耐用年数',
-                    r'決算調整方式',
-                    # 金額パターン
-                    r'(三十|30)万.*未満',
-                    r'(十|10)万.*未満',
-                    # コード
-                    r'6002',
-                    r'6003'
-                ]
-                
-                matches = 0
-                matched_patterns = []
-                for pattern in asset_patterns:
-                    if re.search(pattern, normalized_text, re.IGNORECASE):
-                        matches += 1
-                        matched_patterns.append(pattern)
+                matched_patterns = [pattern.pattern for pattern in ASSET_TEXT.matching(normalized_text)]
+                matches = len(matched_patterns)
                 
                 # 3つ以上のパターンマッチで資産文書と判定
                 if matches >= 3:
-                    doc.close()
-                    self.logger.info(f"[6002/6003 Lock A] Asset document detected by OCR patterns: {matched_patterns} (page {i+1})")
+                    self.logger.info("[6002/6003 Lock A] Asset document detected by OCR patterns: %s (page %s)", matched_patterns, i+1)
                     return True
             
-            doc.close()
             return False
             
         except Exception as e:
-            self.logger.error(f"[6002/6003 Lock A] Asset detection error: {e}")
+            self.logger.error("[6002/6003 Lock A] Asset detection error: %s", e)
             return False
 
     def _detect_bundle_type(self, pdf_path: str) -> BundleDetectionResult:
@@ -975,7 +956,7 @@ class PDFProcessor:
             # 層A：6002/6003四重ロック - Bundle判定の先頭でブロック
             if self.filename_or_heads_match_assets(pdf_path):
                 debug_info.append("[6002/6003 Lock A] Asset document detected - Bundle detection BLOCKED")
-                self.logger.warning(f"[6002/6003 Lock A] BLOCKED: {os.path.basename(pdf_path)} detected as asset document")
+                self.logger.warning("[6002/6003 Lock A] BLOCKED: %s detected as asset document", os.path.basename(pdf_path))
                 return BundleDetectionResult(
                     is_bundle=False,
                     bundle_type=None,
@@ -984,19 +965,12 @@ class PDFProcessor:
                     debug_info=debug_info
                 )
             
-            # Quick sample scan using PyMuPDF (fast mode)
-            doc = fitz.open(pdf_path)
-            scan_pages = min(doc.page_count, self.config["bundle_detection"]["scan_pages"])
-            
-            sample_texts = []
-            for i in range(scan_pages):
-                page = doc[i]
-                text = page.get_text()
-                sample_texts.append(text)
+            # Quick sample scan (shared page text store)
+            scan_pages = self.config["bundle_detection"]["scan_pages"]
+            sample_texts = self.page_text_store.page_texts(pdf_path, max_pages=scan_pages)
+            for i, text in enumerate(sample_texts):
                 debug_info.append(f"Page {i+1}: {len(text)} chars")
             
-            doc.close()
-            
             # Combine all sample text
             combined_text = " ".join(sample_texts)
             debug_info.append(f"Combined sample text: {len(combined_text)} chars")
@@ -1065,10 +1039,8 @@ class PDFProcessor:
     
     def _is_bundle_local(self, texts: List[str], matched_elements: Dict, debug_info: List[str]) -> bool:
         """地方税束ね判定 - OCR内容ベースの書類判定"""
-        from .classification_v5 import DocumentClassifierV5
-        
         try:
-            classifier = DocumentClassifierV5(debug_mode=False)
+            classifier = self._get_page_classifier()
             local_target_codes = ["1003", "1013", "1023", "1004", "2003", "2013", "2023", "2004"]  # 地方税対象コード
             detected_pages = []
             
@@ -1113,10 +1085,8 @@ class PDFProcessor:
     
     def _is_bundle_national(self, texts: List[str], matched_elements: Dict, debug_info: List[str]) -> bool:
         """国税束ね判定 - OCR内容ベースの書類判定"""
-        from .classification_v5 import DocumentClassifierV5
-        
         try:
-            classifier = DocumentClassifierV5(debug_mode=False)
+            classifier = self._get_page_classifier()
             national_target_codes = ["0003", "3003", "0004", "3004"]  # 国税対象コード
             detected_pages = []
             
@@ -1162,92 +1132,96 @@ class PDFProcessor:
     def _execute_bundle_split(self, input_pdf_path: str, out_dir: str, bundle_type: str,
                              processing_callback: Optional[Callable] = None) -> dict:
         """
-        束ねPDFの実際の分割処理を実行
+        束ねPDFの実際の分割処理を実行（各ページを最終パスへ1回だけ書き込む）
+
+        ページテキストは共有ストアから取得し、コールバックが最終出力パスを決めてから
+        write_pdf_page で書き込む（一時ファイルの書き込み・コピーは行わない）。
         
         Args:
             input_pdf_path: 入力PDFパス
             out_dir: 出力ディレクトリ
             bundle_type: 束ね種別 ("local", "national", "unknown")
-            processing_callback: 各ページ処理後のコールバック関数
+            processing_callback: ページごとの命名コールバック
+                callback(page_number, bundle_type, doc_item_id, page_text) -> 最終出力パス（Noneで書き込まない）
+                未指定時は output.split_file_pattern に従って out_dir へ書き込む
             
         Returns:
             dict: {'success': bool, 'split_files': list} 分割成功時はsplit_filesに分割後のファイルパスのリスト
         """
         try:
-            # Use pypdf for splitting
-            reader = PdfReader(input_pdf_path)
-            total_pages = len(reader.pages)
+            total_pages = self.page_text_store.page_count(input_pdf_path)
             
-            self.logger.info(f"[split] Executing split: {total_pages} pages, type={bundle_type}")
+            self.logger.info("[split] Executing split: %s pages, type=%s", total_pages, bundle_type)
             
-            temp_files = []
-            processed_files = []  # 処理済みファイルのリスト
+            split_pattern = self.config.get("output", {}).get("split_file_pattern", "{stem}_{page:03d}.pdf")
+            stem = Path(input_pdf_path).stem
+            processed_files = []
             
-            for i, page in enumerate(reader.pages, start=1):
-                # Create single-page PDF
-                writer = PdfWriter()
-                writer.add_page(page)
-                
-                # Generate unique temporary filename with timestamp
-                import time
-                timestamp = int(time.time() * 1000000)  # microsecond precision
-                temp_pattern = self.config.get("output", {}).get("temp_file_pattern", "__split_{page:03d}_{timestamp}.pdf")
-                temp_filename = temp_pattern.format(page=i, timestamp=timestamp + i)
-                temp_path = os.path.join(out_dir, temp_filename)
-                
-                # Write temporary file
-                with open(temp_path, "wb") as output_file:
-                    writer.write(output_file)
-                
-                temp_files.append(temp_path)
-                
-                # Log page split with hint from classification if available
-                from .classification_v5 import DocumentClassifierV5
+            for i in range(1, total_pages + 1):
+                # Source page text from the shared store (the page is classified before it is written)
                 try:
-                    classifier = DocumentClassifierV5(debug_mode=False)
-                    # Get text from page for classification hint
-                    doc = fitz.open(temp_path)
-                    page_text = doc[0].get_text()
-                    doc.close()
-                    
-                    code_hint = classifier.detect_page_doc_code(page_text, prefer_bundle=bundle_type)
-                    self.logger.debug(f"[split] Page {i:03d}: hint={code_hint}")
+                    page_text = self.page_text_store.page_text(input_pdf_path, i - 1)
                 except Exception as e:
-                    self.logger.debug(f"[split] Page {i:03d}: classification hint failed - {e}")
+                    self.logger.debug("[split] Page %03d: text extraction failed - %s", i, e)
+                    page_text = ""
+                self._log_page_hint(i, page_text, bundle_type)
                 
-                # Call processing callback if provided (integrates with existing pipeline)
                 if processing_callback:
                     try:
                         # v5.3: Generate DocItemID for this page
-                        doc_item_id = self._create_doc_item_id(input_pdf_path, i-1, page_text)  # i-1 for 0-based indexing
-                        
-                        # Enhanced callback with DocItemID
-                        result_file = processing_callback(temp_path, i, bundle_type, doc_item_id)
-                        if result_file and os.path.exists(result_file):
-                            processed_files.append(result_file)
+                        doc_item_id = self._create_doc_item_id(input_pdf_path, i - 1, page_text)
+                        output_path = processing_callback(i, bundle_type, doc_item_id, page_text)
                     except Exception as e:
-                        self.logger.error(f"[split] Processing callback error for page {i}: {e}")
+                        self.logger.error("[split] Processing callback error for page %s: %s", i, e)
+                        continue
+                    if not output_path:
+                        continue
                 else:
-                    # No callback provided, keep temp file as processed file
-                    processed_files.append(temp_path)
-            
-            # Cleanup temporary files if configured (only cleanup if processed)
-            if self.config.get("output", {}).get("auto_cleanup_temp", True):
-                for temp_file in temp_files:
-                    try:
-                        # Only cleanup if this temp file is not in processed_files list
-                        if temp_file not in processed_files and os.path.exists(temp_file):
-                            os.remove(temp_file)
-                    except Exception as e:
-                        self.logger.warning(f"[split] Cleanup warning: {temp_file} - {e}")
+                    output_path = os.path.join(out_dir, split_pattern.format(stem=stem, page=i))
+                
+                processed_files.append(self.write_pdf_page(input_pdf_path, i, output_path))
             
-            self.logger.info(f"[split] Split completed: {input_pdf_path} -> {total_pages} pages (bundle={bundle_type})")
+            self.logger.info("[split] Split completed: %s -> %s pages (bundle=%s)", input_pdf_path, total_pages, bundle_type)
             return {'success': True, 'split_files': processed_files}
             
         except Exception as e:
-            self.logger.error(f"[split] Split execution error: {e}")
+            self.logger.error("[split] Split execution error: %s", e)
             return {'success': False, 'split_files': []}
 
+    def _log_page_hint(self, page_number: int, page_text: str, bundle_type: str):
+        """ページ単位のコード推定結果をデバッグログに出力（DEBUG無効時は推定しない、分割結果には影響しない）"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        try:
+            code_hint = self._get_page_classifier().detect_page_doc_code(page_text, prefer_bundle=bundle_type)
+            self.logger.debug("[split] Page %03d: hint=%s", page_number, code_hint)
+        except Exception as e:
+            self.logger.debug("[split] Page %03d: classification hint failed - %s", page_number, e)
+
+    def write_pdf_page(self, input_pdf_path: str, page_number: int, output_path: str) -> str:
+        """
+        元PDFの1ページを最終出力パスへ直接書き込む（一時ファイルなし）
+
+        Args:
+            input_pdf_path: 入力PDFパス
+            page_number: ページ番号（1始まり）
+            output_path: 出力ファイルパス
+
+        Returns:
+            str: 書き込んだファイルパス
+        """
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        # 一括処理の書き込み段階と他スレッドのテキスト抽出が同じドキュメントを操作するためストアのロックを保持
+        with self.page_text_store.lock:
+            source_doc = self.page_text_store.document(input_pdf_path)
+            page_doc = fitz.open()
+            try:
+                page_doc.insert_pdf(source_doc, from_page=page_number - 1, to_page=page_number - 1)
+                page_doc.save(output_path, garbage=3, deflate=True)
+            finally:
+                page_doc.close()
+        return output_path
+
 if __name__ == "__main__":
     # テスト用
     processor = PDFProcessor()
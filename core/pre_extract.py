@@ -5,7 +5,6 @@ Pre-Extract スナップショット機能 v5.3
 """
 
 import fitz  # PyMuPDF
-import re
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -13,62 +12,63 @@ from typing import List, Optional, Dict, Any
 
 from .models import (
     RenameFields, PreExtractSnapshot, PageFingerprint,
-    compute_file_md5, compute_text_sha1, compute_page_md5
+    compute_file_md5, compute_text_sha1, compute_page_md5, compute_page_content_md5
 )
+from .file_identity import get_shared_file_identity_cache
+from .gazetteer import get_shared_gazetteer
+from .page_text_store import PageTextStore
+from .regex_registry import DOC_HINTS, DOCUMENT_CODE, FULL_DATE, OCR_NOISE_CHARS, TAX_KIND, WHITESPACE_RUN
+from .snapshot_store import SNAPSHOT_BACKENDS, create_snapshot_store
 
 
 class PreExtractEngine:
     """Pre-Extract処理エンジン"""
     
-    def __init__(self, logger: Optional[logging.Logger] = None, snapshot_dir: Optional[Path] = None):
+    FINGERPRINT_MODES = ("content", "raster")
+    
+    def __init__(self, logger: Optional[logging.Logger] = None, snapshot_dir: Optional[Path] = None,
+                 page_text_store: Optional[PageTextStore] = None,
+                 fingerprint_mode: str = "content", raster_fallback: bool = True,
+                 snapshot_backend: str = "sqlite"):
+        """初期化
+        
+        Args:
+            logger: ロガー
+            snapshot_dir: スナップショット保存先
+            page_text_store: ジョブ共有のページテキストストア
+            fingerprint_mode: ページフィンガープリント方式
+                "content": コンテンツストリーム＋リソース参照のハッシュ（レンダリングなし）
+                "raster": 従来方式（全ページをPNGレンダリングしてハッシュ）
+            raster_fallback: "content" でコンテンツストリームがないページを低解像度ラスタで代替するか
+            snapshot_backend: 保存形式
+                "sqlite": snapshot_dir/snapshots.sqlite3 に集約（従来JSONは参照時に取り込み）
+                "json": 従来方式（MD5ごとのJSONファイル）
+        """
+        if fingerprint_mode not in self.FINGERPRINT_MODES:
+            raise ValueError(f"Unknown fingerprint_mode: {fingerprint_mode}")
+        if snapshot_backend not in SNAPSHOT_BACKENDS:
+            raise ValueError(f"Unknown snapshot_backend: {snapshot_backend}")
         self.logger = logger or logging.getLogger(__name__)
         self.snapshot_dir = snapshot_dir or Path("./snapshots")
+        # ジョブ共有のページテキストストア（Noneの場合はbuild_snapshot毎に一時ストアを使用）
+        self.page_text_store = page_text_store
+        self.fingerprint_mode = fingerprint_mode
+        self.raster_fallback = raster_fallback
+        self.snapshot_store = create_snapshot_store(self.snapshot_dir, snapshot_backend, logger=self.logger)
         
         # 既存の分類パターンを活用
         self._init_extraction_patterns()
     
     def _init_extraction_patterns(self):
-        """抽出パターンの初期化"""
+        """抽出パターンの初期化（コンパイル済みパターンは core.regex_registry で共有）"""
         # 書類コード検出パターン（既存分類システムから流用）
-        self.code_patterns = {
-            r'\b(0003|0004|3003|3004|1003|1013|1023|1004|2003|2013|2023|2004|6002|6003)\b': 'strong',
-            r'納付税額一覧表': '0000',
-            r'法人税.*申告書': '0001',
-            r'添付資料.*法人税': '0002',
-            r'消費税.*申告書': '3001',
-            r'添付資料.*消費税': '3002'
-        }
-        
-        # 自治体名検出パターン
-        self.muni_patterns = [
-            r'([都道府県]{2,3}[都道府県])',  # 東京都、神奈川県など
-            r'([市区町村]{1,3}[市区町村])',  # 横浜市、世田谷区など
-            r'(札幌市|仙台市|千葉市|横浜市|川崎市|相模原市|新潟市|静岡市|浜松市|名古屋市|京都市|大阪市|堺市|神戸市|岡山市|広島市|北九州市|福岡市|熊本市)',
-            r'([都道府県][市区町村][都道府県市区町村])',  # 愛知県蒲郡市など
-        ]
-        
-        # 期間検出パターン
-        self.period_patterns = [
-            r'(\d{4})[\s]*[-/年][\s]*(\d{1,2})[\s]*[-/月]',  # 2025年8月、2025-08など
-            r'令和(\d{1,2})年(\d{1,2})月',  # 令和7年8月
-            r'(\d{2})(\d{2})',  # 2508（既存システムで使用中）
-        ]
+        self.code_patterns = DOCUMENT_CODE
         
         # 税務カテゴリ検出パターン
-        self.tax_kind_patterns = {
-            '国税': [r'法人税', r'消費税', r'所得税', r'国税電子申告', r'税務署'],
-            '地方税': [r'都道府県民税', r'市町村民税', r'事業税', r'地方税電子申告', r'県税事務所', r'市役所'],
-            '消費税': [r'消費税及び地方消費税']
-        }
+        self.tax_kind_patterns = TAX_KIND
         
         # 書類種別ヒント
-        self.doc_hint_patterns = {
-            '受信通知': [r'受信通知', r'申告受付完了', r'受信結果'],
-            '納付情報': [r'納付情報', r'納付書', r'納付区分番号'],
-            '申告書': [r'申告書', r'確認表'],
-            '添付資料': [r'添付資料', r'明細表'],
-            '帳票': [r'一括償却資産', r'少額減価償却', r'明細表']
-        }
+        self.doc_hint_patterns = DOC_HINTS
     
     def build_snapshot(self, pdf_path: str, max_scan_pages: Optional[int] = None, user_provided_yymm: Optional[str] = None, ui_context: Optional[Dict[str, Any]] = None) -> PreExtractSnapshot:
         """
@@ -88,48 +88,65 @@ class PreExtractEngine:
             raise ValueError(f"[FATAL] YYMM is required and must be 4 digits from GUI. Example: 2508. Got: {user_provided_yymm}")
         
         # YYMM監査ログ：GUI値専用
-        self.logger.info(f"[AUDIT][YYMM] source=GUI value={user_provided_yymm} validation=PASSED")
-        self.logger.info(f"[v5.3] YYMM source validation passed: {user_provided_yymm} (GUI mandatory)")
-        self.logger.info(f"[pre_extract] Building snapshot: {Path(pdf_path).name}")
+        self.logger.info("[AUDIT][YYMM] source=GUI value=%s validation=PASSED", user_provided_yymm)
+        self.logger.info("[v5.3] YYMM source validation passed: %s (GUI mandatory)", user_provided_yymm)
+        self.logger.info("[pre_extract] Building snapshot: %s", Path(pdf_path).name)
         
-        # PDF全体のMD5計算
-        source_doc_md5 = compute_file_md5(pdf_path)
+        # ジョブ共有ストアがなければ、このスナップショット専用のストアを使用
+        store = self.page_text_store
+        owns_store = store is None
+        if owns_store:
+            store = PageTextStore(logger=self.logger)
+        
+        try:
+            return self._build_snapshot_with_store(store, pdf_path, max_scan_pages, user_provided_yymm, ui_context)
+        finally:
+            if owns_store:
+                store.close()
+    
+    def _build_snapshot_with_store(self, store: PageTextStore, pdf_path: str, max_scan_pages: Optional[int],
+                                   user_provided_yymm: str, ui_context: Optional[Dict[str, Any]]) -> PreExtractSnapshot:
+        """ページテキストストアを使ってスナップショットを構築"""
+        # PDF全体のMD5計算（ストアで1回だけ計算）
+        source_doc_md5 = store.file_md5(pdf_path)
         
         # 既存スナップショットのチェック
-        existing = PreExtractSnapshot.load(self.snapshot_dir, source_doc_md5)
+        existing = self.snapshot_store.load(source_doc_md5)
         if existing:
-            self.logger.info(f"[pre_extract] Using existing snapshot: {source_doc_md5}")
+            self.logger.info("[pre_extract] Using existing snapshot: %s", source_doc_md5)
             return existing
         
         # 新規スナップショット作成
         try:
-            doc = fitz.open(pdf_path)
+            doc = store.document(pdf_path)
             page_count = doc.page_count
             scan_pages = min(page_count, max_scan_pages or page_count)
             
-            self.logger.debug(f"[pre_extract] Scanning {scan_pages}/{page_count} pages")
+            self.logger.debug("[pre_extract] Scanning %s/%s pages", scan_pages, page_count)
             
             pages = []
+            fingerprints = []
             for i in range(scan_pages):
                 page = doc[i]
                 
-                # 高速OCRでテキスト抽出
-                text = page.get_text()
+                # テキストはストアから取得（Bundle判定で抽出済みなら再抽出しない）
+                text = store.page_text(pdf_path, i)
                 normalized_text = self._normalize_text(text)
                 
                 # ページフィンガープリント生成
-                page_bytes = page.get_pixmap().pil_tobytes(format="PNG")
-                page_md5 = compute_page_md5(page_bytes)
-                text_sha1 = compute_text_sha1(normalized_text)
+                fingerprint = PageFingerprint(
+                    page_md5=self.compute_page_fingerprint_md5(page),
+                    text_sha1=compute_text_sha1(normalized_text)
+                )
+                fingerprints.append(fingerprint)
                 
                 # RenameFields推論
                 fields = self._infer_rename_fields(normalized_text, i, user_provided_yymm)
                 
                 pages.append(fields)
                 
-                self.logger.debug(f"[pre_extract] Page {i}: code_hint={fields.code_hint}, muni={fields.muni_name}")
-            
-            doc.close()
+                self.logger.debug("[pre_extract] Page %s: code_hint=%s, muni=%s, page_md5=%s",
+                                  i, fields.code_hint, fields.muni_name, fingerprint.page_md5)
             
             # スナップショット作成
             snapshot = PreExtractSnapshot(
@@ -147,15 +164,27 @@ class PreExtractEngine:
             }
             
             # 永続化
-            snapshot_file = snapshot.save(self.snapshot_dir)
-            self.logger.info(f"[pre_extract] Snapshot saved: {snapshot_file}")
+            snapshot_file = self.snapshot_store.save(snapshot, fingerprints)
+            self.logger.info("[pre_extract] Snapshot saved: %s", snapshot_file)
             
             return snapshot
             
         except Exception as e:
-            self.logger.error(f"[pre_extract] Failed to build snapshot: {e}")
+            self.logger.error("[pre_extract] Failed to build snapshot: %s", e)
             raise
     
+    def compute_page_fingerprint_md5(self, page) -> str:
+        """設定されたフィンガープリント方式でページMD5を計算"""
+        if self.fingerprint_mode == "content":
+            page_md5 = compute_page_content_md5(page, raster_fallback=self.raster_fallback)
+            if page_md5 is not None:
+                return page_md5
+            # ラスタ代替なし: テキストのみで識別できるよう空ページ扱い
+            return compute_page_md5(b"")
+        
+        page_bytes = page.get_pixmap().pil_tobytes(format="PNG")
+        return compute_page_md5(page_bytes)
+    
     def _normalize_text(self, text: str) -> str:
         """テキスト正規化（既存システムと共通化）"""
         if not text:
@@ -168,10 +197,10 @@ class PreExtractEngine:
         ))
         
         # 連続空白の縮約
-        normalized = re.sub(r'\s+', ' ', normalized)
+        normalized = WHITESPACE_RUN.sub(' ', normalized)
         
         # 余分な改行・特殊文字除去
-        normalized = re.sub(r'[・\r\t]', '', normalized)
+        normalized = OCR_NOISE_CHARS.sub('', normalized)
         
         return normalized.strip()
     
@@ -193,7 +222,7 @@ class PreExtractEngine:
         
         # 期間検出：GUI値のみ（他ソース禁止）
         fields.period_yyyymm = user_provided_yymm
-        self.logger.debug(f"[pre_extract] Using GUI-only YYMM: {user_provided_yymm}")
+        self.logger.debug("[pre_extract] Using GUI-only YYMM: %s", user_provided_yymm)
         
         # 連番バケット（地方税系の場合）
         if fields.code_hint and fields.code_hint.startswith(('1', '2')):
@@ -203,65 +232,55 @@ class PreExtractEngine:
         fields.extra = {
             'page_index': page_index,
             'text_length': len(normalized_text),
-            'has_date': bool(re.search(r'\d{4}[/-]\d{1,2}[/-]\d{1,2}', normalized_text))
+            'has_date': bool(FULL_DATE.search(normalized_text))
         }
         
         return fields
     
     def _detect_code(self, text: str) -> Optional[str]:
         """書類コード検出"""
-        for pattern, code_type in self.code_patterns.items():
-            if code_type == 'strong':
-                # 数字コードの直接マッチング
-                match = re.search(pattern, text)
-                if match:
-                    return match.group(1)
-            else:
-                # 書類名からのコード推論
-                if re.search(pattern, text, re.IGNORECASE):
-                    return code_type
-        return None
+        found = self.code_patterns.first(text)
+        if found is None:
+            return None
+        code_type, match = found
+        # 数字コードは直接マッチング、それ以外は書類名からのコード推論
+        return match.group(1) if code_type == 'strong' else code_type
     
     def _detect_doc_hints(self, text: str) -> List[str]:
         """書類種別ヒント検出"""
-        hints = []
-        for hint_type, patterns in self.doc_hint_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    hints.append(hint_type)
-                    break
-        return hints
+        return self.doc_hint_patterns.names(text)
     
     def _detect_municipality(self, text: str) -> Optional[str]:
-        """自治体名検出"""
-        for pattern in self.muni_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1).strip()
-        return None
+        """自治体名検出（地名辞書の1回走査で「都道府県＋市区」を解決。例: 愛知県蒲郡市、東京都）"""
+        return get_shared_gazetteer().resolve(text).display_name
     
     def _detect_tax_kind(self, text: str) -> Optional[str]:
         """税務カテゴリ検出"""
-        for kind, patterns in self.tax_kind_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    return kind
-        return None
+        found = self.tax_kind_patterns.first(text)
+        return found[0] if found else None
     
-    def cleanup_old_snapshots(self, max_age_days: int = 30):
-        """古いスナップショットファイルの削除"""
-        if not self.snapshot_dir.exists():
-            return
-        
-        cutoff_time = datetime.now().timestamp() - (max_age_days * 24 * 3600)
-        
-        for snapshot_file in self.snapshot_dir.glob("*.json"):
-            if snapshot_file.stat().st_mtime < cutoff_time:
-                snapshot_file.unlink()
-                self.logger.debug(f"[pre_extract] Cleaned up old snapshot: {snapshot_file}")
+    def find_existing_snapshots(self, pdf_paths: List[str]) -> Dict[str, PreExtractSnapshot]:
+        """フォルダ内のPDFについて保存済みスナップショットをまとめて検索（パス→スナップショット）"""
+        md5_by_path = {}
+        for pdf_path in pdf_paths:
+            md5_by_path[pdf_path] = (self.page_text_store.file_md5(pdf_path) if self.page_text_store
+                                     else get_shared_file_identity_cache().md5(pdf_path))
+        found = self.snapshot_store.load_many(md5_by_path.values())
+        return {path: found[md5] for path, md5 in md5_by_path.items() if md5 in found}
+    
+    def cleanup_old_snapshots(self, max_age_days: int = 30) -> int:
+        """古いスナップショットの削除（削除件数を返す）"""
+        removed = self.snapshot_store.evict_older_than(max_age_days)
+        if removed:
+            self.logger.debug("[pre_extract] Cleaned up %s old snapshots", removed)
+        return removed
 
 
 def create_pre_extract_engine(logger: Optional[logging.Logger] = None, 
-                             snapshot_dir: Optional[Path] = None) -> PreExtractEngine:
+                             snapshot_dir: Optional[Path] = None,
+                             page_text_store: Optional[PageTextStore] = None,
+                             fingerprint_mode: str = "content",
+                             snapshot_backend: str = "sqlite") -> PreExtractEngine:
     """PreExtractEngineのファクトリ関数"""
-    return PreExtractEngine(logger=logger, snapshot_dir=snapshot_dir)
\ No newline at end of file
+    return PreExtractEngine(logger=logger, snapshot_dir=snapshot_dir, page_text_store=page_text_store,
+                            fingerprint_mode=fingerprint_mode, snapshot_backend=snapshot_backend)
\ No newline at end of file
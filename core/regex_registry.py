@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+正規表現レジストリ v5.5
+ページ単位の判定で使うパターンをモジュール読み込み時に1回だけコンパイルし、全処理で共有する。
+re モジュールの内部キャッシュは上限（re._MAXCACHE）を超えると破棄されるため、
+ホットパスでは文字列パターンを re.search に渡さず、ここで定義したコンパイル済みパターンを使う。
+"""
+
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Pattern, Match, Sequence, Tuple
+
+
+class PatternFamily:
+    """
+    優先順位付きのパターン群（名前, コンパイル済みパターン）
+
+    同じ判定に使うパターンをまとめる。名前は判定結果（書類コード・ヒント種別など）で、重複してよい。
+    """
+
+    def __init__(self, patterns: Sequence[Tuple[str, str]], flags: int = 0):
+        self.items: Tuple[Tuple[str, Pattern], ...] = tuple(
+            (name, re.compile(pattern, flags)) for name, pattern in patterns)
+        self._name_order: Tuple[str, ...] = tuple(dict.fromkeys(name for name, _ in self.items))
+
+    def __iter__(self) -> Iterator[Tuple[str, Pattern]]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def first(self, text: str) -> Optional[Tuple[str, Match]]:
+        """優先順で最初に一致したパターンの (名前, 一致) を返す"""
+        for name, pattern in self.items:
+            match = pattern.search(text)
+            if match:
+                return name, match
+        return None
+
+    def names(self, text: str) -> List[str]:
+        """一致したパターンの名前（名前の定義順・重複なし）"""
+        found = set()
+        for name, pattern in self.items:
+            if name not in found and pattern.search(text):
+                found.add(name)
+        return [name for name in self._name_order if name in found]
+
+    def matching(self, text: str) -> List[Pattern]:
+        """一致したパターンの一覧（件数による判定・ログ用）"""
+        return [pattern for _, pattern in self.items if pattern.search(text)]
+
+
+# --- テキスト正規化 ---------------------------------------------------------
+WHITESPACE_RUN = re.compile(r'\s+')
+OCR_NOISE_CHARS = re.compile(r'[・\r\t]')
+OCR_NOISE_CHARS_WITH_NEWLINE = re.compile(r'[・\n\r\t]')
+
+# --- 事前抽出（PreExtractEngine）: 1ページごとに評価 ---------------------------
+DOCUMENT_CODE = PatternFamily([
+    ('strong', r'\b(0003|0004|3003|3004|1003|1013|1023|1004|2003|2013|2023|2004|6002|6003)\b'),
+    ('0000', r'納付税額一覧表'),
+    ('0001', r'法人税.*申告書'),
+    ('0002', r'添付資料.*法人税'),
+    ('3001', r'消費税.*申告書'),
+    ('3002', r'添付資料.*消費税'),
+], re.IGNORECASE)
+
+DOC_HINTS = PatternFamily([
+    ('受信通知', r'受信通知'), ('受信通知', r'申告受付完了'), ('受信通知', r'受信結果'),
+    ('納付情報', r'納付情報'), ('納付情報', r'納付書'), ('納付情報', r'納付区分番号'),
+    ('申告書', r'申告書'), ('申告書', r'確認表'),
+    ('添付資料', r'添付資料'), ('添付資料', r'明細表'),
+    ('帳票', r'一括償却資産'), ('帳票', r'少額減価償却'), ('帳票', r'明細表'),
+], re.IGNORECASE)
+
+TAX_KIND = PatternFamily([
+    ('国税', r'法人税'), ('国税', r'消費税'), ('国税', r'所得税'), ('国税', r'国税電子申告'), ('国税', r'税務署'),
+    ('地方税', r'都道府県民税'), ('地方税', r'市町村民税'), ('地方税', r'事業税'),
+    ('地方税', r'地方税電子申告'), ('地方税', r'県税事務所'), ('地方税', r'市役所'),
+    ('消費税', r'消費税及び地方消費税'),
+], re.IGNORECASE)
+
+FULL_DATE = re.compile(r'\d{4}[/-]\d{1,2}[/-]\d{1,2}')
+
+# --- 資産文書（6002/6003）四重ロック 層A ---------------------------------------
+ASSET_FILENAME = PatternFamily([(p, p) for p in [
+    r'6002.*明細',
+    r'6003.*明細',
+    r'一括償却資産.*明細',
+    r'少額減価償却資産.*明細',
+    r'少額.*償却|償却.*少額',
+    r'少額資産|少額.*明細',
+    r'償却資産.*明細',
+    r'減価償却.*明細',
+    # シンプルパターン
+    r'少額\.pdf$',
+    r'資産明細.*\.pdf$',
+]], re.IGNORECASE)
+
+ASSET_TEXT = PatternFamily([(p, p) for p in [
+    # 基本パターン
+    r'一括償却資産明細表?',
+    r'少額減価償却資産明細表?',
+    r'償却資産明細表?',
+    r'減価償却資産明細表?',
+    # 略形パターン
+    r'少額.*償却|償却.*少額',
+    r'少額資産|少額.*明細',
+    # 表フィールド
+    r'資産コード',
+    r'取得価額',
+    r'損金算入限度額',
+    r'償却方法',
+    r'耐用年数',
+    r'決算調整方式',
+    # 金額パターン
+    r'(三十|30)万.*未満',
+    r'(十|10)万.*未満',
+    # コード
+    r'6002',
+    r'6003',
+]], re.IGNORECASE)
+
+# --- 文書からのYYMM推定（yymm_resolver） ---------------------------------------
+ERA_REIWA_YEAR = re.compile(r'令和(\d{1,2})年')
+ERA_HEISEI_YEAR = re.compile(r'平成(\d{1,2})年')
+PERIOD_FROM_TO = re.compile(r'自\s*(\d{4})[/-](\d{1,2})[/-](\d{1,2})\s*至\s*(\d{4})[/-](\d{1,2})[/-](\d{1,2})')
+REIWA_YEAR_MONTH = re.compile(r'令和(\d{1,2})年(\d{1,2})月')
+FOUR_DIGITS = re.compile(r'\b(\d{4})\b')
+TAX_PERIOD = re.compile(r'課税期間.*?(\d{2})年(\d{1,2})月.*?(\d{1,2})月')
+FILENAME_DATE = re.compile(r'_(\d{4})(\d{2})(\d{2})_')
+YYMM_FORMAT = re.compile(r'^\d{4}$')
+
+# --- CSVファイル名・日付値 ------------------------------------------------------
+CSV_FILENAME_DATES: Tuple[Pattern, ...] = tuple(re.compile(p) for p in [
+    r'(\d{4})(\d{2})\d{2}',  # YYYYMMDD
+    r'(\d{4})-(\d{2})-\d{2}',  # YYYY-MM-DD
+    r'(\d{4})/(\d{2})/\d{2}',  # YYYY/MM/DD
+    r'(\d{2})(\d{2})\d{2}',    # YYMMDD
+])
+
+
+# --- 設定ファイル由来のパターン ------------------------------------------------
+_CONFIG_PATTERNS: Dict[Tuple[str, int], Pattern] = {}
+_CONFIG_PATTERNS_LOCK = threading.Lock()
+
+
+def compile_pattern(pattern: str, flags: int = 0) -> Pattern:
+    """設定ファイル（split_rules.yaml など）のパターンをコンパイルして保持（破棄しない）"""
+    key = (pattern, flags)
+    compiled = _CONFIG_PATTERNS.get(key)
+    if compiled is None:
+        with _CONFIG_PATTERNS_LOCK:
+            compiled = _CONFIG_PATTERNS.setdefault(key, re.compile(pattern, flags))
+    return compiled
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+フォルダ処理マニフェスト v5.5
+入力フォルダごとに「入力ファイルの指紋 → 出力ファイル名・分類結果」を永続化し、
+同じフォルダを再投入したときは追加・変更されたファイルだけを処理する（増分処理）
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .file_identity import get_shared_file_identity_cache
+
+MANIFEST_VERSION = "1"
+MANIFEST_FILENAME = ".tax_renamer_manifest.json"
+
+
+@dataclass
+class ManifestEntry:
+    """入力ファイル1件分の処理記録"""
+    size: int
+    mtime_ns: int
+    md5: str
+    yymm: str
+    output_folder: str                                   # 出力先フォルダ（絶対パス）
+    outputs: List[str] = field(default_factory=list)     # 出力ファイル名（output_folder からの相対）
+    document_types: List[str] = field(default_factory=list)  # 出力ごとの分類結果
+    processed_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ManifestEntry':
+        return cls(
+            size=int(data['size']),
+            mtime_ns=int(data['mtime_ns']),
+            md5=data['md5'],
+            yymm=data.get('yymm', ''),
+            output_folder=data['output_folder'],
+            outputs=list(data.get('outputs', [])),
+            document_types=list(data.get('document_types', [])),
+            processed_at=data.get('processed_at', ''),
+        )
+
+    def outputs_exist(self) -> bool:
+        return all(os.path.exists(os.path.join(self.output_folder, name)) for name in self.outputs)
+
+
+class RunManifest:
+    """
+    入力フォルダ直下に置く処理マニフェスト
+
+    前回と同じ出力先・YYMMで、入力ファイルが未変更（サイズ・更新時刻、またはMD5が一致）かつ
+    前回の出力ファイルが残っている場合は処理済みとみなし、前回の出力をそのまま再利用する。
+    """
+
+    def __init__(self, folder: str, manifest_path: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.folder = os.path.abspath(folder)
+        self.manifest_path = manifest_path or os.path.join(self.folder, MANIFEST_FILENAME)
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._dirty = False
+        self._load()
+
+    def _key(self, file_path: str) -> str:
+        return os.path.basename(file_path)
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION:
+                self.logger.info("[manifest] Version mismatch, starting fresh: %s", self.manifest_path)
+                return
+            self.entries = {name: ManifestEntry.from_dict(entry) for name, entry in data.get('files', {}).items()}
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            self.logger.warning("[manifest] Failed to load %s: %s", self.manifest_path, e)
+            self.entries = {}
+
+    def get(self, file_path: str) -> Optional[ManifestEntry]:
+        return self.entries.get(self._key(file_path))
+
+    def is_up_to_date(self, file_path: str, output_folder: str, yymm: str) -> bool:
+        """前回の処理結果をそのまま再利用できるか"""
+        entry = self.get(file_path)
+        if entry is None or entry.yymm != yymm or not entry.outputs:
+            return False
+        if entry.output_folder != os.path.abspath(output_folder) or not entry.outputs_exist():
+            return False
+
+        st = os.stat(file_path)
+        if (st.st_size, st.st_mtime_ns) == (entry.size, entry.mtime_ns):
+            return True
+        # 更新時刻だけ変わった（コピー・再保存）場合は内容で判定
+        if st.st_size != entry.size or get_shared_file_identity_cache().md5(file_path) != entry.md5:
+            return False
+        entry.mtime_ns = st.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def plan(self, file_paths: Iterable[str], output_folder: str,
+             yymm: str) -> Tuple[List[str], List[str]]:
+        """(処理が必要なファイル, 前回の出力を再利用するファイル) に振り分け（入力順を維持）"""
+        to_process, reused = [], []
+        for file_path in file_paths:
+            (reused if self.is_up_to_date(file_path, output_folder, yymm) else to_process).append(file_path)
+        return to_process, reused
+
+    def latest_output_folder(self, yymm: str) -> Optional[str]:
+        """このYYMMで最後に使った出力先（存在する場合のみ）"""
+        candidates = [e for e in self.entries.values() if e.yymm == yymm and os.path.isdir(e.output_folder)]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda e: e.processed_at).output_folder
+
+    def record(self, file_path: str, output_folder: str, yymm: str,
+               outputs: List[str], document_types: Optional[List[str]] = None):
+        """処理に成功したファイルの指紋と出力を記録"""
+        st = os.stat(file_path)
+        self.entries[self._key(file_path)] = ManifestEntry(
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            md5=get_shared_file_identity_cache().md5(file_path),
+            yymm=yymm,
+            output_folder=os.path.abspath(output_folder),
+            outputs=[os.path.basename(name) for name in outputs],
+            document_types=list(document_types or []),
+        )
+        self._dirty = True
+
+    def discard_outputs(self, file_path: str, output_folder: str) -> List[str]:
+        """再処理するファイルの前回出力を削除（変更前の分類結果が出力先に残らないように）
+
+        前回と同じ出力先に書き込む場合のみ削除する（別のYYMM・出力先の結果は残す）。
+        他の入力ファイルの出力として記録されているファイルは削除しない。
+
+        Returns:
+            削除した出力ファイルのパス
+        """
+        key = self._key(file_path)
+        entry = self.entries.get(key)
+        if entry is None or entry.output_folder != os.path.abspath(output_folder):
+            return []
+        claimed = {name for other_key, other in self.entries.items()
+                   if other_key != key and other.output_folder == entry.output_folder
+                   for name in other.outputs}
+        removed = []
+        for name in entry.outputs:
+            path = os.path.join(entry.output_folder, name)
+            if name in claimed or not os.path.isfile(path):
+                continue
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError as e:
+                self.logger.warning("[manifest] Failed to remove stale output %s: %s", path, e)
+        return removed
+
+    def forget(self, file_path: str):
+        """失敗したファイルの記録を削除（次回再処理させる）"""
+        if self.entries.pop(self._key(file_path), None) is not None:
+            self._dirty = True
+
+    def save(self):
+        """変更があればマニフェストを書き出す（一時ファイル経由で置き換え）"""
+        if not self._dirty:
+            return
+        data = {
+            'version': MANIFEST_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'files': {name: entry.to_dict() for name, entry in sorted(self.entries.items())},
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+        except OSError as e:
+            self.logger.warning("[manifest] Failed to save %s: %s", self.manifest_path, e)
+
+
+def create_run_manifest(folder: str, logger: Optional[logging.Logger] = None) -> RunManifest:
+    """フォルダ処理マニフェストのファクトリー関数"""
+    return RunManifest(folder, logger=logger)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+スナップショットストア v5.5
+PreExtractSnapshot の永続化バックエンド（SQLite 1ファイル / 従来のMD5ごとのJSONファイル）
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import PageFingerprint, PreExtractSnapshot
+
+SNAPSHOT_BACKENDS = ("sqlite", "json")
+SQLITE_FILENAME = "snapshots.sqlite3"
+# SQLiteの1クエリあたりのパラメータ数上限に収まる件数
+_LOOKUP_CHUNK = 500
+
+
+def _created_timestamp(created_at: str) -> float:
+    try:
+        return datetime.fromisoformat(created_at).timestamp()
+    except (TypeError, ValueError):
+        return datetime.now().timestamp()
+
+
+class JsonSnapshotStore:
+    """従来方式: snapshot_dir/<md5>.json に1件ずつ保存"""
+
+    def __init__(self, snapshot_dir: Path, logger: Optional[logging.Logger] = None):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.logger = logger or logging.getLogger(__name__)
+
+    def save(self, snapshot: PreExtractSnapshot,
+             fingerprints: Optional[Sequence[PageFingerprint]] = None) -> Path:
+        """スナップショットを保存（ページフィンガープリントはJSON形式では保存しない）"""
+        return snapshot.save(self.snapshot_dir)
+
+    def load(self, source_doc_md5: str) -> Optional[PreExtractSnapshot]:
+        return PreExtractSnapshot.load(self.snapshot_dir, source_doc_md5)
+
+    def load_many(self, source_doc_md5s: Iterable[str]) -> Dict[str, PreExtractSnapshot]:
+        """複数MD5のスナップショットをまとめて取得（存在するもののみ）"""
+        found = {}
+        for md5 in dict.fromkeys(source_doc_md5s):
+            snapshot = self.load(md5)
+            if snapshot is not None:
+                found[md5] = snapshot
+        return found
+
+    def evict_older_than(self, max_age_days: int) -> int:
+        """更新日時が max_age_days より古いファイルを削除し、削除件数を返す"""
+        if not self.snapshot_dir.exists():
+            return 0
+        cutoff_time = datetime.now().timestamp() - (max_age_days * 24 * 3600)
+        removed = 0
+        for snapshot_file in self.snapshot_dir.glob("*.json"):
+            if snapshot_file.stat().st_mtime < cutoff_time:
+                snapshot_file.unlink()
+                removed += 1
+                self.logger.debug("[snapshot_store] Cleaned up old snapshot: %s", snapshot_file)
+        return removed
+
+    def close(self):
+        pass
+
+
+class SQLiteSnapshotStore:
+    """
+    SQLite 1ファイルのスナップショットストア
+
+    snapshots(source_doc_md5 主キー, created_ts 索引) と
+    snapshot_pages(page_md5 / text_sha1 索引) の2表で管理する。
+    同じディレクトリに従来のJSONファイルがあれば、初回参照時に取り込む。
+    """
+
+    def __init__(self, snapshot_dir: Path, logger: Optional[logging.Logger] = None):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.db_path = self.snapshot_dir / SQLITE_FILENAME
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._legacy = JsonSnapshotStore(self.snapshot_dir, logger=self.logger)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " source_doc_md5 TEXT PRIMARY KEY, source_path TEXT NOT NULL, created_at TEXT NOT NULL,"
+                " created_ts REAL NOT NULL, version TEXT NOT NULL, data TEXT NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS idx_snapshots_created_ts ON snapshots(created_ts);"
+                "CREATE TABLE IF NOT EXISTS snapshot_pages ("
+                " source_doc_md5 TEXT NOT NULL, page_index INTEGER NOT NULL,"
+                " page_md5 TEXT NOT NULL, text_sha1 TEXT NOT NULL,"
+                " PRIMARY KEY (source_doc_md5, page_index));"
+                "CREATE INDEX IF NOT EXISTS idx_snapshot_pages_page_md5 ON snapshot_pages(page_md5);"
+                "CREATE INDEX IF NOT EXISTS idx_snapshot_pages_text_sha1 ON snapshot_pages(text_sha1);"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def save(self, snapshot: PreExtractSnapshot,
+             fingerprints: Optional[Sequence[PageFingerprint]] = None) -> Path:
+        """スナップショットとページフィンガープリントを保存（同一MD5は置き換え）"""
+        data = json.dumps(snapshot.to_dict(), ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots"
+                    " (source_doc_md5, source_path, created_at, created_ts, version, data)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (snapshot.source_doc_md5, snapshot.source_path, snapshot.created_at,
+                     _created_timestamp(snapshot.created_at), snapshot.version, data)
+                )
+                conn.execute("DELETE FROM snapshot_pages WHERE source_doc_md5 = ?", (snapshot.source_doc_md5,))
+                if fingerprints:
+                    conn.executemany(
+                        "INSERT INTO snapshot_pages (source_doc_md5, page_index, page_md5, text_sha1)"
+                        " VALUES (?, ?, ?, ?)",
+                        [(snapshot.source_doc_md5, i, fp.page_md5, fp.text_sha1) for i, fp in enumerate(fingerprints)]
+                    )
+        return self.db_path
+
+    def load(self, source_doc_md5: str) -> Optional[PreExtractSnapshot]:
+        return self.load_many([source_doc_md5]).get(source_doc_md5)
+
+    def load_many(self, source_doc_md5s: Iterable[str]) -> Dict[str, PreExtractSnapshot]:
+        """複数MD5のスナップショットをまとめて取得（フォルダ単位の一括参照用）"""
+        md5s = list(dict.fromkeys(source_doc_md5s))
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(md5s), _LOOKUP_CHUNK):
+                chunk = md5s[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT source_doc_md5, data FROM snapshots WHERE source_doc_md5 IN ({placeholders})", chunk
+                ).fetchall()
+                for md5, data in rows:
+                    try:
+                        found[md5] = PreExtractSnapshot.from_dict(json.loads(data))
+                    except (json.JSONDecodeError, KeyError, ValueError):
+                        continue
+
+        # 未移行の従来JSONファイルは取り込んでから返す
+        for md5 in md5s:
+            if md5 not in found:
+                legacy = self._legacy.load(md5)
+                if legacy is not None:
+                    self.save(legacy)
+                    found[md5] = legacy
+                    self.logger.debug("[snapshot_store] Imported legacy JSON snapshot: %s", md5)
+        return found
+
+    def find_pages(self, page_md5: Optional[str] = None,
+                   text_sha1: Optional[str] = None) -> List[Tuple[str, int]]:
+        """ページフィンガープリントが一致する (source_doc_md5, page_index) の一覧"""
+        if page_md5 is None and text_sha1 is None:
+            return []
+        conditions, params = [], []
+        if page_md5 is not None:
+            conditions.append("page_md5 = ?")
+            params.append(page_md5)
+        if text_sha1 is not None:
+            conditions.append("text_sha1 = ?")
+            params.append(text_sha1)
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT source_doc_md5, page_index FROM snapshot_pages WHERE {' AND '.join(conditions)}"
+                " ORDER BY source_doc_md5, page_index", params
+            ).fetchall()
+        return [(md5, page_index) for md5, page_index in rows]
+
+    def evict_older_than(self, max_age_days: int) -> int:
+        """作成日時が max_age_days より古いスナップショットを1クエリで削除し、削除件数を返す"""
+        cutoff_ts = datetime.now().timestamp() - (max_age_days * 24 * 3600)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "DELETE FROM snapshot_pages WHERE source_doc_md5 IN"
+                    " (SELECT source_doc_md5 FROM snapshots WHERE created_ts < ?)", (cutoff_ts,)
+                )
+                removed = conn.execute("DELETE FROM snapshots WHERE created_ts < ?", (cutoff_ts,)).rowcount
+        removed += self._legacy.evict_older_than(max_age_days)
+        if removed:
+            self.logger.debug("[snapshot_store] Evicted %s snapshots older than %s days", removed, max_age_days)
+        return removed
+
+    def import_legacy_json(self) -> int:
+        """ディレクトリ内の従来JSONスナップショットをすべて取り込み、取り込み件数を返す"""
+        imported = 0
+        for snapshot_file in sorted(self.snapshot_dir.glob("*.json")):
+            snapshot = self._legacy.load(snapshot_file.stem)
+            if snapshot is not None:
+                self.save(snapshot)
+                imported += 1
+        return imported
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_snapshot_store(snapshot_dir: Path, backend: str = "sqlite",
+                          logger: Optional[logging.Logger] = None):
+    """スナップショットストアのファクトリー関数"""
+    if backend == "sqlite":
+        return SQLiteSnapshotStore(snapshot_dir, logger=logger)
+    if backend == "json":
+        return JsonSnapshotStore(snapshot_dir, logger=logger)
+    raise ValueError(f"Unknown snapshot backend: {backend}")
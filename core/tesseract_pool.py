@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+常駐tesseractワーカープール v5.5
+言語モデルを読み込み済みのtesseract APIを使い回し、OCR呼び出しごとのプロセス起動を省く
+
+同梱tesseractと同じフォルダの libtesseract（Windows: libtesseract-5.dll）を ctypes で読み込み、
+C API（TessBaseAPI）のインスタンスを常駐ワーカーとして貸し出す（追加のPythonパッケージは不要）。
+ライブラリが見つからない・初期化に失敗した場合は従来どおり pytesseract（呼び出しごとにプロセス起動）で処理する。
+"""
+
+import ctypes
+import ctypes.util
+import glob
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .lazy_import import lazy_module
+from .runtime_paths import get_tessdata_dir_path, get_tesseract_executable_path
+
+# pytesseract は初回のOCR実行時に読み込む（起動時間短縮）
+pytesseract = lazy_module("pytesseract")
+
+BACKENDS = ("capi", "subprocess")
+DEFAULT_POOL_SIZE = 2
+# --psm 未指定時は tesseract コマンドと同じ既定（PSM_AUTO）
+DEFAULT_PSM = 3
+# libtesseract の場所を明示する環境変数
+LIBRARY_ENV = "TESSERACT_LIBRARY"
+
+# Windowsで依存DLL（leptonica等）を解決するために追加したディレクトリ（参照を保持）
+_DLL_DIRECTORIES: List = []
+
+
+def parse_tesseract_config(config: str) -> Tuple[Optional[int], Dict[str, str]]:
+    """pytesseract形式の設定文字列から PSM と -c 変数を取り出す
+
+    --oem はワーカー初期化時に固定（既定のLSTM=3）のため無視する。
+    """
+    psm_match = re.search(r'--psm\s+(\d+)', config or "")
+    psm = int(psm_match.group(1)) if psm_match else None
+    variables = dict(re.findall(r'-c\s+([A-Za-z0-9_]+)=(\S+)', config or ""))
+    return psm, variables
+
+
+def find_tesseract_library() -> Optional[str]:
+    """libtesseract を探す（環境変数 → 同梱tesseractのフォルダ → システム）"""
+    path = os.environ.get(LIBRARY_ENV)
+    if path:
+        return path
+    bin_dir = os.path.dirname(get_tesseract_executable_path())
+    for pattern in ("libtesseract*.dll", "tesseract*.dll"):
+        matches = sorted(glob.glob(os.path.join(bin_dir, pattern)))
+        if matches:
+            return matches[-1]
+    return ctypes.util.find_library("tesseract")
+
+
+def load_tesseract_library(path: str) -> "TessLibrary":
+    """libtesseract を読み込む"""
+    directory = os.path.dirname(path)
+    if sys.platform == "win32" and directory and hasattr(os, "add_dll_directory"):
+        _DLL_DIRECTORIES.append(os.add_dll_directory(directory))
+    return TessLibrary(ctypes.CDLL(path))
+
+
+class TessLibrary:
+    """libtesseract C API の薄いラッパー（ハンドルは TessBaseAPI*）"""
+
+    def __init__(self, lib: ctypes.CDLL):
+        handle, text = ctypes.c_void_p, ctypes.c_char_p
+        signatures = {
+            "TessBaseAPICreate": ([], handle),
+            "TessBaseAPIInit3": ([handle, text, text], ctypes.c_int),
+            "TessBaseAPISetPageSegMode": ([handle, ctypes.c_int], None),
+            "TessBaseAPISetVariable": ([handle, text, text], ctypes.c_int),
+            "TessBaseAPIGetIntVariable": ([handle, text, ctypes.POINTER(ctypes.c_int)], ctypes.c_int),
+            "TessBaseAPIGetBoolVariable": ([handle, text, ctypes.POINTER(ctypes.c_int)], ctypes.c_int),
+            "TessBaseAPIGetDoubleVariable": ([handle, text, ctypes.POINTER(ctypes.c_double)], ctypes.c_int),
+            "TessBaseAPIGetStringVariable": ([handle, text], text),
+            "TessBaseAPISetImage": ([handle, text, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int], None),
+            "TessBaseAPISetSourceResolution": ([handle, ctypes.c_int], None),
+            # 戻り値は TessDeleteText で解放するため c_void_p で受け取る
+            "TessBaseAPIGetUTF8Text": ([handle], ctypes.c_void_p),
+            "TessDeleteText": ([ctypes.c_void_p], None),
+            "TessBaseAPIClear": ([handle], None),
+            "TessBaseAPIEnd": ([handle], None),
+            "TessBaseAPIDelete": ([handle], None),
+        }
+        for name, (argtypes, restype) in signatures.items():
+            func = getattr(lib, name)
+            func.argtypes = argtypes
+            func.restype = restype
+        self._lib = lib
+
+    def create(self, datapath: str, lang: str):
+        """言語モデルを読み込んだ API インスタンスを作成"""
+        api = self._lib.TessBaseAPICreate()
+        if self._lib.TessBaseAPIInit3(api, datapath.encode("utf-8"), lang.encode("utf-8")) != 0:
+            self._lib.TessBaseAPIDelete(api)
+            raise RuntimeError(f"TessBaseAPIInit3 failed (datapath={datapath}, lang={lang})")
+        return api
+
+    def set_page_seg_mode(self, api, psm: int):
+        self._lib.TessBaseAPISetPageSegMode(api, psm)
+
+    def set_variable(self, api, name: str, value: str) -> bool:
+        return bool(self._lib.TessBaseAPISetVariable(api, name.encode("utf-8"), value.encode("utf-8")))
+
+    def get_variable(self, api, name: str) -> Optional[str]:
+        """変数の現在値を SetVariable に渡せる文字列で返す（未知の変数は None）"""
+        key = name.encode("utf-8")
+        int_value = ctypes.c_int()
+        if self._lib.TessBaseAPIGetIntVariable(api, key, ctypes.byref(int_value)):
+            return str(int_value.value)
+        if self._lib.TessBaseAPIGetBoolVariable(api, key, ctypes.byref(int_value)):
+            return "1" if int_value.value else "0"
+        double_value = ctypes.c_double()
+        if self._lib.TessBaseAPIGetDoubleVariable(api, key, ctypes.byref(double_value)):
+            return repr(double_value.value)
+        string_value = self._lib.TessBaseAPIGetStringVariable(api, key)
+        return string_value.decode("utf-8") if string_value is not None else None
+
+    def recognize(self, api, img) -> str:
+        """PIL画像を認識してテキストを返す（認識結果は呼び出し後に破棄）"""
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("L" if img.mode in ("1", "P", "I", "F") else "RGB")
+        channels = 1 if img.mode == "L" else 3
+        width, height = img.size
+        self._lib.TessBaseAPISetImage(api, img.tobytes(), width, height, channels, width * channels)
+        dpi = img.info.get("dpi")
+        if dpi:
+            self._lib.TessBaseAPISetSourceResolution(api, int(dpi[0]))
+        try:
+            text = self._lib.TessBaseAPIGetUTF8Text(api)
+            if not text:
+                return ""
+            try:
+                return ctypes.string_at(text).decode("utf-8", errors="replace")
+            finally:
+                self._lib.TessDeleteText(text)
+        finally:
+            self._lib.TessBaseAPIClear(api)
+
+    def delete(self, api):
+        self._lib.TessBaseAPIEnd(api)
+        self._lib.TessBaseAPIDelete(api)
+
+
+class _Worker:
+    """常駐ワーカー1つ分（API インスタンスと -c 変数の初期値）"""
+
+    def __init__(self, library: TessLibrary, api):
+        self.library = library
+        self.api = api
+        self.defaults: Dict[str, Optional[str]] = {}
+
+    def recognize(self, img, config: str) -> str:
+        psm, variables = parse_tesseract_config(config)
+        library, api = self.library, self.api
+        library.set_page_seg_mode(api, psm if psm is not None else DEFAULT_PSM)
+        try:
+            for name, value in variables.items():
+                if name not in self.defaults:
+                    self.defaults[name] = library.get_variable(api, name)
+                library.set_variable(api, name, value)
+            return library.recognize(api, img)
+        finally:
+            # -c 変数はインスタンスに残るため、呼び出しごとに初期値へ戻す
+            for name in variables:
+                default = self.defaults.get(name)
+                if default is not None:
+                    library.set_variable(api, name, default)
+
+
+class TesseractWorkerPool:
+    """
+    tesseract OCRワーカープール
+
+    capi バックエンドでは最大 size 個の API インスタンスを遅延生成し、
+    キューで貸し出す（1インスタンスは同時に1スレッドのみが使用）。
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, lang: str = 'jpn',
+                 tessdata_dir: Optional[str] = None, backend: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None):
+        """初期化
+
+        Args:
+            size: 常駐ワーカー数
+            lang: 読み込む言語モデル
+            tessdata_dir: tessdataディレクトリ（既定: TESSDATA_PREFIX、なければ同梱tessdata）
+            backend: "capi" / "subprocess"（Noneで libtesseract が見つかれば capi）
+            logger: ロガー
+        """
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f"Unknown tesseract backend: {backend}")
+        self.logger = logger or logging.getLogger(__name__)
+        self.size = max(1, size)
+        self.lang = lang
+        self.tessdata_dir = tessdata_dir or os.environ.get("TESSDATA_PREFIX") or get_tessdata_dir_path()
+        # ライブラリの探索・読み込みは初回のOCR実行時に行う（起動時間短縮）
+        self.backend = backend or "capi"
+        self._backend_requested = backend is not None
+
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue" = queue.Queue()
+        self._library: Optional[TessLibrary] = None
+        self._workers: List[_Worker] = []
+        self.stats = {'calls': 0, 'workers_started': 0}
+
+    def image_to_string(self, img, lang: Optional[str] = None, config: str = "") -> str:
+        """画像をOCRしてテキストを返す（pytesseract.image_to_string 互換）"""
+        lang = lang or self.lang
+        with self._lock:
+            self.stats['calls'] += 1
+        if self.backend == "capi" and lang == self.lang:
+            worker = self._acquire()
+            if worker is not None:
+                try:
+                    return worker.recognize(img, config)
+                finally:
+                    self._idle.put(worker)
+        return pytesseract.image_to_string(img, lang=lang, config=config)
+
+    def _acquire(self) -> Optional[_Worker]:
+        """空きワーカーを取得（上限未満なら新規起動、上限なら空くまで待機）"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self.backend == "capi" and len(self._workers) < self.size:
+                try:
+                    if self._library is None:
+                        self._library = self._load_library()
+                    worker = _Worker(self._library, self._library.create(self.tessdata_dir, self.lang))
+                except Exception as e:
+                    # 自動選択でライブラリが無いだけなら通常の構成（pytesseractのみ）として扱う
+                    quiet = isinstance(e, FileNotFoundError) and not self._backend_requested
+                    log = self.logger.debug if quiet else self.logger.warning
+                    log("[tesseract_pool] Worker init failed, using subprocess backend: %s", e)
+                    self.backend = "subprocess"
+                    return None
+                self._workers.append(worker)
+                self.stats['workers_started'] += 1
+                self.logger.debug("[tesseract_pool] Worker started (%d/%d, lang=%s)",
+                                  len(self._workers), self.size, self.lang)
+                return worker
+            if self.backend != "capi":
+                return None
+        return self._idle.get()
+
+    def _load_library(self) -> TessLibrary:
+        path = find_tesseract_library()
+        if not path:
+            raise FileNotFoundError("libtesseract not found")
+        library = load_tesseract_library(path)
+        self.logger.debug("[tesseract_pool] Loaded %s", path)
+        return library
+
+    def close(self):
+        """常駐ワーカーを終了"""
+        with self._lock:
+            for worker in self._workers:
+                try:
+                    worker.library.delete(worker.api)
+                except Exception:
+                    pass
+            self._workers.clear()
+            self._idle = queue.Queue()
+
+
+_SHARED_POOL: Optional[TesseractWorkerPool] = None
+_SHARED_POOL_LOCK = threading.Lock()
+
+
+def get_shared_tesseract_pool() -> TesseractWorkerPool:
+    """プロセス内で共有するワーカープールを取得（初回呼び出し時に作成）"""
+    global _SHARED_POOL
+    if _SHARED_POOL is None:
+        with _SHARED_POOL_LOCK:
+            if _SHARED_POOL is None:
+                _SHARED_POOL = TesseractWorkerPool()
+    return _SHARED_POOL
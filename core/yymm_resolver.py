@@ -4,7 +4,6 @@ YYMM resolution system with UI-forced handling v5.3.5-assets-hotfix
 YYMM解決システム - FATAL回避とバッチ処理継続
 """
 
-import re
 import logging
 from typing import Optional, Tuple, Set, Dict, Any
 from dataclasses import dataclass
@@ -13,6 +12,11 @@ from enum import Enum
 # 堅牢なUI YYMM抽出機能
 from helpers.yymm_policy import require_ui_yymm, resolve_yymm_by_policy
 
+from .regex_registry import (
+    ERA_HEISEI_YEAR, ERA_REIWA_YEAR, FILENAME_DATE, FOUR_DIGITS, PERIOD_FROM_TO, REIWA_YEAR_MONTH, TAX_PERIOD,
+    YYMM_FORMAT,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -194,8 +198,7 @@ def _detect_from_document(document: Any) -> YYMMResult:
         return period_end_result
     
     # パターン3: 令和X年Y月形式（既存）
-    reiwa_pattern = r'令和(\d{1,2})年(\d{1,2})月'
-    match = re.search(reiwa_pattern, text)
+    match = REIWA_YEAR_MONTH.search(text)
     if match:
         year, month = match.groups()
         yymm = f"{int(year):02d}{int(month):02d}"
@@ -204,16 +207,14 @@ def _detect_from_document(document: Any) -> YYMMResult:
             return YYMMResult(yymm, YYMMSource.DOC_HEURISTIC, 0.9, "reiwa_pattern")
     
     # パターン4: YYMM直接形式（４桁数字）
-    yymm_pattern = r'\b(\d{4})\b'
-    matches = re.findall(yymm_pattern, text)
+    matches = FOUR_DIGITS.findall(text)
     for match in matches:
         if _validate_yymm_format(match) and _looks_like_period(match):
             logger.debug("YYMM detected (direct format): %s", match)
             return YYMMResult(match, YYMMSource.DOC_HEURISTIC, 0.7, "direct_pattern")
     
     # パターン5: 課税期間形式
-    period_pattern = r'課税期間.*?(\d{2})年(\d{1,2})月.*?(\d{1,2})月'
-    match = re.search(period_pattern, text)
+    match = TAX_PERIOD.search(text)
     if match:
         year, start_month, end_month = match.groups()
         # 課税期間の終了月を使用
@@ -234,7 +235,7 @@ def _detect_from_document(document: Any) -> YYMMResult:
 def _detect_from_era_year(text: str) -> YYMMResult:
     """元号年からYYMM推定（v5.3.5追加）"""
     # 令和X年 → 2018 + X年
-    reiwa_match = re.search(r'令和(\d{1,2})年', text)
+    reiwa_match = ERA_REIWA_YEAR.search(text)
     if reiwa_match:
         reiwa_year = int(reiwa_match.group(1))
         western_year = 2018 + reiwa_year  # 令和元年=2019
@@ -246,7 +247,7 @@ def _detect_from_era_year(text: str) -> YYMMResult:
         return YYMMResult(yymm, YYMMSource.DOC_HEURISTIC, 0.85, "era_reiwa")
     
     # 平成X年 → 1988 + X年
-    heisei_match = re.search(r'平成(\d{1,2})年', text)
+    heisei_match = ERA_HEISEI_YEAR.search(text)
     if heisei_match:
         heisei_year = int(heisei_match.group(1))
         western_year = 1988 + heisei_year  # 平成元年=1989
@@ -262,8 +263,7 @@ def _detect_from_era_year(text: str) -> YYMMResult:
 def _detect_from_period_end(text: str) -> YYMMResult:
     """終期日付からYYMM推定（v5.3.5追加）"""
     # 自 YYYY/MM/DD 至 YYYY/MM/DD 形式
-    period_pattern = r'自\s*(\d{4})[/-](\d{1,2})[/-](\d{1,2})\s*至\s*(\d{4})[/-](\d{1,2})[/-](\d{1,2})'
-    match = re.search(period_pattern, text)
+    match = PERIOD_FROM_TO.search(text)
     if match:
         end_year = int(match.group(4))
         end_month = int(match.group(5))
@@ -283,8 +283,7 @@ def _detect_from_filename(filename: str) -> YYMMResult:
         return YYMMResult(None, YYMMSource.NONE, 0.0, "no_filename")
     
     # _YYYYMMDD_ 形式
-    date_pattern = r'_(\d{4})(\d{2})(\d{2})_'
-    match = re.search(date_pattern, filename)
+    match = FILENAME_DATE.search(filename)
     if match:
         year, month, day = match.groups()
         yy = int(year) % 100
@@ -314,7 +313,7 @@ def _validate_yymm_format(yymm: str) -> bool:
         return False
     
     # 4桁数字であること
-    if not re.match(r'^\d{4}$', yymm):
+    if not YYMM_FORMAT.match(yymm):
         return False
     
     try:
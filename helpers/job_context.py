@@ -5,13 +5,17 @@ JobContext - 税務書類処理ジョブの一元管理
 """
 
 import logging
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Deque
 from datetime import datetime
 from helpers.run_config import RunConfig
 
 logger = logging.getLogger(__name__)
 
+# 監査ログの保持件数（超えた分は古いものから破棄）
+DEFAULT_AUDIT_LOG_LIMIT = 500
+
 
 @dataclass
 class ProcessingStats:
@@ -60,11 +64,13 @@ class JobContext:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
     error_messages: List[str] = field(default_factory=list)
-    audit_log: List[str] = field(default_factory=list)
+    audit_log_limit: int = DEFAULT_AUDIT_LOG_LIMIT
+    audit_log: Deque[str] = field(default_factory=deque)
     
     def __post_init__(self):
         """初期化後の処理"""
         self.updated_at = datetime.now()
+        self.audit_log = deque(self.audit_log, maxlen=self.audit_log_limit)
         self.audit_log.append(f"[{self.created_at}] JobContext initialized: job_id={self.job_id}")
         
         # YYMM値の妥当性チェック
@@ -382,6 +382,7 @@ def extract_prefecture_city_from_ocr(ocr_text):
     Returns:
         dict: {'prefecture': str, 'city': str}
     """
-    # 既存のOCR解析ロジックをここに統合
-    # 現在は仮実装として返す
-    return {'prefecture': '', 'city': ''}
\ No newline at end of file
+    from core.gazetteer import get_shared_gazetteer
+
+    place = get_shared_gazetteer().resolve(ocr_text or '')
+    return {'prefecture': place.prefecture or '', 'city': place.city or ''}
\ No newline at end of file
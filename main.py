@@ -10,9 +10,9 @@ from tkinter import ttk, filedialog, messagebox
 import os
 import threading
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import sys
-import pytesseract
+import logging
 import shutil
 import datetime
 
@@ -25,18 +25,28 @@ from helpers.yymm_policy import resolve_yymm_by_policy, log_yymm_decision, valid
 from helpers.settings_context import UIContext, create_ui_context_from_gui, normalize_settings_input
 from helpers.run_config import RunConfig, create_run_config_from_gui
 from core.csv_processor import CSVProcessor
-from core.classification_v5 import DocumentClassifierV5  # v5.1バグ修正版エンジンを使用
+from core.classification_v5 import DocumentClassifierV5, ClassificationResult  # v5.1バグ修正版エンジンを使用
 from core.runtime_paths import get_tesseract_executable_path, get_tessdata_dir_path, validate_tesseract_resources
 from ui.drag_drop import DropZoneFrame, AutoSplitControlFrame
 # v5.4.2: Deterministic renaming system
 from core.pre_extract import create_pre_extract_engine
 from core.rename_engine import create_rename_engine
 from core.models import DocItemID, PreExtractSnapshot
+from core.page_text_store import PageTextStore
+from core.file_identity import FILE_IDENTITY_DB_NAME, configure_shared_file_identity_cache
+from core.parallel_batch import create_parallel_batch_engine
+from core.output_naming import (
+    apply_pdf_analysis, is_blank_unclassified, output_filename, should_exclude_blank_page, unique_output_path
+)
+from core.run_manifest import create_run_manifest
+from core.log_config import configure_logging, get_subsystem_logger
 from helpers.job_context import JobContext
 
 
-def _init_tesseract():
-    """同梱Tesseractの初期化"""
+def _init_tesseract(logger: logging.Logger):
+    """同梱Tesseractの初期化（pytesseract の読み込みと動作確認のプロセス起動を伴うため起動後に実行）"""
+    import pytesseract
+    
     try:
         # 同梱tesseract.exe と tessdata を優先使用
         tesseract_bin = get_tesseract_executable_path()
@@ -67,39 +77,29 @@ def _init_tesseract():
         try:
             # 簡単なOCRテストを実行
             pytesseract.get_tesseract_version()
-            print(f"[OK] 同梱Tesseract初期化成功: {tesseract_bin}")
+            logger.info("[OK] 同梱Tesseract初期化成功: %s", tesseract_bin)
         except Exception as e:
             raise RuntimeError(f"同梱Tesseractの動作テストに失敗: {e}")
             
     except Exception as e:
-        print(f"[WARNING] 同梱Tesseract初期化エラー: {e}")
-        print("システムにインストールされたTesseractを探します...")
+        logger.warning("同梱Tesseract初期化エラー: %s", e)
+        logger.info("システムにインストールされたTesseractを探します...")
         
         # システムのTesseractにフォールバック
         import shutil
         system_tesseract = shutil.which("tesseract")
         if system_tesseract:
-            print(f"[OK] システムTesseractを使用: {system_tesseract}")
+            logger.info("[OK] システムTesseractを使用: %s", system_tesseract)
             pytesseract.pytesseract.tesseract_cmd = system_tesseract
         else:
-            print("[ERROR] Tesseractが見つかりません。")
-            print("")
-            print("以下のいずれかを実行してください:")
-            print("1. 同梱Tesseractリソースを正しく配置")
-            print("2. システムにTesseractをインストール")
-            print("")
-            print("詳細は resources/tesseract/README.md を参照してください。")
+            logger.error(
+                "Tesseractが見つかりません。以下のいずれかを実行してください: "
+                "1. 同梱Tesseractリソースを正しく配置 2. システムにTesseractをインストール "
+                "（詳細は resources/tesseract/README.md を参照）"
+            )
             raise RuntimeError("Tesseractが利用できません。")
 
 
-# アプリ起動時に1回だけ初期化（エラー時は警告のみ）
-try:
-    _init_tesseract()
-except RuntimeError as e:
-    print(f"[WARNING] Tesseract初期化をスキップ: {e}")
-    print("[INFO] OCR機能は制限されますが、システムは起動します")
-
-
 class TaxDocumentRenamerV5:
     """税務書類リネームシステム v5.4.2 メインクラス"""
     
@@ -110,20 +110,36 @@ class TaxDocumentRenamerV5:
         self.root.geometry("1200x800")
         
         # v5.2 コアエンジンの初期化（ロガー付き）
-        import logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        # レベルは環境変数 TAX_RENAMER_LOG（例: "INFO,classify=DEBUG"）、未指定なら INFO
+        configure_logging(default_level=logging.INFO)
+        self.logger = get_subsystem_logger("app")
+        
+        # Tesseract初期化はウィンドウ表示後にバックグラウンドで行い、OCRを使う処理は完了を待つ
+        self._tesseract_ready = threading.Event()
+        self._tesseract_probe_lock = threading.Lock()
+        self._tesseract_probe_started = False
         
-        self.pdf_processor = PDFProcessor(logger=self.logger)
+        # ジョブ共有ページテキストストア（フォルダ一括処理ごとに作り直す）
+        self.page_text_store = PageTextStore(logger=get_subsystem_logger("page_store"))
+        
+        self.pdf_processor = PDFProcessor(logger=get_subsystem_logger("split"), page_text_store=self.page_text_store)
         self.ocr_engine = OCREngine()
         self.csv_processor = CSVProcessor()
-        self.classifier_v5 = DocumentClassifierV5(debug_mode=True)
+        # ルールごとの評価過程（debug_steps）は classify=DEBUG のときだけ記録
+        self.classifier_v5 = DocumentClassifierV5(
+            debug_mode=get_subsystem_logger("classify").isEnabledFor(logging.DEBUG))
+        
+        # フォルダ一括処理のワーカープロセス数（Noneで論理CPU数、1で逐次処理）
+        self.batch_max_workers = None
         
         # v5.4.2: Deterministic renaming system
         snapshots_dir = Path("./snapshots")
         snapshots_dir.mkdir(exist_ok=True)
-        self.pre_extract_engine = create_pre_extract_engine(logger=self.logger, snapshot_dir=snapshots_dir)
-        self.rename_engine = create_rename_engine(logger=self.logger)
+        # 未変更ファイルのMD5を次回起動時も再利用
+        configure_shared_file_identity_cache(snapshots_dir / FILE_IDENTITY_DB_NAME)
+        self.pre_extract_engine = create_pre_extract_engine(logger=get_subsystem_logger("pre_extract"), snapshot_dir=snapshots_dir,
+                                                            page_text_store=self.page_text_store)
+        self.rename_engine = create_rename_engine(logger=get_subsystem_logger("rename"))
         
         # UI変数
         self.files_list = []
@@ -355,6 +371,14 @@ class TaxDocumentRenamerV5:
         self.year_month_var.trace_add('write', self._validate_yymm_input)
         self._validate_yymm_input()  # 初期バリデーション
         
+        # 増分処理（既定は無効）: フォルダ再投入時は追加・変更されたファイルのみ処理
+        self.incremental_batch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            settings_frame,
+            text="増分処理（前回から追加・変更されたファイルのみ処理）",
+            variable=self.incremental_batch_var
+        ).pack(anchor='w', padx=10, pady=(0, 5))
+        
         # 自治体設定
         municipality_frame = ttk.LabelFrame(right_frame, text="🏢 自治体設定")
         municipality_frame.pack(fill='x', pady=(0, 10))
@@ -441,6 +465,7 @@ class TaxDocumentRenamerV5:
 
     def _simplified_folder_rename_background(self, folder_path, yymm):
         """左側専用：右側エンジン完全排除版 シンプルフォルダリネーム"""
+        self._wait_for_tesseract()
         try:
             processed_count = 0
             total_files = []
@@ -911,27 +936,38 @@ class TaxDocumentRenamerV5:
         self._cached_municipality_sets = None  # 前回のキャッシュをクリア
         self.municipality_sets = self._get_municipality_sets()
         
-        # YYMMフォルダを作成（重複時は_2, _3と連番で作成）
         yymm = self.year_month_var.get()
-        base_output_folder = os.path.join(source_folder, yymm)
         
-        # 既存フォルダがある場合は連番を追加
-        counter = 1
-        output_folder = base_output_folder
+        # 増分処理: 前回と同じYYMMの出力先が残っていれば、未変更ファイルの出力をそのまま再利用
+        run_manifest = create_run_manifest(source_folder, logger=self.logger) if self.incremental_batch_var.get() else None
+        output_folder = run_manifest.latest_output_folder(yymm) if run_manifest else None
         
-        while os.path.exists(output_folder):
-            counter += 1
-            output_folder = f"{base_output_folder}_{counter}"
+        if output_folder:
+            self._log(f"増分処理: 前回の出力先を使用: {output_folder}")
+        else:
+            # YYMMフォルダを作成（重複時は_2, _3と連番で作成）
+            base_output_folder = os.path.join(source_folder, yymm)
+            
+            # 既存フォルダがある場合は連番を追加
+            counter = 1
+            output_folder = base_output_folder
+            
+            while os.path.exists(output_folder):
+                counter += 1
+                output_folder = f"{base_output_folder}_{counter}"
+            
+            try:
+                os.makedirs(output_folder, exist_ok=True)
+                if counter > 1:
+                    self._log(f"YYMMフォルダ作成（連番）: {output_folder}")
+                else:
+                    self._log(f"YYMMフォルダ作成: {output_folder}")
+            except Exception as e:
+                messagebox.showerror("エラー", f"YYMMフォルダの作成に失敗しました:\n{e}")
+                return
         
-        try:
-            os.makedirs(output_folder, exist_ok=True)
-            if counter > 1:
-                self._log(f"YYMMフォルダ作成（連番）: {output_folder}")
-            else:
-                self._log(f"YYMMフォルダ作成: {output_folder}")
-        except Exception as e:
-            messagebox.showerror("エラー", f"YYMMフォルダの作成に失敗しました:\n{e}")
-            return
+        # ジョブ単位のページテキストストアを新規作成
+        self._reset_page_text_store()
         
         # 【REQ-001】処理済みファイル追跡機能の初期化
         if not hasattr(self, '_processed_files_this_session'):
@@ -955,7 +991,7 @@ class TaxDocumentRenamerV5:
         
         thread = threading.Thread(
             target=self._folder_batch_processing_background,
-            args=(target_files, output_folder),
+            args=(target_files, output_folder, run_manifest),
             daemon=True
         )
         thread.start()
@@ -978,39 +1014,93 @@ class TaxDocumentRenamerV5:
         # 既存の処理メソッドを呼び出し（Bundle Auto-Split常時有効）
         self._start_folder_batch_processing(source_folder)
 
-    def _folder_batch_processing_background(self, target_files, output_folder):
-        """フォルダ一括処理のバックグラウンド処理（v5.4.5 REQ-001/002対応）"""
+    def _reset_page_text_store(self):
+        """ジョブ共有ページテキストストアを作り直し、各エンジンに再設定"""
+        self.page_text_store.close()
+        self.page_text_store = PageTextStore(logger=get_subsystem_logger("page_store"))
+        self.pdf_processor.page_text_store = self.page_text_store
+        self.pre_extract_engine.page_text_store = self.page_text_store
+
+    def _folder_batch_processing_background(self, target_files, output_folder, run_manifest=None):
+        """フォルダ一括処理のバックグラウンド処理（v5.4.5 REQ-001/002対応）
+        
+        抽出・Bundle判定・分類はワーカープロセスで並列実行し、
+        書き込み・命名は入力順にこのスレッドで行う（連番・重複回避の決定性を維持）。
+        run_manifest を渡すと前回から未変更のファイルは処理せず、前回の出力を再利用する。
+        """
+        self._wait_for_tesseract()
+        yymm = self.year_month_var.get()
         try:
             total_files = len(target_files)
             processed_files = 0
             
-            for i, file_path in enumerate(target_files, 1):
-                filename = os.path.basename(file_path)
-                
-                # 【REQ-001】処理済みファイル追跡による重複処理完全排除
+            # 増分処理: 未変更ファイルは前回の出力を再利用
+            if run_manifest is not None:
+                target_files, reused_files = run_manifest.plan(target_files, output_folder, yymm)
+                for file_path in reused_files:
+                    entry = run_manifest.get(file_path)
+                    self.root.after(0, lambda f=os.path.basename(file_path), n=len(entry.outputs):
+                                    self._log(f"[増分] 未変更のため前回の出力を再利用: {f} ({n}件)"))
+                processed_files += len(reused_files)
+            
+            # 【REQ-001】処理済みファイル追跡による重複処理完全排除
+            run_files = []
+            for file_path in target_files:
                 if file_path in self._processed_files_this_session:
+                    filename = os.path.basename(file_path)
                     self.root.after(0, lambda f=filename: self._log(f"[REQ-001] 既処理済みスキップ: {f}"))
                     continue
-                
                 # 処理済みファイルとして記録
                 self._processed_files_this_session.add(file_path)
+                run_files.append(file_path)
+            
+            batch_engine = self._create_parallel_batch_engine()
+            
+            for i, analysis in enumerate(batch_engine.iter_analyses(run_files), 1):
+                file_path = analysis.file_path
+                filename = os.path.basename(file_path)
                 
                 self.root.after(0, lambda f=filename, i=i, total=total_files: self._log(f"処理中 ({i}/{total}): {f}"))
                 
+                if run_manifest is not None:
+                    # 変更されたファイルの前回出力は新しい出力で置き換える
+                    for stale in run_manifest.discard_outputs(file_path, output_folder):
+                        self.root.after(0, lambda s=os.path.basename(stale): self._log(f"[増分] 前回の出力を削除: {s}"))
+                
                 try:
                     # ファイル拡張子による処理分岐
-                    if file_path.lower().endswith('.pdf'):
-                        # PDF処理（既存ロジック）
-                        success = self._process_pdf_file(file_path, output_folder)
-                    elif file_path.lower().endswith('.csv'):
+                    if analysis.kind == 'pdf':
+                        # PDF処理（ワーカーの分析結果を入力順に適用、命名規則はヘッドレスCLIと共通）
+                        success = apply_pdf_analysis(
+                            analysis, output_folder, yymm,
+                            self.pdf_processor, log=self._log,
+                            success_callback=self._add_batch_result_success,
+                            unit_callback=lambda unit, output_path: self._log_detailed_classification_info(
+                                unit.classification, unit.text, unit.classify_filename
+                            ),
+                            # YYMMは分割ページごとに最終分類コードでポリシー解決
+                            yymm_resolver=lambda document_type, f=file_path: self._resolve_yymm_with_policy(
+                                f, document_type
+                            )
+                        )
+                    elif analysis.kind == 'csv':
                         # 【REQ-002】CSV処理（新規実装）
-                        success = self._process_csv_file(file_path, output_folder)
+                        new_filename, document_type = self._process_csv_file(file_path, output_folder)
+                        analysis.outputs.append(new_filename)
+                        analysis.document_types.append(document_type)
+                        success = True
                     else:
                         self.root.after(0, lambda f=filename: self._log(f"未対応ファイル形式: {f}"))
                         continue
                     
                     if success:
                         processed_files += 1
+                    if run_manifest is not None:
+                        if success and analysis.outputs:
+                            run_manifest.record(file_path, output_folder, yymm,
+                                                analysis.outputs, analysis.document_types)
+                        else:
+                            run_manifest.forget(file_path)
                         
                 except Exception as e:
                     self.root.after(0, lambda err=str(e), f=filename: self._log(f"ファイル処理エラー {f}: {err}"))
@@ -1021,86 +1111,34 @@ class TaxDocumentRenamerV5:
         except Exception as e:
             self._log(f"v5.4.5リネーム処理エラー: {str(e)}")
         finally:
+            if run_manifest is not None:
+                run_manifest.save()
+            stats = dict(self.page_text_store.stats)
+            self.page_text_store.close()
+            self.logger.info("[page_store] opened=%s extracted=%s hits=%s",
+                             stats['documents_opened'], stats['pages_extracted'], stats['cache_hits'])
             self.root.after(0, self._rename_processing_finished)
 
-    def _process_pdf_file(self, file_path: str, output_folder: str) -> bool:
-        """PDF ファイル処理（既存ロジック）"""
-        try:
-            # v5.4.2統一処理: 常に pre-extract → 決定論的リネーム経路
-            gui_yymm = self.year_month_var.get()
-            ui_context = create_ui_context_from_gui(
-                yymm_var_value=gui_yymm,
-                municipality_sets=getattr(self, 'municipality_sets', {}),
-                batch_mode=True,
-                debug_mode=False
-            )
-            
-            # ファイル処理（Bundle分割含む）
-            # まず分割を試行（Bundleファイルの場合）
-            split_result = self.pdf_processor.maybe_split_pdf(
-                input_pdf_path=file_path,
-                out_dir=output_folder,
-                force=False,
-                processing_callback=None
-            )
-            
-            if split_result['success']:
-                # Bundle分割が成功した場合
-                filename = os.path.basename(file_path)
-                self.root.after(0, lambda f=filename: self._log(f"Bundle分割完了: {f}"))
-                
-                # Bundle分割後の各ファイルをリネーム処理
-                if split_result.get('split_files'):
-                    split_files = split_result.get('split_files', [])
-                    for split_file_path in split_files:
-                        try:
-                            # 分割後ファイルにもリネーム処理を適用
-                            user_yymm = self._resolve_yymm_with_policy(split_file_path, None)
-                            snapshot = self.pre_extract_engine.build_snapshot(split_file_path, user_provided_yymm=user_yymm, ui_context=ui_context.to_dict())
-                            success = self._process_single_file_v5_with_snapshot(split_file_path, output_folder, snapshot)
-                            if success:
-                                split_filename = os.path.basename(split_file_path)
-                                self.root.after(0, lambda sf=split_filename: self._log(f"分割後ファイル処理完了: {sf}"))
-                            
-                            # 一時ファイル削除処理
-                            if os.path.exists(split_file_path) and os.path.basename(split_file_path).startswith("__split_"):
-                                try:
-                                    # 一時ファイルを削除（未分類移動せず）
-                                    os.remove(split_file_path)
-                                    split_filename = os.path.basename(split_file_path)
-                                    self.root.after(0, lambda sf=split_filename: self._log(f"[cleanup] 一時ファイル削除: {sf}"))
-                                except Exception as cleanup_error:
-                                    split_filename = os.path.basename(split_file_path)
-                                    error_msg = str(cleanup_error)
-                                    self.root.after(0, lambda sf=split_filename, err=error_msg:
-                                                   self._log(f"[cleanup] 一時ファイル削除失敗 {sf}: {err}"))
-                            
-                        except Exception as e:
-                            split_filename = os.path.basename(split_file_path)
-                            error_msg = str(e)
-                            self.root.after(0, lambda err=error_msg, sf=split_filename: self._log(f"分割後ファイル処理エラー {sf}: {err}"))
-                            # エラー時は一時ファイルを削除
-                            try:
-                                if os.path.exists(split_file_path):
-                                    os.remove(split_file_path)
-                                    split_filename = os.path.basename(split_file_path)
-                                    self.root.after(0, lambda sf=split_filename: self._log(f"[error-recovery] エラーファイルを削除: {sf}"))
-                            except Exception as recovery_error:
-                                error_msg = str(recovery_error)
-                                self.root.after(0, lambda err=error_msg: self._log(f"[error-recovery] ファイル削除失敗: {err}"))
-                
-                return True
-            else:
-                # 通常の単一ファイル処理 - スナップショットを作成してから処理
-                user_yymm = self._resolve_yymm_with_policy(file_path, None)
-                snapshot = self.pre_extract_engine.build_snapshot(file_path, user_provided_yymm=user_yymm, ui_context=ui_context.to_dict())
-                return self._process_single_file_v5_with_snapshot(file_path, output_folder, snapshot)
-                
-        except Exception as e:
-            filename = os.path.basename(file_path)
-            error_msg = str(e)
-            self.root.after(0, lambda err=error_msg, f=filename: self._log(f"PDF処理エラー {f}: {err}"))
-            return False
+    def _create_parallel_batch_engine(self):
+        """フォルダ一括処理用の並列エンジンを作成（自治体セットを引き渡す）"""
+        municipality_sets = getattr(self, '_cached_municipality_sets', None)
+        if municipality_sets is None:
+            municipality_sets = self._get_municipality_sets()
+            self._cached_municipality_sets = municipality_sets
+        
+        return create_parallel_batch_engine(
+            municipality_sets=municipality_sets,
+            max_workers=self.batch_max_workers,
+            file_identity_db=self.pre_extract_engine.snapshot_dir / FILE_IDENTITY_DB_NAME,
+            logger=get_subsystem_logger("parallel")
+        )
+
+    def _add_batch_result_success(self, file_path: str, new_filename: str, doc_type: str,
+                                  method: str, confidence: str, matched_keywords: List[str]):
+        """一括処理の出力1件を結果一覧に追加（ワーカースレッドから呼び出し可）"""
+        self.root.after(0, lambda: self._add_result_success(
+            file_path, new_filename, doc_type, self._get_method_display(method), confidence, matched_keywords
+        ))
 
     def _process_csv_file(self, file_path: str, output_folder: str) -> bool:
         """【REQ-002】CSV ファイル処理（仕訳帳対応）"""
@@ -1139,35 +1177,14 @@ class TaxDocumentRenamerV5:
     def _is_csv_journal(self, file_path: str) -> bool:
         """CSVファイルが仕訳帳かどうかを判定"""
         try:
-            import csv
-            import codecs
-            
             # ファイル名による判定
             filename = os.path.basename(file_path).lower()
             if '仕訳' in filename or 'journal' in filename:
                 return True
             
-            # CSV内容による判定（ヘッダー行を確認）
-            encodings = ['utf-8', 'shift_jis', 'cp932', 'utf-8-sig']
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        reader = csv.reader(f)
-                        header = next(reader, None)
-                        if header:
-                            header_text = ''.join(header).lower()
-                            # 仕訳帳特有のキーワードを検索
-                            journal_keywords = ['借方', '貸方', 'debit', 'credit', '勘定科目', '仕訳']
-                            if any(keyword in header_text for keyword in journal_keywords):
-                                return True
-                    break  # 正常に読めたらループを抜ける
-                except UnicodeDecodeError:
-                    continue  # 次のエンコーディングを試す
-                except Exception:
-                    continue
-            
-            return False
+            # ヘッダー行による判定（先頭数KBのみ読む）
+            sniff = self.csv_processor.sniff_csv(file_path)
+            return sniff is not None and sniff.is_journal
             
         except Exception:
             return False
@@ -1382,23 +1399,57 @@ class TaxDocumentRenamerV5:
         
         # Debug log for Bundle splitting files
         if filename.startswith("__split_"):
-            print(f"[DEBUG_TEST] Bundle分割ファイル処理: {filename}")
-            print(f"[DEBUG_TEST] job_context存在: {job_context is not None}")
+            self.logger.debug("[DEBUG_TEST] Bundle分割ファイル処理: %s", filename)
+            self.logger.debug("[DEBUG_TEST] job_context存在: %s", job_context is not None)
             if job_context:
-                print(f"[DEBUG_TEST] job_context.current_municipality_sets: {getattr(job_context, 'current_municipality_sets', None)}")
+                self.logger.debug("[DEBUG_TEST] job_context.current_municipality_sets: %s", getattr(job_context, 'current_municipality_sets', None))
         
-        # 分類実行（従来通り）
+        # 分類実行（スナップショット作成時に抽出済みのテキストをストアから再利用）
         try:
-            import fitz
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
+            text = self.page_text_store.document_text(file_path)
         except Exception as e:
             self._log(f"PDF読み取りエラー: {e}")
             text = ""
         
+        resolved = self._resolve_pdf_output_path(text, filename, output_folder, job_context)
+        if resolved is None:
+            return None  # 空白ページは処理をスキップ
+        output_path, final_document_type, classification_result = resolved
+        
+        # デバッグ: フォルダ存在確認
+        output_dir = os.path.dirname(output_path)
+        if not os.path.exists(output_dir):
+            self._log(f"[DEBUG] 出力フォルダが存在しません: {output_dir}")
+            os.makedirs(output_dir, exist_ok=True)
+            self._log(f"[DEBUG] 出力フォルダを作成しました: {output_dir}")
+        
+        import shutil
+        self._log(f"[DEBUG] ファイルコピー開始: {file_path} -> {output_path}")
+        try:
+            shutil.copy2(file_path, output_path)
+            # コピー結果を確認
+            if os.path.exists(output_path):
+                file_size = os.path.getsize(output_path)
+                self._log(f"[DEBUG] ファイルコピー成功: {output_path} ({file_size} bytes)")
+            else:
+                self._log(f"[ERROR] ファイルコピー失敗: {output_path} が作成されませんでした")
+        except Exception as e:
+            self._log(f"[ERROR] ファイルコピーエラー: {str(e)}")
+            raise
+        
+        # 結果追加
+        self._record_pdf_result(file_path, output_path, final_document_type, classification_result, text, filename)
+        
+        # リネーム後のファイルパスを返す
+        return output_path
+
+    def _resolve_pdf_output_path(self, text: str, filename: str, output_folder: str,
+                                 job_context: Optional['JobContext'] = None):
+        """分類・ファイル名生成を行い出力先パスを決定（ファイルは書き込まない）
+        
+        Returns:
+            (出力パス, 最終書類種別, 分類結果) のタプル。空白ページの場合は None
+        """
         # 空白ページ除外チェック
         if self._should_exclude_blank_page(text, filename):
             self._log(f"[exclude] 空白ページとして除外: {filename}")
@@ -1425,10 +1476,7 @@ class TaxDocumentRenamerV5:
         self._log(f"[v5.4.2] 決定論的独立化処理：分割・非分割統一")
         
         # 信頼度チェック：0.00かつ9999_未分類の場合は空白ページ可能性を再チェック
-        if (classification_result and 
-            classification_result.confidence == 0.0 and 
-            classification_result.document_type == "9999_未分類" and
-            len(text.strip()) < 100):  # より厳格な条件
+        if is_blank_unclassified(classification_result, text):
             self._log(f"[exclude] 信頼度0.00かつ未分類の短いテキスト - 空白ページとして除外: {filename}")
             return None
             
@@ -1448,44 +1496,27 @@ class TaxDocumentRenamerV5:
             self._log(f"[v5.4.2] 🎯 分類結果: {final_document_type}")
         
         # YYMMポリシーシステムでYYMM値を取得
-        user_yymm = self._resolve_yymm_with_policy(file_path, final_document_type)
+        user_yymm = self._resolve_yymm_with_policy(filename, final_document_type)
         
         # ファイル名生成（市町村連番システム対応）
         new_filename = self._generate_filename(final_document_type, user_yymm, "pdf", classification_result)
         
         # 🔥 段階3：最終ファイル名生成の確認ログ
         if filename.startswith("__split_"):
-            print(f"[FILENAME_DEBUG] 分類結果: {final_document_type}")
-            print(f"[FILENAME_DEBUG] 最終ファイル名: {new_filename}")
+            self.logger.debug("[FILENAME_DEBUG] 分類結果: %s", final_document_type)
+            self.logger.debug("[FILENAME_DEBUG] 最終ファイル名: %s", new_filename)
         
         self._log(f"[v5.4.2] 統一ファイル名生成完了: {new_filename}")
         
-        # ファイルコピー
+        # 出力先パス決定（重複回避）
         output_path = os.path.join(output_folder, new_filename)
         output_path = self._generate_unique_filename(output_path)
         
-        # デバッグ: フォルダ存在確認
-        output_dir = os.path.dirname(output_path)
-        if not os.path.exists(output_dir):
-            self._log(f"[DEBUG] 出力フォルダが存在しません: {output_dir}")
-            os.makedirs(output_dir, exist_ok=True)
-            self._log(f"[DEBUG] 出力フォルダを作成しました: {output_dir}")
-        
-        import shutil
-        self._log(f"[DEBUG] ファイルコピー開始: {file_path} -> {output_path}")
-        try:
-            shutil.copy2(file_path, output_path)
-            # コピー結果を確認
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                self._log(f"[DEBUG] ファイルコピー成功: {output_path} ({file_size} bytes)")
-            else:
-                self._log(f"[ERROR] ファイルコピー失敗: {output_path} が作成されませんでした")
-        except Exception as e:
-            self._log(f"[ERROR] ファイルコピーエラー: {str(e)}")
-            raise
-        
-        # 結果追加
+        return output_path, final_document_type, classification_result
+
+    def _record_pdf_result(self, source_label: str, output_path: str, final_document_type: str,
+                           classification_result, text: str, filename: str):
+        """処理結果を結果一覧と詳細ログに追加"""
         if classification_result:
             confidence = f"{classification_result.confidence:.2f}"
             method = self._get_method_display(classification_result.classification_method)
@@ -1496,64 +1527,61 @@ class TaxDocumentRenamerV5:
             matched_keywords = []
         
         self.root.after(0, lambda: self._add_result_success(
-            file_path, os.path.basename(output_path), final_document_type, 
+            source_label, os.path.basename(output_path), final_document_type, 
             method, confidence, matched_keywords
         ))
         
         self._log_detailed_classification_info(classification_result, text, filename)
-        
-        # リネーム後のファイルパスを返す
-        return output_path
 
     def _get_municipality_sets(self) -> Dict[int, Dict[str, str]]:
         """自治体セット情報を取得 - Bundle分割対応版"""
         municipality_sets = {}
         
-        print(f"[MUNICIPALITY_SETS] 自治体セット情報取得開始")
+        self.logger.debug("[MUNICIPALITY_SETS] 自治体セット情報取得開始")
         
         # UI変数からの取得を試行
         for i in range(1, 4):  # Bundle分割では1-3のみを使用
             pref_var = getattr(self, f'prefecture_var_{i}', None)
             city_var = getattr(self, f'city_var_{i}', None)
             
-            print(f"[MUNICIPALITY_SETS] セット{i}: 変数存在確認 pref={pref_var is not None}, city={city_var is not None}")
+            self.logger.debug("[MUNICIPALITY_SETS] セット%s: 変数存在確認 pref=%s, city=%s", i, pref_var is not None, city_var is not None)
             
             # UI変数が正常に設定されている場合
             if pref_var and city_var:
                 try:
                     pref = pref_var.get().strip()
                     city = city_var.get().strip()
-                    print(f"[MUNICIPALITY_SETS] セット{i}: UI値取得 '{pref}', '{city}'")
+                    self.logger.debug("[MUNICIPALITY_SETS] セット%s: UI値取得 '%s', '%s'", i, pref, city)
                     
                     if pref:  # 都道府県名が設定されている場合のみセット作成
                         municipality_sets[i] = {
                             'prefecture': pref,
                             'city': city
                         }
-                        print(f"[MUNICIPALITY_SETS] UI設定取得: セット{i} = {pref} {city}")
+                        self.logger.debug("[MUNICIPALITY_SETS] UI設定取得: セット%s = %s %s", i, pref, city)
                 except Exception as e:
-                    print(f"[MUNICIPALITY_SETS] UI変数アクセスエラー: セット{i}, {e}")
+                    self.logger.warning("[MUNICIPALITY_SETS] UI変数アクセスエラー: セット%s, %s", i, e)
             else:
-                print(f"[MUNICIPALITY_SETS] セット{i}: 変数が存在しないためスキップ")
+                self.logger.debug("[MUNICIPALITY_SETS] セット%s: 変数が存在しないためスキップ", i)
         
-        print(f"[MUNICIPALITY_SETS] UI取得結果: {municipality_sets}")
+        self.logger.debug("[MUNICIPALITY_SETS] UI取得結果: %s", municipality_sets)
         
         # フォールバック: UI変数から取得できない場合はデフォルト設定を使用
         if not municipality_sets:
-            print(f"[MUNICIPALITY_SETS] フォールバック: デフォルト設定を適用")
+            self.logger.debug("[MUNICIPALITY_SETS] フォールバック: デフォルト設定を適用")
             municipality_sets = {
                 1: {'prefecture': '東京都', 'city': ''},
                 2: {'prefecture': '愛知県', 'city': '蒲郡市'},
                 3: {'prefecture': '福岡県', 'city': '福岡市'}
             }
-            print(f"[MUNICIPALITY_SETS] デフォルト設定適用完了")
+            self.logger.debug("[MUNICIPALITY_SETS] デフォルト設定適用完了")
         
-        print(f"[MUNICIPALITY_SETS] 最終セット情報: {municipality_sets}")
+        self.logger.debug("[MUNICIPALITY_SETS] 最終セット情報: %s", municipality_sets)
         
         # UI変数が取得できない場合の警告
         if len(municipality_sets) < 3:
-            print(f"[MUNICIPALITY_SETS] 警告: 自治体セット情報が不完全です（{len(municipality_sets)}/3セット）")
-            print(f"[MUNICIPALITY_SETS] Bundle分割連番処理に影響する可能性があります")
+            self.logger.warning("[MUNICIPALITY_SETS] 自治体セット情報が不完全です（%s/3セット）", len(municipality_sets))
+            self.logger.warning("[MUNICIPALITY_SETS] Bundle分割連番処理に影響する可能性があります")
         
         self._log(f"セット設定情報: {municipality_sets}")
         return municipality_sets
@@ -1619,12 +1647,12 @@ class TaxDocumentRenamerV5:
         self._log(f"従来モード処理: {os.path.basename(file_path)}")
         # ここに従来の処理ロジックを実装...
 
-    def _process_csv_file(self, file_path: str, output_folder: str):
-        """CSVファイルの処理（従来と同じ）"""
+    def _process_csv_file(self, file_path: str, output_folder: str) -> Tuple[str, str]:
+        """CSVファイルの処理（従来と同じ）。(出力ファイル名, 分類) を返す"""
         filename = os.path.basename(file_path)
         
-        # CSV処理
-        result = self.csv_processor.process_csv(file_path)
+        # CSV処理（年月を手動入力済みなら行データは読まない）
+        result = self.csv_processor.process_csv(file_path, year_month=self.year_month_var.get() or None)
         
         if not result.success:
             raise ValueError(result.error_message)
@@ -1652,6 +1680,7 @@ class TaxDocumentRenamerV5:
         self.root.after(0, lambda: self._add_result_success(
             file_path, new_filename, result.document_type, "CSV判定", "1.00", ["CSV自動判定"]
         ))
+        return new_filename, result.document_type
 
     def _extract_year_month_from_pdf(self, text: str, filename: str) -> str:
         """PDFから年月を抽出"""
@@ -1699,7 +1728,7 @@ class TaxDocumentRenamerV5:
                 self._log(f"[市町村連番システム] 自治体変更版適用: {classification_result.original_doc_type_code} → {final_doc_type}")
         
         # 最終ファイル名生成
-        filename = f"{final_doc_type}_{year_month}.{ext}"
+        filename = output_filename(final_doc_type, year_month, ext)
         self._log(f"[最終ファイル名] {filename}")
         return filename
     
@@ -1855,24 +1884,12 @@ class TaxDocumentRenamerV5:
         return split_files
 
     def _generate_unique_filename(self, filepath: str) -> str:
-        """【修正】重複しないファイル名を生成（履歴保存機能削除）"""
-        # 【修正】ファイル履歴機能を削除し、シンプルな重複チェックのみ実行
-        if not os.path.exists(filepath):
-            return filepath
-        
-        dir_name = os.path.dirname(filepath)
-        base_name = os.path.splitext(os.path.basename(filepath))[0]
-        ext = os.path.splitext(filepath)[1]
-        
-        counter = 1
-        while True:
-            new_filename = f"{base_name}_{counter:03d}{ext}"
-            new_filepath = os.path.join(dir_name, new_filename)
-            if not os.path.exists(new_filepath):
-                # 重複処理のログ出力
-                print(f"[DUPLICATE] {os.path.basename(filepath)} -> {os.path.basename(new_filepath)}")
-                return new_filepath
-            counter += 1
+        """【修正】重複しないファイル名を生成（連番規則は一括処理と共通）"""
+        new_filepath = unique_output_path(os.path.dirname(filepath), os.path.basename(filepath))
+        if new_filepath != filepath:
+            # 重複処理のログ出力
+            self.logger.info("[DUPLICATE] %s -> %s", os.path.basename(filepath), os.path.basename(new_filepath))
+        return new_filepath
 
     def _split_processing_finished(self):
         """分割処理完了時の処理"""
@@ -2002,52 +2019,45 @@ class TaxDocumentRenamerV5:
             self._log(f"キーワード辞書エクスポートエラー: {str(e)}")
 
     def _should_exclude_blank_page(self, ocr_text: str, filename: str) -> bool:
-        """空白ページかどうかを判定"""
-        text = ocr_text.strip()
-        
-        # まず、有意味な税務コンテンツをチェック（優先）
-        meaningful_keywords = [
-            "申告書", "受信通知", "納付", "税務", "法人", "消費税", "地方税",
-            "都道府県", "市町村", "税務署", "都税事務所", "一括償却", "固定資産"
-        ]
-        
-        has_meaningful_content = any(keyword in text for keyword in meaningful_keywords)
-        
-        # 有意味なコンテンツがある場合は除外しない
-        if has_meaningful_content:
-            return False
-        
-        # 除外キーワード
-        exclude_keywords = [
-            "Page", "of", "メッセージ", "file:///", 
-            "Temp", "TzTemp", "AppData"
-        ]
-        
-        # 除外キーワードチェック
-        if any(keyword in text for keyword in exclude_keywords):
-            return True
-        
-        # 非常に短いテキストのチェック（有意味コンテンツがない場合のみ）
-        if len(text) < 30:
-            return True
-        
-        # ファイル名から信頼度の低いページをチェック
-        low_confidence_patterns = [
-            "__split_", "temp", "blank"
-        ]
-        
-        if any(pattern in filename.lower() for pattern in low_confidence_patterns):
-            # 有意味コンテンツがない場合のみ除外
-            if not has_meaningful_content and len(text) < 80:
-                return True
-                
-        return False
+        """空白ページかどうかを判定（ヘッドレス一括処理と共通の規則）"""
+        return should_exclude_blank_page(ocr_text, filename)
+
+    def _start_tesseract_probe(self):
+        """Tesseractの初期化をバックグラウンドで1回だけ実行（エラー時は警告のみ、終了時に _tesseract_ready を立てる）"""
+        with self._tesseract_probe_lock:
+            if self._tesseract_probe_started:
+                return
+            self._tesseract_probe_started = True
+        
+        def probe():
+            try:
+                _init_tesseract(self.logger)
+            except RuntimeError as e:
+                self.logger.warning("Tesseract初期化をスキップ: %s", e)
+                self._log(f"[WARNING] Tesseract初期化をスキップ: {e}（OCR機能は制限されます）")
+            finally:
+                self._tesseract_ready.set()
+        
+        threading.Thread(target=probe, name="tesseract-probe", daemon=True).start()
+
+    def _wait_for_tesseract(self):
+        """OCRを使う処理の前に Tesseract の初期化完了を待つ（未開始ならここで開始）"""
+        if self._tesseract_ready.is_set():
+            return
+        self._start_tesseract_probe()
+        self._log("Tesseractの初期化完了を待機しています...")
+        self._tesseract_ready.wait()
 
     def run(self):
         """アプリケーション実行"""
         self._log("税務書類リネームシステム v5.4.2 起動 (Bundle PDF Auto-Split対応版)")
+        # ウィンドウ表示後に Tesseract を初期化（起動を待たせない）
+        self.root.after_idle(self._start_tesseract_probe)
         self.root.mainloop()
 
 if __name__ == "__main__":
+    # 並列一括処理のワーカープロセス起動に必要（PyInstaller等でexe化した場合）
+    import multiprocessing
+    multiprocessing.freeze_support()
     app = TaxDocumentRenamerV5()
     app.run()
\ No newline at end of file
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+処理段階別ベンチマーク v5.5
+tests/sample_pdfs と合成Bundle（10/50/200ページ）で各段階の所要時間を計測し、
+JSONベースラインと比較して閾値を超える劣化があれば失敗（終了コード1）にする
+
+使用例:
+    python tests/benchmark_pipeline.py --save-baseline        # ベースラインを保存
+    python tests/benchmark_pipeline.py                        # ベースラインと比較
+    python tests/benchmark_pipeline.py --threshold 0.5 --repeat 5
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.classification_v5 import DocumentClassifierV5
+from core.csv_processor import CSVProcessor
+from core.file_identity import FILE_IDENTITY_DB_NAME, configure_shared_file_identity_cache
+from core.page_text_store import PageTextStore
+from core.pdf_processor import PDFProcessor
+from core.pre_extract import PreExtractEngine
+from core.rename_engine import create_rename_engine
+from helpers.job_context import create_job_context_from_gui
+from tests import benchmark_startup
+
+SAMPLE_PDF_DIR = Path(__file__).parent / "sample_pdfs"
+DEFAULT_BASELINE = Path(__file__).parent / "benchmarks" / "pipeline_baseline.json"
+BUNDLE_SIZES = (10, 50, 200)
+CSV_ROWS = 5000
+YYMM = "2508"
+# 起動時インポート時間を計測するモジュール（GUI・ヘッドレスCLI）
+STARTUP_MODULES = ("main", "core.batch")
+
+STAGES = [
+    "detect_bundle_type",
+    "asset_lock_check",
+    "build_snapshot",
+    "build_snapshot_cached",
+    "classify_document_v5",
+    "execute_bundle_split",
+    "compute_filename",
+    "process_csv",
+    "startup_import",
+]
+
+BUNDLE_PAGE_TEXTS = [
+    "申告受付完了通知\n法人事業税 県税事務所 愛知県\n受付番号 1003 提出先 愛知県東三河県税事務所\n申告の種類 確定申告 法人県民税",
+    "納付情報発行結果\n法人二税・特別税 納付区分番号通知\n1004 愛知県 納付書 納付情報\n税目 法人県民税 法人事業税 特別法人事業税",
+    "申告受付完了通知\n法人市民税 蒲郡市役所\n受付番号 2003 提出先 愛知県蒲郡市\n申告の種類 確定申告 法人市民税",
+    "納付情報発行結果\n法人市民税 納付区分番号通知\n2004 蒲郡市 納付書 納付情報\n税目 法人市民税",
+]
+
+
+def create_bundle_pdf(path: str, page_count: int) -> str:
+    """地方税の受信通知・納付情報を繰り返した合成BundlePDFを作成"""
+    doc = fitz.open()
+    for i in range(page_count):
+        page = doc.new_page()
+        for n, line in enumerate(BUNDLE_PAGE_TEXTS[i % len(BUNDLE_PAGE_TEXTS)].split("\n")):
+            page.insert_text((72, 72 + n * 20), line, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def create_journal_csv(path: str, rows: int) -> str:
+    """仕訳帳形式の合成CSVを作成"""
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write("日付,伝票番号,借方勘定科目,借方金額,貸方勘定科目,貸方金額,摘要\n")
+        for i in range(rows):
+            f.write(f"2025/08/{i % 28 + 1:02d},{i + 1},旅費交通費,{(i * 37) % 90000 + 100},"
+                    f"現金,{(i * 37) % 90000 + 100},出張旅費 {i}\n")
+    return path
+
+
+def build_datasets(work_dir: str) -> List[Tuple[str, str]]:
+    """計測対象PDF（データセット名, パス）の一覧"""
+    datasets = [(f"sample/{p.name}", str(p)) for p in sorted(SAMPLE_PDF_DIR.glob("*.pdf"))]
+    for size in BUNDLE_SIZES:
+        path = os.path.join(work_dir, f"bundle_{size}.pdf")
+        datasets.append((f"bundle_{size}", create_bundle_pdf(path, size)))
+    return datasets
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """repeat回実行した所要時間の中央値（秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+class PipelineBenchmark:
+    """段階別ベンチマーク実行クラス"""
+
+    def __init__(self, work_dir: str, repeat: int = 3, logger: Optional[logging.Logger] = None):
+        self.work_dir = work_dir
+        self.repeat = repeat
+        self.logger = logger or logging.getLogger(__name__)
+        self.classifier = DocumentClassifierV5(debug_mode=False)
+        self.rename_engine = create_rename_engine(self.logger)
+        self.csv_processor = CSVProcessor()
+        self.job_context = create_job_context_from_gui(YYMM, batch_mode=True)
+
+    def _fresh_processor(self) -> PDFProcessor:
+        # 各回で新しいストアを使い、テキスト抽出のコストも計測に含める
+        return PDFProcessor(logger=self.logger, page_text_store=PageTextStore(logger=self.logger))
+
+    def run_pdf(self, name: str, pdf_path: str) -> Dict[str, float]:
+        """PDF1件について各段階を計測"""
+        results = {}
+
+        def detect():
+            processor = self._fresh_processor()
+            processor._detect_bundle_type(pdf_path)
+            processor.page_text_store.close()
+        results["detect_bundle_type"] = measure(detect, self.repeat)
+
+        def asset_lock():
+            processor = self._fresh_processor()
+            processor.filename_or_heads_match_assets(pdf_path)
+            processor.page_text_store.close()
+        results["asset_lock_check"] = measure(asset_lock, self.repeat)
+
+        def build_snapshot_cold():
+            # 毎回新しい保存先・エンジン・ファイル同一性キャッシュを使い、
+            # 保存済みスナップショットや前回のファイルMD5の再利用を含めない
+            snapshot_dir = Path(tempfile.mkdtemp(dir=self.work_dir))
+            configure_shared_file_identity_cache(snapshot_dir / FILE_IDENTITY_DB_NAME)
+            engine = PreExtractEngine(logger=self.logger, snapshot_dir=snapshot_dir)
+            try:
+                engine.build_snapshot(pdf_path, user_provided_yymm=YYMM)
+            finally:
+                engine.snapshot_store.close()
+                configure_shared_file_identity_cache(None)
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+        results["build_snapshot"] = measure(build_snapshot_cold, self.repeat)
+
+        # 保存済みスナップショット・ファイルMD5の再利用（2回目以降の投入）は別段階として計測
+        snapshot_dir = Path(self.work_dir) / "snapshots"
+        configure_shared_file_identity_cache(snapshot_dir / FILE_IDENTITY_DB_NAME)
+        engine = PreExtractEngine(logger=self.logger, snapshot_dir=snapshot_dir)
+        snapshot = engine.build_snapshot(pdf_path, user_provided_yymm=YYMM)
+        results["build_snapshot_cached"] = measure(
+            lambda: engine.build_snapshot(pdf_path, user_provided_yymm=YYMM), self.repeat)
+        engine.snapshot_store.close()
+        configure_shared_file_identity_cache(None)
+
+        with fitz.open(pdf_path) as doc:
+            page_texts = [page.get_text() for page in doc]
+
+        def classify():
+            return [self.classifier.classify_document_v5(text, f"__split_{n:03d}.pdf")
+                    for n, text in enumerate(page_texts, start=1)]
+        results["classify_document_v5"] = measure(classify, self.repeat)
+        codes = [r.document_type.split("_")[0] for r in classify()]
+
+        def split():
+            out_dir = tempfile.mkdtemp(dir=self.work_dir)
+            try:
+                self._fresh_processor()._execute_bundle_split(pdf_path, out_dir, "local")
+            finally:
+                shutil.rmtree(out_dir, ignore_errors=True)
+        results["execute_bundle_split"] = measure(split, self.repeat)
+
+        processor = self._fresh_processor()
+        doc_item_ids = [processor._create_doc_item_id(pdf_path, i, text) for i, text in enumerate(page_texts)]
+        processor.page_text_store.close()
+
+        def rename():
+            for doc_item_id, code in zip(doc_item_ids, codes):
+                self.rename_engine.compute_filename(doc_item_id, snapshot, code, job_context=self.job_context)
+        results["compute_filename"] = measure(rename, self.repeat)
+
+        return {f"{stage}/{name}": seconds for stage, seconds in results.items()}
+
+    def run_csv(self) -> Dict[str, float]:
+        """合成仕訳帳CSVの処理を計測"""
+        csv_path = create_journal_csv(os.path.join(self.work_dir, "journal.csv"), CSV_ROWS)
+        seconds = measure(lambda: self.csv_processor.process_csv(csv_path), self.repeat)
+        return {f"process_csv/journal_{CSV_ROWS}": seconds}
+
+    def run_startup(self) -> Dict[str, float]:
+        """新しいプロセスでの起動時インポート時間を計測（-X importtime の累積値）"""
+        results = {}
+        for module in STARTUP_MODULES:
+            reports = benchmark_startup.run(module, self.repeat)
+            results[f"startup_import/{module}"] = statistics.median(r.total_us for r in reports) / 1e6
+        return results
+
+    def run(self) -> Dict[str, float]:
+        """全データセット・全段階を計測（キー: "段階/データセット"、値: 秒）"""
+        results = {}
+        for name, pdf_path in build_datasets(self.work_dir):
+            results.update(self.run_pdf(name, pdf_path))
+        results.update(self.run_csv())
+        results.update(self.run_startup())
+        return results
+
+
+def compare_to_baseline(results: Dict[str, float], baseline: Dict[str, float],
+                        threshold: float, min_delta: float = 0.005) -> List[Dict[str, object]]:
+    """ベースラインと比較し、閾値を超えて遅くなった計測を返す
+
+    Args:
+        results: 今回の計測結果（秒）
+        baseline: ベースラインの計測結果（秒）
+        threshold: 許容する劣化率（0.25で25%まで許容）
+        min_delta: ノイズとして無視する差分の下限（秒）
+    """
+    regressions = []
+    for key, seconds in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        ratio = seconds / base - 1.0
+        if ratio > threshold and seconds - base > min_delta:
+            regressions.append({'key': key, 'baseline': base, 'current': seconds, 'ratio': ratio})
+    return regressions
+
+
+def format_results(results: Dict[str, float], baseline: Optional[Dict[str, float]] = None) -> str:
+    """段階順に並べた計測結果の表"""
+    lines = [f"{'stage/dataset':<56} {'now(ms)':>10} {'base(ms)':>10} {'diff':>8}"]
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    for key in sorted(results, key=lambda k: order.get(k.split("/")[0], len(STAGES))):
+        base = (baseline or {}).get(key)
+        base_col = f"{base * 1000:>10.2f}" if base else f"{'-':>10}"
+        diff_col = f"{(results[key] / base - 1.0) * 100:>+7.1f}%" if base else f"{'':>8}"
+        lines.append(f"{key:<56} {results[key] * 1000:>10.2f} {base_col} {diff_col}")
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, float]]:
+    """ベースラインJSONを読み込む（存在しなければNone）"""
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path: Path, results: Dict[str, float], repeat: int):
+    """計測結果をベースラインJSONとして保存"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': {key: round(seconds, 6) for key, seconds in sorted(results.items())},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="処理段階別ベンチマーク（ベースライン比較付き）")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="ベースラインJSONのパス")
+    parser.add_argument("--save-baseline", action="store_true", help="今回の計測結果をベースラインとして保存")
+    parser.add_argument("--threshold", type=float, default=0.25, help="許容する劣化率（既定: 0.25 = 25%%）")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="無視する差分の下限（ミリ秒）")
+    parser.add_argument("--repeat", type=int, default=3, help="各段階の計測回数（中央値を採用）")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    work_dir = tempfile.mkdtemp(prefix="tax_bench_")
+    try:
+        # 各段階のデバッグ出力は端末に出さない
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = PipelineBenchmark(work_dir, repeat=args.repeat).run()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.repeat)
+        print(format_results(results))
+        print(f"\n✅ ベースラインを保存しました: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    print(format_results(results, baseline))
+    if baseline is None:
+        print(f"\n⚠️ ベースラインがありません（--save-baseline で作成）: {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.threshold, args.min_delta_ms / 1000)
+    if regressions:
+        print(f"\n❌ {len(regressions)}件の段階が閾値 {args.threshold:.0%} を超えて劣化しました")
+        for r in regressions:
+            print(f"  - {r['key']}: {r['baseline'] * 1000:.2f}ms → {r['current'] * 1000:.2f}ms ({r['ratio']:+.0%})")
+        return 1
+
+    print(f"\n✅ 劣化なし（閾値 {args.threshold:.0%}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+ページ単位の正規表現判定 マイクロベンチマーク v5.5
+1ページごとに評価するパターン群（書類コード・書類種別ヒント・税務カテゴリ・資産文書・YYMM推定）について、
+以下の方式で1ページあたりの所要時間を比較する
+
+    string/cache-hit   文字列パターンを re.search に渡す（従来。re の内部キャッシュに残っている場合）
+    string/cache-miss  同上で、re の内部キャッシュが破棄された場合（ページごとに re.purge()）
+    registry           core.regex_registry のコンパイル済みパターン（現行）
+    alternation        パターン群を名前付きグループの選択（p1|p2|...）に統合して1回走査
+
+使用例:
+    python tests/benchmark_regex.py
+    python tests/benchmark_regex.py --repeat 2000
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Pattern, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.regex_registry import (
+    ASSET_TEXT, DOC_HINTS, DOCUMENT_CODE, ERA_HEISEI_YEAR, ERA_REIWA_YEAR, FOUR_DIGITS, FULL_DATE,
+    PERIOD_FROM_TO, REIWA_YEAR_MONTH, TAX_KIND, TAX_PERIOD, PatternFamily,
+)
+from tests.benchmark_pipeline import BUNDLE_PAGE_TEXTS
+
+PAGE_TEXTS = BUNDLE_PAGE_TEXTS + [
+    "法人税及び地方法人税申告書\n内国法人の確定申告 青色申告\n自 2024/04/01 至 2025/03/31\n芝税務署長 殿\n" * 6,
+    "一括償却資産明細表\n資産コード 取得価額 損金算入限度額\n償却方法 耐用年数 決算調整方式\n6002\n" * 6,
+]
+
+# (パターン群, 判定方法) … first: 優先順で最初の一致 / names: 一致した名前 / matching: 一致した全パターン
+PAGE_FAMILIES = [
+    (DOCUMENT_CODE, "first"),
+    (DOC_HINTS, "names"),
+    (TAX_KIND, "first"),
+    (ASSET_TEXT, "matching"),
+]
+PAGE_PATTERNS = [FULL_DATE, ERA_REIWA_YEAR, ERA_HEISEI_YEAR, PERIOD_FROM_TO, REIWA_YEAR_MONTH, FOUR_DIGITS,
+                 TAX_PERIOD]
+
+VARIANTS = ["string/cache-hit", "string/cache-miss", "registry", "alternation"]
+
+
+class _StringPattern:
+    """文字列パターンを毎回 re.search に渡す（従来の呼び出し方）"""
+
+    def __init__(self, compiled: Pattern):
+        self.pattern = compiled.pattern
+        self.flags = compiled.flags
+
+    def search(self, text: str):
+        return re.search(self.pattern, text, self.flags)
+
+
+def _string_family(family: PatternFamily) -> PatternFamily:
+    legacy = PatternFamily([])
+    legacy.items = tuple((name, _StringPattern(pattern)) for name, pattern in family)
+    return legacy
+
+
+def _alternation(family: PatternFamily) -> Callable[[str], set]:
+    """パターン群を (?P<g0>...)|(?P<g1>...) に統合し、1回の走査で一致した名前を集める"""
+    names = {f"g{i}": name for i, (name, _) in enumerate(family)}
+    flags = family.items[0][1].flags if len(family) else 0
+    merged = re.compile("|".join(f"(?P<g{i}>{p.pattern})" for i, (_, p) in enumerate(family)), flags)
+    return lambda text: {names[m.lastgroup] for m in merged.finditer(text)}
+
+
+def build_page_checks() -> Dict[str, Callable[[str], None]]:
+    """方式ごとの「1ページ分の判定」関数"""
+    def run_families(families: Sequence[PatternFamily], patterns: Sequence, text: str):
+        for family, (_, method) in zip(families, PAGE_FAMILIES):
+            getattr(family, method)(text)
+        for pattern in patterns:
+            pattern.search(text)
+
+    legacy_families = [_string_family(family) for family, _ in PAGE_FAMILIES]
+    legacy_patterns = [_StringPattern(p) for p in PAGE_PATTERNS]
+    registry_families = [family for family, _ in PAGE_FAMILIES]
+    merged = [_alternation(family) for family, _ in PAGE_FAMILIES]
+
+    def cache_miss(text: str):
+        re.purge()
+        run_families(legacy_families, legacy_patterns, text)
+
+    def alternation(text: str):
+        for scan in merged:
+            scan(text)
+        for pattern in PAGE_PATTERNS:
+            pattern.search(text)
+
+    return {
+        "string/cache-hit": lambda text: run_families(legacy_families, legacy_patterns, text),
+        "string/cache-miss": cache_miss,
+        "registry": lambda text: run_families(registry_families, PAGE_PATTERNS, text),
+        "alternation": alternation,
+    }
+
+
+def run(repeat: int = 500, texts: Optional[List[str]] = None) -> Dict[str, float]:
+    """方式ごとの1ページあたり所要時間（マイクロ秒、ページ平均の中央値）"""
+    texts = texts or PAGE_TEXTS
+    results = {}
+    for variant, check in build_page_checks().items():
+        samples = []
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for text in texts:
+                    check(text)
+            samples.append((time.perf_counter() - started) / (repeat * len(texts)) * 1e6)
+        results[variant] = statistics.median(samples)
+    return results
+
+
+def format_results(results: Dict[str, float]) -> str:
+    base = results.get("registry")
+    lines = [f"{'variant':<20} {'us/page':>10} {'vs registry':>12}"]
+    for variant in VARIANTS:
+        ratio = f"{results[variant] / base:>11.2f}x" if base else ""
+        lines.append(f"{variant:<20} {results[variant]:>10.1f} {ratio}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ページ単位の正規表現判定 マイクロベンチマーク")
+    parser.add_argument("--repeat", type=int, default=500, help="ページ群の繰り返し回数")
+    args = parser.parse_args(argv)
+
+    patterns = sum(len(family) for family, _ in PAGE_FAMILIES) + len(PAGE_PATTERNS)
+    print(f"{patterns} patterns × {len(PAGE_TEXTS)} pages (avg {statistics.mean(map(len, PAGE_TEXTS)):.0f} chars)")
+    print(format_results(run(args.repeat)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
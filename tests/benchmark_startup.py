@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+起動時インポート時間レポート v5.5
+新しいPythonプロセスで `python -X importtime -c "import <module>"` を実行し、
+起動時に読み込まれるモジュールと所要時間を集計する。
+遅延インポートの対象（pandas・chardet・OCRスタックなど）が起動時に読み込まれていないかも確認する。
+
+使用例:
+    python tests/benchmark_startup.py                   # main（GUI）の起動時インポート
+    python tests/benchmark_startup.py --module core.batch --top 30
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 起動時ではなく初回使用時に読み込むモジュール（core.lazy_import で遅延）
+DEFERRED_MODULES = ("pandas", "chardet", "pytesseract", "PIL", "tesserocr", "pypdf", "concurrent.futures.process")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+@dataclass
+class ImportEntry:
+    """-X importtime の1行（マイクロ秒）"""
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportReport:
+    """1回の起動時インポート計測結果"""
+    module: str
+    entries: List[ImportEntry]
+
+    @property
+    def total_us(self) -> int:
+        """対象モジュールの累積インポート時間"""
+        return max((e.cumulative_us for e in self.entries if e.name == self.module), default=0)
+
+    @property
+    def loaded(self) -> List[str]:
+        return [e.name for e in self.entries]
+
+    def deferred_loaded(self) -> List[str]:
+        """起動時に読み込まれてしまった遅延対象モジュール"""
+        loaded = set(self.loaded)
+        return [name for name in DEFERRED_MODULES if name in loaded]
+
+    def heaviest(self, top: int = 15, max_depth: int = 2) -> List[ImportEntry]:
+        """浅い階層のモジュールを累積時間の降順で返す"""
+        entries = [e for e in self.entries if e.depth <= max_depth and e.name != self.module]
+        return sorted(entries, key=lambda e: e.cumulative_us, reverse=True)[:top]
+
+
+def parse_importtime(output: str, module: str) -> ImportReport:
+    """-X importtime の出力（標準エラー）を解析"""
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(ImportEntry(name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return ImportReport(module, entries)
+
+
+def measure_import(module: str = "main", python: Optional[str] = None) -> ImportReport:
+    """新しいプロセスでモジュールをインポートし、インポート時間を計測"""
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr, module)
+
+
+def run(module: str = "main", repeat: int = 3) -> List[ImportReport]:
+    """repeat回計測した結果（OSのファイルキャッシュの影響を均すため複数回）"""
+    return [measure_import(module) for _ in range(repeat)]
+
+
+def format_report(reports: List[ImportReport], top: int = 15) -> str:
+    report = min(reports, key=lambda r: r.total_us)
+    totals = [r.total_us / 1000 for r in reports]
+    lines = [
+        f"import {report.module}: median {statistics.median(totals):.1f} ms "
+        f"(min {min(totals):.1f} / max {max(totals):.1f}, {len(reports)} runs, {len(report.entries)} modules)",
+        "",
+        f"{'module':<48} {'cumulative(ms)':>15} {'self(ms)':>10}",
+    ]
+    for entry in report.heaviest(top):
+        lines.append(f"{'  ' * entry.depth + entry.name:<48} {entry.cumulative_us / 1000:>15.1f} "
+                     f"{entry.self_us / 1000:>10.1f}")
+    deferred = report.deferred_loaded()
+    lines.append("")
+    lines.append(f"deferred modules loaded at startup: {', '.join(deferred) if deferred else 'none'}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="起動時インポート時間レポート")
+    parser.add_argument("--module", default="main", help="計測するモジュール（既定: main）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    parser.add_argument("--top", type=int, default=15, help="表示する上位モジュール数")
+    args = parser.parse_args(argv)
+
+    reports = run(args.module, args.repeat)
+    print(format_report(reports, args.top))
+    return 1 if reports[0].deferred_loaded() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+ヘッドレス一括処理 CLI テスト
+python -m core.batch の実行結果・処理速度レポート・自治体セットJSON読み込み、
+GUIと共通の空白ページ除外を確認
+"""
+
+import json
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.batch import load_municipality_sets, main
+
+LOCAL_BUNDLE_PAGES = [
+    "申告受付完了通知\n法人事業税 県税事務所 愛知県\n受付番号 1003 提出先 愛知県東三河県税事務所\n申告の種類 確定申告 法人県民税",
+    "納付情報発行結果\n法人二税・特別税 納付区分番号通知\n1004 愛知県 納付書 納付情報\n税目 法人県民税 法人事業税 特別法人事業税",
+]
+CORPORATE_TAX_PAGES = ["法人税及び地方法人税申告書\n内国法人の確定申告 青色申告\n法人税 申告書 別表一"]
+
+
+def create_text_pdf(path: str, page_texts: list) -> str:
+    """各ページに複数行テキストを書き込んだPDFを作成"""
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        for n, line in enumerate(text.split("\n")):
+            page.insert_text((72, 72 + n * 20), line, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestBatchCLI(unittest.TestCase):
+    """core.batch のエンドツーエンド実行"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "input")
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        os.makedirs(self.input_dir)
+        # 末尾の空白ページ（フッターのみ）はGUIと同じく出力しない
+        create_text_pdf(os.path.join(self.input_dir, "a_bundle.pdf"), LOCAL_BUNDLE_PAGES + ["Page 3 of 3"])
+        create_text_pdf(os.path.join(self.input_dir, "b_corporate.pdf"), CORPORATE_TAX_PAGES)
+
+        self.sets_path = os.path.join(self.temp_dir, "sets.json")
+        with open(self.sets_path, "w", encoding="utf-8") as f:
+            json.dump({"1": {"prefecture": "東京都", "city": ""},
+                       "2": {"prefecture": "愛知県", "city": "蒲郡市"}}, f, ensure_ascii=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_run_and_report(self):
+        """リネーム結果とfiles/sec・pages/sec・段階別時間をレポート"""
+        report_path = os.path.join(self.temp_dir, "report.json")
+        exit_code = main([
+            self.input_dir, self.output_dir, "--yymm", "2508",
+            "--municipality-sets", self.sets_path, "--workers", "1",
+            "--snapshot-dir", os.path.join(self.temp_dir, "snapshots"),
+            "--report-json", report_path,
+        ])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), [
+            "0001_法人税等申告書_2508.pdf", "1004_納付情報_2508.pdf", "1013_受信通知_2508.pdf",
+        ])
+
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual((report["files"], report["pages"], report["outputs"], report["errors"]), (2, 4, 3, 0))
+        self.assertGreater(report["files_per_sec"], 0)
+        self.assertGreater(report["pages_per_sec"], 0)
+        for stage in ("bundle_detect", "extract", "classify", "write"):
+            self.assertIn(stage, report["stages"])
+        # 命名に使わないスナップショットは作成しない
+        self.assertNotIn("snapshot", report["stages"])
+
+    def test_csv_named_from_classification(self):
+        """CSVは分類結果のコードで命名（総勘定元帳を仕訳帳名にしない）"""
+        with open(os.path.join(self.input_dir, "総勘定元帳.csv"), "w", encoding="utf-8") as f:
+            f.write("日付,勘定科目,摘要,借方,貸方,残高\n2025/08/01,現金,売上,1000,,1000\n")
+        with open(os.path.join(self.input_dir, "仕訳帳.csv"), "w", encoding="utf-8") as f:
+            f.write("日付,借方科目,貸方科目,金額\n2025/08/01,現金,売上,1000\n")
+
+        exit_code = main([self.input_dir, self.output_dir, "--yymm", "2508", "--workers", "1"])
+
+        self.assertEqual(exit_code, 0)
+        csv_outputs = sorted(name for name in os.listdir(self.output_dir) if name.endswith(".csv"))
+        self.assertEqual(csv_outputs, ["5002_総勘定元帳_2508.csv", "5006_仕訳データ_2508.csv"])
+
+    def test_invalid_yymm_rejected(self):
+        """YYMM形式でない値はエラー終了"""
+        with self.assertRaises(SystemExit):
+            main([self.input_dir, self.output_dir, "--yymm", "25-08"])
+
+
+class TestLoadMunicipalitySets(unittest.TestCase):
+    """自治体セットJSONの形式"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, data) -> str:
+        path = os.path.join(self.temp_dir, "sets.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        return path
+
+    def test_supported_formats(self):
+        """辞書形式・リスト形式・GUI設定形式が同じ結果になる"""
+        expected = {1: {"prefecture": "東京都", "city": ""}, 2: {"prefecture": "愛知県", "city": "蒲郡市"}}
+        as_list = [{"set_number": 1, "prefecture": "東京都", "city": ""},
+                   {"set_number": 2, "prefecture": "愛知県", "city": "蒲郡市"}]
+
+        self.assertEqual(load_municipality_sets(self._write(
+            {"1": {"prefecture": "東京都", "city": ""}, "2": {"prefecture": "愛知県", "city": "蒲郡市"}})), expected)
+        self.assertEqual(load_municipality_sets(self._write(as_list)), expected)
+        self.assertEqual(load_municipality_sets(self._write({"municipality_sets": as_list})), expected)
+        self.assertEqual(load_municipality_sets(None), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
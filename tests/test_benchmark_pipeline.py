@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+処理段階別ベンチマーク テスト
+ベースライン保存・読み込みと劣化判定（閾値・ノイズ下限）を確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.benchmark_pipeline import compare_to_baseline, load_baseline, save_baseline
+
+
+class TestBaselineComparison(unittest.TestCase):
+    """compare_to_baseline の判定"""
+
+    def test_regression_beyond_threshold(self):
+        """閾値を超えて遅くなった段階のみ劣化として返す"""
+        baseline = {"classify_document_v5/bundle_50": 0.100, "build_snapshot/bundle_50": 0.100}
+        results = {"classify_document_v5/bundle_50": 0.140, "build_snapshot/bundle_50": 0.120}
+        regressions = compare_to_baseline(results, baseline, threshold=0.25)
+        self.assertEqual([r['key'] for r in regressions], ["classify_document_v5/bundle_50"])
+        self.assertAlmostEqual(regressions[0]['ratio'], 0.40)
+
+    def test_small_delta_and_new_keys_ignored(self):
+        """ノイズ下限未満の差分とベースラインにない計測は判定対象外"""
+        baseline = {"detect_bundle_type/bundle_10": 0.001}
+        results = {"detect_bundle_type/bundle_10": 0.003, "process_csv/journal_5000": 1.0}
+        self.assertEqual(compare_to_baseline(results, baseline, threshold=0.25, min_delta=0.005), [])
+        self.assertEqual(len(compare_to_baseline(results, baseline, threshold=0.25, min_delta=0.0)), 1)
+
+
+class TestBaselineFile(unittest.TestCase):
+    """ベースラインJSONの保存・読み込み"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """保存した計測結果をそのまま読み込める、未作成ならNone"""
+        path = Path(self.temp_dir) / "benchmarks" / "baseline.json"
+        self.assertIsNone(load_baseline(path))
+        save_baseline(path, {"compute_filename/bundle_10": 0.0123456789}, repeat=3)
+        self.assertEqual(load_baseline(path), {"compute_filename/bundle_10": 0.012346})
+
+
+if __name__ == "__main__":
+    unittest.main()
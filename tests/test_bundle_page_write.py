@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Bundleページ書き込みテスト
+一時ファイルを作らず、各ページを元PDFから最終出力パスへ1回だけ書き込むことを確認
+"""
+
+import logging
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.page_text_store import PageTextStore
+from core.output_naming import apply_pdf_analysis
+from core.parallel_batch import ParallelBatchEngine
+from core.pdf_processor import PDFProcessor
+
+RECEIPT_PAGE = "申告受付完了通知\n法人事業税 県税事務所 愛知県\n受付番号 1003 提出先 愛知県東三河県税事務所\n申告の種類 確定申告 法人県民税"
+PAYMENT_PAGE = "納付情報発行結果\n法人二税・特別税 納付区分番号通知\n1004 愛知県 納付書 納付情報\n税目 法人県民税 法人事業税 特別法人事業税"
+
+
+def create_text_pdf(path: str, page_texts: list) -> str:
+    """各ページに複数行テキストを書き込んだPDFを作成"""
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        for n, line in enumerate(text.split("\n")):
+            page.insert_text((72, 72 + n * 20), line, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestBundlePageWrite(unittest.TestCase):
+    """Bundleの各ページを最終パスへ直接書き込む"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        os.makedirs(self.output_dir)
+        self.store = PageTextStore()
+        self.processor = PDFProcessor(page_text_store=self.store)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_write_pdf_page(self):
+        """指定ページだけを1ページPDFとして書き込む（元PDFはストアで1回だけ開く）"""
+        pdf_path = create_text_pdf(os.path.join(self.temp_dir, "bundle.pdf"), [RECEIPT_PAGE, "", PAYMENT_PAGE])
+        self.assertIn("申告受付完了通知", self.store.page_text(pdf_path, 0))
+
+        output_path = self.processor.write_pdf_page(pdf_path, 3, os.path.join(self.output_dir, "page.pdf"))
+
+        with fitz.open(output_path) as doc:
+            self.assertEqual(doc.page_count, 1)
+            self.assertIn("納付情報発行結果", doc[0].get_text())
+        self.assertEqual(self.store.stats['documents_opened'], 1)
+
+    def test_batch_bundle_writes_final_names_only(self):
+        """同種ページが続いても上書きせず、一時ファイル（__split_）を残さない"""
+        pdf_path = create_text_pdf(os.path.join(self.temp_dir, "bundle.pdf"), [RECEIPT_PAGE] + [PAYMENT_PAGE] * 19)
+        (analysis,) = ParallelBatchEngine(max_workers=1).iter_analyses([pdf_path])
+        self.assertTrue(analysis.is_bundle)
+        self.assertEqual([unit.page_number for unit in analysis.units], list(range(1, 21)))
+        self.assertIn('extract', analysis.timings)
+        self.assertIn('classify', analysis.timings)
+
+        written = []
+        success = apply_pdf_analysis(
+            analysis, self.output_dir, "2508", self.processor, log=lambda msg: None,
+            success_callback=lambda src, new, *args: written.append(new)
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(len(written), 20)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), sorted(written))
+        self.assertEqual(written[:3], ["1003_受信通知_2508.pdf", "1004_納付情報_2508.pdf", "1004_納付情報_2508_001.pdf"])
+        self.assertFalse(any(name.startswith("__split_") for name in os.listdir(self.output_dir)))
+        for name in written:
+            with fitz.open(os.path.join(self.output_dir, name)) as doc:
+                self.assertEqual(doc.page_count, 1)
+        self.assertIn('write', analysis.timings)
+
+    def test_execute_bundle_split_writes_callback_paths(self):
+        """分割経路も各ページをコールバックが決めた最終パスへ1回だけ書き込む"""
+        pdf_path = create_text_pdf(os.path.join(self.temp_dir, "bundle.pdf"), [RECEIPT_PAGE, PAYMENT_PAGE])
+        calls = []
+
+        def name_page(page_number, bundle_type, doc_item_id, page_text):
+            calls.append((page_number, bundle_type, doc_item_id.page_index))
+            return os.path.join(self.output_dir, "1003_受信通知.pdf" if "受付完了" in page_text else "1004_納付情報.pdf")
+
+        result = self.processor._execute_bundle_split(pdf_path, self.output_dir, "local", name_page)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(calls, [(1, "local", 0), (2, "local", 1)])
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["1003_受信通知.pdf", "1004_納付情報.pdf"])
+        self.assertEqual(self.store.stats['documents_opened'], 1)
+
+    def test_execute_bundle_split_without_callback(self):
+        """コールバックなしでは split_file_pattern の名前で書き込む"""
+        pdf_path = create_text_pdf(os.path.join(self.temp_dir, "bundle.pdf"), [RECEIPT_PAGE, PAYMENT_PAGE])
+        result = self.processor._execute_bundle_split(pdf_path, self.output_dir, "local")
+        self.assertEqual([os.path.basename(path) for path in result['split_files']],
+                         ["bundle_001.pdf", "bundle_002.pdf"])
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["bundle_001.pdf", "bundle_002.pdf"])
+
+    def test_page_hint_skipped_unless_debug(self):
+        """DEBUG無効時はページヒントのための分類を行わない"""
+        calls = []
+        self.processor._get_page_classifier = lambda: calls.append("classifier")
+        self.processor.logger.setLevel(logging.INFO)
+        self.processor._log_page_hint(1, RECEIPT_PAGE, "receipt")
+        self.assertEqual(calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
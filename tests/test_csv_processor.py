@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+CSV処理エンジン テスト
+先頭サンプルからの形式判定（ヘッダーのみの分類）・チャンク単位の1パス集計・日付列からのYYMM抽出を確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from core.csv_processor import CSVProcessor
+
+JOURNAL_HEADER = ["日付", "伝票番号", "借方科目", "貸方科目", "金額", "摘要"]
+
+
+def write_csv(path: str, rows: list, encoding: str = "cp932", sep: str = ",") -> str:
+    with open(path, "w", encoding=encoding, newline="") as f:
+        for row in rows:
+            f.write(sep.join(row) + "\n")
+    return path
+
+
+def journal_rows(count: int, date_format: str = "2025/08/{day:02d}") -> list:
+    return [JOURNAL_HEADER] + [
+        [date_format.format(day=i % 28 + 1), str(i), "現金", "売上", str(i * 100), "摘要"] for i in range(count)
+    ]
+
+
+class TestCSVProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.processor = CSVProcessor()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.temp_dir, name)
+
+    def test_process_journal(self):
+        """cp932・UTF-8(BOM付き)・タブ区切りの仕訳帳を同じ結果で処理"""
+        for name, encoding, sep in [("cp932.csv", "cp932", ","), ("bom.csv", "utf-8-sig", ","),
+                                    ("tab.csv", "cp932", "\t")]:
+            path = write_csv(self._path(name), journal_rows(3000), encoding=encoding, sep=sep)
+            result = self.processor.process_csv(path)
+            self.assertTrue(result.success, name)
+            self.assertEqual((result.document_type, result.year_month, result.row_count),
+                             ("5006_仕訳データ", "2508", 3000), name)
+            self.assertEqual(result.columns, JOURNAL_HEADER, name)
+
+    def test_stream_stats_constant_chunks(self):
+        """チャンク単位の1パスで行数・最小/最大日付・列検証を集計"""
+        rows = [JOURNAL_HEADER] + [["2025/8/{}".format(i % 28 + 1), str(i), "現金", "売上", "100", "摘要"]
+                                   for i in range(2500)]
+        rows[1500][0] = "2025/09/30"
+        rows[2000][0] = "不明"
+        path = write_csv(self._path("journal.csv"), rows)
+        stats = self.processor.stream_csv_stats(path, chunksize=1000)
+        self.assertEqual((stats.row_count, stats.date_column, stats.invalid_date_rows), (2500, "日付", 1))
+        self.assertEqual((stats.min_date.strftime("%Y-%m-%d"), stats.max_date.strftime("%Y-%m-%d")),
+                         ("2025-08-01", "2025-09-30"))
+        self.assertEqual((stats.year_month, stats.missing_columns), ("2508", []))
+
+    def test_stream_stats_without_date_column(self):
+        """日付列がなければ先頭列で行数のみ集計し、想定列の不足を報告"""
+        trial = write_csv(self._path("残高試算表.csv"), [["科目", "借方残高"]] + [["現金", "1"]] * 5)
+        stats = self.processor.stream_csv_stats(trial)
+        self.assertEqual((stats.row_count, stats.date_column, stats.year_month), (5, None, None))
+        self.assertEqual(stats.missing_columns, ["貸方残高"])
+
+    def test_stream_falls_back_to_csv_reader(self):
+        """pandasで読めないファイルも csv.reader で同じ集計"""
+        path = write_csv(self._path("journal.csv"), journal_rows(30))
+        sniff = self.processor.sniff_csv(path)
+        with mock.patch("core.csv_processor.pd.read_csv", side_effect=ValueError("parser")):
+            stats = self.processor.stream_csv_stats(path, sniff=sniff, chunksize=7)
+        self.assertEqual((stats.row_count, stats.year_month, stats.max_date.day), (30, "2508", 28))
+
+    def test_sniff_reads_header_only(self):
+        """先頭数KBだけで分類・区切り文字・日付列を判定"""
+        path = write_csv(self._path("ledger.csv"), journal_rows(50000), sep="\t")
+        sniff = self.processor.sniff_csv(path, sample_bytes=4096)
+        self.assertEqual((sniff.document_type, sniff.delimiter, sniff.date_column, sniff.encoding),
+                         ("5006_仕訳データ", "\t", "日付", "cp932"))
+        self.assertTrue(sniff.is_journal)
+        self.assertIsNone(sniff.year_month)
+
+        trial = write_csv(self._path("試算表_20250331.csv"), [["科目", "借方残高", "貸方残高"], ["現金", "1", "2"]])
+        sniff = self.processor.sniff_csv(trial)
+        self.assertEqual((sniff.document_type, sniff.year_month, sniff.date_column), ("5004_残高試算表", "2503", None))
+        self.assertTrue(sniff.is_journal)   # 借方を含む列名
+
+    def test_known_year_month_skips_body(self):
+        """年月が指定済み・ファイル名から取れる場合は本体を読まない"""
+        path = write_csv(self._path("journal.csv"), journal_rows(100))
+        with mock.patch.object(self.processor, "stream_csv_stats") as read_rows:
+            result = self.processor.process_csv(path, year_month="2509")
+        read_rows.assert_not_called()
+        self.assertEqual((result.success, result.year_month, result.row_count), (True, "2509", 0))
+
+    def test_year_month_from_values(self):
+        """日付列の先頭の有効値から抽出（0埋めなしの日付も解釈）"""
+        extract = self.processor._extract_year_month_from_values
+        self.assertEqual(extract(pd.Series(["摘要", "2024-12-05", "2025/01/01"])), "2412")
+        self.assertEqual(extract(pd.Series(["20250915"])), "2509")
+        self.assertEqual(extract(pd.Series(["2025/8/1"])), "2508")
+        self.assertIsNone(extract(pd.Series(["なし"])))
+
+    def test_filename_date_takes_priority(self):
+        path = write_csv(self._path("仕訳帳_20250331.csv"), journal_rows(5))
+        self.assertEqual(self.processor.process_csv(path).year_month, "2503")
+
+    def test_header_only_falls_back(self):
+        """データ行がないCSVは従来の読み込みで処理"""
+        path = write_csv(self._path("empty.csv"), [JOURNAL_HEADER])
+        self.assertEqual(self.processor.stream_csv_stats(path).row_count, 0)
+        self.assertTrue(self.processor.process_csv(path).success)
+
+
+if __name__ == "__main__":
+    unittest.main()
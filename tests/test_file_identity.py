@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ファイル同一性キャッシュ テスト
+stat が変わらないファイルはMD5を再計算せず、変更されたファイルは計算し直すことを確認
+"""
+
+import hashlib
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import file_identity
+from core.file_identity import FileIdentityCache
+from core.models import compute_file_md5
+from core.page_text_store import PageTextStore
+
+
+class TestComputeFileMD5(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_matches_hashlib(self):
+        """空ファイル・チャンク境界をまたぐ大きいファイルでも hashlib と一致"""
+        for name, data in [("empty.bin", b""), ("large.bin", os.urandom(3 * 1024 * 1024 + 17))]:
+            path = os.path.join(self.temp_dir, name)
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(compute_file_md5(path), hashlib.md5(data).hexdigest())
+
+
+class TestFileIdentityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.temp_dir) / "cache" / "file_identity.sqlite3"
+        self.file_path = os.path.join(self.temp_dir, "bundle.pdf")
+        with open(self.file_path, "wb") as f:
+            f.write(b"%PDF-1.7 original")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _hash_calls(self):
+        return mock.patch.object(file_identity, "compute_file_md5", wraps=compute_file_md5)
+
+    def test_unchanged_file_hashed_once(self):
+        """同じファイルの2回目以降は stat のみ"""
+        cache = FileIdentityCache()
+        with self._hash_calls() as hashed:
+            first = cache.md5(self.file_path)
+            second = cache.md5(self.file_path)
+        self.assertEqual(first, second)
+        self.assertEqual(hashed.call_count, 1)
+        self.assertEqual(cache.stats, {'hits': 1, 'computed': 1})
+
+    def test_persisted_for_next_run(self):
+        """永続化したキャッシュは次回実行（別インスタンス）でも再利用"""
+        first_run = FileIdentityCache(self.db_path)
+        expected = first_run.md5(self.file_path)
+        first_run.close()
+
+        next_run = FileIdentityCache(self.db_path)
+        with self._hash_calls() as hashed:
+            self.assertEqual(next_run.md5(self.file_path), expected)
+        hashed.assert_not_called()
+        next_run.close()
+
+    def test_modified_file_rehashed(self):
+        """サイズ・更新時刻が変わったファイルは計算し直す"""
+        cache = FileIdentityCache(self.db_path)
+        before = cache.md5(self.file_path)
+        with open(self.file_path, "wb") as f:
+            f.write(b"%PDF-1.7 modified content")
+        st = os.stat(self.file_path)
+        os.utime(self.file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        after = cache.md5(self.file_path)
+        self.assertNotEqual(before, after)
+        self.assertEqual(after, compute_file_md5(self.file_path))
+        cache.close()
+
+    def test_page_text_store_uses_cache(self):
+        """PageTextStore のファイルMD5は同一性キャッシュ経由"""
+        cache = FileIdentityCache()
+        with self._hash_calls() as hashed:
+            for _ in range(3):
+                with PageTextStore(identity_cache=cache) as store:
+                    store.file_md5(self.file_path)
+        self.assertEqual(hashed.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
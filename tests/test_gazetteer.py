@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+自治体地名辞書 テスト
+トライ木の最長一致走査と、都道府県・市区町村・税事務所の解決、既存の自治体抽出経路への組み込みを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.classification_v5 import DocumentClassifierV5, SUBMISSION_SET_LOCALITIES, get_submission_office_sets
+from core.gazetteer import (
+    KIND_MUNICIPALITY, KIND_OFFICE, KIND_PREFECTURE, NameTrie, create_gazetteer, get_shared_gazetteer,
+)
+from core.ocr_engine import OCREngine
+from core.pre_extract import PreExtractEngine
+from helpers.seq_policy import extract_prefecture_city_from_ocr
+
+
+class TestNameTrie(unittest.TestCase):
+
+    def test_leftmost_longest_without_overlap(self):
+        trie = NameTrie()
+        for name in ["福岡県", "福岡市", "西福岡県税事務所", "岡"]:
+            trie.add(name, name)
+        matches = trie.find_all("福岡県西福岡県税事務所 福岡市岡")
+        self.assertEqual([m.name for m in matches], ["福岡県", "西福岡県税事務所", "福岡市", "岡"])
+        self.assertEqual((matches[1].start, matches[1].end), (3, 11))
+
+    def test_small_kana_variants(self):
+        """ヶ・ケ の表記ゆれは同じ名称として一致"""
+        trie = NameTrie()
+        trie.add("茅ヶ崎市", "茅ヶ崎市")
+        self.assertEqual([m.values for m in trie.find_all("茅ケ崎市役所")], [("茅ヶ崎市",)])
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.gazetteer = get_shared_gazetteer()
+
+    def test_bundled_entries(self):
+        """47都道府県・全市区町村・税事務所を収録"""
+        kinds = {}
+        for name in ["愛知県", "北海道", "蒲郡市", "港区", "東三河県税事務所", "芝税務署", "音威子府村"]:
+            (match,) = self.gazetteer.find_all(name)
+            kinds[name] = {e.kind for e in match.values}
+        self.assertEqual(kinds["北海道"], {KIND_PREFECTURE})
+        self.assertEqual(kinds["港区"], {KIND_MUNICIPALITY})
+        self.assertEqual(kinds["芝税務署"], {KIND_OFFICE})
+        self.assertEqual(kinds["音威子府村"], {KIND_MUNICIPALITY})
+        prefectures = {e.name for e in self.gazetteer.entries if e.kind == KIND_PREFECTURE}
+        self.assertEqual(len(prefectures), 47)
+        municipalities = [e for e in self.gazetteer.entries if e.kind == KIND_MUNICIPALITY]
+        self.assertEqual(len(municipalities), 1741)
+        self.assertEqual(sum(e.name.endswith("町") for e in municipalities), 743)
+        self.assertEqual(sum(e.name.endswith("村") for e in municipalities), 183)
+        office_prefectures = {e.prefecture for e in self.gazetteer.entries if e.kind == KIND_OFFICE}
+        self.assertEqual(office_prefectures, prefectures)
+
+    def test_resolve_office_and_city(self):
+        place = self.gazetteer.resolve("提出先 愛知県 東三河県税事務所 長 殿\n蒲郡市 役所")
+        self.assertEqual((place.prefecture, place.city, place.office), ("愛知県", "蒲郡市", "東三河県税事務所"))
+        self.assertEqual(place.display_name, "愛知県蒲郡市")
+
+        place = self.gazetteer.resolve("東京都港都税事務所長")
+        self.assertEqual((place.prefecture, place.city, place.office), ("東京都", None, "港都税事務所"))
+
+    def test_office_implies_prefecture(self):
+        self.assertEqual(self.gazetteer.resolve("芝税務署長").prefecture, "東京都")
+        self.assertEqual(self.gazetteer.resolve("西福岡県税事務所").prefecture, "福岡県")
+        self.assertEqual(self.gazetteer.resolve("阪神南県税事務所長").prefecture, "兵庫県")
+
+    def test_ambiguous_office_needs_prefecture(self):
+        """同名の税務署は都道府県名と一致する方を採用し、都道府県名と食い違う税事務所は採用しない"""
+        self.assertIsNone(self.gazetteer.resolve("中野税務署長").prefecture)
+        place = self.gazetteer.resolve("長野県 中野税務署長")
+        self.assertEqual((place.prefecture, place.office), ("長野県", "中野税務署"))
+        place = self.gazetteer.resolve("鳥取県 芝税務署")
+        self.assertEqual((place.prefecture, place.office), ("鳥取県", None))
+
+    def test_towns_and_villages(self):
+        """町村も都道府県が確定していれば解決し、町村名だけでは都道府県を推定しない"""
+        self.assertEqual(self.gazetteer.resolve("愛知県額田郡幸田町長").display_name, "愛知県幸田町")
+        self.assertEqual(self.gazetteer.resolve("沖縄県国頭郡東村").city, "東村")
+        self.assertEqual(self.gazetteer.resolve("東村山市長").city, "東村山市")
+        # 住所の町名（千代田区神田錦町）を熊本県錦町とみなさない
+        place = self.gazetteer.resolve("千代田区神田錦町")
+        self.assertEqual((place.prefecture, place.city), ("東京都", "千代田区"))
+        place = self.gazetteer.resolve("栄町1-2 蒲郡市長")
+        self.assertEqual((place.prefecture, place.city), ("愛知県", "蒲郡市"))
+
+    def test_ambiguous_city_needs_prefecture(self):
+        """同名の市は都道府県が確定した場合だけその都道府県の市として扱う"""
+        self.assertEqual(self.gazetteer.resolve("府中市長").prefecture, None)
+        self.assertEqual(self.gazetteer.resolve("広島県府中市").display_name, "広島県府中市")
+        self.assertEqual(self.gazetteer.resolve("蒲郡市長").prefecture, "愛知県")
+        # 別の都道府県の同名区（名古屋市港区など）は採用しない
+        self.assertIsNone(self.gazetteer.resolve("愛知県 港区").city)
+
+    def test_no_false_hit_on_generic_words(self):
+        self.assertIsNone(self.gazetteer.resolve("市町村民税 都道府県民税").display_name)
+
+    def test_office_coverage_per_prefecture(self):
+        """各都道府県に税務署と都道府県税の事務所を収録（地方事務所のない県は都道府県名で判定）"""
+        without_prefectural_offices = {"石川県", "山梨県", "奈良県", "鳥取県", "佐賀県"}
+        for prefecture in (e.name for e in self.gazetteer.entries if e.kind == KIND_PREFECTURE):
+            with self.subTest(prefecture=prefecture):
+                offices = self.gazetteer.entries_in(prefecture, KIND_OFFICE)
+                self.assertTrue(any(e.is_national_tax_office for e in offices))
+                prefectural = [e for e in offices if not e.is_national_tax_office]
+                self.assertEqual(not prefectural, prefecture in without_prefectural_offices)
+
+
+class TestGazetteerResource(unittest.TestCase):
+    """辞書ファイルがない・壊れている場合は例外（空の辞書で黙って動かない）"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, content: str) -> str:
+        path = os.path.join(self.temp_dir, "gazetteer.tsv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_missing_resource(self):
+        with self.assertRaises(FileNotFoundError):
+            create_gazetteer(os.path.join(self.temp_dir, "none.tsv"))
+
+    def test_corrupt_resource(self):
+        for content in ["# 注釈のみ\n",
+                        "prefecture\t愛知県\t愛知県\nmunicipality\t蒲郡市\n",
+                        "prefecture\t愛知県\t愛知県\noffice\t芝税務署\t東京都\t港区\n"]:
+            with self.subTest(content=content):
+                with self.assertRaises(ValueError):
+                    create_gazetteer(self._write(content))
+
+
+class TestSubmissionOfficeSets(unittest.TestCase):
+    """分類器の提出先キーワードは地名辞書から作成"""
+
+    def test_sets_follow_gazetteer(self):
+        office_sets = get_submission_office_sets()
+        self.assertIn("東三河県税事務所", office_sets[2])
+        self.assertIn("愛知県東三河県税事務所", office_sets[2])
+        self.assertIn("芝税務署", office_sets[1])
+        self.assertNotIn("港区", office_sets[1])
+        self.assertIn("福岡市役所", office_sets[3])
+        # 所在市区以外の税務署は含めない
+        self.assertNotIn("豊橋税務署", office_sets[2])
+        gazetteer = get_shared_gazetteer()
+        for set_num, names in office_sets.items():
+            prefecture, city = SUBMISSION_SET_LOCALITIES[set_num]
+            offices = {e.name for e in gazetteer.entries_in(prefecture, KIND_OFFICE)}
+            allowed = {prefecture, city, city + "役所"} | offices | {prefecture + name for name in offices}
+            self.assertLessEqual(set(names), allowed)
+
+
+class TestGazetteerCallers(unittest.TestCase):
+
+    def test_pre_extract_muni_name(self):
+        engine = PreExtractEngine.__new__(PreExtractEngine)
+        self.assertEqual(engine._detect_municipality("愛知県蒲郡市長 殿 市町村民税"), "愛知県蒲郡市")
+        self.assertEqual(engine._detect_municipality("東京都 受信通知 1003"), "東京都")
+        self.assertIsNone(engine._detect_municipality("法人税 申告書"))
+
+    def test_ocr_parse_municipality(self):
+        """OCR結果の解析は従来どおり接尾辞を除いた名称（町村も地名辞書で解決）"""
+        engine = OCREngine(use_cache=False, tesseract_pool=object())
+        info = engine._parse_municipality_text("愛知県東三河県税事務所長 殿 蒲郡市長")
+        self.assertEqual((info.prefecture, info.municipality), ("愛知", "蒲郡"))
+        self.assertEqual(engine._parse_municipality_text("北海道 札幌市").prefecture, "北海道")
+        self.assertEqual(engine._parse_municipality_text("愛知県 幸田町長").municipality, "幸田")
+        info = engine._parse_municipality_text("請求書 株式会社 県知事")
+        self.assertEqual((info.prefecture, info.municipality), (None, None))
+
+    def test_seq_policy_extract(self):
+        self.assertEqual(extract_prefecture_city_from_ocr("福岡県 福岡市長"),
+                         {'prefecture': '福岡県', 'city': '福岡市'})
+        self.assertEqual(extract_prefecture_city_from_ocr(""), {'prefecture': '', 'city': ''})
+
+    def test_classifier_prefers_filename_place(self):
+        """本文の会社住所よりファイル名の市町村を優先し、足りない項目だけ本文から補う"""
+        classifier = DocumentClassifierV5()
+        text = "メトロノーム株式会社 東京都港区芝公園 法人市民税 申告書"
+        self.assertEqual(classifier._extract_pref_city_from_text(text, "メトロノーム 株式会社_福岡市_250731.pdf"),
+                         ("福岡県", "福岡市"))
+        self.assertEqual(classifier._extract_pref_city_from_text("福岡県 福岡市長 殿", "愛知県_250731.pdf"),
+                         ("愛知県", None))
+        self.assertEqual(classifier._extract_pref_city_from_text("愛知県蒲郡市長 殿", "市民税_250731.pdf"),
+                         ("愛知県", "蒲郡市"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+キーワード一括照合エンジン テスト
+Aho–Corasick による1パス照合が従来の部分文字列走査とスコア完全一致することを確認
+"""
+
+import os
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.classification_v5 import DocumentClassifierV5, get_shared_classification_rules_v5
+from core.keyword_matcher import AhoCorasickMatcher
+
+SAMPLE_PDF_DIR = Path(__file__).parent / "sample_pdfs"
+
+
+def load_sample_corpus():
+    """tests/sample_pdfs のPDF（ページ単位）とREADMEからテキストを収集"""
+    corpus = []
+    for pdf_path in sorted(SAMPLE_PDF_DIR.glob("*.pdf")):
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            corpus.extend((page.get_text(), pdf_path.name) for page in doc)
+            corpus.append(("".join(page.get_text() for page in doc), pdf_path.name))
+
+    readme = SAMPLE_PDF_DIR / "README.md"
+    if readme.exists():
+        for block in readme.read_text(encoding="utf-8").split("\n\n"):
+            corpus.append((block, readme.name))
+    return corpus
+
+
+def build_rule_corpus(seed: int = 5):
+    """全ルールのキーワードを組み合わせた合成テキスト（除外語・境界またぎを含む）"""
+    rng = random.Random(seed)
+    rules = get_shared_classification_rules_v5()
+    keywords = sorted({kw for r in rules.values()
+                       for key in ("exact_keywords", "partial_keywords", "exclude_keywords", "filename_keywords")
+                       for kw in r.get(key, ())})
+    corpus = []
+    for doc_type, r in rules.items():
+        for kw in list(r.get("exact_keywords", ())) + list(r.get("filename_keywords", ())):
+            corpus.append((kw, f"{doc_type}.pdf"))
+            corpus.append(("種目 " + kw, kw + ".pdf"))
+        for kw in r.get("exclude_keywords", ()):
+            corpus.append((" ".join(r.get("exact_keywords", ())) + " " + kw, "scan.pdf"))
+    for _ in range(300):
+        text = "".join(rng.choice(keywords) + rng.choice(["", " ", "・", "\n"]) for _ in range(rng.randint(1, 6)))
+        # キーワードを末尾/先頭で分断して結合文字列の境界をまたがせる
+        cut = rng.choice(keywords)
+        split_at = rng.randint(0, len(cut))
+        corpus.append((text + cut[:split_at], cut[split_at:] + rng.choice(keywords) + ".pdf"))
+    return corpus
+
+
+class TestAhoCorasickMatcher(unittest.TestCase):
+    """オートマトン単体の照合結果"""
+
+    def test_find_matches_substring_scan(self):
+        """重複・包含関係のあるキーワードでも `in` と同一結果"""
+        keywords = ["he", "she", "his", "hers", "a", "aa", "aaa", "納付", "納付情報", "付情"]
+        matcher = AhoCorasickMatcher(keywords)
+        rng = random.Random(1)
+        alphabet = "hesira納付情報"
+        for _ in range(500):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            self.assertEqual(matcher.find(text), {k for k in keywords if k in text}, text)
+
+    def test_scan_splits_text_filename_and_combined(self):
+        """1回の走査でテキスト・ファイル名・結合文字列の検出結果を区別"""
+        matcher = AhoCorasickMatcher(["受信通知", "通知 納付", "納付情報", "知"])
+        hits = matcher.scan("申告受信通知", "納付情報.pdf")
+        self.assertEqual(hits.text, {"受信通知", "知"})
+        self.assertEqual(hits.filename, {"納付情報"})
+        self.assertEqual(hits.combined, {"受信通知", "知", "納付情報", "通知 納付"})
+
+
+class TestRuleScoringParity(unittest.TestCase):
+    """分類ルールのスコアが従来実装と完全一致すること"""
+
+    def setUp(self):
+        self.classifier = DocumentClassifierV5(debug_mode=False)
+        self.rules = self.classifier.classification_rules_v5
+        self.corpus = load_sample_corpus() + build_rule_corpus()
+
+    def test_scores_match_legacy_scan(self):
+        """テキスト・ファイル名スコアとAND条件が全ルールで一致"""
+        for raw_text, raw_filename in self.corpus:
+            text = self.classifier._preprocess_text(raw_text)
+            filename = self.classifier._preprocess_text(raw_filename)
+            hits = self.classifier._scan_keywords(text, filename)
+            for doc_type, rules in self.rules.items():
+                with self.subTest(doc_type=doc_type, text=text[:40], filename=filename):
+                    self.assertEqual(
+                        self.classifier._calculate_score(text, rules, "テキスト"),
+                        self.classifier._calculate_score(text, rules, "テキスト", hits=hits.text))
+                    self.assertEqual(
+                        self.classifier._calculate_filename_score(filename, rules),
+                        self.classifier._calculate_filename_score(filename, rules, hits=hits.filename))
+                    for condition in rules.get("highest_priority_conditions", ()):
+                        self.assertEqual(condition.check_match(f"{text} {filename}"),
+                                         condition.check_hits(hits.combined))
+
+    def test_standard_classification_matches_legacy_scan(self):
+        """標準分類の各ルールの総合スコア・除外判定が従来の走査と一致"""
+        self.classifier.debug_mode = True   # debug_steps はデバッグモード時のみ記録
+        for raw_text, raw_filename in self.corpus:
+            text = self.classifier._preprocess_text(raw_text)
+            filename = self.classifier._preprocess_text(raw_filename)
+            result = self.classifier._standard_classification(text, filename)
+            self.assertEqual(len(result.debug_steps), len(self.rules))
+            for step in result.debug_steps:
+                rules = self.rules[step.document_type]
+                text_score, text_keywords = self.classifier._calculate_score(text, rules, "テキスト")
+                filename_score, filename_keywords = self.classifier._calculate_filename_score(filename, rules)
+                has_highest_priority = any(c.check_match(f"{text} {filename}")[0]
+                                           for c in rules.get("highest_priority_conditions", ()))
+                excluded = not has_highest_priority and any(
+                    kw in text or kw in filename for kw in rules.get("exclude_keywords", ()))
+                with self.subTest(doc_type=step.document_type, text=text[:40], filename=filename):
+                    self.assertEqual(step.score, text_score + filename_score * 1.5)
+                    self.assertEqual(step.matched_keywords, text_keywords + filename_keywords)
+                    self.assertEqual(step.excluded, excluded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+遅延インポート テスト
+代理モジュールが初回の属性参照で読み込まれること、
+起動時に pandas・chardet・OCRスタックが読み込まれないこと、インポート時間レポートの解析、
+OCRを使う処理がバックグラウンドの Tesseract 初期化の完了を待つことを確認
+"""
+
+import logging
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import ocr_engine, tesseract_pool
+from core.lazy_import import LazyModule, lazy_module, module_available
+from tests import benchmark_startup
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _json
+import time:       800 |        920 |   json
+import time:      3000 |       3920 | main
+"""
+
+
+class TestLazyModule(unittest.TestCase):
+
+    def test_loaded_on_first_attribute(self):
+        proxy = LazyModule("colorsys")
+        self.assertFalse(proxy.is_loaded)
+        self.assertEqual(proxy.rgb_to_hsv(0, 0, 0), (0, 0, 0))
+        self.assertTrue(proxy.is_loaded)
+
+    def test_shared_proxy(self):
+        """同じモジュール名には同じ代理を返す（テストでの差し替えが全利用箇所に効く）"""
+        self.assertIs(lazy_module("pytesseract"), ocr_engine.pytesseract)
+        self.assertIs(ocr_engine.pytesseract, tesseract_pool.pytesseract)
+        with mock.patch("core.ocr_engine.pytesseract.image_to_string", return_value="text"):
+            self.assertEqual(tesseract_pool.pytesseract.image_to_string(None), "text")
+
+    def test_module_available(self):
+        self.assertTrue(module_available("json"))
+        self.assertFalse(module_available("no_such_module_xyz"))
+
+
+class TestStartupImports(unittest.TestCase):
+
+    def test_deferred_modules_not_loaded(self):
+        modules = ["core.batch", "core.ocr_engine", "core.csv_processor"]
+        if module_available("tkinter"):
+            modules.append("main")
+        for module in modules:
+            with self.subTest(module=module):
+                report = benchmark_startup.measure_import(module)
+                self.assertGreater(report.total_us, 0)
+                self.assertEqual(report.deferred_loaded(), [])
+
+    def test_parse_importtime(self):
+        report = benchmark_startup.parse_importtime(IMPORTTIME_OUTPUT, "main")
+        self.assertEqual(report.total_us, 3920)
+        self.assertEqual([(e.name, e.depth) for e in report.entries], [("_json", 2), ("json", 1), ("main", 0)])
+        self.assertEqual([e.name for e in report.heaviest(top=1)], ["json"])
+        self.assertIn("deferred modules loaded at startup: none", benchmark_startup.format_report([report]))
+
+
+@unittest.skipUnless(module_available("tkinter"), "tkinter is not available")
+class TestTesseractProbe(unittest.TestCase):
+
+    def setUp(self):
+        import main
+        self.main = main
+        self.app = main.TaxDocumentRenamerV5.__new__(main.TaxDocumentRenamerV5)
+        self.app.logger = logging.getLogger("test.tesseract_probe")
+        self.app._tesseract_ready = threading.Event()
+        self.app._tesseract_probe_lock = threading.Lock()
+        self.app._tesseract_probe_started = False
+        self.logged = []
+        self.app._log = self.logged.append
+
+    def test_ocr_entry_waits_for_probe(self):
+        """初期化が終わるまで OCR を使う処理は待機し、初期化は1回だけ"""
+        release = threading.Event()
+        calls = []
+
+        def slow_init(logger):
+            calls.append(logger)
+            release.wait(5)
+
+        with mock.patch.object(self.main, "_init_tesseract", side_effect=slow_init):
+            self.app._start_tesseract_probe()
+            waiter = threading.Thread(target=self.app._wait_for_tesseract)
+            waiter.start()
+            waiter.join(0.2)
+            self.assertTrue(waiter.is_alive())
+            release.set()
+            waiter.join(5)
+            self.assertFalse(waiter.is_alive())
+            self.app._start_tesseract_probe()
+        self.assertEqual(calls, [self.app.logger])
+
+    def test_probe_failure_is_logged_not_printed(self):
+        """Tesseractがなくても待機は解除され、警告はロガーとGUIログに出る（標準出力には出さない）"""
+        with mock.patch.object(self.main, "_init_tesseract", side_effect=RuntimeError("Tesseractが利用できません。")), \
+                mock.patch("builtins.print") as print_mock, \
+                self.assertLogs("test.tesseract_probe", level="WARNING") as logs:
+            self.app._wait_for_tesseract()
+            self.assertTrue(self.app._tesseract_ready.wait(5))
+        print_mock.assert_not_called()
+        self.assertIn("Tesseractが利用できません", logs.output[0])
+        self.assertTrue(any("Tesseract初期化をスキップ" in m for m in self.logged))
+
+
+if __name__ == "__main__":
+    unittest.main()
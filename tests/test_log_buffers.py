@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+処理ログ上限 テスト
+分類エンジンの処理ログ・JobContext の監査ログが上限件数で古いものから破棄されること、
+ルールごとの評価過程（debug_steps）がデバッグモード時のみ記録されることを確認
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.classification_v5 import DocumentClassifierV5
+from helpers.job_context import JobContext
+
+TEXT = "法人税及び地方法人税申告書 内国法人の確定申告 青色申告"
+FILENAME = "法人税申告書.pdf"
+
+
+class TestClassifierProcessingLog(unittest.TestCase):
+
+    def test_processing_log_keeps_latest_entries(self):
+        classifier = DocumentClassifierV5(debug_mode=True, max_log_entries=5)
+        result = classifier.classify_document_v5(TEXT, FILENAME)
+        self.assertIsInstance(result.processing_log, list)
+        self.assertEqual(len(result.processing_log), 5)
+        self.assertIn("最終結果", result.processing_log[-1])   # 古いルール評価ログから破棄
+        self.assertLessEqual(len(classifier.processing_log), 5)
+
+    def test_log_reset_per_document(self):
+        classifier = DocumentClassifierV5(debug_mode=False)
+        first = classifier.classify_document_v5(TEXT, FILENAME)
+        second = classifier.classify_document_v5(TEXT, FILENAME)
+        self.assertEqual(len(first.processing_log), len(second.processing_log))
+
+    def test_debug_steps_only_in_debug_mode(self):
+        result = DocumentClassifierV5(debug_mode=False).classify_document_v5("請求書", "memo.pdf")
+        self.assertEqual(result.debug_steps, [])
+        result = DocumentClassifierV5(debug_mode=True).classify_document_v5("請求書", "memo.pdf")
+        self.assertTrue(result.debug_steps)
+
+
+class TestJobContextAuditLog(unittest.TestCase):
+
+    def test_audit_log_bounded(self):
+        ctx = JobContext(job_id="test", confirmed_yymm="2508", yymm_source="UI", run_config=None,
+                         audit_log_limit=3)
+        for i in range(10):
+            ctx.update_status(f"STEP{i}")
+        self.assertEqual(len(ctx.audit_log), 3)
+        self.assertIn("STEP9", ctx.audit_log[-1])
+        self.assertEqual(ctx.get_summary()["audit_entries"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
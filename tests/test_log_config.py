@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ログ設定 テスト
+サブシステムごとのレベル指定、JSON Lines 出力、無効なレベルでメッセージを組み立てないことを確認
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.classification_v5 import DocumentClassifierV5
+from core.log_config import (
+    LOG_JSON_ENV, LOG_LEVEL_ENV, configure_logging, get_subsystem_logger, log_event, parse_level_spec,
+)
+
+
+class _CountingStr:
+    """文字列化された回数を数える"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "value"
+
+
+class TestLogConfig(unittest.TestCase):
+
+    def setUp(self):
+        self._env = {key: os.environ.pop(key, None) for key in (LOG_LEVEL_ENV, LOG_JSON_ENV)}
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        configure_logging("", console=False)
+        logging.getLogger().setLevel(self.root_level)
+        for key, value in self._env.items():
+            if value is not None:
+                os.environ[key] = value
+
+    def test_parse_level_spec(self):
+        default, levels = parse_level_spec("INFO, classify=DEBUG,core.batch=error")
+        self.assertEqual(default, logging.INFO)
+        self.assertEqual(levels, {"core.classification_v5": logging.DEBUG, "core.batch": logging.ERROR})
+        self.assertEqual(parse_level_spec(None), (None, {}))
+        with self.assertRaises(ValueError):
+            parse_level_spec("split=LOUD")
+
+    def test_subsystem_levels_replaced_on_reconfigure(self):
+        configure_logging("WARNING,split=DEBUG", console=False)
+        self.assertTrue(get_subsystem_logger("split").isEnabledFor(logging.DEBUG))
+        self.assertFalse(get_subsystem_logger("classify").isEnabledFor(logging.INFO))
+
+        configure_logging("INFO", console=False)
+        self.assertFalse(get_subsystem_logger("split").isEnabledFor(logging.DEBUG))
+        self.assertTrue(get_subsystem_logger("classify").isEnabledFor(logging.INFO))
+
+    def test_json_lines_sink(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.jsonl")
+            os.environ[LOG_JSON_ENV] = path
+            configure_logging("INFO", console=False)
+            logger = get_subsystem_logger("batch")
+            logger.info("[batch] Failed: %s", "a.pdf")
+            log_event(logger, logging.INFO, "[batch] Done", files=3, seconds=1.5)
+            logger.debug("[batch] hidden")
+            del os.environ[LOG_JSON_ENV]
+            configure_logging("", console=False)   # ハンドラを閉じる
+
+            with open(path, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f]
+        self.assertEqual([e["message"] for e in entries], ["[batch] Failed: a.pdf", "[batch] Done"])
+        self.assertEqual((entries[1]["files"], entries[1]["seconds"]), (3, 1.5))
+        self.assertEqual(entries[0]["logger"], "core.batch")
+
+    def test_disabled_levels_do_not_format(self):
+        configure_logging("WARNING", console=False)
+        value = _CountingStr()
+        get_subsystem_logger("split").debug("[split] Page %s", value)
+        log_event(get_subsystem_logger("split"), logging.DEBUG, "[split] Stage seconds", value=value)
+
+        classifier = DocumentClassifierV5(debug_mode=False)
+        classifier._log_debug("評価中: %s", value)
+        self.assertEqual(value.calls, 0)
+        self.assertFalse(classifier.processing_log)
+
+        configure_logging("WARNING,classify=DEBUG", console=False)
+        with self.assertLogs(classifier.logger, level="DEBUG") as captured:
+            classifier._log_debug("評価中: %s", value)
+        self.assertEqual(captured.records[0].getMessage(), "評価中: value")
+        self.assertFalse(classifier.processing_log)       # processing_log は debug_mode 時のみ
+
+        classifier = DocumentClassifierV5(debug_mode=True)
+        classifier._log_debug("評価中: %s", value)
+        self.assertTrue(classifier.processing_log[-1].endswith("[DEBUG] 評価中: value"))
+
+    def test_classifier_info_log_stays_off_console_at_info(self):
+        configure_logging("INFO", console=False)
+        classifier = DocumentClassifierV5(debug_mode=False)
+        with self.assertLogs(classifier.logger, level="DEBUG") as captured:
+            classifier._log("最優先AND条件判定開始")
+            classifier._log("分類失敗", "ERROR")
+        self.assertEqual([r.levelno for r in captured.records], [logging.DEBUG, logging.ERROR])
+        self.assertFalse(classifier.logger.isEnabledFor(logging.DEBUG))
+        self.assertEqual(len(classifier.processing_log), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+一括OCR（extract_municipalities_batch）テスト
+1回のドキュメントオープンで複数ページを並列OCRし、ページ順に結果を返すこと、
+一括処理のBundleでテキストレイヤーのないページだけが一括OCRに回ることを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.ocr_engine import OCREngine
+from core.parallel_batch import _BatchWorker
+
+PREFECTURES = ["愛知", "静岡", "三重", "福岡", "長野", "岐阜"]
+BASE_WIDTH = 400
+WIDTH_STEP = 40
+
+
+class FakePool:
+    """切り出し画像の幅からページを特定して県税事務所名を返すOCRバックエンド"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    def image_to_string(self, img, lang=None, config=""):
+        with self.lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            page_width = img.width / 3.0 / 0.66
+            index = round((page_width - BASE_WIDTH) / WIDTH_STEP)
+            return f"{PREFECTURES[index]}県税事務所"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestExtractMunicipalitiesBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.pdf_path = os.path.join(self.temp_dir, "receipts.pdf")
+        doc = fitz.open()
+        for i in range(len(PREFECTURES)):
+            page = doc.new_page(width=BASE_WIDTH + WIDTH_STEP * i, height=600)
+            page.insert_text((72, 72), "申告受付完了通知", fontname="japan")
+        doc.save(self.pdf_path)
+        doc.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_results_in_page_order(self):
+        """要求したページ順に MunicipalityInfo を返す（範囲外ページも位置を保持）"""
+        pool = FakePool(delay=0)
+        engine = OCREngine(use_cache=False, tesseract_pool=pool)
+        results = engine.extract_municipalities_batch(self.pdf_path, [3, 0, 99, 5], max_workers=3)
+        self.assertEqual([r.prefecture for r in results], ["福岡", "愛知", None, "岐阜"])
+        self.assertEqual(results[2].raw_text, "ページが存在しません")
+
+    def test_single_open_and_parallel_ocr(self):
+        """ドキュメントは1回だけ開き、OCRは並列に実行"""
+        pool = FakePool()
+        engine = OCREngine(use_cache=False, tesseract_pool=pool)
+        with mock.patch("core.ocr_engine.fitz.open", wraps=fitz.open) as opened:
+            results = engine.extract_municipalities_batch(self.pdf_path, range(len(PREFECTURES)), max_workers=4)
+        self.assertEqual(opened.call_count, 1)
+        self.assertGreater(pool.max_active, 1)
+        self.assertEqual([r.prefecture for r in results], PREFECTURES)
+
+    def test_matches_single_page_api(self):
+        """1ページずつ抽出した結果と一致"""
+        engine = OCREngine(use_cache=False, tesseract_pool=FakePool(delay=0))
+        batch = engine.extract_municipalities_batch(self.pdf_path, range(len(PREFECTURES)))
+        single = [engine.extract_municipality_from_pdf(self.pdf_path, i) for i in range(len(PREFECTURES))]
+        self.assertEqual([(r.prefecture, r.municipality, r.raw_text, r.position) for r in batch],
+                         [(r.prefecture, r.municipality, r.raw_text, r.position) for r in single])
+
+    def test_missing_file(self):
+        """開けないファイルはページ数分のエラー結果"""
+        engine = OCREngine(use_cache=False, tesseract_pool=FakePool(delay=0))
+        results = engine.extract_municipalities_batch(os.path.join(self.temp_dir, "none.pdf"), [0, 1])
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(r.raw_text.startswith("OCR処理エラー") for r in results))
+        self.assertEqual(engine.extract_municipalities_batch(self.pdf_path, []), [])
+
+
+class CityPool:
+    """常に同じ市長名を返すOCRバックエンド"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def image_to_string(self, img, lang=None, config=""):
+        self.calls += 1
+        return "愛知県 蒲郡市長"
+
+
+class TestBundleTextlessPages(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.pdf_path = os.path.join(self.temp_dir, "bundle.pdf")
+        doc = fitz.open()
+        for text in ["申告受付完了通知 法人市民税 1003 受信通知", None, "納付情報発行結果 納付区分番号通知 1004 納付書"]:
+            page = doc.new_page()
+            if text:
+                page.insert_text((72, 72), text, fontname="japan")
+        doc.save(self.pdf_path)
+        doc.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _analyze(self, ocr_textless_pages: bool):
+        worker = _BatchWorker({'ocr_textless_pages': ocr_textless_pages})
+        pool = CityPool()
+        worker._ocr_engine = OCREngine(use_cache=False, tesseract_pool=pool)
+        with mock.patch.object(worker.pdf_processor, "_detect_bundle_type",
+                               return_value=mock.Mock(is_bundle=True, bundle_type="local")):
+            return worker.analyze(0, self.pdf_path), pool
+
+    def test_only_textless_pages_are_ocred(self):
+        analysis, pool = self._analyze(True)
+        self.assertIsNone(analysis.error)
+        self.assertEqual(pool.calls, 1)
+        self.assertIn("蒲郡市長", analysis.units[1].text)
+        self.assertNotIn("蒲郡", analysis.units[0].text + analysis.units[2].text)
+        self.assertIn('ocr', analysis.timings)
+
+    def test_disabled(self):
+        analysis, pool = self._analyze(False)
+        self.assertEqual(pool.calls, 0)
+        self.assertEqual(analysis.units[1].text.strip(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
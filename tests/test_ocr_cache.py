@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+OCR結果キャッシュ テスト
+永続化・LRU追い出しと、キャッシュ済みページでtesseractを実行しないこと、
+別内容のページに他書類の結果を返さないことを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.ocr_cache import OCRResultCache, compute_ocr_region_md5, make_ocr_cache_key
+from core.ocr_engine import OCREngine, MunicipalityMatcher, MunicipalitySet
+from core.tesseract_pool import TesseractWorkerPool
+
+OCR_TEXT = "愛知県東三河県税事務所 蒲郡市長"
+# テキストレイヤーを使わず全PSMを実行（tesseract呼び出し回数を確認するため）
+# pytesseract経由のバックエンドに固定（libtesseract があってもモックしたOCRを通す）
+OCR_ONLY = {"psm_strategy": "exhaustive", "use_text_layer": False,
+            "tesseract_pool": TesseractWorkerPool(backend="subprocess")}
+
+
+def create_pdf(path: str, text: str) -> str:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((200, 72), text, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def create_scan_pdf(path: str, text: str) -> str:
+    """テキストを画像化して貼り付けたPDF（スキャンPDF相当、同じxref配置になる）"""
+    with fitz.open(create_pdf(path + ".src", text)) as src:
+        png = src[0].get_pixmap(dpi=72).tobytes("png")
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=png)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestOCRResultCache(unittest.TestCase):
+    """OCRResultCache 単体"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_persisted_across_instances(self):
+        """別インスタンス（次回実行）からも参照できる"""
+        key = make_ocr_cache_key("abc", "--psm 6 --oem 3", "jpn")
+        with OCRResultCache(Path(self.temp_dir)) as cache:
+            self.assertIsNone(cache.get(key))
+            cache.put(key, OCR_TEXT)
+        with OCRResultCache(Path(self.temp_dir)) as cache:
+            self.assertEqual(cache.get(key), OCR_TEXT)
+            self.assertEqual(cache.stats['hits'], 1)
+
+    def test_key_depends_on_every_component(self):
+        """画像・PSM・言語のいずれが違っても別キー"""
+        base = ("abc", "--psm 6 --oem 3", "jpn")
+        variants = [
+            ("abd",) + base[1:],
+            base[:1] + ("--psm 7 --oem 3",) + base[2:],
+            base[:2] + ("eng",),
+        ]
+        keys = {make_ocr_cache_key(*base)} | {make_ocr_cache_key(*v) for v in variants}
+        self.assertEqual(len(keys), 4)
+
+    def test_region_md5_depends_on_page_clip_and_zoom(self):
+        """ページ内容・切り出し領域・倍率のいずれが違っても別の値"""
+        base = ("page-a", (100.0, 0.0, 500.0, 280.0), 3.0)
+        variants = [
+            ("page-b",) + base[1:],
+            base[:1] + ((100.0, 0.0, 500.0, 300.0),) + base[2:],
+            base[:2] + (2.0,),
+        ]
+        values = {compute_ocr_region_md5(*base)} | {compute_ocr_region_md5(*v) for v in variants}
+        self.assertEqual(len(values), 4)
+
+    def test_unwritable_cache_dir_disables_persistence(self):
+        """キャッシュフォルダを作成できなくてもエラーにせず、プロセス内LRUで動作"""
+        blocker = os.path.join(self.temp_dir, "not_a_dir")
+        with open(blocker, "w") as f:
+            f.write("")
+        with OCRResultCache(Path(blocker) / "ocr_cache") as cache:
+            self.assertIsNone(cache.get("a"))
+            cache.put("a", OCR_TEXT)
+            self.assertEqual(cache.get("a"), OCR_TEXT)
+            self.assertTrue(cache.persistent_disabled)
+            self.assertEqual(cache.stats['stores'], 0)
+
+    def test_lru_eviction_by_entries_and_bytes(self):
+        """上限超過時は最終参照が古いものから削除"""
+        with OCRResultCache(Path(self.temp_dir), max_entries=2, memory_entries=0) as cache:
+            cache.put("a", "1")
+            cache.put("b", "2")
+            cache.get("a")
+            cache.put("c", "3")
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual((cache.get("a"), cache.get("c")), ("1", "3"))
+            self.assertEqual(cache.stats['evictions'], 1)
+
+        with OCRResultCache(Path(self.temp_dir) / "bytes", max_bytes=10, memory_entries=0) as cache:
+            cache.put("x", "12345")
+            cache.put("y", "67890")
+            cache.put("z", "abcde")
+            self.assertIsNone(cache.get("x"))
+            self.assertEqual(cache.get("z"), "abcde")
+
+    def test_put_keeps_running_totals(self):
+        """上限内の put では全件集計を繰り返さず、同じキーの上書きは件数に数えない"""
+        with OCRResultCache(Path(self.temp_dir), max_entries=5, memory_entries=0) as cache:
+            cache.put("warmup", "0")
+            statements = []
+            cache._connection().set_trace_callback(statements.append)
+            for i in range(4):
+                cache.put(f"k{i}", str(i))
+            cache.put("k0", "replaced")
+            self.assertFalse([sql for sql in statements if "COUNT(*)" in sql])
+            self.assertEqual(cache._totals, (5, 1 + 3 + len("replaced")))
+            cache.put("k4", "4")
+            self.assertEqual(cache.stats['evictions'], 1)
+            self.assertIsNone(cache.get("warmup"))
+
+
+class TestOCREngineCache(unittest.TestCase):
+    """OCREngine からのキャッシュ利用（tesseractはモック）"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = Path(self.temp_dir) / "ocr_cache"
+        self.pdf_path = create_pdf(os.path.join(self.temp_dir, "receipt.pdf"), OCR_TEXT)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeat_run_skips_tesseract(self):
+        """2回目以降（別エンジン・同一キャッシュ）は描画・画像前処理・tesseractを実行しない"""
+        with mock.patch("core.ocr_engine.pytesseract.image_to_string", return_value=OCR_TEXT) as tesseract:
+            engine = OCREngine(ocr_cache=OCRResultCache(self.cache_dir), **OCR_ONLY)
+            first = engine.extract_municipality_from_pdf(self.pdf_path)
+            self.assertEqual(tesseract.call_count, 4)
+
+            engine = OCREngine(ocr_cache=OCRResultCache(self.cache_dir), **OCR_ONLY)
+            with mock.patch.object(engine, "_preprocess_image_for_ocr", side_effect=AssertionError("preprocessed")), \
+                    mock.patch.object(fitz.Page, "get_pixmap", side_effect=AssertionError("rendered")):
+                second = engine.extract_municipality_from_pdf(self.pdf_path)
+            self.assertEqual(tesseract.call_count, 4)
+
+        self.assertEqual((first.prefecture, first.municipality), (second.prefecture, second.municipality))
+        self.assertEqual(second.raw_text, OCR_TEXT)
+
+    def test_best_match_runs_ocr_once(self):
+        """get_best_match の3回の抽出はtesseract 1パス分（4回）で済む"""
+        matcher = MunicipalityMatcher([MunicipalitySet(1, "愛知県", "蒲郡市")])
+        matcher.ocr_engine = OCREngine(ocr_cache=OCRResultCache(self.cache_dir), **OCR_ONLY)
+        with mock.patch("core.ocr_engine.pytesseract.image_to_string", return_value=OCR_TEXT) as tesseract:
+            result = matcher.get_best_match(self.pdf_path)
+        self.assertEqual(tesseract.call_count, 4)
+        self.assertEqual(result['prefecture_code'], 1001)
+
+    def test_different_scans_not_shared(self):
+        """同じxref配置のスキャンPDFでも、別内容のページに他書類のOCR結果を返さない"""
+        first_pdf = create_scan_pdf(os.path.join(self.temp_dir, "scan_a.pdf"), OCR_TEXT)
+        second_pdf = create_scan_pdf(os.path.join(self.temp_dir, "scan_b.pdf"), "東京都千代田区 千代田税務署")
+        engine = OCREngine(ocr_cache=OCRResultCache(self.cache_dir), **OCR_ONLY)
+        with mock.patch("core.ocr_engine.pytesseract.image_to_string", return_value=OCR_TEXT) as tesseract:
+            engine.extract_municipality_from_pdf(first_pdf)
+        with mock.patch("core.ocr_engine.pytesseract.image_to_string", return_value="東京都千代田区") as tesseract:
+            second = engine.extract_municipality_from_pdf(second_pdf)
+        self.assertEqual(tesseract.call_count, 4)
+        self.assertEqual(second.raw_text, "東京都千代田区")
+
+    def test_unwritable_cache_dir_still_runs_ocr(self):
+        """キャッシュフォルダを作成できなくてもOCRは実行される"""
+        blocker = os.path.join(self.temp_dir, "not_a_dir")
+        with open(blocker, "w") as f:
+            f.write("")
+        engine = OCREngine(ocr_cache=OCRResultCache(Path(blocker) / "ocr_cache"), **OCR_ONLY)
+        with mock.patch("core.ocr_engine.pytesseract.image_to_string", return_value=OCR_TEXT) as tesseract:
+            result = engine.extract_municipality_from_pdf(self.pdf_path)
+        self.assertEqual(tesseract.call_count, 4)
+        self.assertEqual(result.raw_text, OCR_TEXT)
+
+    def test_cache_disabled(self):
+        """use_cache=False では毎回tesseractを実行"""
+        engine = OCREngine(use_cache=False, **OCR_ONLY)
+        with mock.patch("core.ocr_engine.pytesseract.image_to_string", return_value=OCR_TEXT) as tesseract:
+            engine.extract_municipality_from_pdf(self.pdf_path)
+            engine.extract_municipality_from_pdf(self.pdf_path)
+        self.assertEqual(tesseract.call_count, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
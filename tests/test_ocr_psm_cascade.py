@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+PSM段階実行（adaptive）テスト
+軽いPSMから順に実行し、市区町村名が解析できた時点で打ち切ることを確認
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from core.ocr_engine import ADAPTIVE_PSM_CONFIGS, EXHAUSTIVE_PSM_CONFIGS, OCREngine
+from core.tesseract_pool import TesseractWorkerPool
+
+
+def fake_tesseract(outputs):
+    """PSM設定ごとの出力を返すtesseractのモック"""
+    def image_to_string(img, lang=None, config=None):
+        return outputs.get(config, "")
+    return mock.patch("core.ocr_engine.pytesseract.image_to_string", side_effect=image_to_string)
+
+
+def create_engine(**kwargs) -> OCREngine:
+    """pytesseract経由のバックエンドで OCREngine を作成（libtesseract の有無に依存しない）"""
+    return OCREngine(use_cache=False, tesseract_pool=TesseractWorkerPool(backend="subprocess"), **kwargs)
+
+
+class TestAdaptivePSMCascade(unittest.TestCase):
+    """_perform_enhanced_ocr の打ち切り判定"""
+
+    def setUp(self):
+        self.image = Image.new("L", (10, 10), 255)
+
+    def _configs_called(self, tesseract):
+        return [call.kwargs["config"] for call in tesseract.call_args_list]
+
+    def test_stops_at_first_valid_parse(self):
+        """最初に市区町村名が解析できたPSMで終了"""
+        outputs = {ADAPTIVE_PSM_CONFIGS[0]: "申告", ADAPTIVE_PSM_CONFIGS[1]: "愛知県蒲郡市長"}
+        engine = create_engine()
+        with fake_tesseract(outputs) as tesseract:
+            result = engine._perform_enhanced_ocr(self.image)
+        self.assertEqual(result, "愛知県蒲郡市長")
+        self.assertEqual(self._configs_called(tesseract), ADAPTIVE_PSM_CONFIGS[:2])
+
+    def test_prefecture_only_keeps_cascading(self):
+        """都道府県名のみでは打ち切らず、後続PSMで市区町村名が得られればそれを返す"""
+        outputs = {ADAPTIVE_PSM_CONFIGS[0]: "愛知県", ADAPTIVE_PSM_CONFIGS[2]: "愛知県蒲郡市長"}
+        engine = create_engine()
+        with fake_tesseract(outputs) as tesseract:
+            result = engine._perform_enhanced_ocr(self.image)
+        self.assertEqual(result, "愛知県蒲郡市長")
+        self.assertEqual(self._configs_called(tesseract), ADAPTIVE_PSM_CONFIGS[:3])
+
+    def test_prefecture_only_everywhere_returns_longest(self):
+        """どのPSMでも都道府県名のみなら全PSMを実行し最長の結果を返す"""
+        outputs = {ADAPTIVE_PSM_CONFIGS[0]: "愛知県", ADAPTIVE_PSM_CONFIGS[3]: "愛知県東三河県税事務所"}
+        engine = create_engine()
+        with fake_tesseract(outputs) as tesseract:
+            result = engine._perform_enhanced_ocr(self.image)
+        self.assertEqual(result, "愛知県東三河県税事務所")
+        self.assertEqual(self._configs_called(tesseract), ADAPTIVE_PSM_CONFIGS)
+
+    def test_falls_back_to_longest_when_nothing_parses(self):
+        """どのPSMでも解析できなければ全PSMを実行し最長の結果を返す"""
+        outputs = {ADAPTIVE_PSM_CONFIGS[0]: "受付", ADAPTIVE_PSM_CONFIGS[2]: "申告受付完了"}
+        engine = create_engine()
+        with fake_tesseract(outputs) as tesseract:
+            result = engine._perform_enhanced_ocr(self.image)
+        self.assertEqual(result, "申告受付完了")
+        self.assertEqual(self._configs_called(tesseract), ADAPTIVE_PSM_CONFIGS)
+
+    def test_exhaustive_runs_every_psm(self):
+        """exhaustive は従来どおり全PSMを実行"""
+        outputs = {config: "愛知県東三河県税事務所" for config in EXHAUSTIVE_PSM_CONFIGS}
+        engine = create_engine(psm_strategy="exhaustive")
+        with fake_tesseract(outputs) as tesseract:
+            engine._perform_enhanced_ocr(self.image)
+        self.assertEqual(self._configs_called(tesseract), EXHAUSTIVE_PSM_CONFIGS)
+
+    def test_unknown_strategy_rejected(self):
+        with self.assertRaises(ValueError):
+            create_engine(psm_strategy="fastest")
+
+
+if __name__ == "__main__":
+    unittest.main()
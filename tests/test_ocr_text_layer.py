@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+テキストレイヤー優先の自治体認識 テスト
+切り出し領域の埋め込みテキストで解析できればtesseractを実行しないことを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.ocr_engine import OCREngine, MunicipalityMatcher, MunicipalitySet
+
+HEADER_TEXT = "愛知県蒲郡市長"
+
+
+def create_pdf(path: str, text: str = None, y: float = 72) -> str:
+    """指定位置に1行書き込んだPDFを作成（text=Noneでテキストなし）"""
+    doc = fitz.open()
+    page = doc.new_page()
+    if text:
+        page.insert_text((200, y), text, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestTextLayerFirst(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tesseract = mock.MagicMock()
+        self.tesseract.image_to_string.return_value = "福岡県税事務所"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _engine(self, **kwargs):
+        return OCREngine(use_cache=False, tesseract_pool=self.tesseract, **kwargs)
+
+    def test_text_layer_skips_ocr(self):
+        """上部領域の埋め込みテキストで解析できればOCRしない"""
+        pdf_path = create_pdf(os.path.join(self.temp_dir, "etax.pdf"), HEADER_TEXT)
+        engine = self._engine()
+        info = engine.extract_municipality_from_pdf(pdf_path)
+        self.assertEqual((info.prefecture, info.municipality, info.source), ("愛知", "蒲郡", "text_layer"))
+        self.tesseract.image_to_string.assert_not_called()
+        self.assertEqual(engine.stats, {'text_layer': 1, 'ocr': 0})
+        engine.reset_stats()
+        self.assertEqual(engine.stats, {'text_layer': 0, 'ocr': 0})
+
+    def test_prefecture_only_text_layer_falls_back_to_ocr(self):
+        """都道府県名だけの埋め込みテキストではOCRを省略しない"""
+        self.tesseract.image_to_string.return_value = "東京都 港区長"
+        pdf_path = create_pdf(os.path.join(self.temp_dir, "tokyo.pdf"), "東京都")
+        engine = self._engine()
+        info = engine.extract_municipality_from_pdf(pdf_path)
+        self.assertEqual((info.prefecture, info.municipality, info.source), ("東京", "港", "ocr"))
+        self.assertEqual(engine.stats, {'text_layer': 0, 'ocr': 1})
+
+    def test_ocr_when_text_outside_crop_or_missing(self):
+        """領域外のテキストのみ・テキストなしの場合はOCR"""
+        outside = create_pdf(os.path.join(self.temp_dir, "footer.pdf"), HEADER_TEXT, y=700)
+        scanned = create_pdf(os.path.join(self.temp_dir, "scan.pdf"))
+        engine = self._engine()
+        for pdf_path in (outside, scanned):
+            info = engine.extract_municipality_from_pdf(pdf_path)
+            self.assertEqual((info.prefecture, info.source), ("福岡", "ocr"))
+        self.assertEqual(engine.stats, {'text_layer': 0, 'ocr': 2})
+
+    def test_invalid_text_layer_falls_back_to_ocr(self):
+        """埋め込みテキストが検証に通らなければOCR"""
+        pdf_path = create_pdf(os.path.join(self.temp_dir, "notice.pdf"), "申告受付完了通知")
+        info = self._engine().extract_municipality_from_pdf(pdf_path)
+        self.assertEqual((info.prefecture, info.source), ("福岡", "ocr"))
+        self.assertTrue(self.tesseract.image_to_string.called)
+
+    def test_text_layer_disabled(self):
+        """use_text_layer=False では常にOCR"""
+        pdf_path = create_pdf(os.path.join(self.temp_dir, "etax.pdf"), HEADER_TEXT)
+        info = self._engine(use_text_layer=False).extract_municipality_from_pdf(pdf_path)
+        self.assertEqual(info.source, "ocr")
+
+    def test_matcher_uses_text_layer(self):
+        """MunicipalityMatcher もtesseractなしでセット照合できる"""
+        pdf_path = create_pdf(os.path.join(self.temp_dir, "etax.pdf"), HEADER_TEXT)
+        matcher = MunicipalityMatcher([MunicipalitySet(1, "東京都", ""), MunicipalitySet(2, "愛知県", "蒲郡市")])
+        matcher.ocr_engine = self._engine()
+        result = matcher.get_best_match(pdf_path)
+        self.assertEqual(result['prefecture_code'], 1011)
+        self.tesseract.image_to_string.assert_not_called()
+        self.assertEqual(matcher.ocr_engine.stats['ocr'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+出力ファイル命名テスト
+GUI・ヘッドレスCLIで共通の 命名・重複時の連番・空白ページ除外 を確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.classification_v5 import ClassificationResult
+from core.output_naming import apply_pdf_analysis, output_filename, unique_output_path
+from core.parallel_batch import AnalyzedUnit, FileAnalysis
+from core.pdf_processor import PDFProcessor
+
+
+class TestOutputNaming(unittest.TestCase):
+    """出力ファイル名の決定と出力"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "output")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_unique_output_path_skips_existing_and_reserved(self):
+        """既存ファイルと命名済み（未書き込み）のパスを避けて連番を付ける"""
+        os.makedirs(self.output_dir)
+        name = output_filename("1004_納付情報", "2508")
+        self.assertEqual(name, "1004_納付情報_2508.pdf")
+        open(os.path.join(self.output_dir, name), "w").close()
+        reserved = {os.path.join(self.output_dir, "1004_納付情報_2508_001.pdf")}
+
+        output_path = unique_output_path(self.output_dir, name, reserved)
+
+        self.assertEqual(os.path.basename(output_path), "1004_納付情報_2508_002.pdf")
+
+    def test_blank_single_pdf_not_written(self):
+        """空白ページと判定された非分割PDFは出力せず False を返す"""
+        pdf_path = os.path.join(self.temp_dir, "blank.pdf")
+        doc = fitz.open()
+        doc.new_page()
+        doc.save(pdf_path)
+        doc.close()
+        analysis = FileAnalysis(index=0, file_path=pdf_path, kind='pdf',
+                                units=[AnalyzedUnit(None, "blank.pdf", "", None)])
+        messages = []
+
+        with PDFProcessor() as processor:
+            success = apply_pdf_analysis(analysis, self.output_dir, "2508", processor, log=messages.append)
+
+        self.assertFalse(success)
+        self.assertEqual(analysis.outputs, [])
+        self.assertIn("[exclude] 空白ページとして除外: blank.pdf", messages)
+
+    def test_yymm_resolved_per_unit(self):
+        """yymm_resolver 指定時は出力ごとに分類コードでYYMMを決める"""
+        pdf_path = os.path.join(self.temp_dir, "bundle.pdf")
+        doc = fitz.open()
+        doc.new_page()
+        doc.new_page()
+        doc.save(pdf_path)
+        doc.close()
+        text = "申告受付完了通知 法人事業税 受信通知 " * 3
+        units = [AnalyzedUnit(n, f"page{n}.pdf", text, ClassificationResult(
+                     document_type=document_type, confidence=1.0, matched_keywords=[],
+                     classification_method="test"))
+                 for n, document_type in ((1, "1003_受信通知"), (2, "0000_納付税額一覧表"))]
+        analysis = FileAnalysis(index=0, file_path=pdf_path, kind='pdf', is_bundle=True, units=units)
+        resolved = []
+
+        def resolve(document_type):
+            resolved.append(document_type)
+            return "2507" if document_type.startswith("0000") else "2508"
+
+        with PDFProcessor() as processor:
+            apply_pdf_analysis(analysis, self.output_dir, "YYMM", processor, log=lambda msg: None,
+                               yymm_resolver=resolve)
+
+        self.assertEqual(resolved, ["1003_受信通知", "0000_納付税額一覧表"])
+        self.assertEqual(analysis.outputs, ["1003_受信通知_2508.pdf", "0000_納付税額一覧表_2507.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
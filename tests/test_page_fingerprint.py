@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+ページフィンガープリント テスト
+コンテンツストリーム方式がレンダリングなしで同一性を判定できることを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.models import compute_page_content_md5
+from core.pre_extract import PreExtractEngine
+
+PAGE_TEXTS = ["申告受付完了通知 法人事業税 愛知県", "納付情報発行結果 納付区分番号通知", "申告受付完了通知 法人事業税 愛知県"]
+
+
+def create_pdf(path: str, page_texts: list) -> str:
+    """1行ずつテキストを書き込んだPDFを作成（Noneは空ページ）"""
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        if text is not None:
+            page.insert_text((72, 72), text, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def create_image_pdf(path: str, color: tuple) -> str:
+    """1ページに画像1枚だけを貼ったPDF（スキャンPDF相当）を作成"""
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    pix.set_rect(pix.irect, color)
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=pix.tobytes("png"))
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestPageContentMD5(unittest.TestCase):
+    """compute_page_content_md5 の判定"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_same_content_same_hash(self):
+        """同一内容のページは同じ値、内容が違えば異なる値（PDFを作り直しても安定）"""
+        first = create_pdf(os.path.join(self.temp_dir, "a.pdf"), PAGE_TEXTS)
+        second = create_pdf(os.path.join(self.temp_dir, "b.pdf"), PAGE_TEXTS)
+        with fitz.open(first) as doc_a, fitz.open(second) as doc_b:
+            hashes_a = [compute_page_content_md5(page) for page in doc_a]
+            hashes_b = [compute_page_content_md5(page) for page in doc_b]
+        self.assertEqual(hashes_a, hashes_b)
+        self.assertNotEqual(hashes_a[0], hashes_a[1])
+
+    def test_no_render_when_content_stream_exists(self):
+        """コンテンツストリームがあればレンダリングしない"""
+        path = create_pdf(os.path.join(self.temp_dir, "a.pdf"), PAGE_TEXTS)
+        with mock.patch.object(fitz.Page, "get_pixmap", side_effect=AssertionError("rendered")):
+            with fitz.open(path) as doc:
+                for page in doc:
+                    self.assertIsNotNone(compute_page_content_md5(page))
+
+    def test_raster_fallback_for_empty_page(self):
+        """コンテンツストリームがないページは低解像度ラスタで代替、無効時はNone"""
+        path = create_pdf(os.path.join(self.temp_dir, "blank.pdf"), [None])
+        with fitz.open(path) as doc:
+            self.assertIsNotNone(compute_page_content_md5(doc[0]))
+            self.assertIsNone(compute_page_content_md5(doc[0], raster_fallback=False))
+
+    def test_different_images_same_layout_differ(self):
+        """同じxref配置でも画像の中身が違えば異なる値（ラスタ代替の有無に関わらず）"""
+        white = create_image_pdf(os.path.join(self.temp_dir, "white.pdf"), (255, 255, 255))
+        black = create_image_pdf(os.path.join(self.temp_dir, "black.pdf"), (0, 0, 0))
+        white_again = create_image_pdf(os.path.join(self.temp_dir, "white2.pdf"), (255, 255, 255))
+        with fitz.open(white) as doc_w, fitz.open(black) as doc_b, fitz.open(white_again) as doc_w2:
+            for raster_fallback in (True, False):
+                with self.subTest(raster_fallback=raster_fallback):
+                    hash_w = compute_page_content_md5(doc_w[0], raster_fallback=raster_fallback)
+                    self.assertNotEqual(hash_w, compute_page_content_md5(doc_b[0], raster_fallback=raster_fallback))
+                    self.assertEqual(hash_w, compute_page_content_md5(doc_w2[0], raster_fallback=raster_fallback))
+
+    def test_image_only_page_uses_raster(self):
+        """画像のみのページは低解像度ラスタも使う"""
+        path = create_image_pdf(os.path.join(self.temp_dir, "scan.pdf"), (0, 0, 0))
+        with fitz.open(path) as doc:
+            with mock.patch.object(fitz.Page, "get_pixmap", wraps=doc[0].get_pixmap) as get_pixmap:
+                compute_page_content_md5(doc[0])
+            get_pixmap.assert_called_once()
+
+
+class TestSnapshotFingerprintMode(unittest.TestCase):
+    """PreExtractEngine のフィンガープリント方式"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.pdf_path = create_pdf(os.path.join(self.temp_dir, "bundle.pdf"), PAGE_TEXTS)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_modes_produce_same_snapshot(self):
+        """content方式とraster方式でスナップショット内容は同一"""
+        pages = []
+        for mode in PreExtractEngine.FINGERPRINT_MODES:
+            engine = PreExtractEngine(snapshot_dir=Path(self.temp_dir) / mode, fingerprint_mode=mode)
+            snapshot = engine.build_snapshot(self.pdf_path, user_provided_yymm="2508")
+            pages.append([page.to_dict() for page in snapshot.pages])
+        self.assertEqual(pages[0], pages[1])
+
+    def test_content_mode_skips_png_render(self):
+        """既定のcontent方式ではPNGレンダリングを行わない"""
+        engine = PreExtractEngine(snapshot_dir=Path(self.temp_dir) / "snapshots")
+        with mock.patch.object(fitz.Page, "get_pixmap", side_effect=AssertionError("rendered")):
+            snapshot = engine.build_snapshot(self.pdf_path, user_provided_yymm="2508")
+        self.assertEqual(len(snapshot.pages), len(PAGE_TEXTS))
+
+    def test_unknown_mode_rejected(self):
+        """未知の方式はエラー"""
+        with self.assertRaises(ValueError):
+            PreExtractEngine(fingerprint_mode="pixels")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+ページ段階パイプライン テスト
+段階が重なって実行されても結果が入力順になること・キュー長で先行数が制限されることを確認
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.page_pipeline import PagePipeline
+
+
+def sleepy(label: str, max_delay: float = 0.005):
+    def stage(value):
+        time.sleep(random.uniform(0, max_delay))
+        return value + [label]
+    return stage
+
+
+class TestPagePipeline(unittest.TestCase):
+
+    def test_results_in_input_order(self):
+        """段階ごとの所要時間がばらついても入力順で返す"""
+        pipeline = PagePipeline([("extract", sleepy("e")), ("classify", sleepy("c")), ("write", sleepy("w"))])
+        results = pipeline.run_all([[i] for i in range(50)])
+        self.assertEqual([item.index for item in results], list(range(50)))
+        self.assertEqual(results[7].value, [7, "e", "c", "w"])
+        self.assertEqual(set(pipeline.stage_seconds), {"extract", "classify", "write"})
+
+    def test_stages_overlap(self):
+        """所要時間は段階の合計ではなく最も遅い段階に近づく"""
+        def wait(value):
+            time.sleep(0.03)
+            return value
+
+        pipeline = PagePipeline([("extract", wait), ("classify", wait), ("write", wait)])
+        started = time.perf_counter()
+        pipeline.run_all(range(10))
+        elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 10 * 3 * 0.03 * 0.75)
+
+    def test_error_passes_through_in_order(self):
+        """失敗したページは以降の段階を飛ばし、順番を保ったまま返す"""
+        calls = []
+
+        def classify(value):
+            if value == 2:
+                raise ValueError("broken page")
+            return value
+
+        def write(value):
+            calls.append(value)
+            return value
+
+        results = PagePipeline([("classify", classify), ("write", write)]).run_all(range(4))
+        self.assertEqual([item.index for item in results], [0, 1, 2, 3])
+        self.assertEqual((results[2].failed_stage, str(results[2].error)), ("classify", "broken page"))
+        self.assertEqual(calls, [0, 1, 3])
+
+    def test_bounded_lookahead(self):
+        """下流が止まっている間、上流はキュー長を超えて先行しない"""
+        extracted = []
+        lock = threading.Lock()
+
+        def extract(value):
+            with lock:
+                extracted.append(value)
+            return value
+
+        pipeline = PagePipeline([("extract", extract)], queue_size=2)
+        results = pipeline.run(range(100))
+        next(results)
+        time.sleep(0.2)
+        with lock:
+            ahead = len(extracted)
+        results.close()
+        # 入力キュー・出力キュー各2件 + 処理中1件 + 返却済み1件
+        self.assertLessEqual(ahead, 6)
+
+    def test_requires_stage(self):
+        with self.assertRaises(ValueError):
+            PagePipeline([])
+
+
+if __name__ == "__main__":
+    unittest.main()
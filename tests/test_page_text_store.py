@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+PageTextStore テスト
+1ジョブ内でPDFを1回だけ開き、各ページを1回だけ抽出することを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.page_text_store import PageTextStore
+from core.pdf_processor import PDFProcessor
+from core.pre_extract import PreExtractEngine
+
+
+def create_text_pdf(path: str, page_texts: list) -> str:
+    """各ページにテキストを書き込んだPDFを作成"""
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestPageTextStore(unittest.TestCase):
+    """PageTextStore の基本動作"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.pdf_path = create_text_pdf(
+            os.path.join(self.temp_dir, "bundle.pdf"),
+            ["申告受付完了通知 法人事業税 県税事務所", "納付情報発行結果 都道府県", ""]
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_each_page_extracted_once(self):
+        """同じページを何度要求しても get_text() は1回だけ"""
+        with PageTextStore() as store:
+            first = store.page_texts(self.pdf_path)
+            second = store.page_texts(self.pdf_path, max_pages=2)
+            self.assertEqual(len(first), 3)
+            self.assertEqual(first[:2], second)
+            self.assertIn("申告受付完了通知", first[0])
+            self.assertEqual(store.stats['documents_opened'], 1)
+            self.assertEqual(store.stats['pages_extracted'], 3)
+            self.assertEqual(store.stats['cache_hits'], 2)
+
+    def test_identical_content_shares_entry(self):
+        """同一内容のファイルはMD5キーでキャッシュを共有"""
+        copy_path = os.path.join(self.temp_dir, "copy.pdf")
+        shutil.copy2(self.pdf_path, copy_path)
+        with PageTextStore() as store:
+            store.page_texts(self.pdf_path)
+            store.page_texts(copy_path)
+            self.assertEqual(store.stats['documents_opened'], 1)
+            self.assertEqual(store.stats['pages_extracted'], 3)
+
+    def test_release_keeps_texts(self):
+        """release() 後もテキストはキャッシュから返る"""
+        with PageTextStore() as store:
+            text = store.page_text(self.pdf_path, 0)
+            store.release(self.pdf_path)
+            self.assertEqual(store.page_text(self.pdf_path, 0), text)
+            self.assertEqual(store.stats['pages_extracted'], 1)
+
+
+class TestPageTextStoreSharing(unittest.TestCase):
+    """Bundle判定・資産ロック・スナップショットでのストア共有"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.pdf_path = create_text_pdf(
+            os.path.join(self.temp_dir, "notice.pdf"),
+            ["申告受付完了通知 法人事業税 県税事務所", "納付情報発行結果 法人二税・特別税"]
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pipeline_stages_share_extraction(self):
+        """PDFProcessor と PreExtractEngine が同じ抽出結果を再利用"""
+        store = PageTextStore()
+        processor = PDFProcessor(page_text_store=store)
+        engine = PreExtractEngine(snapshot_dir=Path(self.temp_dir) / "snapshots", page_text_store=store)
+
+        processor._detect_bundle_type(self.pdf_path)
+        processor.analyze_pdf_content(self.pdf_path)
+        snapshot = engine.build_snapshot(self.pdf_path, user_provided_yymm="2508")
+
+        self.assertEqual(len(snapshot.pages), 2)
+        self.assertEqual(snapshot.source_doc_md5, store.file_md5(self.pdf_path))
+        self.assertEqual(store.stats['documents_opened'], 1)
+        self.assertEqual(store.stats['pages_extracted'], 2)
+        store.close()
+
+    def test_processor_closes_only_its_own_store(self):
+        """PDFProcessor.close() は専用ストアだけを解放し、共有ストアは所有者に任せる"""
+        shared = PageTextStore()
+        with PDFProcessor(page_text_store=shared) as processor:
+            processor._detect_bundle_type(self.pdf_path)
+        self.assertEqual(len(shared._docs), 1)
+        shared.close()
+
+        with PDFProcessor() as processor:
+            processor._detect_bundle_type(self.pdf_path)
+            own = processor.page_text_store
+            self.assertEqual(len(own._docs), 1)
+        self.assertEqual(len(own._docs), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
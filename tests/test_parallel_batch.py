@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+並列フォルダ一括処理エンジン テスト
+ワーカー数に関係なく入力順・同一分類結果・同一出力ファイル名になることを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.parallel_batch import ParallelBatchEngine
+from core.pdf_processor import PDFProcessor
+from core.output_naming import apply_pdf_analysis
+
+LOCAL_BUNDLE_PAGES = [
+    "申告受付完了通知\n法人事業税 県税事務所 愛知県\n受付番号 1003 提出先 愛知県東三河県税事務所\n申告の種類 確定申告 法人県民税",
+    "納付情報発行結果\n法人二税・特別税 納付区分番号通知\n1004 愛知県 納付書 納付情報\n税目 法人県民税 法人事業税 特別法人事業税",
+]
+CORPORATE_TAX_PAGES = ["法人税及び地方法人税申告書\n内国法人の確定申告 青色申告\n法人税 申告書 別表一"]
+
+
+def create_text_pdf(path: str, page_texts: list) -> str:
+    """各ページに複数行テキストを書き込んだPDFを作成"""
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        for n, line in enumerate(text.split("\n")):
+            page.insert_text((72, 72 + n * 20), line, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestParallelBatchEngine(unittest.TestCase):
+    """ParallelBatchEngine の順序保証と決定性"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = []
+        for i in range(6):
+            pages = LOCAL_BUNDLE_PAGES if i % 2 == 0 else CORPORATE_TAX_PAGES
+            self.files.append(create_text_pdf(os.path.join(self.temp_dir, f"doc_{i}.pdf"), pages))
+        csv_path = os.path.join(self.temp_dir, "journal.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("日付,借方,貸方\n")
+        self.files.insert(3, csv_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _summaries(self, max_workers: int):
+        engine = ParallelBatchEngine(max_workers=max_workers)
+        return [
+            (a.index, a.file_path, a.kind, a.is_bundle, a.error,
+             [(u.page_number, u.classification.document_type) for u in a.units])
+            for a in engine.iter_analyses(self.files)
+        ]
+
+    def test_results_in_input_order(self):
+        """結果は入力順、Bundleはページ単位、CSVは分析対象外"""
+        summaries = self._summaries(max_workers=2)
+        self.assertEqual([s[1] for s in summaries], self.files)
+        self.assertEqual([s[0] for s in summaries], list(range(len(self.files))))
+
+        bundle = summaries[0]
+        self.assertTrue(bundle[3])
+        self.assertEqual(bundle[5], [(1, "1003_受信通知"), (2, "1004_納付情報")])
+        self.assertEqual(summaries[3][2], "csv")
+        self.assertEqual(summaries[3][5], [])
+
+    def test_parallel_matches_serial(self):
+        """並列実行と逐次実行で分析結果が一致"""
+        self.assertEqual(self._summaries(max_workers=3), self._summaries(max_workers=1))
+
+    def test_output_names_deterministic(self):
+        """入力順に書き込むため、ワーカー数に関係なく同じ出力ファイル名になる"""
+        outputs = []
+        for workers in (1, 3):
+            output_folder = os.path.join(self.temp_dir, f"out_{workers}")
+            os.makedirs(output_folder)
+            processor = PDFProcessor()
+            names = []
+            engine = ParallelBatchEngine(max_workers=workers)
+            for analysis in engine.iter_analyses(self.files):
+                if analysis.kind != 'pdf':
+                    continue
+                apply_pdf_analysis(
+                    analysis, output_folder, "2508", processor, log=lambda msg: None,
+                    success_callback=lambda src, new, *args: names.append((os.path.basename(src), new))
+                )
+            processor.close()
+            outputs.append(names)
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0][:3], [
+            ("doc_0.pdf", "1003_受信通知_2508.pdf"),
+            ("doc_0.pdf", "1004_納付情報_2508.pdf"),
+            ("doc_1.pdf", "0001_法人税等申告書_2508.pdf"),
+        ])
+        self.assertEqual(outputs[0][3], ("doc_2.pdf", "1003_受信通知_2508_001.pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+正規表現レジストリ テスト
+コンパイル済みパターン群の判定が従来の文字列パターンのループと同じ結果になること、
+マイクロベンチマークが全方式を計測できることを確認
+"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pre_extract import PreExtractEngine
+from core.regex_registry import ASSET_FILENAME, ASSET_TEXT, PatternFamily, compile_pattern
+from tests import benchmark_regex
+
+
+class TestPatternFamily(unittest.TestCase):
+
+    def setUp(self):
+        self.family = PatternFamily([("a", r"foo\d"), ("b", r"bar"), ("a", r"baz")], re.IGNORECASE)
+
+    def test_first_in_priority_order(self):
+        """テキスト中の位置ではなく、パターンの優先順で最初に一致したものを返す"""
+        name, match = self.family.first("BAR then FOO1")
+        self.assertEqual((name, match.group(0)), ("a", "FOO1"))
+        self.assertIsNone(self.family.first("nothing"))
+
+    def test_names_and_matching(self):
+        self.assertEqual(self.family.names("baz bar"), ["a", "b"])
+        self.assertEqual([p.pattern for p in self.family.matching("foo1 baz")], [r"foo\d", "baz"])
+
+    def test_config_patterns_compiled_once(self):
+        self.assertIs(compile_pattern(r"少額.*明細", re.IGNORECASE), compile_pattern(r"少額.*明細", re.IGNORECASE))
+
+
+class TestRegistryCallers(unittest.TestCase):
+    """呼び出し側の判定結果が従来と同じであること"""
+
+    def test_pre_extract_detection(self):
+        engine = PreExtractEngine.__new__(PreExtractEngine)
+        engine._init_extraction_patterns()
+        text = "申告受付完了通知 法人事業税 県税事務所 受付番号 1003 一括償却資産明細表"
+        self.assertEqual(engine._detect_code(text), "1003")
+        self.assertEqual(engine._detect_code("法人税 確定 申告書"), "0001")
+        self.assertEqual(engine._detect_doc_hints(text), ["受信通知", "添付資料", "帳票"])
+        self.assertEqual(engine._detect_tax_kind(text), "地方税")
+        self.assertIsNone(engine._detect_tax_kind("請求書"))
+
+    def test_asset_patterns(self):
+        self.assertEqual(ASSET_FILENAME.first("少額.PDF")[0], r"少額\.pdf$")
+        text = "一括償却資産明細表 資産コード 取得価額"
+        self.assertEqual(len(ASSET_TEXT.matching(text)), 4)   # 償却資産明細表 も部分一致
+
+
+class TestRegexBenchmark(unittest.TestCase):
+
+    def test_all_variants_measured(self):
+        results = benchmark_regex.run(repeat=1, texts=benchmark_regex.PAGE_TEXTS[:2])
+        self.assertEqual(set(results), set(benchmark_regex.VARIANTS))
+        self.assertTrue(all(us > 0 for us in results.values()))
+        self.assertIn("registry", benchmark_regex.format_results(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+フォルダ処理マニフェスト テスト
+同じフォルダの再投入で追加・変更されたファイルだけを処理し、未変更ファイルは前回の出力を再利用することを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.batch import run_batch
+from core.run_manifest import MANIFEST_FILENAME, RunManifest
+
+CORPORATE_TAX_TEXT = ["法人税及び地方法人税申告書", "内国法人の確定申告 青色申告", "法人税 申告書 別表一"]
+PAYMENT_TEXT = ["納付情報発行結果", "1004 愛知県 納付書 納付情報", "税目 法人県民税 法人事業税"]
+
+
+def create_text_pdf(path: str, lines: list) -> str:
+    doc = fitz.open()
+    page = doc.new_page()
+    for n, line in enumerate(lines):
+        page.insert_text((72, 72 + n * 20), line, fontname="japan")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def bump_mtime(path: str):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+
+
+class TestRunManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "2508")
+        os.makedirs(self.output_dir)
+        self.pdf_path = os.path.join(self.temp_dir, "a.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.7 a")
+        with open(os.path.join(self.output_dir, "0001_法人税等申告書_2508.pdf"), "wb") as f:
+            f.write(b"out")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _recorded(self) -> RunManifest:
+        manifest = RunManifest(self.temp_dir)
+        manifest.record(self.pdf_path, self.output_dir, "2508",
+                        ["0001_法人税等申告書_2508.pdf"], ["0001_法人税等申告書"])
+        manifest.save()
+        return RunManifest(self.temp_dir)
+
+    def test_round_trip_and_up_to_date(self):
+        """保存したマニフェストを読み直しても未変更と判定"""
+        manifest = self._recorded()
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, MANIFEST_FILENAME)))
+        self.assertEqual(manifest.get(self.pdf_path).document_types, ["0001_法人税等申告書"])
+        self.assertEqual(manifest.plan([self.pdf_path], self.output_dir, "2508"), ([], [self.pdf_path]))
+        self.assertEqual(manifest.latest_output_folder("2508"), os.path.abspath(self.output_dir))
+        self.assertIsNone(manifest.latest_output_folder("2509"))
+
+    def test_touched_but_same_content_reused(self):
+        """更新時刻だけ変わったファイルは内容（MD5）で未変更と判定"""
+        manifest = self._recorded()
+        bump_mtime(self.pdf_path)
+        self.assertTrue(manifest.is_up_to_date(self.pdf_path, self.output_dir, "2508"))
+
+    def test_needs_processing(self):
+        """内容変更・YYMM変更・出力先変更・出力ファイル削除は再処理"""
+        manifest = self._recorded()
+        self.assertFalse(manifest.is_up_to_date(self.pdf_path, self.output_dir, "2509"))
+        self.assertFalse(manifest.is_up_to_date(self.pdf_path, os.path.join(self.temp_dir, "other"), "2508"))
+
+        os.remove(os.path.join(self.output_dir, "0001_法人税等申告書_2508.pdf"))
+        self.assertFalse(manifest.is_up_to_date(self.pdf_path, self.output_dir, "2508"))
+
+        manifest = self._recorded()
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.7 b")
+        bump_mtime(self.pdf_path)
+        self.assertFalse(manifest.is_up_to_date(self.pdf_path, self.output_dir, "2508"))
+
+    def test_discard_outputs_only_in_same_folder(self):
+        """再処理時は同じ出力先の前回出力だけを削除（別の出力先・他ファイルの出力は残す）"""
+        stale = os.path.join(self.output_dir, "0001_法人税等申告書_2508.pdf")
+        manifest = self._recorded()
+        self.assertEqual(manifest.discard_outputs(self.pdf_path, os.path.join(self.temp_dir, "other")), [])
+        self.assertTrue(os.path.exists(stale))
+
+        other_pdf = os.path.join(self.temp_dir, "b.pdf")
+        with open(other_pdf, "wb") as f:
+            f.write(b"%PDF-1.7 other")
+        manifest.record(other_pdf, self.output_dir, "2508", ["0001_法人税等申告書_2508.pdf"])
+        self.assertEqual(manifest.discard_outputs(self.pdf_path, self.output_dir), [])
+        self.assertTrue(os.path.exists(stale))
+
+        manifest = self._recorded()
+        self.assertEqual(manifest.discard_outputs(self.pdf_path, self.output_dir), [stale])
+        self.assertFalse(os.path.exists(stale))
+
+    def test_corrupt_manifest_starts_fresh(self):
+        with open(os.path.join(self.temp_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+            f.write("{broken")
+        self.assertEqual(RunManifest(self.temp_dir).entries, {})
+
+
+class TestIncrementalBatch(unittest.TestCase):
+    """core.batch.run_batch の増分処理"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "input")
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        self.snapshot_dir = os.path.join(self.temp_dir, "snapshots")
+        os.makedirs(self.input_dir)
+        create_text_pdf(os.path.join(self.input_dir, "a_corporate.pdf"), CORPORATE_TAX_TEXT)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self):
+        return run_batch(self.input_dir, self.output_dir, "2508", max_workers=1,
+                         snapshot_dir=self.snapshot_dir, incremental=True)
+
+    def test_rerun_processes_only_new_files(self):
+        first = self._run()
+        self.assertEqual((first.files, first.reused, first.outputs), (1, 0, 1))
+
+        # 書類が追加された状態で同じフォルダを再投入
+        create_text_pdf(os.path.join(self.input_dir, "b_payment.pdf"), PAYMENT_TEXT)
+        second = self._run()
+        self.assertEqual((second.files, second.reused, second.outputs), (1, 1, 1))
+        self.assertEqual(len(os.listdir(self.output_dir)), 2)
+
+        # 変更なしの再投入では何も処理しない
+        third = self._run()
+        self.assertEqual((third.files, third.reused, third.outputs), (0, 2, 0))
+        self.assertEqual(len(os.listdir(self.output_dir)), 2)
+
+        manifest = RunManifest(self.input_dir)
+        self.assertEqual(sorted(manifest.entries), ["a_corporate.pdf", "b_payment.pdf"])
+        self.assertEqual(manifest.get(os.path.join(self.input_dir, "a_corporate.pdf")).outputs,
+                         ["0001_法人税等申告書_2508.pdf"])
+
+    def test_changed_file_replaces_previous_output(self):
+        """内容が変わったファイルを再処理すると、前回の出力は出力先に残らない"""
+        pdf_path = os.path.join(self.input_dir, "a_corporate.pdf")
+        self._run()
+        self.assertEqual(os.listdir(self.output_dir), ["0001_法人税等申告書_2508.pdf"])
+
+        create_text_pdf(pdf_path, PAYMENT_TEXT)
+        bump_mtime(pdf_path)
+        second = self._run()
+        self.assertEqual((second.files, second.reused, second.outputs), (1, 0, 1))
+        outputs = os.listdir(self.output_dir)
+        self.assertEqual(len(outputs), 1)
+        self.assertNotIn("0001_法人税等申告書_2508.pdf", outputs)
+        self.assertEqual(RunManifest(self.input_dir).get(pdf_path).outputs, outputs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+共有分類ルールセット テスト
+DocumentClassifierV5 の全インスタンスが同じ読み取り専用ルールセットを参照することを確認
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.classification_v5 import DocumentClassifierV5, get_shared_classification_rules_v5
+from core.pdf_processor import PDFProcessor
+from core.unified_classifier import UnifiedClassifier
+
+
+class TestSharedClassificationRules(unittest.TestCase):
+    """プロセス共有ルールセット"""
+
+    def test_instances_share_one_rule_set(self):
+        """分類器・PDFProcessor・UnifiedClassifier が同じルールセットを参照"""
+        shared = get_shared_classification_rules_v5()
+        processor = PDFProcessor()
+
+        self.assertIs(DocumentClassifierV5().classification_rules_v5, shared)
+        self.assertIs(DocumentClassifierV5(debug_mode=True).classification_rules_v5, shared)
+        self.assertIs(processor._get_page_classifier().classification_rules_v5, shared)
+        self.assertIs(UnifiedClassifier().legacy_classifier.classification_rules_v5, shared)
+
+    def test_processor_reuses_page_classifier(self):
+        """PDFProcessor はページごとに分類器を作り直さない"""
+        processor = PDFProcessor()
+        self.assertIs(processor._get_page_classifier(), processor._get_page_classifier())
+
+    def test_rule_set_is_read_only(self):
+        """共有ルールセットは変更できない"""
+        rules = get_shared_classification_rules_v5()
+        with self.assertRaises(TypeError):
+            rules["9999_test"] = {}
+        with self.assertRaises(TypeError):
+            rules["6002_一括償却資産明細表"]["priority"] = 0
+        self.assertIsInstance(rules["6002_一括償却資産明細表"]["exact_keywords"], tuple)
+
+    def test_result_meta_is_not_shared(self):
+        """分類結果の meta を変更しても共有ルールに影響しない"""
+        classifier = DocumentClassifierV5()
+        result = classifier.classify_document_v5("一括償却資産明細表", "asset.pdf")
+        self.assertEqual(result.document_type, "6002_一括償却資産明細表")
+
+        result.meta["no_split"] = False
+        self.assertTrue(get_shared_classification_rules_v5()["6002_一括償却資産明細表"]["meta"]["no_split"])
+
+
+if __name__ == "__main__":
+    unittest.main()
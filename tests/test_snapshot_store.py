@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+スナップショットストア テスト
+SQLiteバックエンドの保存・一括参照・フィンガープリント索引・期限切れ削除・従来JSON取り込みを確認
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from core.models import PageFingerprint, PreExtractSnapshot, RenameFields
+from core.pre_extract import PreExtractEngine
+from core.snapshot_store import SQLiteSnapshotStore, create_snapshot_store
+
+
+def make_snapshot(md5: str, days_old: int = 0, pages: int = 2) -> PreExtractSnapshot:
+    created_at = (datetime.now() - timedelta(days=days_old)).isoformat()
+    return PreExtractSnapshot(
+        source_path=f"/input/{md5}.pdf",
+        source_doc_md5=md5,
+        pages=[RenameFields(code_hint="1003", muni_name="愛知県", period_yyyymm="2508",
+                            extra={'page_index': i}) for i in range(pages)],
+        created_at=created_at,
+    )
+
+
+def fingerprints_for(md5: str, pages: int = 2):
+    return [PageFingerprint(page_md5=f"{md5}-p{i}", text_sha1=f"text-{i}") for i in range(pages)]
+
+
+class TestSQLiteSnapshotStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.store = SQLiteSnapshotStore(self.temp_dir)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip_single_file(self):
+        """保存内容をそのまま読み込め、JSONファイルは作らない"""
+        snapshot = make_snapshot("a" * 32)
+        self.store.save(snapshot, fingerprints_for("a" * 32))
+        self.assertEqual(self.store.load("a" * 32).to_dict(), snapshot.to_dict())
+        self.assertIsNone(self.store.load("b" * 32))
+        self.assertEqual(sorted(p.name for p in self.temp_dir.iterdir() if p.suffix == ".json"), [])
+
+    def test_batch_lookup(self):
+        """フォルダ分のMD5を一括参照（存在するもののみ返す）"""
+        md5s = [f"{i:032x}" for i in range(1200)]
+        for md5 in md5s[::2]:
+            self.store.save(make_snapshot(md5))
+        found = self.store.load_many(md5s)
+        self.assertEqual(sorted(found), sorted(md5s[::2]))
+
+    def test_find_pages_by_fingerprint(self):
+        """ページフィンガープリントから元PDF・ページを逆引き"""
+        self.store.save(make_snapshot("a" * 32), fingerprints_for("a" * 32))
+        self.store.save(make_snapshot("b" * 32), fingerprints_for("b" * 32))
+        self.assertEqual(self.store.find_pages(page_md5="b" * 32 + "-p1"), [("b" * 32, 1)])
+        self.assertEqual(self.store.find_pages(text_sha1="text-0"), [("a" * 32, 0), ("b" * 32, 0)])
+
+    def test_age_based_eviction(self):
+        """作成日時が期限より古いものを削除"""
+        self.store.save(make_snapshot("a" * 32, days_old=40), fingerprints_for("a" * 32))
+        self.store.save(make_snapshot("b" * 32, days_old=1), fingerprints_for("b" * 32))
+        self.assertEqual(self.store.evict_older_than(30), 1)
+        self.assertEqual(self.store.count(), 1)
+        self.assertEqual(self.store.find_pages(text_sha1="text-0"), [("b" * 32, 0)])
+
+    def test_legacy_json_imported(self):
+        """従来のJSONスナップショットは参照時・一括で取り込む"""
+        make_snapshot("c" * 32).save(self.temp_dir)
+        make_snapshot("d" * 32).save(self.temp_dir)
+        self.assertEqual(self.store.load("c" * 32).source_doc_md5, "c" * 32)
+        self.assertEqual(self.store.count(), 1)
+        self.assertEqual(self.store.import_legacy_json(), 2)
+        self.assertEqual(self.store.count(), 2)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_snapshot_store(self.temp_dir, backend="lmdb")
+
+
+class TestPreExtractEngineBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.pdf_paths = []
+        for i, text in enumerate(["申告受付完了通知 愛知県", "納付情報 蒲郡市"]):
+            path = self.temp_dir / f"doc_{i}.pdf"
+            doc = fitz.open()
+            doc.new_page().insert_text((72, 72), text, fontname="japan")
+            doc.save(str(path))
+            doc.close()
+            self.pdf_paths.append(str(path))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_backends_produce_same_snapshot(self):
+        """SQLite・JSONのどちらでも同じスナップショットを保存・再利用"""
+        results = []
+        for backend in ("sqlite", "json"):
+            engine = PreExtractEngine(snapshot_dir=self.temp_dir / backend, snapshot_backend=backend)
+            built = engine.build_snapshot(self.pdf_paths[0], user_provided_yymm="2508")
+            reused = engine.build_snapshot(self.pdf_paths[0], user_provided_yymm="2508")
+            self.assertEqual(built.created_at, reused.created_at)
+            results.append([page.to_dict() for page in reused.pages])
+        self.assertEqual(results[0], results[1])
+        self.assertFalse(list((self.temp_dir / "sqlite").glob("*.json")))
+
+    def test_find_existing_snapshots(self):
+        """フォルダ内PDFの保存済みスナップショットを一括検索"""
+        engine = PreExtractEngine(snapshot_dir=self.temp_dir / "snapshots")
+        engine.build_snapshot(self.pdf_paths[1], user_provided_yymm="2508")
+        found = engine.find_existing_snapshots(self.pdf_paths)
+        self.assertEqual(list(found), [self.pdf_paths[1]])
+        self.assertEqual(engine.cleanup_old_snapshots(max_age_days=30), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
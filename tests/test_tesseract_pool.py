@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+常駐tesseractワーカープール テスト
+APIインスタンス（言語モデル読み込み）が使い回されること、-c 変数の持ち越しがないこと、
+libtesseract が無い環境でのフォールバックを確認
+"""
+
+import ctypes
+import os
+import sys
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from core import tesseract_pool
+from core.tesseract_pool import TesseractWorkerPool, parse_tesseract_config
+
+
+class FakeTessLibrary:
+    """TessLibrary の代替（API インスタンスの生成回数と変数の状態を記録）"""
+    DEFAULT_VARIABLES = {'preserve_interword_spaces': '0', 'tessedit_char_whitelist': ''}
+
+    def __init__(self, fail_init=False):
+        self.fail_init = fail_init
+        self.instances = []
+
+    def create(self, datapath, lang):
+        if self.fail_init:
+            raise RuntimeError("no jpn.traineddata")
+        api = SimpleNamespace(path=datapath, lang=lang, psm=None, ended=False,
+                              variables=dict(self.DEFAULT_VARIABLES), seen=[], busy=threading.Lock())
+        self.instances.append(api)
+        return api
+
+    def set_page_seg_mode(self, api, psm):
+        api.psm = psm
+
+    def set_variable(self, api, name, value):
+        api.variables[name] = value
+        return True
+
+    def get_variable(self, api, name):
+        return api.variables.get(name)
+
+    def recognize(self, api, img):
+        # 同一インスタンスを複数スレッドが同時に使っていないこと
+        if not api.busy.acquire(blocking=False):
+            raise AssertionError("API used concurrently")
+        try:
+            api.seen.append(dict(api.variables))
+            return f"psm={api.psm}"
+        finally:
+            api.busy.release()
+
+    def delete(self, api):
+        api.ended = True
+
+
+class TestParseConfig(unittest.TestCase):
+
+    def test_psm_and_variables(self):
+        """--psm と -c 変数を取り出し、--oem は無視"""
+        self.assertEqual(parse_tesseract_config('--psm 7 --oem 3 -c preserve_interword_spaces=1'),
+                         (7, {'preserve_interword_spaces': '1'}))
+        self.assertEqual(parse_tesseract_config(''), (None, {}))
+
+
+class TestTesseractWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.library = FakeTessLibrary()
+        self.image = Image.new("L", (10, 10), 255)
+        patcher = mock.patch.multiple(tesseract_pool,
+                                      find_tesseract_library=mock.Mock(return_value="libtesseract.so.5"),
+                                      load_tesseract_library=mock.Mock(return_value=self.library))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_workers_reused_across_calls(self):
+        """多数の呼び出しでもAPI初期化はプール上限まで"""
+        pool = TesseractWorkerPool(size=2, tessdata_dir="/tessdata")
+        results = []
+
+        def run():
+            for psm in (6, 7, 8, 13):
+                results.append(pool.image_to_string(self.image, lang='jpn', config=f'--psm {psm} --oem 3'))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(pool.backend, "capi")
+        self.assertEqual(len(results), 16)
+        self.assertEqual(sorted(set(results)), ["psm=13", "psm=6", "psm=7", "psm=8"])
+        self.assertLessEqual(len(self.library.instances), 2)
+        self.assertEqual(pool.stats['workers_started'], len(self.library.instances))
+        self.assertTrue(all(api.path == "/tessdata" and api.lang == "jpn" for api in self.library.instances))
+        tesseract_pool.load_tesseract_library.assert_called_once_with("libtesseract.so.5")
+
+        pool.close()
+        self.assertTrue(all(api.ended for api in self.library.instances))
+
+    def test_variables_reset_between_calls(self):
+        """-c 変数は呼び出しごとに初期値へ戻り、次の呼び出しに持ち越さない"""
+        pool = TesseractWorkerPool(size=1)
+        self.assertEqual(pool.image_to_string(self.image, config='--psm 7 -c preserve_interword_spaces=1'), "psm=7")
+        self.assertEqual(pool.image_to_string(self.image), "psm=3")
+
+        api, = self.library.instances
+        self.assertEqual(api.seen[0]['preserve_interword_spaces'], '1')
+        self.assertEqual(api.seen[1], FakeTessLibrary.DEFAULT_VARIABLES)
+        self.assertEqual(api.variables, FakeTessLibrary.DEFAULT_VARIABLES)
+
+    def test_variables_reset_after_failure(self):
+        """認識中に例外が出ても -c 変数は初期値へ戻る"""
+        pool = TesseractWorkerPool(size=1)
+        with mock.patch.object(self.library, "recognize", side_effect=RuntimeError("bad image")):
+            with self.assertRaises(RuntimeError):
+                pool.image_to_string(self.image, config='-c tessedit_char_whitelist=0123456789')
+        api, = self.library.instances
+        self.assertEqual(api.variables, FakeTessLibrary.DEFAULT_VARIABLES)
+        # ワーカーはプールに戻り、次の呼び出しで再利用される
+        self.assertEqual(pool.image_to_string(self.image, config='--psm 6'), "psm=6")
+        self.assertEqual(len(self.library.instances), 1)
+
+    def test_other_language_uses_subprocess(self):
+        """プールの言語と異なる指定は pytesseract で処理"""
+        pool = TesseractWorkerPool(size=1)
+        with mock.patch.object(tesseract_pool.pytesseract, "image_to_string", return_value="eng") as fallback:
+            self.assertEqual(pool.image_to_string(self.image, lang='eng'), "eng")
+        fallback.assert_called_once()
+        self.assertEqual(self.library.instances, [])
+
+    def test_init_failure_falls_back(self):
+        """ワーカー初期化に失敗したら以降は pytesseract で処理"""
+        self.library.fail_init = True
+        pool = TesseractWorkerPool(size=1)
+        with mock.patch.object(tesseract_pool.pytesseract, "image_to_string", return_value="text") as fallback:
+            self.assertEqual(pool.image_to_string(self.image, config='--psm 6'), "text")
+            self.assertEqual(pool.image_to_string(self.image, config='--psm 7'), "text")
+        self.assertEqual(pool.backend, "subprocess")
+        self.assertEqual(fallback.call_count, 2)
+
+
+class TestTessLibrary(unittest.TestCase):
+    """C API ラッパーの値変換（CDLL の代わりに関数を差し込む）"""
+
+    def setUp(self):
+        self.calls = []
+        self.text = ctypes.create_string_buffer("令和6年分 納税証明書\n".encode("utf-8"))
+
+        def int_variable(api, name, value):
+            if name != b"tessedit_pageseg_mode":
+                return 0
+            value._obj.value = 6
+            return 1
+
+        def bool_variable(api, name, value):
+            if name != b"preserve_interword_spaces":
+                return 0
+            value._obj.value = 0
+            return 1
+
+        def record(name, result=None):
+            return lambda *args: self.calls.append((name, args[1:])) or result
+
+        self.cdll = SimpleNamespace(
+            TessBaseAPICreate=lambda: "api",
+            TessBaseAPIInit3=lambda api, path, lang: 0 if lang == b"jpn" else -1,
+            TessBaseAPISetPageSegMode=record("psm"),
+            TessBaseAPISetVariable=record("set", 1),
+            TessBaseAPIGetIntVariable=int_variable,
+            TessBaseAPIGetBoolVariable=bool_variable,
+            TessBaseAPIGetDoubleVariable=lambda api, name, value: 0,
+            TessBaseAPIGetStringVariable=lambda api, name: b"" if name == b"tessedit_char_whitelist" else None,
+            TessBaseAPISetImage=lambda api, data, w, h, bpp, bpl: self.calls.append(("image", (len(data), w, h, bpp, bpl))),
+            TessBaseAPISetSourceResolution=record("dpi"),
+            TessBaseAPIGetUTF8Text=lambda api: ctypes.addressof(self.text),
+            TessDeleteText=record("delete_text"),
+            TessBaseAPIClear=record("clear"),
+            TessBaseAPIEnd=record("end"),
+            TessBaseAPIDelete=record("delete"),
+        )
+        self.library = tesseract_pool.TessLibrary(self.cdll)
+
+    def test_create_checks_init(self):
+        self.assertEqual(self.library.create("/tessdata", "jpn"), "api")
+        with self.assertRaises(RuntimeError):
+            self.library.create("/tessdata", "xxx")
+        self.assertIn(("delete", ()), self.calls)
+
+    def test_get_variable_by_type(self):
+        self.assertEqual(self.library.get_variable("api", "tessedit_pageseg_mode"), "6")
+        self.assertEqual(self.library.get_variable("api", "preserve_interword_spaces"), "0")
+        self.assertEqual(self.library.get_variable("api", "tessedit_char_whitelist"), "")
+        self.assertIsNone(self.library.get_variable("api", "no_such_variable"))
+
+    def test_recognize_rgb_image(self):
+        """RGBA は RGB（24bpp）で渡し、結果テキストを解放して Clear する"""
+        img = Image.new("RGBA", (5, 2))
+        img.info["dpi"] = (300, 300)
+        self.assertEqual(self.library.recognize("api", img), "令和6年分 納税証明書\n")
+        self.assertIn(("image", (30, 5, 2, 3, 15)), self.calls)
+        self.assertIn(("dpi", (300,)), self.calls)
+        self.assertEqual([name for name, _ in self.calls[-2:]], ["delete_text", "clear"])
+
+
+class TestSubprocessBackend(unittest.TestCase):
+
+    def test_without_library(self):
+        """libtesseract が見つからなければ pytesseract に委譲"""
+        pool = TesseractWorkerPool()
+        with mock.patch.object(tesseract_pool, "find_tesseract_library", return_value=None), \
+                mock.patch.object(tesseract_pool.pytesseract, "image_to_string", return_value="text") as fallback:
+            self.assertEqual(pool.image_to_string(Image.new("L", (4, 4)), lang='jpn', config='--psm 6'), "text")
+            self.assertEqual(pool.image_to_string(Image.new("L", (4, 4)), lang='jpn', config='--psm 7'), "text")
+        self.assertEqual(pool.backend, "subprocess")
+        self.assertEqual(fallback.call_count, 2)
+
+    def test_subprocess_backend_skips_library(self):
+        """subprocess 指定時はライブラリを探さない"""
+        pool = TesseractWorkerPool(backend="subprocess")
+        with mock.patch.object(tesseract_pool, "find_tesseract_library") as find, \
+                mock.patch.object(tesseract_pool.pytesseract, "image_to_string", return_value="text"):
+            self.assertEqual(pool.image_to_string(Image.new("L", (4, 4))), "text")
+        find.assert_not_called()
+
+    def test_unknown_backend_rejected(self):
+        with self.assertRaises(ValueError):
+            TesseractWorkerPool(backend="grpc")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,9 @@ from typing import List, Dict, Any, Callable, Optional
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# 並列一括処理の出力処理（ヘッドレス実行と共通）
+from core.output_naming import apply_pdf_analysis
+
 def handle_dropped_files(files: List[str], log: Callable[[str], None], settings: Dict[str, Any], 
                         success_callback: Optional[Callable] = None, error_callback: Optional[Callable] = None) -> tuple[int, int]:
     """
@@ -82,12 +85,13 @@ def handle_dropped_files(files: List[str], log: Callable[[str], None], settings:
             log(f"出力先: {output_folder}")
             
             # 元のmain.pyの処理ロジックを使用
+            pdf_processor = None
             try:
                 # main.pyから必要なクラスとモジュールをインポート
                 from main import TaxDocumentRenamerV5
                 from core.pdf_processor import PDFProcessor
-                from core.classification_v5 import DocumentClassifierV5
                 from core.csv_processor import CSVProcessor
+                from core.parallel_batch import create_parallel_batch_engine
                 import logging
                 
                 # ロガーを設定
@@ -95,23 +99,28 @@ def handle_dropped_files(files: List[str], log: Callable[[str], None], settings:
                 
                 # 必要なエンジンを初期化
                 pdf_processor = PDFProcessor(logger=logger)
-                classifier_v5 = DocumentClassifierV5(debug_mode=True)
                 csv_processor = CSVProcessor()
                 
-                # 各ファイルを処理
-                for i, file_path in enumerate(target_files, 1):
+                # 抽出・Bundle判定・分類はワーカープロセスで並列実行（結果は入力順）
+                batch_engine = create_parallel_batch_engine(
+                    municipality_sets=build_municipality_sets(settings),
+                    max_workers=settings.get('batch_max_workers')
+                )
+                
+                # 各ファイルを処理（書き込み・命名は入力順）
+                for i, analysis in enumerate(batch_engine.iter_analyses(target_files), 1):
+                    file_path = analysis.file_path
                     filename = os.path.basename(file_path)
                     log(f"処理中 ({i}/{len(target_files)}): {filename}")
                     
                     try:
-                        # ファイル拡張子による処理分岐
-                        if file_path.lower().endswith('.pdf'):
+                        # ファイル種別による処理分岐
+                        if analysis.kind == 'pdf':
                             # PDF処理（Bundle分割含む）
-                            success = process_single_pdf_file(
-                                file_path, output_folder, yymm, pdf_processor, 
-                                classifier_v5, settings, log, success_callback, error_callback
+                            success = apply_pdf_analysis(
+                                analysis, output_folder, yymm, pdf_processor, log, success_callback
                             )
-                        elif file_path.lower().endswith('.csv'):
+                        elif analysis.kind == 'csv':
                             # CSV処理
                             success = process_single_csv_file(
                                 file_path, output_folder, yymm, csv_processor, log, success_callback, error_callback
@@ -143,6 +152,9 @@ def handle_dropped_files(files: List[str], log: Callable[[str], None], settings:
             except Exception as e:
                 log(f"処理エンジン初期化エラー: {e}")
                 return 0, len(target_files)
+            finally:
+                if pdf_processor is not None:
+                    pdf_processor.close()
                 
         else:
             # 個別ファイルが指定された場合（従来通り）
@@ -156,136 +168,16 @@ def handle_dropped_files(files: List[str], log: Callable[[str], None], settings:
     return success_count, error_count
 
 
-def process_single_pdf_file(file_path: str, output_folder: str, yymm: str, 
-                           pdf_processor, classifier_v5, settings: Dict, log: Callable,
-                           success_callback: Optional[Callable] = None, error_callback: Optional[Callable] = None) -> bool:
-    """PDFファイルの処理（Bundle分割・分類・リネーム）"""
-    try:
-        filename = os.path.basename(file_path)
-        
-        # まずBundle分割を試行
-        split_result = pdf_processor.maybe_split_pdf(
-            input_pdf_path=file_path,
-            out_dir=output_folder,
-            force=False,
-            processing_callback=None
-        )
-        
-        if split_result['success']:
-            # Bundle分割が成功した場合
-            log(f"Bundle分割完了: {filename}")
-            
-            # 分割後の各ファイルをリネーム処理
-            if split_result.get('split_files'):
-                split_files = split_result.get('split_files', [])
-                for split_file_path in split_files:
-                    try:
-                        # 分割後ファイルの分類・リネーム
-                        process_pdf_classification_and_rename(
-                            split_file_path, output_folder, yymm, classifier_v5, settings, log, success_callback, error_callback
-                        )
-                        
-                        # 一時ファイルを削除
-                        if os.path.exists(split_file_path) and os.path.basename(split_file_path).startswith("__split_"):
-                            try:
-                                os.remove(split_file_path)
-                                log(f"一時ファイル削除: {os.path.basename(split_file_path)}")
-                            except Exception as cleanup_error:
-                                log(f"一時ファイル削除失敗: {cleanup_error}")
-                        
-                    except Exception as e:
-                        log(f"分割後ファイル処理エラー {os.path.basename(split_file_path)}: {e}")
-            
-            return True
-        else:
-            # 通常の単一ファイル処理
-            return process_pdf_classification_and_rename(
-                file_path, output_folder, yymm, classifier_v5, settings, log, success_callback, error_callback
-            )
-            
-    except Exception as e:
-        log(f"PDF処理エラー {os.path.basename(file_path)}: {e}")
-        return False
-
-
-def process_pdf_classification_and_rename(file_path: str, output_folder: str, yymm: str,
-                                        classifier_v5, settings: Dict, log: Callable,
-                                        success_callback: Optional[Callable] = None, error_callback: Optional[Callable] = None) -> bool:
-    """PDFファイルの分類・リネーム処理"""
-    try:
-        filename = os.path.basename(file_path)
-        
-        # PDFからテキストを抽出
-        try:
-            import fitz
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-        except Exception as e:
-            log(f"PDF読み取りエラー: {e}")
-            text = ""
-        
-        # 自治体設定を構築
-        municipality_sets = {}
-        if 'municipality_sets' in settings:
-            for muni_set in settings['municipality_sets']:
-                set_num = muni_set['set_number']
-                municipality_sets[set_num] = {
-                    'prefecture': muni_set['prefecture'],
-                    'city': muni_set['city']
-                }
-        
-        # ファイル分類
-        classification_result = classifier_v5.classify_with_municipality_info_v5(
-            text, filename, municipality_sets=municipality_sets
-        )
-        
-        document_type = classification_result.document_type if classification_result else "9999_未分類"
-        
-        # 新ファイル名生成
-        new_filename = f"{document_type}_{yymm}.pdf"
-        
-        # ファイルコピー（重複回避）
-        import shutil
-        output_path = os.path.join(output_folder, new_filename)
-        
-        # 重複回避処理
-        counter = 1
-        while os.path.exists(output_path):
-            name, ext = os.path.splitext(new_filename)
-            output_path = os.path.join(output_folder, f"{name}_{counter:03d}{ext}")
-            counter += 1
-        
-        shutil.copy2(file_path, output_path)
-        
-        # 結果ログ
-        if classification_result:
-            confidence = f"{classification_result.confidence:.2f}"
-            method = classification_result.classification_method
-            matched_keywords = classification_result.matched_keywords or []
-        else:
-            confidence = "0.00"
-            method = "未分類"
-            matched_keywords = []
-        
-        log(f"✅ 処理完了: {filename} → {os.path.basename(output_path)}")
-        log(f"  - 分類: {document_type}")
-        log(f"  - 信頼度: {confidence}")
-        log(f"  - 判定方法: {method}")
-        if matched_keywords:
-            log(f"  - キーワード: {matched_keywords}")
-        
-        # 成功コールバックを呼び出し
-        if success_callback:
-            success_callback(file_path, os.path.basename(output_path), document_type, method, confidence, matched_keywords)
-        
-        return True
-        
-    except Exception as e:
-        log(f"分類・リネーム処理エラー {os.path.basename(file_path)}: {e}")
-        return False
+def build_municipality_sets(settings: Dict) -> Dict[int, Dict[str, str]]:
+    """設定の自治体セットリストを分類器用の辞書に変換"""
+    municipality_sets = {}
+    for muni_set in settings.get('municipality_sets', []):
+        set_num = muni_set['set_number']
+        municipality_sets[set_num] = {
+            'prefecture': muni_set['prefecture'],
+            'city': muni_set['city']
+        }
+    return municipality_sets
 
 
 def process_single_csv_file(file_path: str, output_folder: str, yymm: str, 
@@ -295,8 +187,8 @@ def process_single_csv_file(file_path: str, output_folder: str, yymm: str,
     try:
         filename = os.path.basename(file_path)
         
-        # CSV処理
-        result = csv_processor.process_csv(file_path)
+        # CSV処理（年月は指定値を使うため、分類はヘッダーのみで行う）
+        result = csv_processor.process_csv(file_path, year_month=yymm)
         
         if not result.success:
             log(f"CSV処理失敗: {result.error_message}")